@@ -1,9 +1,9 @@
 # Resume Relevance Check Application
 # Main package initialization
 
-__version__ = \"1.0.0\"
-__author__ = \"Pratima Dixit R\"
-__email__ = \"pratimadixit2305@gmail.com\"
+__version__ = "1.0.0"
+__author__ = "Pratima Dixit R"
+__email__ = "pratimadixit2305@gmail.com"
 
 # Configure Python path for relative imports
 import sys
@@ -16,7 +16,7 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 # Add src directory to path
-src_path = project_root / \"src\"
+src_path = project_root / "src"
 if str(src_path) not in sys.path:
     sys.path.insert(0, str(src_path))
 
@@ -13,9 +13,11 @@ from datetime import datetime
 import time
 from pathlib import Path
 import json
-import base64
 import logging
 
+from src.scoring.engine import ScoringOptions, get_scoring_engine
+from src.storage.export import export_filename, export_records
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -123,150 +125,6 @@ def extract_text_from_file(uploaded_file):
         st.error(f"Error extracting text: {e}")
         return None
 
-def extract_key_sections(text):
-    """Extract key sections from resume or JD text"""
-    sections = {
-        'experience': [],
-        'skills': [],
-        'education': [],
-        'projects': []
-    }
-    
-    # Simple section extraction based on common headers
-    lines = text.split('\n')
-    current_section = None
-    
-    experience_keywords = ['experience', 'work', 'employment', 'professional']
-    skills_keywords = ['skills', 'technologies', 'tools', 'competencies']
-    education_keywords = ['education', 'academic', 'university', 'degree']
-    projects_keywords = ['projects', 'portfolio', 'work samples']
-    
-    for line in lines:
-        line_lower = line.lower().strip()
-        
-        # Detect section headers
-        if any(keyword in line_lower for keyword in experience_keywords):
-            current_section = 'experience'
-        elif any(keyword in line_lower for keyword in skills_keywords):
-            current_section = 'skills'
-        elif any(keyword in line_lower for keyword in education_keywords):
-            current_section = 'education'
-        elif any(keyword in line_lower for keyword in projects_keywords):
-            current_section = 'projects'
-        
-        # Add content to current section
-        if current_section and line.strip() and not any(keyword in line_lower for keyword in 
-            experience_keywords + skills_keywords + education_keywords + projects_keywords):
-            sections[current_section].append(line.strip())
-    
-    return sections
-
-def calculate_section_scores(resume_sections, jd_sections):
-    """Calculate scores for each section"""
-    section_scores = {}
-    
-    for section in ['experience', 'skills', 'education', 'projects']:
-        resume_text = ' '.join(resume_sections.get(section, []))
-        jd_text = ' '.join(jd_sections.get(section, []))
-        
-        if not jd_text:
-            section_scores[section] = 100.0  # No requirements, full score
-            continue
-        
-        if not resume_text:
-            section_scores[section] = 0.0  # No content, no score
-            continue
-        
-        # Calculate similarity for this section
-        try:
-            from sklearn.feature_extraction.text import TfidfVectorizer
-            from sklearn.metrics.pairwise import cosine_similarity
-            
-            vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 1))
-            tfidf_matrix = vectorizer.fit_transform([resume_text.lower(), jd_text.lower()])
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            section_scores[section] = max(0.0, min(100.0, float(similarity) * 100))
-        except:
-            section_scores[section] = 0.0
-    
-    return section_scores
-
-def calculate_hard_match(resume_data, jd_data):
-    """Calculate hard match score based on keyword matching"""
-    try:
-        resume_text = resume_data.get('raw_text', '').lower()
-        jd_text = jd_data.get('raw_text', '').lower()
-        
-        if not resume_text or not jd_text:
-            return 0.0, []
-        
-        # Simple keyword matching approach
-        jd_words = set(jd_text.split())
-        resume_words = set(resume_text.split())
-        
-        # Calculate overlap
-        common_words = jd_words.intersection(resume_words)
-        missing_words = jd_words - resume_words
-        total_jd_words = len(jd_words)
-        
-        if total_jd_words == 0:
-            return 0.0, []
-            
-        score = (len(common_words) / total_jd_words) * 100
-        return min(score, 100.0), list(missing_words)
-        
-    except Exception as e:
-        logger.error(f"Hard match calculation failed: {e}")
-        return 0.0, []
-
-def calculate_semantic_match(resume_data, jd_data):
-    """Calculate semantic similarity using TF-IDF"""
-    try:
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.metrics.pairwise import cosine_similarity
-        
-        resume_text = resume_data.get('raw_text', '')
-        jd_text = jd_data.get('raw_text', '')
-        
-        if not resume_text or not jd_text:
-            return 0.0
-        
-        # Clean texts
-        def _clean_text(text):
-            import re
-            if not text:
-                return ""
-            # Remove extra whitespace and normalize
-            text = re.sub(r'\s+', ' ', text.strip())
-            # Remove special characters but keep important punctuation
-            text = re.sub(r'[^\w\s\.,!?;:()-]', ' ', text)
-            return text.lower()
-        
-        resume_clean = _clean_text(resume_text)
-        jd_clean = _clean_text(jd_text)
-        
-        if not resume_clean or not jd_clean:
-            return 0.0
-        
-        # Create TF-IDF vectors
-        vectorizer = TfidfVectorizer(
-            stop_words='english',
-            ngram_range=(1, 2),
-            max_features=1000,
-            min_df=1
-        )
-        
-        tfidf_matrix = vectorizer.fit_transform([resume_clean, jd_clean])
-        
-        # Calculate cosine similarity
-        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-        
-        return max(0.0, min(100.0, float(similarity) * 100))
-        
-    except Exception as e:
-        logger.error(f"Semantic matching failed: {e}")
-        return 0.0
-
 def get_detailed_verdict(hard_match_score, semantic_match_score, missing_keywords=None):
     """Generate detailed verdict based on scores"""
     combined_score = (hard_match_score + semantic_match_score) / 2
@@ -315,13 +173,6 @@ def check_ai_status():
         st.error(f"❌ AI Status Error: {e}")
         return False
 
-def create_download_link(data, filename):
-    """Create a download link for analysis results"""
-    json_data = json.dumps(data, indent=2)
-    b64 = base64.b64encode(json_data.encode()).decode()
-    href = f'<a href="data:file/json;base64,{b64}" download="{filename}">Download Analysis Report</a>'
-    return href
-
 def main():
     # Main header
     st.markdown('<h1 class="main-header">🤖 Advanced Resume AI Analyzer</h1>', unsafe_allow_html=True)
@@ -417,33 +268,29 @@ def perform_advanced_analysis(analysis_depth):
         status_text.text('📊 Preparing data...')
         progress_bar.progress(20)
         
-        resume_data = {"raw_text": st.session_state.resume_text}
-        jd_data = {"raw_text": st.session_state.jd_text}
-        
-        # Initialize section variables
-        resume_sections = {}
-        jd_sections = {}
-        section_scores = {}
+        # Tokenize each document once; keywords and sections are served from it
+        engine = get_scoring_engine()
+        resume_doc = engine.analyze(st.session_state.resume_text)
+        jd_doc = engine.analyze(st.session_state.jd_text)
+        include_sections = analysis_depth in ["Standard", "Deep"]
         
-        # Extract sections for deep analysis
-        if analysis_depth in ["Standard", "Deep"]:
+        if include_sections:
             status_text.text('🔍 Extracting sections...')
             progress_bar.progress(30)
-            resume_sections = extract_key_sections(st.session_state.resume_text)
-            jd_sections = extract_key_sections(st.session_state.jd_text)
         
         # Calculate scores
         status_text.text('🧮 Calculating scores...')
         progress_bar.progress(50)
         
-        hard_match_score, missing_keywords = calculate_hard_match(resume_data, jd_data)
-        semantic_match_score = calculate_semantic_match(resume_data, jd_data)
+        scores = engine.score(resume_doc, jd_doc, ScoringOptions.standard(include_sections=include_sections))
+        hard_match_score, missing_keywords = scores['hard_match_score'], scores['missing_keywords']
+        semantic_match_score = scores['semantic_match_score']
+        section_scores = scores['section_scores']
         
         # Section scores for deep analysis
-        if analysis_depth in ["Standard", "Deep"]:
+        if include_sections:
             status_text.text('📑 Analyzing sections...')
             progress_bar.progress(70)
-            section_scores = calculate_section_scores(resume_sections, jd_sections)
         
         progress_bar.progress(80)
         status_text.text('🏆 Generating detailed verdict...')
@@ -851,22 +698,21 @@ def save_export_page():
         
         # Export all analyses
         st.markdown("#### 📦 Export All Analyses")
-        all_json = json.dumps(st.session_state.analysis_results, indent=2)
+        # Serialised only when a button is clicked, not on every rerun of the page
+        results = st.session_state.analysis_results
         st.download_button(
             label="Download All Analyses (JSON)",
-            data=all_json,
+            data=lambda: json.dumps(results, indent=2),
             file_name=f"all_resume_analyses_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
             mime="application/json"
         )
         
         # Export as CSV
         st.markdown("#### 📊 Export Summary (CSV)")
-        df = pd.DataFrame(st.session_state.analysis_results)
-        csv = df.to_csv(index=False)
         st.download_button(
             label="Download Summary (CSV)",
-            data=csv,
-            file_name=f"resume_analysis_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            data=lambda: export_records(results, 'csv'),
+            file_name=export_filename("resume_analysis_summary", 'csv'),
             mime="text/csv"
         )
         
@@ -0,0 +1,86 @@
+"""
+Benchmark section segmentation on multi-page documents.
+
+Compares the previous keyword-substring detector, which tested every header
+keyword against every line, with the compiled header classifier in
+``src.scoring.sections``. Documents are built by repeating the bundled sample
+resume and job description to the requested number of pages.
+
+Usage:
+    python benchmarks/bench_section_segmentation.py --pages 1 10 100
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.scoring.sections import segment_sections  # noqa: E402
+
+# Header keywords and matching loop of the detector replaced by the classifier
+LEGACY_PROFILE = {
+    'experience': ['experience', 'work', 'employment', 'professional'],
+    'skills': ['skills', 'technologies', 'tools', 'competencies', 'expertise'],
+    'education': ['education', 'academic', 'university', 'degree', 'qualification'],
+    'projects': ['projects', 'portfolio', 'work samples', 'achievements'],
+    'certifications': ['certifications', 'certificates', 'credentials'],
+    'summary': ['summary', 'objective', 'profile', 'about'],
+}
+
+
+def legacy_sections(text: str) -> Dict[str, List[str]]:
+    """Previous detector: substring keyword test per line and per section"""
+    sections: Dict[str, List[str]] = {name: [] for name in LEGACY_PROFILE}
+    all_keywords = [keyword for keywords in LEGACY_PROFILE.values() for keyword in keywords]
+    current_section = None
+    for line in text.split('\n'):
+        line_lower = line.lower().strip()
+        for name, keywords in LEGACY_PROFILE.items():
+            if any(keyword in line_lower for keyword in keywords):
+                current_section = name
+                break
+        if current_section and line.strip() and not any(keyword in line_lower for keyword in all_keywords):
+            sections[current_section].append(line.strip())
+    return sections
+
+
+def load_page() -> str:
+    """One 'page' of text: the sample resume followed by the sample JD"""
+    resume = next((PROJECT_ROOT / "sample_resumes").glob("*.txt")).read_text(encoding="utf-8")
+    jd = next((PROJECT_ROOT / "sample_jds").glob("*.txt")).read_text(encoding="utf-8")
+    return resume + "\n" + jd
+
+
+def time_call(func: Callable[[str], object], text: str, repeat: int) -> float:
+    """Best wall-clock time of ``repeat`` runs in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark section segmentation")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    page = load_page()
+    print(f"{'pages':>6} {'lines':>8} {'legacy ms':>10} {'compiled ms':>12} {'speedup':>8} {'lines/s':>12}")
+    for pages in args.pages:
+        text = "\n".join([page] * pages)
+        lines = text.count("\n") + 1
+        legacy = time_call(legacy_sections, text, args.repeat)
+        compiled = time_call(lambda t: segment_sections(t, "professional"), text, args.repeat)
+        print(f"{pages:>6} {lines:>8} {legacy * 1000:>10.2f} {compiled * 1000:>12.2f} "
+              f"{legacy / compiled:>7.1f}x {lines / compiled:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
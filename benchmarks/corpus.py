@@ -0,0 +1,132 @@
+"""
+Deterministic synthetic resume and job description corpora.
+
+Documents are assembled from the section headers and bullet lines of the
+samples in ``sample_resumes/`` and ``sample_jds/``, with skills swapped in
+from the samples' own skill vocabulary and a varying number of bullets per
+section, so the corpus exercises realistic lengths and overlaps. Document
+``i`` depends only on the seed and ``i``, so any slice of a 100k corpus can be
+regenerated without building the documents before it.
+"""
+
+import random
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from src.scoring.document import tokenize
+from src.scoring.hard_match import extract_skills_from_text
+from src.scoring.sections import get_section_classifier, span_lines
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SEED = 1729
+
+
+class SampleTemplate:
+    """Headers and content lines per section, learned from sample documents"""
+
+    def __init__(self, texts: List[str]):
+        """Segment the samples with the professional section profile
+
+        Args:
+            texts: Raw sample documents of one kind (resumes or JDs)
+        """
+        classifier = get_section_classifier("professional")
+        self.headers: Dict[str, List[str]] = {}
+        self.lines: Dict[str, List[str]] = {}
+        self.preamble: List[str] = []
+
+        for text in texts:
+            for line in text.split('\n'):
+                header = classifier.classify(line)
+                if header is not None and line.strip():
+                    name, _ = header
+                    self.headers.setdefault(name, [])
+                    if line.strip() not in self.headers[name]:
+                        self.headers[name].append(line.strip())
+
+            spans = classifier.segment(text)
+            for name, section_spans in spans.items():
+                self.lines.setdefault(name, []).extend(span_lines(text, section_spans))
+
+            first_span = min((start for spans_ in spans.values() for start, _ in spans_), default=len(text))
+            self.preamble.extend(line.strip() for line in text[:first_span].split('\n')[:3] if line.strip())
+
+        self.sections = [name for name in self.headers if self.lines.get(name)]
+
+
+def _read_samples(directory: Path) -> List[str]:
+    return [path.read_text(encoding="utf-8") for path in sorted(directory.glob("*.txt"))]
+
+
+class SyntheticCorpus:
+    """Reproducible generator of resumes, job descriptions and pairs"""
+
+    def __init__(self, seed: int = DEFAULT_SEED, resume_dir: Path = PROJECT_ROOT / "sample_resumes",
+                 jd_dir: Path = PROJECT_ROOT / "sample_jds"):
+        """Load the sample templates
+
+        Args:
+            seed: Base seed; the same seed always yields the same corpus
+            resume_dir: Directory of sample resume ``.txt`` files
+            jd_dir: Directory of sample job description ``.txt`` files
+        """
+        self.seed = seed
+        resume_samples = _read_samples(resume_dir)
+        jd_samples = _read_samples(jd_dir)
+        if not resume_samples or not jd_samples:
+            raise FileNotFoundError(f"No .txt samples found in {resume_dir} or {jd_dir}")
+
+        self.resume_template = SampleTemplate(resume_samples)
+        self.jd_template = SampleTemplate(jd_samples)
+        self.skills = sorted(set(extract_skills_from_text(' '.join(resume_samples + jd_samples))))
+        self.vocabulary = sorted(set(tokenize(' '.join(resume_samples + jd_samples))))
+
+    def _document(self, template: SampleTemplate, kind: str, index: int, max_bullets: int) -> str:
+        rng = random.Random(f"{self.seed}:{kind}:{index}")
+        lines = [f"{rng.choice(template.preamble)} #{index}"] if template.preamble else []
+
+        sections = [name for name in template.sections if rng.random() < 0.85] or template.sections[:1]
+        for name in sections:
+            lines.append("")
+            lines.append(rng.choice(template.headers[name]))
+            pool = template.lines[name]
+            for _ in range(rng.randint(1, max_bullets)):
+                lines.append(self._mutate(rng.choice(pool), rng))
+
+        return '\n'.join(lines)
+
+    def _mutate(self, line: str, rng: random.Random) -> str:
+        """Swap a few words for other skills or sample vocabulary"""
+        words = line.split(' ')
+        for _ in range(rng.randint(0, 3)):
+            position = rng.randrange(len(words))
+            replacement_pool = self.skills if rng.random() < 0.6 and self.skills else self.vocabulary
+            words[position] = rng.choice(replacement_pool)
+        return ' '.join(words)
+
+    def resume(self, index: int) -> str:
+        """Synthetic resume number ``index`` (roughly one to four pages)"""
+        return self._document(self.resume_template, "resume", index, max_bullets=12)
+
+    def jd(self, index: int) -> str:
+        """Synthetic job description number ``index``"""
+        return self._document(self.jd_template, "jd", index, max_bullets=8)
+
+    def resumes(self, count: int) -> Iterator[str]:
+        return (self.resume(index) for index in range(count))
+
+    def jds(self, count: int) -> Iterator[str]:
+        return (self.jd(index) for index in range(count))
+
+    def pairs(self, count: int, jd_pool: int = 50) -> Iterator[Tuple[str, str]]:
+        """``count`` resume/JD pairs, cycling over a pool of job descriptions
+
+        A real screening run compares many resumes against few JDs, so JDs are
+        reused across pairs while every resume is distinct.
+        """
+        jd_count = max(1, min(jd_pool, count))
+        jds = [self.jd(index) for index in range(jd_count)]
+        return ((self.resume(index), jds[index % jd_count]) for index in range(count))
+
+
+__all__ = ['SyntheticCorpus', 'SampleTemplate', 'DEFAULT_SEED']
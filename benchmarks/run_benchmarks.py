@@ -0,0 +1,259 @@
+"""
+Latency and throughput benchmarks for the scoring pipeline.
+
+Times each scoring stage over synthetic corpora of increasing size and writes
+p50/p95/p99 latency and docs/sec per target and size to a JSON file, so runs
+from different commits can be compared with ``--compare``.
+
+Targets:
+    hard_match       src.scoring.hard_match.calculate_hard_match on raw text
+    engine_tfidf     ScoringEngine.semantic_match (the Streamlit TF-IDF path)
+    semantic_<name>  each backend of calculate_detailed_semantic_match that
+                     is installed (tfidf, sentence_transformer, spacy,
+                     huggingface); missing backends are reported as skipped
+    alignment        requirement-to-evidence alignment (embeddings when a
+                     model is loaded, otherwise TF-IDF)
+    verdict          src.scoring.verdict.get_detailed_verdict
+    evaluate         POST /api/v1/evaluate/ through FastAPI's TestClient
+
+Usage:
+    python -m benchmarks.run_benchmarks --sizes 1 100 1000
+    python -m benchmarks.run_benchmarks --targets hard_match evaluate --sizes 10000
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/old.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.corpus import DEFAULT_SEED, SyntheticCorpus  # noqa: E402
+
+DEFAULT_SIZES = [1, 10, 100, 1000]
+DEFAULT_RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+MAX_SIZE = 100_000
+
+PairFunction = Callable[[str, str], Any]
+
+
+def _hard_match_target() -> PairFunction:
+    from src.scoring.hard_match import calculate_hard_match
+    return calculate_hard_match
+
+
+def _engine_tfidf_target() -> PairFunction:
+    from src.scoring.engine import get_scoring_engine
+    return get_scoring_engine().semantic_match
+
+
+def _semantic_backend_target(backend: str) -> Callable[[], Optional[PairFunction]]:
+    def build() -> Optional[PairFunction]:
+        from src.scoring import semantic_match
+        backends = {
+            'tfidf': (True, semantic_match._calculate_tfidf_similarity),
+            'sentence_transformer': (semantic_match.SENTENCE_TRANSFORMERS_AVAILABLE,
+                                     semantic_match._calculate_transformer_similarity),
+            'spacy': (semantic_match.SPACY_AVAILABLE, semantic_match._calculate_spacy_similarity),
+            'huggingface': (semantic_match.HUGGINGFACE_LLM_AVAILABLE,
+                            semantic_match._calculate_huggingface_similarity),
+        }
+        available, func = backends[backend]
+        return func if available else None
+    return build
+
+
+def _verdict_target() -> PairFunction:
+    from src.scoring.verdict import get_detailed_verdict
+    # The verdict only depends on scores; derive stable ones from the lengths
+    return lambda resume, jd: get_detailed_verdict(len(resume) % 100, len(jd) % 100)
+
+
+def _alignment_target() -> PairFunction:
+    from src.scoring.alignment import get_requirement_aligner
+    aligner = get_requirement_aligner()
+    return lambda resume, jd: aligner.align(resume, jd)
+
+
+def _evaluate_target() -> PairFunction:
+    # database.py opens ./evaluations.db relative to the working directory, and
+    # main() has already moved into a scratch directory before this import
+    from fastapi.testclient import TestClient
+    from src.api.auth import get_current_active_user
+    from src.api.main import app
+    from src.api.models import User
+
+    app.dependency_overrides[get_current_active_user] = lambda: User(
+        id=1, username="benchmark", email="benchmark@example.com"
+    )
+    client = TestClient(app)
+
+    def evaluate(resume: str, jd: str):
+        response = client.post("/api/v1/evaluate/", data={"resume_text": resume, "jd_text": jd})
+        response.raise_for_status()
+        return response.json()
+
+    return evaluate
+
+
+TARGETS: Dict[str, Callable[[], Optional[PairFunction]]] = {
+    'hard_match': _hard_match_target,
+    'engine_tfidf': _engine_tfidf_target,
+    'semantic_tfidf': _semantic_backend_target('tfidf'),
+    'semantic_sentence_transformer': _semantic_backend_target('sentence_transformer'),
+    'semantic_spacy': _semantic_backend_target('spacy'),
+    'semantic_huggingface': _semantic_backend_target('huggingface'),
+    'alignment': _alignment_target,
+    'verdict': _verdict_target,
+    'evaluate': _evaluate_target,
+}
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Percentile latencies in milliseconds and throughput over busy time
+
+    Throughput excludes the time spent generating the synthetic documents,
+    which are streamed so that 100k-document runs stay in constant memory.
+    """
+    samples = np.asarray(latencies) * 1000.0
+    busy_time = float(np.sum(latencies))
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        'count': len(latencies),
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'mean_ms': float(samples.mean()),
+        'max_ms': float(samples.max()),
+        'busy_time_s': busy_time,
+        'docs_per_sec': len(latencies) / busy_time if busy_time > 0 else 0.0,
+    }
+
+
+def run_target(func: PairFunction, pairs: Iterable[Tuple[str, str]]) -> Dict[str, float]:
+    """Time ``func`` over every pair, after one untimed warm-up call"""
+    pairs = iter(pairs)
+    first = next(pairs)
+    warmup_start = time.perf_counter()
+    func(*first)
+    warmup = time.perf_counter() - warmup_start
+
+    latencies = []
+    for resume, jd in itertools.chain([first], pairs):
+        start = time.perf_counter()
+        func(resume, jd)
+        latencies.append(time.perf_counter() - start)
+    result = summarize(latencies)
+    result['warmup_ms'] = warmup * 1000.0
+    return result
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(targets: List[str], sizes: List[int], seed: int, jd_pool: int,
+              limits: Dict[str, int]) -> Dict[str, Any]:
+    """Run every target at every corpus size and collect the results"""
+    corpus = SyntheticCorpus(seed=seed)
+    report: Dict[str, Any] = {
+        'revision': _git_revision(),
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': seed,
+        'jd_pool': jd_pool,
+        'results': {},
+    }
+
+    for size in sizes:
+        print(f"\n== size {size:,}")
+
+        for name in targets:
+            func = TARGETS[name]()
+            entry = report['results'].setdefault(name, {})
+            if func is None:
+                entry[str(size)] = {'skipped': 'backend not installed'}
+                print(f"{name:<32} skipped (backend not installed)")
+                continue
+
+            count = min(size, limits.get(name, size))
+            result = run_target(func, corpus.pairs(count, jd_pool))
+            result['size'] = size
+            entry[str(size)] = result
+            print(f"{name:<32} n={result['count']:<7,} p50={result['p50_ms']:8.3f}ms "
+                  f"p95={result['p95_ms']:8.3f}ms p99={result['p99_ms']:8.3f}ms "
+                  f"{result['docs_per_sec']:10,.1f} docs/s")
+
+    return report
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]):
+    """Print p50 and throughput ratios against a previous report"""
+    print(f"\n== {current['revision']} vs {baseline.get('revision', 'baseline')}")
+    for name, sizes in current['results'].items():
+        for size, result in sizes.items():
+            previous = baseline.get('results', {}).get(name, {}).get(size)
+            if 'p50_ms' not in result or not previous or 'p50_ms' not in previous:
+                continue
+            p50_ratio = result['p50_ms'] / previous['p50_ms'] if previous['p50_ms'] else float('inf')
+            throughput_ratio = (result['docs_per_sec'] / previous['docs_per_sec']
+                                if previous['docs_per_sec'] else float('inf'))
+            print(f"{name:<32} size={size:<7} p50 x{p50_ratio:6.2f}  docs/s x{throughput_ratio:6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the resume scoring pipeline")
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=list(TARGETS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help=f"corpus sizes in resume/JD pairs (1 to {MAX_SIZE:,})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--jd-pool", type=int, default=50, help="distinct JDs cycled across pairs")
+    parser.add_argument("--evaluate-limit", type=int, default=1000,
+                        help="cap on /evaluate/ calls per size, since each one writes to the database")
+    parser.add_argument("--output", type=Path, help="report path (default benchmarks/results/<revision>.json)")
+    parser.add_argument("--compare", type=Path, help="previous report to compare against")
+    args = parser.parse_args()
+
+    invalid = [size for size in args.sizes if not 1 <= size <= MAX_SIZE]
+    if invalid:
+        parser.error(f"sizes must be between 1 and {MAX_SIZE:,}: {invalid}")
+
+    output = args.output.resolve() if args.output else None
+    baseline = json.loads(args.compare.resolve().read_text()) if args.compare else None
+
+    with tempfile.TemporaryDirectory(prefix="resume-bench-") as scratch:
+        os.chdir(scratch)
+        report = run_suite(args.targets, args.sizes, args.seed, args.jd_pool,
+                           limits={'evaluate': args.evaluate_limit})
+
+    output = output or DEFAULT_RESULTS_DIR / f"{report['revision']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults written to {output}")
+
+    if baseline:
+        compare(report, baseline)
+
+
+if __name__ == "__main__":
+    main()
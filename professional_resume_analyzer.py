@@ -13,11 +13,16 @@ from datetime import datetime
 import time
 from pathlib import Path
 import json
-import base64
 import logging
 from io import BytesIO
 import numpy as np
 
+from src.utils.analysis_cache import AnalysisCache, content_hash, make_cache_key
+
+from src.scoring.engine import ScoringOptions, get_scoring_engine
+from src.storage.export import PYARROW_AVAILABLE, export_filename, export_records
+from src.storage.rollups import ScoreRollup, bucket_labels
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -171,7 +176,45 @@ if 'analysis_results' not in st.session_state:
 if 'current_analysis' not in st.session_state:
     st.session_state.current_analysis = None
 
+SCORE_FIELDS = ['final_score', 'hard_match', 'semantic_match', 'skill_match']
+
+def session_rollups():
+    """Per-score rollups of the session's results, updated as results are added
+
+    Rebuilt only when they no longer match the results list, e.g. in a
+    session that predates them.
+    """
+    results = st.session_state.analysis_results
+    rollups = st.session_state.get('score_rollups')
+    if rollups is None or rollups['final_score'].count != len(results):
+        rollups = {
+            field: ScoreRollup(float(result.get(field) or 0) for result in results)
+            for field in SCORE_FIELDS
+        }
+        st.session_state.score_rollups = rollups
+    return rollups
+
+@st.cache_resource
+def get_analysis_cache():
+    """Bounded cache shared across reruns, keyed by content hash and analysis options"""
+    return AnalysisCache(max_entries=int(os.getenv('ANALYSIS_CACHE_SIZE', '128')))
+
 def extract_text_from_file(uploaded_file):
+    """Extract text from uploaded file, reusing the cached text for identical content"""
+    file_bytes = uploaded_file.getvalue()
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    key = make_cache_key("extract", content_hash(file_bytes), extension)
+    text, cached = get_analysis_cache().get_or_compute(key, lambda: _extract_text_uncached(uploaded_file))
+    if cached:
+        st.caption("⚡ Served from cache")
+    return text
+
+def get_cached_document(text):
+    """Tokenize and section a document once per distinct content"""
+    key = make_cache_key("document", content_hash(text))
+    return get_analysis_cache().get_or_compute(key, lambda: get_scoring_engine().analyze(text))
+
+def _extract_text_uncached(uploaded_file):
     """Extract text from uploaded file"""
     try:
         # For PDF files
@@ -204,161 +247,6 @@ def extract_text_from_file(uploaded_file):
         st.error(f"Error extracting text: {e}")
         return None
 
-def extract_key_sections(text):
-    """Extract key sections from resume or JD text"""
-    sections = {
-        'experience': [],
-        'skills': [],
-        'education': [],
-        'projects': [],
-        'certifications': [],
-        'summary': []
-    }
-    
-    # Simple section extraction based on common headers
-    lines = text.split('\n')
-    current_section = None
-    
-    experience_keywords = ['experience', 'work', 'employment', 'professional']
-    skills_keywords = ['skills', 'technologies', 'tools', 'competencies', 'expertise']
-    education_keywords = ['education', 'academic', 'university', 'degree', 'qualification']
-    projects_keywords = ['projects', 'portfolio', 'work samples', 'achievements']
-    certifications_keywords = ['certifications', 'certificates', 'credentials']
-    summary_keywords = ['summary', 'objective', 'profile', 'about']
-    
-    for line in lines:
-        line_lower = line.lower().strip()
-        
-        # Detect section headers
-        if any(keyword in line_lower for keyword in experience_keywords):
-            current_section = 'experience'
-        elif any(keyword in line_lower for keyword in skills_keywords):
-            current_section = 'skills'
-        elif any(keyword in line_lower for keyword in education_keywords):
-            current_section = 'education'
-        elif any(keyword in line_lower for keyword in projects_keywords):
-            current_section = 'projects'
-        elif any(keyword in line_lower for keyword in certifications_keywords):
-            current_section = 'certifications'
-        elif any(keyword in line_lower for keyword in summary_keywords):
-            current_section = 'summary'
-        
-        # Add content to current section
-        if current_section and line.strip() and not any(keyword in line_lower for keyword in 
-            experience_keywords + skills_keywords + education_keywords + projects_keywords + 
-            certifications_keywords + summary_keywords):
-            sections[current_section].append(line.strip())
-    
-    return sections
-
-def calculate_section_scores(resume_sections, jd_sections):
-    """Calculate scores for each section"""
-    section_scores = {}
-    
-    for section in ['experience', 'skills', 'education', 'projects', 'certifications', 'summary']:
-        resume_text = ' '.join(resume_sections.get(section, []))
-        jd_text = ' '.join(jd_sections.get(section, []))
-        
-        if not jd_text:
-            section_scores[section] = 100.0  # No requirements, full score
-            continue
-        
-        if not resume_text:
-            section_scores[section] = 0.0  # No content, no score
-            continue
-        
-        # Calculate similarity for this section
-        try:
-            from sklearn.feature_extraction.text import TfidfVectorizer
-            from sklearn.metrics.pairwise import cosine_similarity
-            
-            vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 2), max_features=500)
-            tfidf_matrix = vectorizer.fit_transform([resume_text.lower(), jd_text.lower()])
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            section_scores[section] = max(0.0, min(100.0, float(similarity) * 100))
-        except:
-            section_scores[section] = 0.0
-    
-    return section_scores
-
-def calculate_hard_match(resume_data, jd_data):
-    """Calculate hard match score based on keyword matching"""
-    try:
-        resume_text = resume_data.get('raw_text', '').lower()
-        jd_text = jd_data.get('raw_text', '').lower()
-        
-        if not resume_text or not jd_text:
-            return 0.0, []
-        
-        # Extract keywords from JD
-        import re
-        # Simple keyword extraction - in a real app, you might use NLP techniques
-        jd_words = set(re.findall(r'\b\w+\b', jd_text))
-        resume_words = set(re.findall(r'\b\w+\b', resume_text))
-        
-        # Calculate overlap
-        common_words = jd_words.intersection(resume_words)
-        missing_words = list(jd_words - resume_words)
-        total_jd_words = len(jd_words)
-        
-        if total_jd_words == 0:
-            return 0.0, []
-            
-        score = (len(common_words) / total_jd_words) * 100
-        return min(score, 100.0), missing_words[:20]  # Top 20 missing words
-        
-    except Exception as e:
-        logger.error(f"Hard match calculation failed: {e}")
-        return 0.0, []
-
-def calculate_semantic_match(resume_data, jd_data):
-    """Calculate semantic similarity using TF-IDF"""
-    try:
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.metrics.pairwise import cosine_similarity
-        
-        resume_text = resume_data.get('raw_text', '')
-        jd_text = jd_data.get('raw_text', '')
-        
-        if not resume_text or not jd_text:
-            return 0.0
-        
-        # Clean texts
-        def _clean_text(text):
-            import re
-            if not text:
-                return ""
-            # Remove extra whitespace and normalize
-            text = re.sub(r'\s+', ' ', text.strip())
-            # Remove special characters but keep important punctuation
-            text = re.sub(r'[^\w\s\.,!?;:()-]', ' ', text)
-            return text.lower()
-        
-        resume_clean = _clean_text(resume_text)
-        jd_clean = _clean_text(jd_text)
-        
-        if not resume_clean or not jd_clean:
-            return 0.0
-        
-        # Create TF-IDF vectors
-        vectorizer = TfidfVectorizer(
-            stop_words='english',
-            ngram_range=(1, 3),
-            max_features=2000,
-            min_df=1
-        )
-        
-        tfidf_matrix = vectorizer.fit_transform([resume_clean, jd_clean])
-        
-        # Calculate cosine similarity
-        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-        
-        return max(0.0, min(100.0, float(similarity) * 100))
-        
-    except Exception as e:
-        logger.error(f"Semantic matching failed: {e}")
-        return 0.0
-
 def calculate_skill_match(resume_text, jd_text):
     """Calculate skill-specific matching score"""
     try:
@@ -463,21 +351,6 @@ def check_ai_status():
         st.error(f"❌ AI Status Error: {e}")
         return False
 
-def create_download_link(data, filename, download_type="json"):
-    """Create a download link for analysis results"""
-    if download_type == "json":
-        json_data = json.dumps(data, indent=2)
-        b64 = base64.b64encode(json_data.encode()).decode()
-        href = f'<a href="data:file/json;base64,{b64}" download="{filename}">📥 Download Analysis Report (JSON)</a>'
-    elif download_type == "csv":
-        df = pd.DataFrame([data] if isinstance(data, dict) else data)
-        csv = df.to_csv(index=False)
-        b64 = base64.b64encode(csv.encode()).decode()
-        href = f'<a href="data:file/csv;base64,{b64}" download="{filename}">📥 Download Analysis Report (CSV)</a>'
-    else:
-        href = ""
-    return href
-
 def main():
     # Main header
     st.markdown('<h1 class="main-header">🎯 Professional Resume AI Analyzer</h1>', unsafe_allow_html=True)
@@ -586,44 +459,62 @@ def perform_professional_analysis(analysis_depth, focus_areas):
         status_text.text('📊 Preparing data for analysis...')
         progress_bar.progress(15)
         
-        resume_data = {"raw_text": st.session_state.resume_text}
-        jd_data = {"raw_text": st.session_state.jd_text}
-        
         # Initialize section variables
-        resume_sections = {}
-        jd_sections = {}
         section_scores = {}
+        cache_hits = []
+        section_analysis = "Section Analysis" in focus_areas and analysis_depth in ["Comprehensive", "Deep Dive"]
         
-        # Extract sections for comprehensive analysis
-        if "Section Analysis" in focus_areas and analysis_depth in ["Comprehensive", "Deep Dive"]:
-            status_text.text('🔍 Extracting document sections...')
-            progress_bar.progress(25)
-            resume_sections = extract_key_sections(st.session_state.resume_text)
-            jd_sections = extract_key_sections(st.session_state.jd_text)
+        # Tokenize each document once; keywords and sections are served from it
+        status_text.text('🔍 Extracting document sections...')
+        progress_bar.progress(25)
+        resume_doc, resume_cached = get_cached_document(st.session_state.resume_text)
+        jd_doc, jd_cached = get_cached_document(st.session_state.jd_text)
+        if resume_cached and jd_cached:
+            cache_hits.append("document analysis")
         
         # Calculate scores
         status_text.text('🧮 Performing multi-dimensional analysis...')
         progress_bar.progress(40)
         
-        hard_match_score, missing_keywords = 0.0, []
-        semantic_match_score = 0.0
-        skill_match_score, missing_skills = 0.0, []
-        
-        if "Keyword Matching" in focus_areas:
-            hard_match_score, missing_keywords = calculate_hard_match(resume_data, jd_data)
-        
-        if "Semantic Analysis" in focus_areas:
-            semantic_match_score = calculate_semantic_match(resume_data, jd_data)
+        def compute_scores():
+            options = ScoringOptions.professional(
+                include_hard_match="Keyword Matching" in focus_areas,
+                include_semantic="Semantic Analysis" in focus_areas,
+                include_sections=section_analysis
+            )
+            result = get_scoring_engine().score(resume_doc, jd_doc, options)
+            
+            skill_match_score, missing_skills = 0.0, []
+            if "Skill Matching" in focus_areas:
+                skill_match_score, missing_skills = calculate_skill_match(
+                    st.session_state.resume_text, st.session_state.jd_text)
+            
+            return {
+                'hard_match': (result['hard_match_score'], result['missing_keywords']),
+                'semantic_match': result['semantic_match_score'],
+                'skill_match': (skill_match_score, missing_skills),
+                'section_scores': result['section_scores']
+            }
+        
+        scores_key = make_cache_key(
+            "scores",
+            content_hash(st.session_state.resume_text),
+            content_hash(st.session_state.jd_text),
+            analysis_depth=analysis_depth,
+            focus_areas=sorted(focus_areas)
+        )
+        scores, scores_cached = get_analysis_cache().get_or_compute(scores_key, compute_scores)
+        if scores_cached:
+            cache_hits.append("scoring")
         
-        if "Skill Matching" in focus_areas:
-            skill_match_score, missing_skills = calculate_skill_match(
-                st.session_state.resume_text, st.session_state.jd_text)
+        hard_match_score, missing_keywords = scores['hard_match']
+        semantic_match_score = scores['semantic_match']
+        skill_match_score, missing_skills = scores['skill_match']
+        section_scores = dict(scores['section_scores'])
         
-        # Section scores for comprehensive analysis
-        if "Section Analysis" in focus_areas and analysis_depth in ["Comprehensive", "Deep Dive"]:
+        if section_analysis:
             status_text.text('📑 Analyzing document sections...')
             progress_bar.progress(60)
-            section_scores = calculate_section_scores(resume_sections, jd_sections)
         
         progress_bar.progress(75)
         status_text.text('🏆 Generating professional verdict...')
@@ -662,7 +553,10 @@ def perform_professional_analysis(analysis_depth, focus_areas):
             'resume_preview': st.session_state.resume_text[:200] + "..." if st.session_state.resume_text else ""
         }
         
+        rollups = session_rollups()
         st.session_state.analysis_results.append(analysis_result)
+        for field in SCORE_FIELDS:
+            rollups[field].add(float(analysis_result[field] or 0))
         st.session_state.current_analysis = analysis_result
         
         progress_bar.progress(100)
@@ -675,6 +569,9 @@ def perform_professional_analysis(analysis_depth, focus_areas):
         # Display results
         display_professional_results(analysis_result)
         
+        if cache_hits:
+            st.caption(f"⚡ Served from cache: {', '.join(cache_hits)}")
+        
     except Exception as e:
         st.error(f"🚨 Analysis error: {e}")
         import traceback
@@ -845,18 +742,20 @@ def detailed_analytics_page():
         for col in score_columns:
             df[col] = pd.to_numeric(df[col], errors='coerce')
         
-        # Professional metrics
+        # Professional metrics, from rollups kept up to date as analyses are added
+        rollups = session_rollups()
+        overall = rollups['final_score']
         col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
-            st.metric("Total Analyses", len(df))
+            st.metric("Total Analyses", overall.count)
         with col2:
-            st.metric("Avg Overall Score", f"{df['final_score'].mean():.1f}%")
+            st.metric("Avg Overall Score", f"{overall.mean:.1f}%")
         with col3:
-            st.metric("Best Score", f"{df['final_score'].max():.1f}%")
+            st.metric("Best Score", f"{overall.maximum:.1f}%")
         with col4:
-            st.metric("Worst Score", f"{df['final_score'].min():.1f}%")
+            st.metric("Worst Score", f"{overall.minimum:.1f}%")
         with col5:
-            st.metric("Success Rate", f"{(df['final_score'] >= 70).sum() / len(df) * 100:.1f}%")
+            st.metric("Success Rate", f"{overall.share_at_least(70) * 100:.1f}%")
         
         # Professional score distribution chart
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
@@ -865,17 +764,16 @@ def detailed_analytics_page():
         fig_hist = go.Figure()
         
         # Add histograms for different score types
-        score_types = ['final_score', 'hard_match', 'semantic_match', 'skill_match']
         colors = ['#9b59b6', '#3498db', '#2ecc71', '#e74c3c']
         names = ['Overall Score', 'Keyword Match', 'Semantic Match', 'Skill Match']
         
-        for i, (score_type, color, name) in enumerate(zip(score_types, colors, names)):
-            fig_hist.add_trace(go.Histogram(
-                x=df[score_type],
+        for score_type, color, name in zip(SCORE_FIELDS, colors, names):
+            fig_hist.add_trace(go.Bar(
+                x=bucket_labels(),
+                y=rollups[score_type].buckets,
                 name=name,
                 marker_color=color,
-                opacity=0.7,
-                nbinsx=25
+                opacity=0.7
             ))
         
         fig_hist.update_layout(
@@ -962,7 +860,7 @@ def detailed_analytics_page():
         # Performance insights
         st.markdown("### 💡 Professional Performance Insights")
         
-        avg_score = df['final_score'].mean()
+        avg_score = overall.mean
         if avg_score >= 85:
             st.success("🏆 Exceptional performance! Your resumes consistently exceed job description requirements.")
         elif avg_score >= 70:
@@ -1361,29 +1259,46 @@ Recommendations:
         
         # Export all analyses
         st.markdown("#### 📦 Export All Professional Analyses")
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
         
+        # Serialised only when the button is clicked, not on every rerun of the page
+        results = st.session_state.analysis_results
         with col1:
-            all_json = json.dumps(st.session_state.analysis_results, indent=2)
             st.download_button(
                 label="📥 Download All JSON Reports",
-                data=all_json,
+                data=lambda: json.dumps(results, indent=2),
                 file_name=f"all_professional_resume_analyses_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
                 mime="application/json",
                 use_container_width=True
             )
         
         with col2:
-            df_all = pd.DataFrame(st.session_state.analysis_results)
-            csv_all = df_all.to_csv(index=False)
             st.download_button(
                 label="📊 Download All CSV Reports",
-                data=csv_all,
-                file_name=f"all_professional_resume_analyses_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                data=lambda: export_records(results, 'csv'),
+                file_name=export_filename("all_professional_resume_analyses", 'csv'),
                 mime="text/csv",
                 use_container_width=True
             )
         
+        with col3:
+            if PYARROW_AVAILABLE:
+                st.download_button(
+                    label="🗂️ Download All Parquet",
+                    data=lambda: export_records(results, 'parquet'),
+                    file_name=export_filename("all_professional_resume_analyses", 'parquet'),
+                    mime="application/vnd.apache.parquet",
+                    use_container_width=True
+                )
+            else:
+                st.download_button(
+                    label="🗂️ Download All NDJSON",
+                    data=lambda: export_records(results, 'ndjson'),
+                    file_name=export_filename("all_professional_resume_analyses", 'ndjson'),
+                    mime="application/x-ndjson",
+                    use_container_width=True
+                )
+        
         # Share options
         st.markdown("### 🌐 Professional Sharing Options")
         
@@ -14,6 +14,10 @@ from pathlib import Path
 import glob
 import logging
 
+from src.utils.analysis_cache import AnalysisCache, content_hash, make_cache_key
+
+from src.scoring.engine import ScoringOptions, get_scoring_engine
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -170,7 +174,27 @@ if 'resume_text' not in st.session_state:
 if 'analysis_history' not in st.session_state:
     st.session_state.analysis_history = []
 
+@st.cache_resource
+def get_analysis_cache():
+    """Bounded cache shared across reruns, keyed by content hash and analysis options"""
+    return AnalysisCache(max_entries=int(os.getenv('ANALYSIS_CACHE_SIZE', '128')))
+
 def extract_text_from_file(uploaded_file):
+    """Extract text from uploaded file, reusing the cached text for identical content"""
+    file_bytes = uploaded_file.getvalue()
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    key = make_cache_key("extract", content_hash(file_bytes), extension)
+    text, cached = get_analysis_cache().get_or_compute(key, lambda: _extract_text_uncached(uploaded_file))
+    if cached:
+        st.caption("⚡ Served from cache")
+    return text
+
+def get_cached_document(text):
+    """Tokenize and section a document once per distinct content"""
+    key = make_cache_key("document", content_hash(text))
+    return get_analysis_cache().get_or_compute(key, lambda: get_scoring_engine().analyze(text))
+
+def _extract_text_uncached(uploaded_file):
     """Extract text from uploaded file (simplified version)"""
     try:
         # For PDF files
@@ -203,151 +227,6 @@ def extract_text_from_file(uploaded_file):
         st.error(f"Error extracting text: {e}")
         return None
 
-def calculate_hard_match(resume_data, jd_data):
-    """Calculate hard match score based on keyword matching"""
-    try:
-        resume_text = resume_data.get('raw_text', '').lower()
-        jd_text = jd_data.get('raw_text', '').lower()
-        
-        if not resume_text or not jd_text:
-            return 0.0, []
-        
-        # Simple keyword matching approach
-        # Extract potential keywords from JD (simplified)
-        jd_words = set(jd_text.split())
-        resume_words = set(resume_text.split())
-        
-        # Calculate overlap
-        common_words = jd_words.intersection(resume_words)
-        missing_words = jd_words - resume_words
-        total_jd_words = len(jd_words)
-        
-        if total_jd_words == 0:
-            return 0.0, []
-            
-        score = (len(common_words) / total_jd_words) * 100
-        return min(score, 100.0), list(missing_words)
-        
-    except Exception as e:
-        logger.error(f"Hard match calculation failed: {e}")
-        return 0.0, []
-
-def calculate_semantic_match(resume_data, jd_data):
-    """Calculate semantic similarity using TF-IDF as fallback"""
-    try:
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.metrics.pairwise import cosine_similarity
-        
-        resume_text = resume_data.get('raw_text', '')
-        jd_text = jd_data.get('raw_text', '')
-        
-        if not resume_text or not jd_text:
-            return 0.0
-        
-        # Clean texts
-        def _clean_text(text):
-            import re
-            if not text:
-                return ""
-            # Remove extra whitespace and normalize
-            text = re.sub(r'\s+', ' ', text.strip())
-            # Remove special characters but keep important punctuation
-            text = re.sub(r'[^\w\s\.,!?;:()-]', ' ', text)
-            return text.lower()
-        
-        resume_clean = _clean_text(resume_text)
-        jd_clean = _clean_text(jd_text)
-        
-        if not resume_clean or not jd_clean:
-            return 0.0
-        
-        # Create TF-IDF vectors
-        vectorizer = TfidfVectorizer(
-            stop_words='english',
-            ngram_range=(1, 2),
-            max_features=1000,
-            min_df=1
-        )
-        
-        tfidf_matrix = vectorizer.fit_transform([resume_clean, jd_clean])
-        
-        # Calculate cosine similarity
-        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-        
-        return max(0.0, min(100.0, float(similarity) * 100))
-        
-    except Exception as e:
-        logger.error(f"Semantic matching failed: {e}")
-        return 0.0
-
-def extract_key_sections(text):
-    """Extract key sections from resume or JD text"""
-    sections = {
-        'experience': [],
-        'skills': [],
-        'education': [],
-        'projects': []
-    }
-    
-    # Simple section extraction based on common headers
-    lines = text.split('\n')
-    current_section = None
-    
-    experience_keywords = ['experience', 'work', 'employment', 'professional']
-    skills_keywords = ['skills', 'technologies', 'tools', 'competencies']
-    education_keywords = ['education', 'academic', 'university', 'degree']
-    projects_keywords = ['projects', 'portfolio', 'work samples']
-    
-    for line in lines:
-        line_lower = line.lower().strip()
-        
-        # Detect section headers
-        if any(keyword in line_lower for keyword in experience_keywords):
-            current_section = 'experience'
-        elif any(keyword in line_lower for keyword in skills_keywords):
-            current_section = 'skills'
-        elif any(keyword in line_lower for keyword in education_keywords):
-            current_section = 'education'
-        elif any(keyword in line_lower for keyword in projects_keywords):
-            current_section = 'projects'
-        
-        # Add content to current section
-        if current_section and line.strip() and not any(keyword in line_lower for keyword in 
-            experience_keywords + skills_keywords + education_keywords + projects_keywords):
-            sections[current_section].append(line.strip())
-    
-    return sections
-
-def calculate_section_scores(resume_sections, jd_sections):
-    """Calculate scores for each section"""
-    section_scores = {}
-    
-    for section in ['experience', 'skills', 'education', 'projects']:
-        resume_text = ' '.join(resume_sections.get(section, []))
-        jd_text = ' '.join(jd_sections.get(section, []))
-        
-        if not jd_text:
-            section_scores[section] = 100.0  # No requirements, full score
-            continue
-        
-        if not resume_text:
-            section_scores[section] = 0.0  # No content, no score
-            continue
-        
-        # Calculate similarity for this section
-        try:
-            from sklearn.feature_extraction.text import TfidfVectorizer
-            from sklearn.metrics.pairwise import cosine_similarity
-            
-            vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 1))
-            tfidf_matrix = vectorizer.fit_transform([resume_text.lower(), jd_text.lower()])
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            section_scores[section] = max(0.0, min(100.0, float(similarity) * 100))
-        except:
-            section_scores[section] = 0.0
-    
-    return section_scores
-
 def get_detailed_verdict(hard_match_score, semantic_match_score, missing_keywords=None):
     """Generate detailed verdict based on scores"""
     combined_score = (hard_match_score + semantic_match_score) / 2
@@ -483,31 +362,48 @@ def perform_analysis(analysis_depth):
         status_text.text('📊 Preparing data...')
         progress_bar.progress(40)
         
-        resume_data = {"raw_text": st.session_state.resume_text}
-        jd_data = {"raw_text": st.session_state.jd_text}
-        
         # Initialize section variables
-        resume_sections = {}
-        jd_sections = {}
         section_scores = {}
+        cache_hits = []
         
-        # Extract sections for deep analysis
+        # Tokenize each document once; keywords and sections are served from it
         if analysis_depth == "Deep":
             status_text.text('🔍 Extracting sections...')
-            resume_sections = extract_key_sections(st.session_state.resume_text)
-            jd_sections = extract_key_sections(st.session_state.jd_text)
+        resume_doc, resume_cached = get_cached_document(st.session_state.resume_text)
+        jd_doc, jd_cached = get_cached_document(st.session_state.jd_text)
+        if resume_cached and jd_cached:
+            cache_hits.append("document analysis")
         
         # Calculate scores
         status_text.text('🧮 Calculating scores...')
         progress_bar.progress(60)
         
-        hard_match_score, missing_keywords = calculate_hard_match(resume_data, jd_data)
-        semantic_match_score = calculate_semantic_match(resume_data, jd_data)
+        def compute_scores():
+            options = ScoringOptions.standard(include_sections=analysis_depth == "Deep")
+            result = get_scoring_engine().score(resume_doc, jd_doc, options)
+            return {
+                'hard_match': (result['hard_match_score'], result['missing_keywords']),
+                'semantic_match': result['semantic_match_score'],
+                'section_scores': result['section_scores']
+            }
+        
+        scores_key = make_cache_key(
+            "scores",
+            content_hash(st.session_state.resume_text),
+            content_hash(st.session_state.jd_text),
+            analysis_depth=analysis_depth
+        )
+        scores, scores_cached = get_analysis_cache().get_or_compute(scores_key, compute_scores)
+        if scores_cached:
+            cache_hits.append("scoring")
+        
+        hard_match_score, missing_keywords = scores['hard_match']
+        semantic_match_score = scores['semantic_match']
         
         # Section scores for deep analysis
         if analysis_depth == "Deep":
             status_text.text('📑 Analyzing sections...')
-            section_scores = calculate_section_scores(resume_sections, jd_sections)
+            section_scores = dict(scores['section_scores'])
         
         progress_bar.progress(80)
         status_text.text('🏆 Generating verdict...')
@@ -524,6 +420,9 @@ def perform_analysis(analysis_depth):
         # Display results
         display_results(hard_match_score, semantic_match_score, verdict_info, "")
         
+        if cache_hits:
+            st.caption(f"⚡ Served from cache: {', '.join(cache_hits)}")
+        
         # Store in history
         st.session_state.analysis_history.append({
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
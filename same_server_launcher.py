@@ -7,19 +7,19 @@ Launches Streamlit frontend and FastAPI backend on the same server
 with optimized resource management for Windows environments.
 """
 
-import subprocess
+import importlib.util
 import sys
 import time
 import os
-import threading
-import signal
 import webbrowser
 from pathlib import Path
 import logging
-import json
 import gc
 import psutil
 
+from src.utils.supervisor import ServiceSpec, ServiceSupervisor
+from src.utils.topology import log_topology, plan_topology
+
 # Configure lightweight logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,9 +30,10 @@ logger = logging.getLogger(__name__)
 class OptimizedSameServerLauncher:
     def __init__(self):
         self.base_path = Path(__file__).parent
-        self.venv_python = self.base_path / "venv" / "Scripts" / "python.exe"
-        self.processes = []
-        self.running = True
+        venv_python = self.base_path / "venv" / "Scripts" / "python.exe"
+        self.venv_python = venv_python if venv_python.exists() else Path(sys.executable)
+        self.supervisor = None
+        self.topology = None
         
         # Optimized configuration for same server
         self.config = {
@@ -40,12 +41,27 @@ class OptimizedSameServerLauncher:
                 "host": "127.0.0.1",  # Local only for better performance
                 "port": 8000,
                 "module": "src.api.main:app",
-                "workers": 1  # Single worker to reduce memory usage
+                "workers": 1,  # Replaced by the topology plan at startup
+                "health_path": "/health",
+                # Pre-fork: models loaded once in a gunicorn master and
+                # shared copy-on-write by the workers (POSIX only)
+                "prefork": os.getenv('API_PREFORK', '1') != '0'
             },
             "streamlit": {
                 "host": "127.0.0.1",
                 "port": 8501,
-                "script": "src/dashboard/streamlit_app.py"
+                "script": "src/dashboard/streamlit_app.py",
+                "health_path": "/_stcore/health"
+            },
+            "inference": {
+                # Set INFERENCE_SOCKET to run one model-serving sidecar that
+                # both services use instead of loading their own models
+                "socket": os.getenv('INFERENCE_SOCKET')
+            },
+            "supervisor": {
+                "log_dir": str(self.base_path / "logs"),
+                "max_restarts": 5,
+                "grace_period": 10  # Seconds to finish in-flight requests on shutdown
             }
         }
     
@@ -57,11 +73,17 @@ class OptimizedSameServerLauncher:
             os.environ['TORCH_BACKENDS_CUDNN_ENABLED'] = 'False'
             os.environ['PYTORCH_DISABLE_CUDA'] = '1'
             os.environ['CUDA_VISIBLE_DEVICES'] = ''
-            os.environ['OMP_NUM_THREADS'] = '2'
-            os.environ['MKL_NUM_THREADS'] = '2'
             os.environ['STREAMLIT_SERVER_MAX_UPLOAD_SIZE'] = '200'
             os.environ['STREAMLIT_SERVER_MAX_MESSAGE_SIZE'] = '200'
             
+            # Size workers, intra-op threads and the process pool to the
+            # CPUs and memory this machine (or container) actually has;
+            # the thread variables are inherited by both services
+            self.topology = plan_topology()
+            self.topology.apply()
+            self.config["fastapi"]["workers"] = self.topology.api_workers
+            log_topology(self.topology)
+            
             # Force garbage collection
             gc.collect()
             
@@ -90,12 +112,43 @@ class OptimizedSameServerLauncher:
             logger.warning(f"Could not check system resources: {e}")
             return True
     
-    def start_fastapi_optimized(self):
-        """Start FastAPI backend with optimized settings."""
-        logger.info("🚀 Starting FastAPI backend (optimized)...")
-        
-        try:
-            cmd = [
+    def _health_url(self, service):
+        config = self.config[service]
+        return f"http://{config['host']}:{config['port']}{config['health_path']}"
+    
+    def use_prefork(self):
+        """Pre-fork only pays off with several workers and needs gunicorn (not on Windows)."""
+        return (
+            self.config["fastapi"]["prefork"]
+            and self.config["fastapi"]["workers"] > 1
+            and os.name != 'nt'
+            and importlib.util.find_spec("gunicorn") is not None
+        )
+    
+    def fastapi_spec(self):
+        """FastAPI backend command and readiness probe."""
+        grace = self.config["supervisor"]["grace_period"]
+        if self.use_prefork():
+            fastapi = self.config["fastapi"]
+            return ServiceSpec(
+                name="fastapi",
+                command=[
+                    str(self.venv_python), "-m", "gunicorn",
+                    "-c", "python:src.api.gunicorn_conf",
+                    fastapi["module"]
+                ],
+                health_url=self._health_url("fastapi"),
+                cwd=str(self.base_path),
+                env={
+                    'API_BIND': f"{fastapi['host']}:{fastapi['port']}",
+                    'API_WORKERS': str(fastapi["workers"]),
+                    'API_GRACEFUL_TIMEOUT': str(grace)
+                },
+                grace_period=grace + 2
+            )
+        return ServiceSpec(
+            name="fastapi",
+            command=[
                 str(self.venv_python), "-m", "uvicorn",
                 self.config["fastapi"]["module"],
                 "--host", self.config["fastapi"]["host"],
@@ -103,41 +156,19 @@ class OptimizedSameServerLauncher:
                 "--workers", str(self.config["fastapi"]["workers"]),
                 "--log-level", "warning",  # Reduce log verbosity
                 "--access-log",
-                "--no-use-colors"
-            ]
-            
-            # Set environment for the process
-            env = os.environ.copy()
-            env.update({
-                'PYTHONUNBUFFERED': '1',
-                'PYTHONIOENCODING': 'utf-8'
-            })
-            
-            process = subprocess.Popen(
-                cmd,
-                cwd=str(self.base_path),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                env=env,
-                bufsize=1
-            )
-            
-            self.processes.append(("FastAPI", process))
-            logger.info(f"✅ FastAPI started on http://{self.config['fastapi']['host']}:{self.config['fastapi']['port']}")
-            
-            return process
-            
-        except Exception as e:
-            logger.error(f"Failed to start FastAPI: {e}")
-            return None
+                "--no-use-colors",
+                "--timeout-graceful-shutdown", str(grace)
+            ],
+            health_url=self._health_url("fastapi"),
+            cwd=str(self.base_path),
+            grace_period=grace + 2
+        )
     
-    def start_streamlit_optimized(self):
-        """Start Streamlit frontend with optimized settings."""
-        logger.info("🎨 Starting Streamlit frontend (optimized)...")
-        
-        try:
-            cmd = [
+    def streamlit_spec(self):
+        """Streamlit frontend command and readiness probe."""
+        return ServiceSpec(
+            name="streamlit",
+            command=[
                 str(self.venv_python), "-m", "streamlit", "run",
                 self.config["streamlit"]["script"],
                 "--server.address", self.config["streamlit"]["host"],
@@ -149,70 +180,36 @@ class OptimizedSameServerLauncher:
                 "--server.maxMessageSize", "200",
                 "--browser.gatherUsageStats", "false",
                 "--logger.level", "warning"
-            ]
-            
-            # Set environment for the process
-            env = os.environ.copy()
-            env.update({
-                'PYTHONUNBUFFERED': '1',
-                'PYTHONIOENCODING': 'utf-8',
-                'STREAMLIT_SERVER_MAX_UPLOAD_SIZE': '200'
-            })
-            
-            process = subprocess.Popen(
-                cmd,
-                cwd=str(self.base_path),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                env=env,
-                bufsize=1
-            )
-            
-            self.processes.append(("Streamlit", process))
-            logger.info(f"✅ Streamlit started on http://{self.config['streamlit']['host']}:{self.config['streamlit']['port']}")
-            
-            return process
-            
-        except Exception as e:
-            logger.error(f"Failed to start Streamlit: {e}")
-            return None
+            ],
+            health_url=self._health_url("streamlit"),
+            cwd=str(self.base_path),
+            env={'STREAMLIT_SERVER_MAX_UPLOAD_SIZE': '200'},
+            grace_period=self.config["supervisor"]["grace_period"]
+        )
     
-    def wait_for_services_quick(self):
-        """Quick service readiness check."""
-        logger.info("⏳ Checking services...")
-        
-        max_attempts = 15
-        
-        for attempt in range(max_attempts):
-            try:
-                # Quick check for FastAPI
-                import socket
-                
-                # Check FastAPI port
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                fastapi_ready = sock.connect_ex(('127.0.0.1', self.config['fastapi']['port'])) == 0
-                sock.close()
-                
-                # Check Streamlit port
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                streamlit_ready = sock.connect_ex(('127.0.0.1', self.config['streamlit']['port'])) == 0
-                sock.close()
-                
-                if fastapi_ready and streamlit_ready:
-                    logger.info("✅ Both services are ready!")
-                    return True
-                    
-                if attempt % 3 == 0:  # Log every 3rd attempt
-                    logger.info(f"📡 Services starting... (attempt {attempt + 1})")
-                
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.debug(f"Service check: {e}")
-        
-        logger.info("⚠️ Services starting (may need a moment more)")
-        return True
+    def inference_spec(self):
+        """Inference sidecar owning the models; ready once it answers a ping."""
+        from src.inference.client import InferenceClient
+        socket_path = self.config["inference"]["socket"]
+        return ServiceSpec(
+            name="inference",
+            command=[str(self.venv_python), "-m", "src.inference.server", "--socket", socket_path],
+            ready_check=lambda: InferenceClient(socket_path, timeout=2).is_available(),
+            cwd=str(self.base_path),
+            ready_timeout=180,  # Model loading
+            grace_period=self.config["supervisor"]["grace_period"]
+        )
+    
+    def log_memory_report(self):
+        """Log how much memory the pre-forked API workers share with the master."""
+        try:
+            from src.api.prefork import format_memory_report, memory_report
+            time.sleep(2)  # Let the remaining workers finish booting
+            fastapi = next(service for service in self.supervisor.services if service.spec.name == "fastapi")
+            master_pid = fastapi.process.pid
+            logger.info("🧠 API memory (pre-fork):\n" + format_memory_report(memory_report(master_pid)))
+        except Exception as e:
+            logger.warning(f"Could not measure API memory: {e}")
     
     def display_same_server_info(self):
         """Display unified server information."""
@@ -247,79 +244,36 @@ class OptimizedSameServerLauncher:
         except Exception as e:
             logger.error(f"Could not open browser: {e}")
     
-    def monitor_lightweight(self):
-        """Lightweight process monitoring."""
-        while self.running:
-            try:
-                for service_name, process in self.processes:
-                    if process.poll() is not None:
-                        logger.error(f"❌ {service_name} stopped unexpectedly")
-                        return False
-                
-                time.sleep(2)  # Check every 2 seconds
-                
-            except Exception as e:
-                logger.error(f"Monitoring error: {e}")
-                return False
-        
-        return True
-    
-    def signal_handler(self, signum, frame):
-        """Handle shutdown signals."""
-        logger.info("🛑 Shutdown requested...")
-        self.shutdown()
-    
-    def shutdown(self):
-        """Graceful shutdown."""
-        self.running = False
-        
-        for service_name, process in self.processes:
-            try:
-                logger.info(f"🛑 Stopping {service_name}...")
-                process.terminate()
-                
-                try:
-                    process.wait(timeout=3)
-                except subprocess.TimeoutExpired:
-                    process.kill()
-                    process.wait()
-                    
-            except Exception as e:
-                logger.error(f"Error stopping {service_name}: {e}")
-        
-        logger.info("🎯 All services stopped")
-    
     def launch_same_server(self):
         """Main launch method for same-server deployment."""
+        logger.info("🚀 Starting Same-Server Resume Relevance Checker...")
+        
+        # Optimize environment
+        self.optimize_environment()
+        self.check_system_resources()
+        
+        # FastAPI first, Streamlit once the API answers its health check;
+        # child output goes to rotating files under logs/
+        supervisor_config = self.config["supervisor"]
+        specs = [self.fastapi_spec(), self.streamlit_spec()]
+        if self.config["inference"]["socket"]:
+            # Started first; both services inherit INFERENCE_SOCKET and
+            # become thin clients of it
+            specs.insert(0, self.inference_spec())
+        self.supervisor = ServiceSupervisor(
+            specs,
+            log_dir=supervisor_config["log_dir"],
+            max_restarts=supervisor_config["max_restarts"]
+        )
         try:
-            # Setup signal handlers
-            signal.signal(signal.SIGINT, self.signal_handler)
-            signal.signal(signal.SIGTERM, self.signal_handler)
-            
-            logger.info("🚀 Starting Same-Server Resume Relevance Checker...")
-            
-            # Optimize environment
-            self.optimize_environment()
-            self.check_system_resources()
-            
-            # Start FastAPI backend first
-            fastapi_process = self.start_fastapi_optimized()
-            if not fastapi_process:
-                logger.error("❌ Failed to start FastAPI backend")
+            self.supervisor.install_signal_handlers()
+            if not self.supervisor.start():
+                logger.error(f"❌ Services failed to start, see logs in {supervisor_config['log_dir']}")
+                self.supervisor.stop()
                 return False
             
-            # Wait a moment for FastAPI to initialize
-            time.sleep(3)
-            
-            # Start Streamlit frontend
-            streamlit_process = self.start_streamlit_optimized()
-            if not streamlit_process:
-                logger.error("❌ Failed to start Streamlit frontend")
-                self.shutdown()
-                return False
-            
-            # Quick service check
-            self.wait_for_services_quick()
+            if self.use_prefork():
+                self.log_memory_report()
             
             # Display information
             self.display_same_server_info()
@@ -327,24 +281,20 @@ class OptimizedSameServerLauncher:
             # Open browser
             self.open_main_app()
             
-            # Lightweight monitoring
-            logger.info("🔄 Monitoring services (same-server mode)...")
-            success = self.monitor_lightweight()
+            # Supervise: restart crashed services, drain on SIGTERM/Ctrl+C
+            logger.info("🔄 Supervising services (same-server mode)...")
+            success = self.supervisor.run()
             
             if not success:
-                logger.error("❌ Service monitoring failed")
+                logger.error("❌ A service kept crashing")
                 return False
                 
             return True
             
-        except KeyboardInterrupt:
-            logger.info("🛑 Keyboard interrupt received")
-            return True
         except Exception as e:
             logger.error(f"❌ Launch error: {e}")
+            self.supervisor.stop()
             return False
-        finally:
-            self.shutdown()
 
 def main():
     """Entry point for same-server deployment."""
@@ -21,6 +21,9 @@ SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "resume_relevance_checker_secret_k
 ALGORITHM = "HS512"  # Using HS512 instead of HS256 for stronger encryption
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Comma-separated usernames allowed to call the /admin endpoints
+ADMIN_USERNAMES = {name.strip() for name in os.environ.get("ADMIN_USERNAMES", "").split(",") if name.strip()}
+
 # Rate limiting
 MAX_LOGIN_ATTEMPTS = 5
 LOGIN_LOCKOUT_TIME = 900  # 15 minutes
@@ -138,4 +141,13 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
 
 def get_current_active_user(current_user = Depends(get_current_user)):
     """Get current active user"""
-    return current_user
\ No newline at end of file
+    return current_user
+
+def get_current_admin_user(current_user = Depends(get_current_active_user)):
+    """Get current user, requiring them to be listed in ADMIN_USERNAMES"""
+    if current_user.username not in ADMIN_USERNAMES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
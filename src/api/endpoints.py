@@ -1,7 +1,11 @@
 import sys
 import os
+import hashlib
+import json
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, status, Form
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, status, Form, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from typing import List, Optional
 
 # Add project paths
@@ -14,13 +18,25 @@ import jwt
 
 from src.parsing.resume_parser import ResumeParser
 from src.parsing.jd_parser import JDParser
-from src.scoring.hard_match import calculate_hard_match
-from src.scoring.semantic_match import calculate_semantic_match, calculate_detailed_semantic_match
+from src.scoring.engine import ScoringOptions, get_scoring_engine
 from src.scoring.verdict import get_verdict, get_detailed_verdict
 from src.storage.database import store_evaluation_results, get_evaluations, SessionLocal, create_user, get_user_by_username, get_user_by_email
-from src.api.auth import authenticate_user, create_access_token, get_current_active_user, TokenData
-from src.api.models import UserCreate, UserLogin, Token, User, Evaluation
-from datetime import datetime, timedelta
+from src.api.auth import authenticate_user, create_access_token, get_current_active_user, get_current_admin_user, TokenData
+from src.api.models import UserCreate, UserLogin, Token, User, Evaluation, JobCreate, JobUpdate, CandidateBatch
+from src.storage.export import (
+    DEFAULT_BATCH_SIZE, EXPORT_FORMATS, MAX_BATCH_SIZE, PYARROW_AVAILABLE, export_filename, stream_evaluations
+)
+from src.storage.jobs import (
+    DEFAULT_RANKING_LIMIT, add_candidates, create_job, get_job, job_ranking, list_jobs, list_versions, update_job_description
+)
+from src.storage.rollups import job_comparison, score_distribution, score_trend, summarize, verdict_breakdown
+from src.utils.metrics import stage_timer
+from src.utils.tracing import export_trace, start_trace
+from src.utils.profiler import (
+    DEFAULT_SAMPLE_RATE_HZ, MAX_PROFILE_SECONDS, MAX_SAMPLE_RATE_HZ, ProfilerBusyError,
+    format_collapsed, sample_stacks
+)
+from datetime import date, datetime, timedelta
 
 router = APIRouter()
 
@@ -103,22 +119,17 @@ async def upload_jd(file: UploadFile = File(...), current_user: User = Depends(g
     
     return {"message": "Job description uploaded successfully", "jd_text": jd_text}
 
-@router.post("/evaluate/")
-async def evaluate_resume(
-    resume_text: str = Form(...), 
-    jd_text: str = Form(...), 
-    current_user: User = Depends(get_current_active_user)
-):
+def _evaluate(resume_text: str, jd_text: str, user_id: int) -> dict:
+    """Score and store one evaluation; blocking, so it runs in the threadpool"""
     # Parse the text data for better structure
-    resume_data = {"raw_text": resume_text, "skills": []}
-    jd_data = {"raw_text": jd_text, "required_skills": {"required": [], "preferred": []}}
-    
-    # Calculate hard match score
-    hard_match_score = calculate_hard_match(resume_data, jd_data)
+    with stage_timer("evaluate_parse", resume_length=len(resume_text), jd_length=len(jd_text)):
+        resume_data = {"raw_text": resume_text, "skills": []}
+        jd_data = {"raw_text": jd_text, "required_skills": {"required": [], "preferred": []}}
     
-    # Calculate semantic match score with detailed analysis
-    semantic_analysis = calculate_detailed_semantic_match(resume_data, jd_data)
-    semantic_match_score = semantic_analysis['weighted_score']
+    # Calculate hard match and detailed semantic scores with the shared engine
+    scores = get_scoring_engine().score(resume_data, jd_data, ScoringOptions.api())
+    hard_match_score = scores['hard_match_score']
+    semantic_match_score = scores['semantic_match_score']
     
     # Calculate final score
     final_score = (hard_match_score + semantic_match_score) / 2
@@ -127,17 +138,40 @@ async def evaluate_resume(
     # Get detailed verdict
     detailed_verdict = get_detailed_verdict(hard_match_score, semantic_match_score)
     
+    alignment = scores['requirement_alignment']
+    missing_requirements = [
+        item['requirement'] for item in alignment.get('requirements', []) if item['status'] == 'missing'
+    ]
+    
     evaluation_result = {
         "hard_match_score": hard_match_score,
         "semantic_match_score": semantic_match_score,
         "final_score": final_score,
         "verdict": verdict,
-        "detailed_analysis": semantic_analysis['detailed_analysis'],
-        "backend_scores": semantic_analysis['backend_scores'],
+        "detailed_analysis": scores['detailed_analysis'],
+        "backend_scores": scores['backend_scores'],
+        "requirement_alignment": alignment,
+        "missing_elements": "; ".join(missing_requirements),
         "explanation": detailed_verdict['explanation']
     }
     
-    store_evaluation_results(evaluation_result, user_id=current_user.id)
+    store_evaluation_results(evaluation_result, user_id=user_id)
+    return evaluation_result
+
+@router.post("/evaluate/")
+async def evaluate_resume(
+    resume_text: str = Form(...), 
+    jd_text: str = Form(...), 
+    trace: bool = Query(False, description="Return a per-stage span tree and export it as OTLP JSON"),
+    current_user: User = Depends(get_current_active_user)
+):
+    with start_trace("POST /evaluate/", enabled=trace, user_id=current_user.id) as root:
+        # Off the event loop, so concurrent requests overlap and their embeddings share batches
+        evaluation_result = await run_in_threadpool(_evaluate, resume_text, jd_text, current_user.id)
+    
+    if root is not None:
+        export_trace(root)
+        evaluation_result["trace"] = {"trace_id": root.trace_id, **root.to_dict()}
     
     return evaluation_result
 
@@ -165,4 +199,189 @@ async def get_evaluation_results(current_user: User = Depends(get_current_active
         
         return results
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/evaluations/export")
+async def export_evaluation_results(
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    job_id: Optional[str] = Query(None, description="Only evaluations against this job"),
+    since: Optional[datetime] = Query(None, description="Only evaluations created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only evaluations created before this time"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=MAX_BATCH_SIZE, description="Rows fetched per round trip"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stream the user's full evaluation history as CSV, NDJSON or Parquet"""
+    if format == "parquet" and not PYARROW_AVAILABLE:
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow on the server")
+    
+    media_type, _ = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        stream_evaluations(format, current_user.id, job_id, since, until, batch_size),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{export_filename("evaluations", format)}"'}
+    )
+
+def _run_analytics(query, **kwargs):
+    db = SessionLocal()
+    try:
+        return query(db, **kwargs)
+    finally:
+        db.close()
+
+async def _analytics_response(request: Request, query, **kwargs) -> Response:
+    """Run an aggregate query and answer with an ETag, or 304 if the client's copy is current"""
+    result = await run_in_threadpool(_run_analytics, query, **kwargs)
+    body = json.dumps(result, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    # Per-user data: browsers and proxies may keep it but must revalidate
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/analytics/summary")
+async def analytics_summary(
+    request: Request,
+    job_id: Optional[str] = Query(None, description="Only evaluations against this job"),
+    since: Optional[date] = Query(None, description="First UTC day to include"),
+    until: Optional[date] = Query(None, description="Last UTC day to include"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Score statistics, histogram, daily trend and per-job breakdown from the rollup tables"""
+    return await _analytics_response(request, summarize, user_id=current_user.id, job_id=job_id, since=since, until=until)
+
+@router.get("/analytics/distribution")
+async def analytics_distribution(
+    request: Request,
+    job_id: Optional[str] = Query(None, description="Only evaluations against this job"),
+    since: Optional[date] = Query(None, description="First UTC day to include"),
+    until: Optional[date] = Query(None, description="Last UTC day to include"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Score statistics, approximate percentiles and histogram"""
+    return await _analytics_response(request, score_distribution, user_id=current_user.id, job_id=job_id, since=since, until=until)
+
+@router.get("/analytics/verdicts")
+async def analytics_verdicts(
+    request: Request,
+    job_id: Optional[str] = Query(None, description="Only evaluations against this job"),
+    since: Optional[date] = Query(None, description="First UTC day to include"),
+    until: Optional[date] = Query(None, description="Last UTC day to include"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Count and share of each verdict"""
+    return await _analytics_response(request, verdict_breakdown, user_id=current_user.id, job_id=job_id, since=since, until=until)
+
+@router.get("/analytics/trends")
+async def analytics_trends(
+    request: Request,
+    interval: str = Query("day", pattern="^(day|week|month)$"),
+    job_id: Optional[str] = Query(None, description="Only evaluations against this job"),
+    since: Optional[date] = Query(None, description="First UTC day to include"),
+    until: Optional[date] = Query(None, description="Last UTC day to include"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Score count, mean, min and max per day, week or month"""
+    return await _analytics_response(
+        request, score_trend, user_id=current_user.id, job_id=job_id, since=since, until=until, interval=interval
+    )
+
+@router.get("/analytics/jobs")
+async def analytics_jobs(
+    request: Request,
+    since: Optional[date] = Query(None, description="First UTC day to include"),
+    until: Optional[date] = Query(None, description="Last UTC day to include"),
+    success_threshold: int = Query(70, ge=0, le=100, description="Score counted as a success, rounded down to a bucket edge"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Per-job comparison: statistics, median, success rate and verdict mix"""
+    return await _analytics_response(
+        request, job_comparison, user_id=current_user.id, since=since, until=until, success_threshold=success_threshold
+    )
+
+def _run_job_operation(operation, job_id: Optional[int], user_id: int, *args, **kwargs):
+    db = SessionLocal()
+    try:
+        if job_id is None:
+            return operation(db, user_id, *args, **kwargs)
+        job = get_job(db, job_id, user_id)
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+        return operation(db, job, *args, **kwargs)
+    finally:
+        db.close()
+
+@router.post("/jobs/", status_code=status.HTTP_201_CREATED)
+async def create_job_posting(job: JobCreate, current_user: User = Depends(get_current_active_user)):
+    """Store a job description as version 1 of a new job"""
+    return await run_in_threadpool(_run_job_operation, create_job, None, current_user.id, job.jd_text, job.title)
+
+@router.get("/jobs/")
+async def list_job_postings(current_user: User = Depends(get_current_active_user)):
+    return await run_in_threadpool(_run_job_operation, list_jobs, None, current_user.id)
+
+@router.post("/jobs/{job_id}/candidates")
+async def add_job_candidates(job_id: int, batch: CandidateBatch, current_user: User = Depends(get_current_active_user)):
+    """Store resumes and score them against the job's current version"""
+    resumes = [{'resume_text': resume.resume_text, 'name': resume.name} for resume in batch.resumes]
+    return await run_in_threadpool(_run_job_operation, add_candidates, job_id, current_user.id, resumes)
+
+@router.put("/jobs/{job_id}")
+async def update_job_posting(job_id: int, update: JobUpdate, current_user: User = Depends(get_current_active_user)):
+    """Store a new JD version and re-score its candidates from the diff"""
+    return await run_in_threadpool(_run_job_operation, update_job_description, job_id, current_user.id, update.jd_text)
+
+@router.get("/jobs/{job_id}/ranking")
+async def get_job_ranking(
+    job_id: int,
+    limit: int = Query(DEFAULT_RANKING_LIMIT, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Candidates ranked by final score against the current JD version"""
+    return await run_in_threadpool(_run_job_operation, job_ranking, job_id, current_user.id, limit, offset)
+
+@router.get("/jobs/{job_id}/versions")
+async def get_job_versions(job_id: int, current_user: User = Depends(get_current_active_user)):
+    """Every version of the JD with its diff from the previous one"""
+    return await run_in_threadpool(_run_job_operation, list_versions, job_id, current_user.id)
+
+# Admin routes
+@router.post("/admin/profile")
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0, le=MAX_PROFILE_SECONDS, description="Profile duration"),
+    rate: int = Query(DEFAULT_SAMPLE_RATE_HZ, ge=1, le=MAX_SAMPLE_RATE_HZ, description="Samples per second"),
+    include: Optional[str] = Query(None, description="Keep only stacks containing this substring, e.g. src/scoring"),
+    format: str = Query("collapsed", pattern="^(collapsed|json)$"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Sample this worker's stacks and return them in collapsed (flamegraph) format"""
+    try:
+        # Sample from a pool thread so the event loop keeps serving the traffic being profiled
+        result = await run_in_threadpool(sample_stacks, seconds, rate, include)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    
+    if format == "json":
+        return result
+    
+    return PlainTextResponse(
+        format_collapsed(result['stacks']),
+        headers={
+            "X-Profile-Samples": str(result['samples']),
+            "X-Profile-Duration": f"{result['duration_s']:.3f}",
+            "X-Profile-Rate": str(result['rate_hz']),
+        }
+    )
+
+@router.get("/admin/analytics/summary")
+async def organization_analytics_summary(
+    request: Request,
+    user_id: Optional[int] = Query(None, description="Only this user's evaluations"),
+    job_id: Optional[str] = Query(None, description="Only evaluations against this job"),
+    since: Optional[date] = Query(None, description="First UTC day to include"),
+    until: Optional[date] = Query(None, description="Last UTC day to include"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Organisation-wide analytics summary across all users"""
+    return await _analytics_response(request, summarize, user_id=user_id, job_id=job_id, since=since, until=until)
@@ -0,0 +1,35 @@
+"""
+Gunicorn settings for the pre-fork API mode.
+
+Run with::
+
+    gunicorn -c python:src.api.gunicorn_conf src.api.main:app
+
+``preload_app`` imports the app in the master. ``on_starting`` then loads
+the models and freezes the heap before any worker is forked, so the workers
+share the weights copy-on-write (see ``src.api.prefork``). The worker count
+and bind address come from ``API_WORKERS`` (set by the launcher's topology
+plan) and ``API_BIND``.
+"""
+
+import os
+
+from src.api.prefork import freeze_heap, preload_models
+
+bind = os.getenv('API_BIND', '127.0.0.1:8000')
+workers = int(os.getenv('API_WORKERS', '2'))
+worker_class = 'uvicorn.workers.UvicornWorker'
+preload_app = True
+graceful_timeout = int(os.getenv('API_GRACEFUL_TIMEOUT', '10'))
+timeout = 120
+loglevel = os.getenv('API_LOG_LEVEL', 'info')
+accesslog = '-'
+
+
+def on_starting(server):
+    """Runs in the master after the app import and before forking"""
+    timings = preload_models(include_llm=os.getenv('PRELOAD_LLM', '1') != '0')
+    server.log.info("Preloaded models: " + (", ".join(
+        f"{name} ({seconds:.1f}s)" for name, seconds in timings.items()) or "none"))
+    freeze_heap()
+    server.log.info(f"Forking {workers} workers from a frozen heap")
@@ -7,9 +7,35 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(project_root / "src"))
 
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from src.api.endpoints import router
+from src.utils.metrics import render_metrics, stage_timer, track_queue
+
+logger = logging.getLogger(__name__)
+
+def backfill_analytics():
+    """Build analytics rollups missing from an older database, once per worker start"""
+    from src.storage.database import SessionLocal
+    from src.storage.rollups import backfill_rollups
+
+    db = SessionLocal()
+    try:
+        backfill_rollups(db)
+    except Exception as e:
+        # Another worker may hold the lock for a long rebuild; analytics catch up when it commits
+        logger.error(f"❌ Analytics rollup backfill failed (run `python -m src.cli rebuild-rollups`): {e}")
+    finally:
+        db.close()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(backfill_analytics)
+    yield
 
 # Create FastAPI application with metadata
 app = FastAPI(
@@ -19,7 +45,8 @@ app = FastAPI(
     contact={
         "name": "Pratima Dixit R",
         "email": "pratimadixit2305@gmail.com",
-    }
+    },
+    lifespan=lifespan
 )
 
 # Add CORS middleware for frontend integration
@@ -31,6 +58,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Track in-flight requests and their latency for /metrics
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    if request.url.path == "/metrics":
+        return await call_next(request)
+    with track_queue("http_requests"), stage_timer("http_request"):
+        return await call_next(request)
+
 # Include API routes
 app.include_router(router, prefix="/api/v1")
 
@@ -45,4 +80,10 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "resume-relevance-check"}
\ No newline at end of file
+    return {"status": "healthy", "service": "resume-relevance-check"}
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint"""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
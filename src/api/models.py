@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class UserBase(BaseModel):
     username: str
@@ -43,4 +43,18 @@ class Evaluation(EvaluationBase):
     created_at: str
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class JobCreate(BaseModel):
+    jd_text: str
+    title: Optional[str] = None
+
+class JobUpdate(BaseModel):
+    jd_text: str
+
+class CandidateIn(BaseModel):
+    resume_text: str
+    name: Optional[str] = None
+
+class CandidateBatch(BaseModel):
+    resumes: List[CandidateIn]
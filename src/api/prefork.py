@@ -0,0 +1,146 @@
+"""
+Pre-fork model preloading for the API workers.
+
+Every uvicorn worker used to import the app and then load its own MiniLM,
+DistilGPT-2 and spaCy models on first use, so resident memory grew with the
+worker count. In pre-fork mode (``src/api/gunicorn_conf.py``) the gunicorn
+master imports the app, loads the models with ``preload_models`` and calls
+``freeze_heap`` before forking. Workers then share the weight pages
+copy-on-write with the master:
+
+- model weights are only read during inference, so their pages are never
+  copied;
+- ``gc.freeze()`` moves every object allocated so far into the permanent
+  generation. Otherwise the first collection in each worker would write to
+  the GC header of every preloaded object and un-share those pages;
+- no inference runs in the master, because the OpenMP thread pools that
+  torch starts on first use do not survive ``fork``.
+
+``memory_report`` measures the effect. It compares RSS, which counts shared
+pages in every process, with PSS, which splits each shared page between the
+processes using it, and USS, the memory private to one process.
+"""
+
+import argparse
+import gc
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def preload_models(include_llm: bool = True) -> Dict[str, float]:
+    """Load the models the workers use; returns load seconds per model"""
+    timings: Dict[str, float] = {}
+
+    start = time.perf_counter()
+    from src.utils.embeddings import get_embedding_manager
+    manager = get_embedding_manager()
+    timings[f"embeddings:{manager.model_name}"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    from src.scoring.spacy_backend import get_spacy_backend
+    backend = get_spacy_backend()
+    if backend.available:
+        timings[f"spacy:{backend.model_name}"] = time.perf_counter() - start
+
+    if include_llm:
+        from src.scoring import semantic_match
+        if semantic_match.backend_availability()['huggingface_llm']:
+            start = time.perf_counter()
+            if semantic_match._get_huggingface_pipeline() is not None:
+                timings["huggingface_llm"] = time.perf_counter() - start
+
+    logger.info(f"📦 Preloaded {len(timings)} models in the master: "
+                + ", ".join(f"{name} ({seconds:.1f}s)" for name, seconds in timings.items()))
+    return timings
+
+
+def freeze_heap():
+    """Collect garbage once, then exempt all surviving objects from future collections"""
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+        logger.info(f"🧊 Froze {gc.get_freeze_count()} objects before forking")
+
+
+def _process_memory(process: psutil.Process, role: str) -> Optional[Dict[str, Any]]:
+    try:
+        info = process.memory_full_info()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+    rss = info.rss / MB
+    uss = getattr(info, 'uss', info.rss) / MB
+    pss = getattr(info, 'pss', info.rss) / MB
+    return {
+        'pid': process.pid,
+        'role': role,
+        'rss_mb': round(rss, 1),
+        'pss_mb': round(pss, 1),
+        'uss_mb': round(uss, 1),
+        'shared_mb': round(rss - uss, 1),
+    }
+
+
+def memory_report(master_pid: int) -> Dict[str, Any]:
+    """Shared vs private memory of a pre-fork master and its workers
+
+    Returns:
+        Dictionary with one entry per process under ``processes`` (RSS, PSS,
+        USS and shared MB), the totals, and ``shared_savings_mb``: how much
+        less memory the group actually uses (PSS) than the sum of RSS
+        implies, i.e. what copy-on-write sharing saves over independent
+        worker processes
+    """
+    master = psutil.Process(master_pid)
+    processes: List[Dict[str, Any]] = []
+    for process, role in [(master, 'master')] + [(child, 'worker') for child in master.children()]:
+        entry = _process_memory(process, role)
+        if entry is not None:
+            processes.append(entry)
+
+    total_rss = sum(entry['rss_mb'] for entry in processes)
+    total_pss = sum(entry['pss_mb'] for entry in processes)
+    return {
+        'processes': processes,
+        'workers': sum(1 for entry in processes if entry['role'] == 'worker'),
+        'total_rss_mb': round(total_rss, 1),
+        'total_pss_mb': round(total_pss, 1),
+        'total_uss_mb': round(sum(entry['uss_mb'] for entry in processes), 1),
+        'shared_savings_mb': round(total_rss - total_pss, 1),
+    }
+
+
+def format_memory_report(report: Dict[str, Any]) -> str:
+    """Plain-text table of a ``memory_report``"""
+    lines = [f"{'pid':>8} {'role':<7} {'rss':>9} {'pss':>9} {'uss':>9} {'shared':>9}"]
+    for entry in report['processes']:
+        lines.append(
+            f"{entry['pid']:>8} {entry['role']:<7} {entry['rss_mb']:>7.1f}MB {entry['pss_mb']:>7.1f}MB "
+            f"{entry['uss_mb']:>7.1f}MB {entry['shared_mb']:>7.1f}MB"
+        )
+    lines.append(
+        f"{report['workers']} workers: {report['total_pss_mb']:.1f}MB actual (PSS) vs "
+        f"{report['total_rss_mb']:.1f}MB summed RSS, {report['shared_savings_mb']:.1f}MB shared"
+    )
+    return "\n".join(lines)
+
+
+__all__ = ['preload_models', 'freeze_heap', 'memory_report', 'format_memory_report']
+
+
+def main():
+    """Print the shared vs private memory of a running pre-fork API"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("master_pid", type=int, help="pid of the gunicorn master")
+    args = parser.parse_args()
+    print(format_memory_report(memory_report(args.master_pid)))
+
+
+if __name__ == "__main__":
+    main()
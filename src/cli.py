@@ -0,0 +1,93 @@
+"""
+Command line entry point, ``resume-relevance``.
+
+Subcommands:
+
+- ``screen``: score every resume in a set of directories or glob patterns
+  against every job description and write ranked results
+  (``src.scoring.screening``), e.g.::
+
+      python -m src.cli screen \\
+          --resumes "data/data/sample_resumes/Resumes/*.pdf" \\
+          --jds data/sample_jds/JD --output results/screening.csv
+
+- ``rebuild-rollups``: recompute the analytics rollup tables from the
+  evaluations table (``src.storage.rollups``)
+"""
+
+import argparse
+import logging
+import sys
+from typing import List, Optional
+
+from src.scoring.engine import ScoringOptions
+from src.scoring.screening import DEFAULT_BATCH_SIZE, SEMANTIC_BACKENDS, screen
+
+logger = logging.getLogger(__name__)
+
+PROFILES = {
+    'standard': ScoringOptions.standard,
+    'professional': ScoringOptions.professional,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="resume-relevance", description="Resume relevance tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    screening = commands.add_parser("screen", help="score resumes × job descriptions in bulk")
+    screening.add_argument("--resumes", nargs="+", required=True, help="resume directories or glob patterns")
+    screening.add_argument("--jds", nargs="+", required=True, help="job description directories or glob patterns")
+    screening.add_argument("--output", required=True, help="results file, .csv or .parquet")
+    screening.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint.jsonl)")
+    screening.add_argument("--workers", type=int,
+                           help="extraction processes, 0 to extract in-process (default: PROCESS_POOL_SIZE or all CPUs)")
+    screening.add_argument("--profile", choices=sorted(PROFILES), default="standard")
+    screening.add_argument("--semantic", choices=SEMANTIC_BACKENDS, default="auto")
+    screening.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="documents per embedding batch")
+    screening.add_argument("--top-k", type=int, help="keep only the best K resumes per job description")
+    screening.add_argument("--fresh", action="store_true", help="ignore and overwrite an existing checkpoint")
+
+    commands.add_parser("rebuild-rollups", help="recompute analytics rollups from stored evaluations")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == "screen":
+        try:
+            summary = screen(
+                args.resumes, args.jds, args.output,
+                checkpoint_path=args.checkpoint,
+                workers=args.workers,
+                options=PROFILES[args.profile](),
+                semantic=args.semantic,
+                batch_size=args.batch_size,
+                top_k=args.top_k,
+                fresh=args.fresh,
+            )
+        except ValueError as e:
+            logger.error(f"❌ {e}")
+            return 2
+        if summary['failed_files']:
+            logger.warning(f"⚠️ {len(summary['failed_files'])} files could not be extracted")
+    elif args.command == "rebuild-rollups":
+        # Imported here: opening the database creates ./evaluations.db
+        from src.storage.database import SessionLocal
+        from src.storage.rollups import rebuild_rollups
+
+        db = SessionLocal()
+        try:
+            rebuild_rollups(db)
+        finally:
+            db.close()
+    return 0
+
+
+__all__ = ['build_parser', 'main']
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,4 @@
 import streamlit as st
-import tempfile
 import os
 import pandas as pd
 import plotly.graph_objects as go
@@ -9,6 +8,7 @@ from pathlib import Path
 import glob
 import requests
 import json
+import tempfile
 
 # Page configuration
 st.set_page_config(
@@ -142,6 +142,65 @@ def get_user_evaluations(token):
         st.error(f"Error getting evaluations: {str(e)}")
         return []
 
+def get_analytics(token, name, **params):
+    """Get an aggregate from /analytics/<name>, revalidating the session's copy by ETag"""
+    cache = st.session_state.setdefault('analytics_cache', {})
+    cache_key = (name, tuple(sorted(params.items())))
+    cached = cache.get(cache_key)
+    try:
+        headers = {"Authorization": f"Bearer {token}"}
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        response = requests.get(f"{API_BASE_URL}/analytics/{name}", params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        if response.status_code == 200:
+            result = response.json()
+            if response.headers.get("ETag"):
+                cache[cache_key] = (response.headers["ETag"], result)
+            return result
+        else:
+            st.error(f"Failed to get analytics: {response.text}")
+            return None
+    except Exception as e:
+        st.error(f"Error getting analytics: {str(e)}")
+        return None
+
+EXPORT_MIME_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+EXPORT_CHUNK_BYTES = 1 << 20
+EXPORT_TIMEOUT_SECONDS = 300
+
+# Failed exports by token; the download callable runs outside the script, where st.error is ignored
+_export_errors = {}
+
+def download_evaluations(token, format):
+    """Fetch the user's full evaluation history from the streaming export endpoint
+
+    The response is written to a temporary file chunk by chunk rather than
+    joined in memory; Streamlit reads the file once to serve it. On failure
+    the error is kept for the next rerun of the results page and re-raised,
+    so the download itself reports it as failed.
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    export_file = tempfile.TemporaryFile(buffering=0)
+    try:
+        with requests.get(f"{API_BASE_URL}/evaluations/export", params={"format": format}, headers=headers,
+                          stream=True, timeout=EXPORT_TIMEOUT_SECONDS) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(EXPORT_CHUNK_BYTES):
+                export_file.write(chunk)
+    except requests.RequestException as e:
+        export_file.close()
+        _export_errors[token] = f"Export of evaluation history failed: {e}"
+        raise
+    export_file.seek(0)
+    return export_file
+
 def upload_resume(token, file_bytes, filename):
     """Upload resume file"""
     try:
@@ -215,23 +274,14 @@ def extract_text_from_file(uploaded_file):
         if str(project_root) not in sys.path:
             sys.path.insert(0, str(project_root))
         
-        from src.utils.text_extraction import extract_text
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            tmp_file.flush()
-            
-            try:
-                text = extract_text(tmp_file.name)
-                return text
-            finally:
-                os.unlink(tmp_file.name)
+        from src.utils.extraction_service import get_extraction_service
+        return get_extraction_service().extract_bytes(uploaded_file.getvalue(), uploaded_file.name)
     except Exception as e:
         st.error(f"Error extracting text: {e}")
         return None
 
 def load_sample_file(file_path):
-    """Load a sample file and return its content."""
+    """Load a sample file through the extraction service (persistent cache)."""
     try:
         # Add project root to Python path
         import sys
@@ -239,15 +289,9 @@ def load_sample_file(file_path):
         project_root = Path(__file__).parent.parent.parent
         if str(project_root) not in sys.path:
             sys.path.insert(0, str(project_root))
-            
-        if file_path.endswith('.pdf'):
-            from src.utils.text_extraction import extract_text
-            return extract_text(file_path)
-        elif file_path.endswith('.txt'):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        else:
-            return None
+        
+        from src.utils.extraction_service import get_extraction_service
+        return get_extraction_service().extract(file_path)
     except Exception as e:
         st.error(f"Error loading file {file_path}: {e}")
         return None
@@ -262,14 +306,15 @@ def check_ai_status():
         if str(project_root) not in sys.path:
             sys.path.insert(0, str(project_root))
             
-        from src.scoring.semantic_match import HUGGINGFACE_LLM_AVAILABLE, SENTENCE_TRANSFORMERS_AVAILABLE, SPACY_AVAILABLE
+        from src.scoring.semantic_match import backend_availability
+        available = backend_availability()
         status_info = []
         
-        if HUGGINGFACE_LLM_AVAILABLE:
+        if available['huggingface_llm']:
             status_info.append("✅ Hugging Face LLM available")
-        if SENTENCE_TRANSFORMERS_AVAILABLE:
+        if available['sentence_transformers']:
             status_info.append("✅ Sentence Transformers available")
-        if SPACY_AVAILABLE:
+        if available['spacy']:
             status_info.append("✅ spaCy available")
             
         if status_info:
@@ -529,7 +574,8 @@ def perform_analysis(use_huggingface, analysis_depth):
             'hard_match_score': evaluation_result.get('hard_match_score', 0),
             'semantic_match_score': evaluation_result.get('semantic_match_score', 0),
             'backend_scores': evaluation_result.get('backend_scores', {}),
-            'detailed_text': evaluation_result.get('detailed_analysis', '')
+            'detailed_text': evaluation_result.get('detailed_analysis', ''),
+            'requirement_alignment': evaluation_result.get('requirement_alignment', {})
         }
         
         progress_bar.progress(100)
@@ -671,6 +717,21 @@ def display_enhanced_results(hard_match_score, semantic_match_score, verdict_inf
     
     st.plotly_chart(fig_radar, use_container_width=True)
     
+    # Requirement-by-requirement evidence
+    requirements = detailed_analysis.get('requirement_alignment', {}).get('requirements', [])
+    if requirements:
+        st.markdown("### 🎯 Requirement Coverage")
+        status_icons = {'strong': '✅', 'partial': '⚠️', 'missing': '❌'}
+        st.dataframe(pd.DataFrame([
+            {
+                'Status': status_icons.get(item['status'], item['status']),
+                'Requirement': item['requirement'],
+                'Best Evidence': item['evidence'] or '—',
+                'Match': f"{item['score']:.0f}%"
+            }
+            for item in requirements
+        ]), use_container_width=True, hide_index=True)
+    
     # Detailed breakdown
     if detailed_analysis.get('detailed_text'):
         st.markdown("### 🔍 Detailed Breakdown")
@@ -680,29 +741,30 @@ def analytics_page():
     """Analytics page with advanced data analysis"""
     st.header("📊 Analytics & Insights")
     
-    # Get user evaluations
-    evaluations = get_user_evaluations(st.session_state.token)
+    # Aggregates are computed by the API from its rollup tables; this page only renders them
+    token = st.session_state.token
+    distribution = get_analytics(token, "distribution")
     
-    if evaluations:
-        df = pd.DataFrame(evaluations)
-        
-        # Convert relevance_score to numeric if it's not already
-        df['relevance_score'] = pd.to_numeric(df['relevance_score'], errors='coerce')
-        
-        col1, col2, col3, col4 = st.columns(4)
+    if distribution and distribution['count']:
+        col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
-            st.metric("Total Analyses", len(df))
+            st.metric("Total Analyses", distribution['count'])
         with col2:
-            st.metric("Average Score", f"{df['relevance_score'].mean():.1f}%")
+            st.metric("Average Score", f"{distribution['mean']:.1f}%")
         with col3:
-            st.metric("Best Score", f"{df['relevance_score'].max():.1f}%")
+            st.metric("Median Score", f"{distribution['p50']:.1f}%")
         with col4:
-            st.metric("Worst Score", f"{df['relevance_score'].min():.1f}%")
+            st.metric("Best Score", f"{distribution['max']:.1f}%")
+        with col5:
+            st.metric("Worst Score", f"{distribution['min']:.1f}%")
         
         # Score distribution chart
         st.subheader("📈 Score Distribution")
         
-        fig_hist = go.Figure(data=[go.Histogram(x=df['relevance_score'], nbinsx=20)])
+        fig_hist = go.Figure(data=[go.Bar(
+            x=[bucket['bucket'] for bucket in distribution['histogram']],
+            y=[bucket['count'] for bucket in distribution['histogram']]
+        )])
         fig_hist.update_layout(
             title="Distribution of Analysis Scores",
             xaxis_title="Score (%)",
@@ -714,22 +776,26 @@ def analytics_page():
         # Trend analysis
         st.subheader("📈 Score Trend Over Time")
         
-        # Convert created_at to datetime
-        df['created_at'] = pd.to_datetime(df['created_at'])
-        df_sorted = df.sort_values('created_at')
-        
+        interval = st.selectbox("Group by", ["day", "week", "month"], key="trend_interval")
+        points = (get_analytics(token, "trends", interval=interval) or {'points': []})['points']
         fig_trend = go.Figure()
         fig_trend.add_trace(go.Scatter(
-            x=df_sorted['created_at'],
-            y=df_sorted['relevance_score'],
+            x=[point['period'] for point in points],
+            y=[point['mean'] for point in points],
             mode='lines+markers',
-            name='Score Trend',
+            name='Average Score',
             line=dict(color='#45B7D1'),
-            marker=dict(size=8)
+            marker=dict(size=8),
+            error_y=dict(
+                type='data',
+                symmetric=False,
+                array=[point['max'] - point['mean'] for point in points],
+                arrayminus=[point['mean'] - point['min'] for point in points]
+            )
         ))
         
         fig_trend.update_layout(
-            title="Score Trend Over Time",
+            title=f"Average Score per {interval.capitalize()} (bars show best and worst)",
             xaxis_title="Date",
             yaxis_title="Score (%)",
             height=400
@@ -739,11 +805,10 @@ def analytics_page():
         # Verdict distribution
         st.subheader("📊 Verdict Distribution")
         
-        verdict_counts = df['verdict'].value_counts()
-        
+        verdicts = (get_analytics(token, "verdicts") or {'verdicts': []})['verdicts']
         fig_pie = go.Figure(data=[go.Pie(
-            labels=verdict_counts.index,
-            values=verdict_counts.values,
+            labels=[row['verdict'] for row in verdicts],
+            values=[row['count'] for row in verdicts],
             marker_colors=['#FF6B6B', '#4ECDC4', '#45B7D1']
         )])
         
@@ -753,14 +818,31 @@ def analytics_page():
         )
         st.plotly_chart(fig_pie, use_container_width=True)
         
-        # Detailed history table
-        st.subheader("📋 Analysis History")
-        st.dataframe(df[['id', 'relevance_score', 'verdict', 'created_at']], use_container_width=True)
+        # Per-job comparison
+        jobs = (get_analytics(token, "jobs") or {'jobs': []})['jobs']
+        if len(jobs) > 1:
+            st.subheader("🏢 Job Comparison")
+            
+            fig_jobs = go.Figure(data=[go.Bar(
+                x=[job['job_id'] for job in jobs],
+                y=[job['mean'] for job in jobs],
+                text=[f"{job['success_rate'] * 100:.0f}% ≥ 70" for job in jobs],
+                marker_color='#4ECDC4'
+            )])
+            fig_jobs.update_layout(
+                title="Average Score per Job",
+                xaxis_title="Job",
+                yaxis_title="Score (%)",
+                height=400
+            )
+            st.plotly_chart(fig_jobs, use_container_width=True)
+            st.dataframe(pd.DataFrame(jobs)[['job_id', 'count', 'mean', 'p50', 'min', 'max', 'success_rate']],
+                         use_container_width=True, hide_index=True)
         
         # Performance insights
         st.subheader("💡 Performance Insights")
         
-        avg_score = df['relevance_score'].mean()
+        avg_score = distribution['mean']
         if avg_score >= 80:
             st.success("🏆 Excellent performance! Your resumes consistently match job descriptions well.")
         elif avg_score >= 50:
@@ -796,6 +878,23 @@ def view_results_page():
                     st.write(f"**Hard Match:** {result['relevance_score']:.1f}%")
                 with col2:
                     st.write(f"**Verdict:** {result['verdict']}")
+        
+        st.markdown("### 📥 Export History")
+        export_error = _export_errors.pop(st.session_state.token, None)
+        if export_error:
+            st.error(export_error)
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            export_format = st.selectbox("Format", list(EXPORT_MIME_TYPES), key="export_format")
+        with col2:
+            # Fetched only when clicked; the API streams every evaluation, not just the recent ones shown
+            token = st.session_state.token
+            st.download_button(
+                label=f"Download all evaluations ({export_format.upper()})",
+                data=lambda: download_evaluations(token, export_format),
+                file_name=f"evaluations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}",
+                mime=EXPORT_MIME_TYPES[export_format]
+            )
     else:
         st.info("📋 No results available.")
 
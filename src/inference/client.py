@@ -0,0 +1,181 @@
+"""
+Thin client for the local inference sidecar (``src.inference.server``).
+
+When ``INFERENCE_SOCKET`` points at a running sidecar, the API and the
+Streamlit front ends stop loading models themselves. ``EmbeddingManager``
+wraps a ``RemoteEmbeddingModel``, ``SpacyBackend`` sends its cache misses
+to the sidecar, and the LLM backend calls a ``RemoteGenerator``. Each
+thread keeps its own connection, so concurrent requests from one process
+reach the server in parallel, where they are coalesced into batches.
+Connections are tied to the process that opened them: a pre-fork worker
+that inherits its master's socket opens a fresh one instead of sharing
+the stream with its siblings.
+"""
+
+import logging
+import os
+import socket
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.inference.protocol import MSGPACK_AVAILABLE, ProtocolError, recv_frame, send_frame, unpack_array
+
+logger = logging.getLogger(__name__)
+
+MAX_SEQ_LENGTH = 256
+
+
+class InferenceError(Exception):
+    """The sidecar could not be reached or reported a failure"""
+
+
+class InferenceClient:
+    """Request/response client over a Unix domain socket"""
+
+    def __init__(self, socket_path: str, timeout: float = 60.0):
+        """Configure the client; connections are opened lazily per thread
+
+        Args:
+            socket_path: Path of the sidecar's Unix socket
+            timeout: Seconds to wait for one response
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None and getattr(self._local, 'pid', None) != os.getpid():
+            # Inherited across fork: the parent and our siblings share this stream
+            self._disconnect()
+            sock = None
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+            self._local.pid = os.getpid()
+        return sock
+
+    def _disconnect(self):
+        sock = getattr(self._local, 'sock', None)
+        self._local.sock = None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def call(self, op: str, **arguments: Any) -> Dict[str, Any]:
+        """Send one request and return the response fields
+
+        A broken connection (e.g. after a sidecar restart) is reopened and
+        the request retried once.
+        """
+        if not MSGPACK_AVAILABLE:
+            raise InferenceError("msgpack is required to talk to the inference sidecar")
+        request = {'op': op, **arguments}
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                send_frame(sock, request)
+                response = recv_frame(sock)
+                if response is None:
+                    raise ProtocolError("Sidecar closed the connection")
+                break
+            except (OSError, ProtocolError) as e:
+                self._disconnect()
+                if attempt:
+                    raise InferenceError(f"Inference sidecar at {self.socket_path} unavailable: {e}") from e
+        if not response.get('ok'):
+            raise InferenceError(response.get('error', 'unknown sidecar error'))
+        return response
+
+    def close(self):
+        """Close this thread's connection"""
+        self._disconnect()
+
+    def ping(self) -> Dict[str, Any]:
+        """Models the sidecar has loaded, e.g. ``{"embeddings": "all-MiniLM-L6-v2", ...}``"""
+        return self.call('ping')['models']
+
+    def is_available(self) -> bool:
+        try:
+            self.ping()
+            return True
+        except InferenceError:
+            return False
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Unit-length embeddings, one row per text"""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        vectors = unpack_array(self.call('embed', texts=list(texts))['embeddings'])
+        # Renormalise after the float16 round trip
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def spacy(self, texts: Sequence[str]) -> List[Tuple[np.ndarray, List[Tuple[str, str]], List[str]]]:
+        """Vector, entities and tokens per text from the sidecar's spaCy pipeline"""
+        documents = self.call('spacy', texts=list(texts))['documents']
+        return [
+            (unpack_array(document['vector']),
+             [tuple(entity) for entity in document['entities']],
+             list(document['tokens']))
+            for document in documents
+        ]
+
+    def tokenize(self, texts: Sequence[str]) -> List[List[str]]:
+        """Lowercased spaCy tokens of short phrases (skill vocabularies)"""
+        return self.call('tokenize', texts=list(texts))['tokens']
+
+    def generate(self, prompt: str, **kwargs: Any) -> List[Dict[str, Any]]:
+        """Text generation, returning the pipeline's list of ``generated_text`` dicts"""
+        return self.call('generate', prompt=prompt, kwargs=kwargs)['outputs']
+
+
+class RemoteEmbeddingModel:
+    """``SentenceTransformer.encode`` look-alike backed by the sidecar"""
+
+    max_seq_length = MAX_SEQ_LENGTH
+
+    def __init__(self, client: InferenceClient):
+        self.client = client
+
+    def encode(self, sentences, batch_size: int = 32, normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        vectors = self.client.embed([sentences] if single else list(sentences))
+        return vectors[0] if single else vectors
+
+
+class RemoteGenerator:
+    """Callable standing in for the Hugging Face text-generation pipeline"""
+
+    def __init__(self, client: InferenceClient):
+        self.client = client
+
+    def __call__(self, prompt: str, **kwargs: Any) -> List[Dict[str, Any]]:
+        return self.client.generate(prompt, **kwargs)
+
+
+# Global client, only when a sidecar is configured
+_client = None
+
+
+def get_inference_client() -> Optional[InferenceClient]:
+    """The sidecar client if ``INFERENCE_SOCKET`` is set, else ``None``"""
+    global _client
+    socket_path = os.getenv('INFERENCE_SOCKET')
+    if not socket_path:
+        return None
+    if _client is None or _client.socket_path != socket_path:
+        _client = InferenceClient(socket_path, timeout=float(os.getenv('INFERENCE_TIMEOUT', '60')))
+    return _client
+
+
+__all__ = [
+    'InferenceClient', 'InferenceError', 'RemoteEmbeddingModel', 'RemoteGenerator',
+    'get_inference_client'
+]
@@ -0,0 +1,221 @@
+"""
+Local inference sidecar: one process owns the models for the whole box.
+
+Without it, the API workers and every Streamlit front end each hold their
+own copy of MiniLM, spaCy and DistilGPT-2. The sidecar loads them once and
+serves them over a Unix domain socket using the frames in
+``src.inference.protocol``:
+
+- ``ping``: names of the loaded models;
+- ``embed``: unit-length sentence embeddings (float16 on the wire);
+- ``spacy``: document vector, entities and tokens per text;
+- ``tokenize``: spaCy tokens of short phrases;
+- ``generate``: text generation with the optional LLM.
+
+Each connection is served by its own thread. The texts of concurrent
+``embed`` and ``spacy`` requests go through a ``MicroBatcher``, so requests
+from different clients that arrive within ``max_wait_ms`` of each other
+share one forward pass.
+
+Run with ``python -m src.inference.server --socket /tmp/resume-inference.sock``
+and set ``INFERENCE_SOCKET`` to the same path for the clients.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socketserver
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.inference.protocol import DEFAULT_SOCKET_PATH, ProtocolError, pack_array, recv_frame, send_frame
+from src.utils.batching import DEFAULT_MAX_BATCH_SIZE, MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+
+class _ThreadingServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def _gather(futures: List[Future]) -> List[Any]:
+    return [future.result() for future in futures]
+
+
+class InferenceServer:
+    """Owns the models and answers protocol requests"""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = 5.0, include_llm: bool = True, include_spacy: bool = True,
+                 embedding_manager=None,
+                 spacy_backend=None, generator: Optional[Callable] = None):
+        """Configure the server; models are loaded by ``load`` unless given
+
+        Args:
+            socket_path: Unix socket to listen on
+            max_batch_size: Texts per coalesced batch
+            max_wait_ms: How long the first queued text waits for others
+            include_llm: Load the text-generation pipeline
+            include_spacy: Load the spaCy pipeline
+            embedding_manager: Preloaded ``EmbeddingManager``
+            spacy_backend: Preloaded ``SpacyBackend``
+            generator: Preloaded text-generation callable
+        """
+        self.socket_path = socket_path
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.include_llm = include_llm
+        self.include_spacy = include_spacy
+        self.manager = embedding_manager
+        self.spacy = spacy_backend
+        self.generator = generator
+        self._generate_lock = threading.Lock()
+        self._embed_batcher: Optional[MicroBatcher] = None
+        self._spacy_batcher: Optional[MicroBatcher] = None
+        self._server: Optional[_ThreadingServer] = None
+
+    def load(self):
+        """Load the models that were not passed in, in this process"""
+        # The sidecar serves the models, it must not try to call itself
+        os.environ.pop('INFERENCE_SOCKET', None)
+        if os.getenv('EMBEDDING_BACKEND') == 'remote':
+            os.environ.pop('EMBEDDING_BACKEND')
+
+        if self.manager is None:
+            from src.utils.embeddings import get_embedding_manager
+            self.manager = get_embedding_manager()
+        if self.spacy is None and self.include_spacy:
+            from src.scoring.spacy_backend import get_spacy_backend
+            self.spacy = get_spacy_backend()
+        if self.generator is None and self.include_llm:
+            from src.scoring.semantic_match import _get_huggingface_pipeline
+            self.generator = _get_huggingface_pipeline()
+
+        self._embed_batcher = MicroBatcher(
+            lambda texts: list(self.manager.create_batch_embeddings(texts, coalesce=False)),
+            self.max_batch_size, self.max_wait_ms, name="sidecar_embed"
+        )
+        if self.spacy is not None:
+            self._spacy_batcher = MicroBatcher(
+                self.spacy.process, self.max_batch_size, self.max_wait_ms, name="sidecar_spacy"
+            )
+        logger.info(f"✅ Inference sidecar models: {self.models()}")
+
+    def models(self) -> Dict[str, Optional[str]]:
+        return {
+            'embeddings': self.manager.model_name if self.manager is not None and self.manager._model is not None else None,
+            'spacy': self.spacy.model_name if self.spacy is not None and self.spacy.available else None,
+            'generator': 'huggingface_llm' if self.generator is not None else None,
+        }
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one request; failures become ``ok: False`` responses"""
+        op = request.get('op')
+        try:
+            if op == 'ping':
+                return {'ok': True, 'models': self.models()}
+            if op == 'embed':
+                if self.manager is None or self.manager._model is None:
+                    raise RuntimeError("No embedding model loaded")
+                rows = _gather([self._embed_batcher.submit(text) for text in request['texts']])
+                return {'ok': True, 'embeddings': pack_array(np.vstack(rows))}
+            if op == 'spacy':
+                if self.spacy is None or not self.spacy.available:
+                    raise RuntimeError("No spaCy model loaded")
+                artifacts = _gather([self._spacy_batcher.submit(text) for text in request['texts']])
+                return {'ok': True, 'documents': [
+                    {'vector': pack_array(item.vector), 'entities': [list(entity) for entity in item.entities],
+                     'tokens': list(item.tokens)}
+                    for item in artifacts
+                ]}
+            if op == 'tokenize':
+                if self.spacy is None or not self.spacy.available:
+                    raise RuntimeError("No spaCy model loaded")
+                tokens = self.spacy.tokenize_phrases(request['texts'])
+                return {'ok': True, 'tokens': [list(phrase) for phrase in tokens]}
+            if op == 'generate':
+                if self.generator is None:
+                    raise RuntimeError("No text generation model loaded")
+                with self._generate_lock:
+                    outputs = self.generator(request['prompt'], **request.get('kwargs', {}))
+                return {'ok': True, 'outputs': [{'generated_text': item['generated_text']} for item in outputs]}
+            raise ValueError(f"Unknown op: {op!r}")
+        except Exception as e:
+            logger.error(f"Inference request '{op}' failed: {e}")
+            return {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        request = recv_frame(self.request)
+                    except (ProtocolError, OSError) as e:
+                        logger.warning(f"Dropping inference connection: {e}")
+                        return
+                    if request is None:
+                        return
+                    try:
+                        send_frame(self.request, server.handle(request))
+                    except (BrokenPipeError, ConnectionResetError) as e:
+                        logger.warning(f"Dropping inference connection: {e}")
+                        return
+
+        return Handler
+
+    def serve_forever(self):
+        """Listen on the socket until ``shutdown`` is called"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # Stale socket from a previous run
+        # bind() creates the socket file; the umask makes it 0600 from the start, same-user clients only
+        previous_umask = os.umask(0o177)
+        try:
+            self._server = _ThreadingServer(self.socket_path, self._handler_class())
+        finally:
+            os.umask(previous_umask)
+        logger.info(f"🔌 Inference sidecar listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            for batcher in (self._embed_batcher, self._spacy_batcher):
+                if batcher is not None:
+                    batcher.close()
+
+    def shutdown(self):
+        """Stop accepting connections; safe to call from a signal handler"""
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local inference sidecar for resume scoring")
+    parser.add_argument("--socket", default=os.getenv('INFERENCE_SOCKET', DEFAULT_SOCKET_PATH))
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--no-llm", action="store_true", help="do not load the text-generation model")
+    parser.add_argument("--no-spacy", action="store_true", help="do not load the spaCy pipeline")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = InferenceServer(args.socket, args.max_batch_size, args.max_wait_ms, include_llm=not args.no_llm,
+                             include_spacy=not args.no_spacy)
+    server.load()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: server.shutdown())
+    server.serve_forever()
+
+
+__all__ = ['InferenceServer']
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,30 @@
 import re
-import tempfile
-import os
+import asyncio
 from fastapi import UploadFile
-from src.utils.text_extraction import extract_text
+from src.utils.extraction_service import get_extraction_service
+from src.utils.metrics import timed
 
 class JDParser:
     def __init__(self):
         pass
 
+    @timed('jd_parse')
     async def parse(self, file: UploadFile):
         """Parse uploaded job description file and extract text and structured data"""
-        # Save uploaded file temporarily
-        file_extension = os.path.splitext(file.filename or '')[1] or '.tmp'
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_file.flush()
-            
-            try:
-                # Extract text from file
-                text = extract_text(tmp_file.name)
-                
-                # Extract structured information
-                structured_data = {
-                    "raw_text": text,
-                    "role_title": self.extract_role_title(text),
-                    "required_skills": self.extract_skills(text),
-                    "qualifications": self.extract_qualifications(text),
-                    "experience_required": self.extract_experience_requirements(text)
-                }
-                
-                return structured_data
-            finally:
-                # Clean up temporary file
-                os.unlink(tmp_file.name)
+        # Parsed off the event loop, cached by content hash
+        content = await file.read()
+        text = await asyncio.to_thread(get_extraction_service().extract_bytes, content, file.filename)
+        
+        # Extract structured information
+        structured_data = {
+            "raw_text": text,
+            "role_title": self.extract_role_title(text),
+            "required_skills": self.extract_skills(text),
+            "qualifications": self.extract_qualifications(text),
+            "experience_required": self.extract_experience_requirements(text)
+        }
+        
+        return structured_data
 
     def extract_role_title(self, text):
         """Extract role title from job description"""
@@ -1,39 +1,35 @@
+import logging
 import re
-import tempfile
-import os
+import asyncio
 from fastapi import UploadFile
-from src.utils.text_extraction import extract_text
+from src.utils.extraction_service import get_extraction_service
+from src.utils.metrics import timed
+from src.scoring.spacy_backend import get_spacy_backend
+
+logger = logging.getLogger(__name__)
 
 class ResumeParser:
     def __init__(self):
         pass
 
+    @timed('resume_parse')
     async def parse(self, file: UploadFile):
         """Parse uploaded resume file and extract text and structured data"""
-        # Save uploaded file temporarily
-        file_extension = os.path.splitext(file.filename or '')[1] or '.tmp'
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_file.flush()
-            
-            try:
-                # Extract text from file
-                text = extract_text(tmp_file.name)
-                
-                # Extract structured information
-                structured_data = {
-                    "raw_text": text,
-                    "contact_info": self.extract_contact_info(text),
-                    "skills": self.extract_skills(text),
-                    "experience": self.extract_experience(text),
-                    "education": self.extract_education(text)
-                }
-                
-                return structured_data
-            finally:
-                # Clean up temporary file
-                os.unlink(tmp_file.name)
+        # Parsed off the event loop, cached by content hash
+        content = await file.read()
+        text = await asyncio.to_thread(get_extraction_service().extract_bytes, content, file.filename)
+        
+        # Extract structured information
+        structured_data = {
+            "raw_text": text,
+            "contact_info": self.extract_contact_info(text),
+            "skills": self.extract_skills(text),
+            "entities": self.extract_entities(text),
+            "experience": self.extract_experience(text),
+            "education": self.extract_education(text)
+        }
+        
+        return structured_data
 
     def extract_contact_info(self, text):
         """Extract contact information from resume text"""
@@ -63,6 +59,15 @@ class ResumeParser:
             'numpy', 'scikit-learn', 'api', 'rest', 'graphql', 'microservices'
         ]
         
+        # Whole-token matches on the cached spaCy document, which the spaCy
+        # similarity backend reuses when this resume is scored later
+        backend = get_spacy_backend()
+        if backend.available:
+            try:
+                return backend.skills(text, skill_keywords)
+            except Exception as e:
+                logger.error(f"spaCy skill extraction failed: {e}")
+        
         text_lower = text.lower()
         found_skills = []
         
@@ -72,6 +77,17 @@ class ResumeParser:
         
         return found_skills
 
+    def extract_entities(self, text):
+        """Extract named entities (organizations, dates, places) with spaCy when available"""
+        backend = get_spacy_backend()
+        if not backend.available:
+            return []
+        try:
+            return [{'text': entity, 'label': label} for entity, label in backend.entities(text)]
+        except Exception as e:
+            logger.error(f"spaCy entity extraction failed: {e}")
+            return []
+
     def extract_experience(self, text):
         """Extract work experience from resume text"""
         # Basic experience extraction - look for year patterns and job titles
@@ -0,0 +1,350 @@
+"""
+Chunked embeddings for documents longer than the encoder's context.
+
+MiniLM truncates its input to 256 wordpieces, so embedding a resume as one
+string only captures its first half page. ``split_into_chunks`` cuts a
+document into windows of at most ``max_tokens`` estimated tokens, breaking
+at section headers (``src.scoring.sections``) and preferring blank-line
+paragraph breaks. Consecutive windows of one section share up to
+``overlap_tokens`` of trailing lines, and single lines longer than a window
+are split into overlapping word windows.
+
+``ChunkedEmbedder`` embeds the chunks of every uncached document in one
+length-bucketed batch, keeps chunk texts and embeddings in an LRU cache keyed
+by content hash, pools them into a document vector (mean, max or
+attention-weighted) and exposes chunk-to-chunk similarity matrices so scores
+can be explained by the passages that matched.
+"""
+
+import logging
+import os
+import re
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.scoring.sections import get_section_classifier
+from src.utils.analysis_cache import AnalysisCache, content_hash, make_cache_key
+from src.utils.batching import CHARS_PER_TOKEN
+from src.utils.embeddings import EmbeddingManager, get_embedding_manager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TOKENS = 200  # headroom under MiniLM's 256 for estimate error and [CLS]/[SEP]
+DEFAULT_OVERLAP_TOKENS = 40
+POOLING_METHODS = ('mean', 'max', 'attention')
+ATTENTION_TEMPERATURE = 0.1
+WORD_PATTERN = re.compile(r"\S+")
+
+
+class Chunk(NamedTuple):
+    """One embedded window of a document"""
+    text: str
+    start: int
+    end: int
+    section: Optional[str]
+
+
+class _Unit(NamedTuple):
+    start: int
+    end: int
+    tokens: float
+    paragraph_start: bool
+
+
+def _estimate_tokens(length: int) -> float:
+    # Every word is at least one wordpiece
+    return max(1.0, length / CHARS_PER_TOKEN)
+
+
+def _pack(text: str, units: List[_Unit], section: Optional[str], max_tokens: int,
+          overlap_tokens: int, joiner: str = ' ') -> List[Chunk]:
+    """Greedily pack units into windows, carrying a trailing overlap"""
+    chunks: List[Chunk] = []
+    window: List[_Unit] = []
+    tokens = 0.0
+
+    def emit():
+        chunks.append(Chunk(
+            joiner.join(text[unit.start:unit.end] for unit in window),
+            window[0].start, window[-1].end, section
+        ))
+
+    for unit in units:
+        if window and unit.paragraph_start and tokens >= max_tokens // 2:
+            # A paragraph break in a well-filled window is a natural boundary
+            emit()
+            window, tokens = [], 0.0
+        elif window and tokens + unit.tokens > max_tokens:
+            emit()
+            carried: List[_Unit] = []
+            carried_tokens = 0.0
+            for previous in reversed(window):
+                if carried_tokens + previous.tokens > overlap_tokens or previous is window[0]:
+                    break
+                carried.insert(0, previous)
+                carried_tokens += previous.tokens
+            while carried and carried_tokens + unit.tokens > max_tokens:
+                carried_tokens -= carried.pop(0).tokens
+            window, tokens = carried, carried_tokens
+        window.append(unit)
+        tokens += unit.tokens
+
+    if window:
+        emit()
+    return chunks
+
+
+def _split_long_line(text: str, start: int, end: int, section: Optional[str],
+                     max_tokens: int, overlap_tokens: int) -> List[Chunk]:
+    """Overlapping word windows over one line that exceeds a window"""
+    words = [
+        _Unit(start + match.start(), start + match.end(), _estimate_tokens(len(match.group()) + 1), False)
+        for match in WORD_PATTERN.finditer(text[start:end])
+    ]
+    return _pack(text, words, section, max_tokens, overlap_tokens)
+
+
+def split_into_chunks(text: str, max_tokens: int = DEFAULT_MAX_TOKENS,
+                      overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+                      profile: str = "professional") -> List[Chunk]:
+    """Split a document into section-aligned, overlapping windows
+
+    Args:
+        text: Raw document text
+        max_tokens: Estimated wordpiece budget per chunk
+        overlap_tokens: Trailing tokens repeated at the start of the next
+            chunk of the same section
+        profile: Section profile used to detect headers
+
+    Returns:
+        Chunks in document order with character offsets into ``text``
+    """
+    classifier = get_section_classifier(profile)
+    blocks: List[Tuple[Optional[str], List[_Unit]]] = [(None, [])]
+    paragraph_start = True
+
+    offset = 0
+    for line in (text or '').split('\n'):
+        line_start = offset
+        offset += len(line) + 1
+
+        content = line.strip()
+        if not content:
+            paragraph_start = True
+            continue
+
+        header = classifier.classify(line)
+        if header is not None:
+            # Headers open a new block and stay with it as context
+            blocks.append((header[0], []))
+            paragraph_start = True
+
+        start = line_start + (len(line) - len(line.lstrip()))
+        blocks[-1][1].append(_Unit(start, start + len(content), _estimate_tokens(len(content) + 1), paragraph_start))
+        paragraph_start = False
+
+    chunks: List[Chunk] = []
+    for section, units in blocks:
+        pending: List[_Unit] = []
+        for unit in units:
+            if unit.tokens <= max_tokens:
+                pending.append(unit)
+                continue
+            chunks.extend(_pack(text, pending, section, max_tokens, overlap_tokens))
+            chunks.extend(_split_long_line(text, unit.start, unit.end, section, max_tokens, overlap_tokens))
+            pending = []
+        chunks.extend(_pack(text, pending, section, max_tokens, overlap_tokens))
+    return chunks
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def pool_embeddings(embeddings: np.ndarray, method: str = 'mean',
+                    query: Optional[np.ndarray] = None) -> np.ndarray:
+    """Combine chunk embeddings into one l2-normalised document vector
+
+    Args:
+        embeddings: ``(n_chunks, dim)`` chunk embeddings
+        method: ``mean``, ``max`` (element-wise) or ``attention``, which
+            weights chunks by a softmax over their similarity to ``query``
+            (by default the document's own mean vector)
+        query: Vector the attention weights are computed against, usually
+            the other document's mean embedding
+
+    Returns:
+        Array of shape ``(dim,)``; zeros for a document without chunks
+    """
+    if method not in POOLING_METHODS:
+        raise ValueError(f"Unknown pooling method '{method}', expected one of {POOLING_METHODS}")
+    if len(embeddings) == 0:
+        return np.zeros(embeddings.shape[1] if embeddings.ndim == 2 else 0)
+
+    if method == 'max':
+        return _normalize(embeddings.max(axis=0))
+
+    mean = _normalize(embeddings.mean(axis=0))
+    if method == 'mean':
+        return mean
+
+    query = _normalize(query) if query is not None else mean
+    logits = embeddings @ query / ATTENTION_TEMPERATURE
+    weights = np.exp(logits - logits.max())
+    weights /= weights.sum()
+    return _normalize(weights @ embeddings)
+
+
+class ChunkedEmbedder:
+    """Embeds long documents as chunk sets and compares them"""
+
+    def __init__(self, manager: Optional[EmbeddingManager] = None,
+                 max_tokens: int = DEFAULT_MAX_TOKENS, overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+                 profile: str = "professional", cache_size: int = 512):
+        """Set up chunking parameters and the chunk cache
+
+        Args:
+            manager: Embedding manager providing the model, defaults to the
+                process-wide one
+            max_tokens: Estimated wordpiece budget per chunk
+            overlap_tokens: Overlap between consecutive chunks of a section
+            profile: Section profile used for chunk boundaries
+            cache_size: Number of documents whose chunks are kept
+        """
+        self.manager = manager or get_embedding_manager()
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.profile = profile
+        self.cache = AnalysisCache(cache_size, name="chunk_embeddings")
+
+    @property
+    def available(self) -> bool:
+        """Whether a transformer model is loaded (the TF-IDF fallback has no shared space)"""
+        return self.manager._model is not None
+
+    def _cache_key(self, text: str) -> str:
+        return make_cache_key(
+            "chunk_embeddings", content_hash(text), model=self.manager.model_name,
+            backend=self.manager.backend, max_tokens=self.max_tokens,
+            overlap_tokens=self.overlap_tokens, profile=self.profile
+        )
+
+    def embed_documents(self, texts: Sequence[str]) -> List[Tuple[List[Chunk], np.ndarray]]:
+        """Chunks and normalised chunk embeddings for each document
+
+        Chunks of all documents missing from the cache are embedded in a
+        single batch.
+        """
+        keys = [self._cache_key(text) for text in texts]
+        results: List[Optional[Tuple[List[Chunk], np.ndarray]]] = []
+        pending = []
+        for index, (text, key) in enumerate(zip(texts, keys)):
+            cached, hit = self.cache.lookup(key)
+            results.append(cached if hit else None)
+            if not hit:
+                pending.append((index, split_into_chunks(text, self.max_tokens, self.overlap_tokens, self.profile)))
+
+        if pending:
+            chunk_texts = [chunk.text for _, chunks in pending for chunk in chunks]
+            embeddings = np.asarray(self.manager.create_batch_embeddings(chunk_texts)) if chunk_texts else None
+            position = 0
+            for index, chunks in pending:
+                if embeddings is not None and chunks:
+                    document = embeddings[position:position + len(chunks)]
+                else:
+                    document = np.zeros((0, embeddings.shape[1] if embeddings is not None else 0))
+                position += len(chunks)
+                results[index] = (chunks, document)
+                self.cache.store(keys[index], results[index])
+
+        return results
+
+    def embed(self, text: str) -> Tuple[List[Chunk], np.ndarray]:
+        """Chunks and chunk embeddings of one document"""
+        return self.embed_documents([text])[0]
+
+    def document_embedding(self, text: str, pooling: str = 'mean',
+                           query: Optional[np.ndarray] = None) -> np.ndarray:
+        """Pooled embedding of a whole document"""
+        return pool_embeddings(self.embed(text)[1], pooling, query)
+
+    def similarity(self, first: str, second: str, pooling: str = 'mean') -> float:
+        """Cosine similarity of two pooled documents, clipped to [0, 1]
+
+        With attention pooling each document attends to the other's mean
+        vector, so the chunks most relevant to the comparison dominate.
+        """
+        (_, first_embeddings), (_, second_embeddings) = self.embed_documents([first, second])
+        if len(first_embeddings) == 0 or len(second_embeddings) == 0:
+            return 0.0
+
+        if pooling == 'attention':
+            first_query = pool_embeddings(second_embeddings, 'mean')
+            second_query = pool_embeddings(first_embeddings, 'mean')
+        else:
+            first_query = second_query = None
+        first_vector = pool_embeddings(first_embeddings, pooling, first_query)
+        second_vector = pool_embeddings(second_embeddings, pooling, second_query)
+        return float(np.clip(first_vector @ second_vector, 0.0, 1.0))
+
+    def max_sim_matrix(self, first: str, second: str) -> Tuple[List[Chunk], List[Chunk], np.ndarray]:
+        """Cosine similarity of every chunk of ``first`` with every chunk of ``second``
+
+        Returns:
+            Tuple of (first chunks, second chunks, matrix of shape
+            ``(len(first chunks), len(second chunks))``). Row maxima give
+            each passage's best supporting passage in the other document.
+        """
+        (first_chunks, first_embeddings), (second_chunks, second_embeddings) = \
+            self.embed_documents([first, second])
+        if len(first_chunks) == 0 or len(second_chunks) == 0:
+            return first_chunks, second_chunks, np.zeros((len(first_chunks), len(second_chunks)))
+        return first_chunks, second_chunks, first_embeddings @ second_embeddings.T
+
+    def relevant_excerpt(self, text: str, reference: str, max_chars: int = 500) -> str:
+        """The chunks of ``text`` closest to ``reference``, in document order
+
+        Used where only a short excerpt fits (LLM prompts) instead of the
+        first ``max_chars`` characters.
+        """
+        chunks, _, matrix = self.max_sim_matrix(text, reference)
+        if not chunks:
+            return text[:max_chars]
+
+        relevance = matrix.max(axis=1) if matrix.size else np.zeros(len(chunks))
+        selected = []
+        used = 0
+        for index in np.argsort(-relevance, kind='stable'):
+            length = len(chunks[index].text)
+            if used and used + length > max_chars:
+                continue
+            selected.append(index)
+            used += length + 1
+            if used >= max_chars:
+                break
+
+        excerpt = ' '.join(chunks[index].text for index in sorted(selected))
+        return excerpt[:max_chars]
+
+
+# Global chunked embedder instance
+_chunked_embedder = None
+
+
+def get_chunked_embedder() -> ChunkedEmbedder:
+    """Get or create the global chunked embedder"""
+    global _chunked_embedder
+    if _chunked_embedder is None:
+        _chunked_embedder = ChunkedEmbedder(
+            max_tokens=int(os.getenv('CHUNK_MAX_TOKENS', DEFAULT_MAX_TOKENS)),
+            overlap_tokens=int(os.getenv('CHUNK_OVERLAP_TOKENS', DEFAULT_OVERLAP_TOKENS)),
+        )
+    return _chunked_embedder
+
+
+__all__ = [
+    'Chunk', 'ChunkedEmbedder', 'get_chunked_embedder', 'split_into_chunks', 'pool_embeddings',
+    'POOLING_METHODS', 'DEFAULT_MAX_TOKENS', 'DEFAULT_OVERLAP_TOKENS'
+]
@@ -0,0 +1,239 @@
+"""
+Single-pass document analysis for keyword and section scoring.
+
+A ``DocumentAnalysis`` tokenizes a resume or job description exactly once and
+keeps stopword-filtered term-frequency maps per line. Keyword overlap,
+missing-keyword ranking and section scoring are all served from these maps,
+so comparing one JD against many resumes never re-tokenizes the JD. Token
+character offsets are kept as well, so section terms are sliced out of the
+single token stream using the spans from ``src.scoring.sections``.
+"""
+
+import math
+import re
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+from src.scoring.sections import SECTION_PROFILES, Span, segment_sections, span_lines
+
+# Same token definition as sklearn's TfidfVectorizer so section scores stay
+# comparable with the previous vectorizer-based implementation
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+STOP_WORDS = ENGLISH_STOP_WORDS
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and tokenize text, dropping English stop words"""
+    return [token for token in TOKEN_PATTERN.findall((text or '').lower()) if token not in STOP_WORDS]
+
+
+def ngram_counts(terms: List[str], ngram_range: Tuple[int, int] = (1, 1)) -> Counter:
+    """Count word n-grams built from an already stopword-filtered term list"""
+    low, high = ngram_range
+    counts: Counter = Counter()
+    for n in range(low, high + 1):
+        if n == 1:
+            counts.update(terms)
+        else:
+            counts.update(' '.join(terms[i:i + n]) for i in range(len(terms) - n + 1))
+    return counts
+
+
+def tfidf_cosine(first: Counter, second: Counter, max_features: Optional[int] = None) -> float:
+    """Cosine similarity of two term-count maps under pairwise smooth TF-IDF
+
+    Mirrors ``TfidfVectorizer`` fitted on exactly these two documents: smooth
+    idf ``ln(3 / (1 + df)) + 1`` and l2-normalised vectors.
+    """
+    vocabulary = set(first) | set(second)
+    if not vocabulary:
+        return 0.0
+
+    if max_features is not None and len(vocabulary) > max_features:
+        ranked = sorted(vocabulary, key=lambda term: (-(first[term] + second[term]), term))
+        vocabulary = set(ranked[:max_features])
+
+    dot = norm_first = norm_second = 0.0
+    for term in vocabulary:
+        df = (term in first) + (term in second)
+        idf = math.log(3.0 / (1.0 + df)) + 1.0
+        weight_first = first.get(term, 0) * idf
+        weight_second = second.get(term, 0) * idf
+        dot += weight_first * weight_second
+        norm_first += weight_first * weight_first
+        norm_second += weight_second * weight_second
+
+    if norm_first == 0.0 or norm_second == 0.0:
+        return 0.0
+    return dot / math.sqrt(norm_first * norm_second)
+
+
+def pairwise_tfidf_cosines(first: Sequence[Counter], second: Sequence[Counter],
+                           max_features: Optional[int] = None) -> np.ndarray:
+    """Row-wise ``tfidf_cosine`` of many count-map pairs in one sparse pass
+
+    All maps share one alphabetically ordered vocabulary, so pair ``i`` is
+    row ``i`` of two CSR matrices. The per-pair ``max_features`` cut (top
+    terms by combined count, ties broken alphabetically) is applied with a
+    single lexsort over the non-zeros, and the pairwise smooth idf is
+    derived from the document frequency within each pair.
+
+    Returns:
+        Array of cosine similarities, one per pair
+    """
+    n_pairs = len(first)
+    vocabulary = {term: index for index, term in enumerate(sorted(set().union(*first, *second)))}
+    if n_pairs == 0 or not vocabulary:
+        return np.zeros(n_pairs)
+
+    rows: List[int] = []
+    cols: List[int] = []
+    data: List[float] = []
+    for row, counts in enumerate(list(first) + list(second)):
+        for term, count in counts.items():
+            rows.append(row)
+            cols.append(vocabulary[term])
+            data.append(count)
+    matrix = sparse.csr_matrix((data, (rows, cols)), shape=(2 * n_pairs, len(vocabulary)), dtype=np.float64)
+    left, right = matrix[:n_pairs], matrix[n_pairs:]
+
+    if max_features is not None:
+        combined = (left + right).tocoo()
+        order = np.lexsort((combined.col, -combined.data, combined.row))
+        ordered_rows = combined.row[order]
+        rank = np.arange(len(order)) - np.searchsorted(ordered_rows, ordered_rows)
+        keep = order[rank < max_features]
+        mask = sparse.csr_matrix(
+            (np.ones(len(keep)), (combined.row[keep], combined.col[keep])), shape=left.shape
+        )
+        left = left.multiply(mask).tocsr()
+        right = right.multiply(mask).tocsr()
+
+    idf = ((left > 0).astype(np.float64) + (right > 0).astype(np.float64)).tocsr()
+    idf.data = np.log(3.0 / (1.0 + idf.data)) + 1.0
+    left = left.multiply(idf)
+    right = right.multiply(idf)
+
+    dot = np.asarray(left.multiply(right).sum(axis=1)).ravel()
+    norms = np.sqrt(
+        np.asarray(left.multiply(left).sum(axis=1)).ravel() * np.asarray(right.multiply(right).sum(axis=1)).ravel()
+    )
+    cosines = np.zeros(n_pairs)
+    np.divide(dot, norms, out=cosines, where=norms > 0)
+    return cosines
+
+
+class DocumentAnalysis:
+    """Tokenized view of one document with reusable term statistics"""
+
+    def __init__(self, text: str):
+        """Tokenize the document once
+
+        Args:
+            text: Raw resume or job description text
+        """
+        self.text = text or ''
+        self.lines = self.text.split('\n')
+        self.terms: List[str] = []
+        self.term_offsets: List[int] = []
+        self.term_counts: Counter = Counter()
+        self.line_frequency: Counter = Counter()
+        self.content_line_count = 0
+        self._first_position: Dict[str, int] = {}
+        self._sections: Dict[str, Dict[str, List[Span]]] = {}
+
+        line_start = 0
+        for line in self.lines:
+            line_terms = set()
+            for match in TOKEN_PATTERN.finditer(line):
+                term = match.group().lower()
+                if term in STOP_WORDS:
+                    continue
+                self._first_position.setdefault(term, len(self.terms))
+                self.terms.append(term)
+                self.term_offsets.append(line_start + match.start())
+                line_terms.add(term)
+
+            if line_terms:
+                self.line_frequency.update(line_terms)
+                self.content_line_count += 1
+            line_start += len(line) + 1
+
+        self.term_counts.update(self.terms)
+
+    def __bool__(self) -> bool:
+        return bool(self.text.strip())
+
+    @property
+    def vocabulary(self) -> Iterable[str]:
+        """Distinct stopword-filtered terms in the document"""
+        return self.term_counts.keys()
+
+    def keyword_weights(self) -> Dict[str, float]:
+        """TF-IDF weight of each term, treating lines as the document collection
+
+        Terms that recur in every bullet (generic words) are damped, while
+        terms concentrated in a few lines (specific skills) rank higher.
+        """
+        n_lines = max(1, self.content_line_count)
+        return {
+            term: count * (math.log((1.0 + n_lines) / (1.0 + self.line_frequency[term])) + 1.0)
+            for term, count in self.term_counts.items()
+        }
+
+    def rank_keywords(self, terms: Iterable[str]) -> List[str]:
+        """Order terms by TF-IDF weight, breaking ties by first occurrence"""
+        weights = self.keyword_weights()
+        return sorted(terms, key=lambda term: (-weights.get(term, 0.0), self._first_position.get(term, 0)))
+
+    def keyword_overlap(self, resume: "DocumentAnalysis") -> Tuple[float, List[str]]:
+        """Share of this document's keywords that also appear in ``resume``
+
+        Returns:
+            Tuple of (score between 0 and 100, missing keywords ranked by
+            TF-IDF weight in this document)
+        """
+        jd_terms = set(self.term_counts)
+        if not jd_terms:
+            return 0.0, []
+
+        resume_terms = set(resume.term_counts)
+        common = jd_terms & resume_terms
+        missing = self.rank_keywords(jd_terms - resume_terms)
+        return min(len(common) / len(jd_terms) * 100, 100.0), missing
+
+    def section_spans(self, profile: str = "standard") -> Dict[str, List[Span]]:
+        """Character offsets of each section's content, segmented once per profile"""
+        if profile not in self._sections:
+            self._sections[profile] = segment_sections(self.text, profile)
+        return self._sections[profile]
+
+    def sections(self, profile: str = "standard") -> Dict[str, List[str]]:
+        """Stripped content lines of each section"""
+        return {
+            name: span_lines(self.text, spans)
+            for name, spans in self.section_spans(profile).items()
+        }
+
+    def section_terms(self, section: str, profile: str = "standard") -> List[str]:
+        """Stopword-filtered terms of one section, in document order"""
+        terms: List[str] = []
+        for start, end in self.section_spans(profile).get(section, []):
+            first = bisect_left(self.term_offsets, start)
+            last = bisect_left(self.term_offsets, end, first)
+            terms.extend(self.terms[first:last])
+        return terms
+
+    def has_section(self, section: str, profile: str = "standard") -> bool:
+        """Whether the section has any non-empty content"""
+        return bool(self.section_spans(profile).get(section))
+
+
+__all__ = [
+    'DocumentAnalysis', 'SECTION_PROFILES', 'STOP_WORDS', 'TOKEN_PATTERN',
+    'ngram_counts', 'pairwise_tfidf_cosines', 'tfidf_cosine', 'tokenize'
+]
@@ -0,0 +1,327 @@
+"""
+Unified scoring engine shared by the Streamlit front ends and the API.
+
+Keyword matching, TF-IDF semantic matching, section extraction and
+section scoring used to be copy-pasted into every UI with slightly different
+parameters. They now live here, and the historical differences between the
+front ends are captured as named ``ScoringOptions`` profiles so that every
+caller keeps its current behaviour while sharing one implementation.
+"""
+
+import cProfile
+import io
+import logging
+import pstats
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from src.scoring.document import DocumentAnalysis, ngram_counts, pairwise_tfidf_cosines, tokenize
+from src.scoring.normalization import NormalizedDocument, clean_text, normalize
+from src.scoring.sections import SECTION_PROFILES
+from src.utils.metrics import observe_stage, stage_timer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ScoringOptions:
+    """Tunable parameters for one scoring run
+
+    The dataclass is frozen so it can be hashed and used in cache keys.
+    """
+    hard_match_mode: str = "keywords"          # "keywords" or "skills"
+    missing_keyword_limit: Optional[int] = None
+    semantic_backend: str = "tfidf"            # "tfidf" or "detailed"
+    semantic_ngram_range: Tuple[int, int] = (1, 2)
+    semantic_max_features: Optional[int] = 1000
+    section_profile: str = "standard"
+    section_ngram_range: Tuple[int, int] = (1, 1)
+    section_max_features: Optional[int] = None
+    include_hard_match: bool = True
+    include_semantic: bool = True
+    include_sections: bool = True
+
+    @classmethod
+    def standard(cls, **overrides) -> "ScoringOptions":
+        """Profile used by the resume, advanced and Streamlit Cloud analyzers"""
+        return cls(**overrides)
+
+    @classmethod
+    def professional(cls, **overrides) -> "ScoringOptions":
+        """Profile used by the professional analyzer"""
+        params = dict(
+            missing_keyword_limit=20,
+            semantic_ngram_range=(1, 3),
+            semantic_max_features=2000,
+            section_profile="professional",
+            section_ngram_range=(1, 2),
+            section_max_features=500,
+        )
+        params.update(overrides)
+        return cls(**params)
+
+    @classmethod
+    def api(cls, **overrides) -> "ScoringOptions":
+        """Profile used by the FastAPI ``/evaluate/`` endpoint"""
+        params = dict(
+            hard_match_mode="skills",
+            semantic_backend="detailed",
+            include_sections=False,
+        )
+        params.update(overrides)
+        return cls(**params)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the options as a plain dict, e.g. for cache keys"""
+        return asdict(self)
+
+
+DocumentInput = Union[str, Dict[str, Any], DocumentAnalysis, NormalizedDocument, None]
+
+
+@contextmanager
+def _stage(timings: Dict[str, float], name: str):
+    """Time one scoring stage into ``timings``, the metrics and any active trace"""
+    with stage_timer(f"scoring_{name}"):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings[name] = time.perf_counter() - start
+
+
+class ScoringEngine:
+    """Single implementation of the resume/JD scoring pipeline"""
+
+    def __init__(self, default_options: Optional[ScoringOptions] = None):
+        """Initialize the engine
+
+        Args:
+            default_options: Options used when ``score`` is called without any
+        """
+        self.default_options = default_options or ScoringOptions()
+
+    def analyze(self, document: DocumentInput) -> DocumentAnalysis:
+        """Tokenize a document once so it can be scored against many others"""
+        if isinstance(document, DocumentAnalysis):
+            return document
+        return normalize(document).analysis
+
+    def score(self, resume: DocumentInput, jd: DocumentInput,
+              options: Optional[ScoringOptions] = None) -> Dict[str, Any]:
+        """Score a resume against a job description
+
+        Args:
+            resume: Resume text, parsed resume dict (``raw_text``, ``skills``)
+                or a ``DocumentAnalysis`` from ``analyze``
+            jd: Job description text, parsed JD dict (``raw_text``,
+                ``required_skills``) or a ``DocumentAnalysis``
+            options: Scoring options, defaults to the engine's default profile
+
+        Returns:
+            Dictionary with hard match, semantic and section results plus
+            per-stage timings in seconds under ``timings``
+        """
+        options = options or self.default_options
+        timings: Dict[str, float] = {}
+
+        with _stage(timings, 'tokenization'):
+            # Every scorer below shares these, so each text is normalized once
+            resume_norm = normalize(resume)
+            jd_norm = normalize(jd)
+            resume_doc = resume_norm.analysis
+            jd_doc = jd_norm.analysis
+
+        result: Dict[str, Any] = {
+            'hard_match_score': 0.0,
+            'missing_keywords': [],
+            'semantic_match_score': 0.0,
+            'backend_scores': {},
+            'detailed_analysis': '',
+            'requirement_alignment': {},
+            'resume_sections': {},
+            'jd_sections': {},
+            'section_scores': {},
+        }
+
+        if options.include_hard_match:
+            with _stage(timings, 'hard_match'):
+                if options.hard_match_mode == "skills":
+                    from src.scoring.hard_match import calculate_hard_match
+                    resume_data = resume if isinstance(resume, dict) else {"raw_text": resume_doc.text, "skills": []}
+                    jd_data = jd if isinstance(jd, dict) else {"raw_text": jd_doc.text, "required_skills": {"required": [], "preferred": []}}
+                    result['hard_match_score'] = calculate_hard_match(resume_data, jd_data)
+                else:
+                    score, missing = self.hard_match(resume_doc, jd_doc, options)
+                    result['hard_match_score'] = score
+                    result['missing_keywords'] = missing
+
+        if options.include_semantic:
+            with _stage(timings, 'semantic_match'):
+                if options.semantic_backend == "detailed":
+                    from src.scoring.semantic_match import calculate_detailed_semantic_match
+                    analysis = calculate_detailed_semantic_match(resume_norm, jd_norm)
+                    result['semantic_match_score'] = analysis['weighted_score']
+                    result['backend_scores'] = analysis['backend_scores']
+                    result['detailed_analysis'] = analysis['detailed_analysis']
+                    result['requirement_alignment'] = analysis.get('requirement_alignment', {})
+                else:
+                    result['semantic_match_score'] = self.semantic_match(resume_norm, jd_norm, options)
+
+        if options.include_sections:
+            with _stage(timings, 'section_extraction'):
+                result['resume_sections'] = self.extract_sections(resume_doc, options)
+                result['jd_sections'] = self.extract_sections(jd_doc, options)
+
+            with _stage(timings, 'section_scoring'):
+                result['section_scores'] = self.section_scores(resume_doc, jd_doc, options)
+
+        timings['total'] = sum(timings.values())
+        observe_stage('scoring_total', timings['total'])
+        result['timings'] = timings
+        return result
+
+    def hard_match(self, resume: DocumentInput, jd: DocumentInput,
+                   options: Optional[ScoringOptions] = None) -> Tuple[float, List[str]]:
+        """Calculate hard match score based on stopword-filtered keyword overlap
+
+        Returns:
+            Tuple of (score between 0 and 100, missing JD keywords ranked by
+            TF-IDF weight)
+        """
+        options = options or self.default_options
+        try:
+            resume_doc = self.analyze(resume)
+            jd_doc = self.analyze(jd)
+
+            if not resume_doc or not jd_doc:
+                return 0.0, []
+
+            score, missing = jd_doc.keyword_overlap(resume_doc)
+            if options.missing_keyword_limit is not None:
+                missing = missing[:options.missing_keyword_limit]
+            return score, missing
+
+        except Exception as e:
+            logger.error(f"Hard match calculation failed: {e}")
+            return 0.0, []
+
+    def semantic_match(self, resume_text: DocumentInput, jd_text: DocumentInput,
+                       options: Optional[ScoringOptions] = None) -> float:
+        """Calculate semantic similarity (0-100) using TF-IDF cosine similarity"""
+        options = options or self.default_options
+        try:
+            resume_clean = normalize(resume_text).cleaned
+            jd_clean = normalize(jd_text).cleaned
+
+            if not resume_clean or not jd_clean:
+                return 0.0
+
+            vectorizer = TfidfVectorizer(
+                stop_words='english',
+                ngram_range=tuple(options.semantic_ngram_range),
+                max_features=options.semantic_max_features,
+                min_df=1
+            )
+
+            tfidf_matrix = vectorizer.fit_transform([resume_clean, jd_clean])
+            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+
+            return max(0.0, min(100.0, float(similarity) * 100))
+
+        except Exception as e:
+            logger.error(f"Semantic matching failed: {e}")
+            return 0.0
+
+    def extract_sections(self, document: DocumentInput,
+                         options: Optional[ScoringOptions] = None) -> Dict[str, List[str]]:
+        """Extract key sections from resume or JD text"""
+        options = options or self.default_options
+        return self.analyze(document).sections(options.section_profile)
+
+    def section_scores(self, resume: Union[DocumentInput, Dict[str, List[str]]],
+                       jd: Union[DocumentInput, Dict[str, List[str]]],
+                       options: Optional[ScoringOptions] = None) -> Dict[str, float]:
+        """Calculate a 0-100 similarity score for each section
+
+        Accepts either ``DocumentAnalysis`` objects, whose token maps are
+        reused, or section dicts as returned by ``extract_sections``. All
+        sections present on both sides are scored together in one sparse
+        matrix operation.
+        """
+        options = options or self.default_options
+        profile = options.section_profile
+        ngram_range = tuple(options.section_ngram_range)
+        resume_terms = self._section_term_lists(resume, profile)
+        jd_terms = self._section_term_lists(jd, profile)
+        section_scores: Dict[str, float] = {}
+        compared: List[str] = []
+
+        for section in SECTION_PROFILES[profile]:
+            if section not in jd_terms:
+                section_scores[section] = 100.0  # No requirements, full score
+            elif section not in resume_terms:
+                section_scores[section] = 0.0  # No content, no score
+            else:
+                section_scores[section] = 0.0
+                compared.append(section)
+
+        if compared:
+            similarities = pairwise_tfidf_cosines(
+                [ngram_counts(resume_terms[section], ngram_range) for section in compared],
+                [ngram_counts(jd_terms[section], ngram_range) for section in compared],
+                options.section_max_features
+            )
+            for section, similarity in zip(compared, similarities):
+                section_scores[section] = max(0.0, min(100.0, float(similarity) * 100))
+
+        return section_scores
+
+    def _section_term_lists(self, document, profile: str) -> Dict[str, List[str]]:
+        """Terms of each non-empty section, from an analysis or a section dict"""
+        if isinstance(document, dict) and 'raw_text' not in document:
+            return {
+                name: tokenize(' '.join(lines))
+                for name, lines in document.items() if ' '.join(lines)
+            }
+
+        doc = self.analyze(document)
+        return {
+            name: doc.section_terms(name, profile)
+            for name in SECTION_PROFILES[profile] if doc.has_section(name, profile)
+        }
+
+
+def profile_score(resume: DocumentInput, jd: DocumentInput,
+                  options: Optional[ScoringOptions] = None, limit: int = 25) -> str:
+    """Run one scoring pass under cProfile and return the cumulative-time report"""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    get_scoring_engine().score(resume, jd, options)
+    profiler.disable()
+
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(limit)
+    return stream.getvalue()
+
+
+# Global scoring engine instance
+_scoring_engine = None
+
+def get_scoring_engine() -> ScoringEngine:
+    """Get or create global scoring engine instance"""
+    global _scoring_engine
+    if _scoring_engine is None:
+        _scoring_engine = ScoringEngine()
+    return _scoring_engine
+
+
+__all__ = [
+    'ScoringEngine', 'ScoringOptions', 'SECTION_PROFILES', 'DocumentAnalysis',
+    'get_scoring_engine', 'profile_score', 'clean_text'
+]
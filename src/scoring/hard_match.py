@@ -1,6 +1,9 @@
 import re
 from difflib import SequenceMatcher
 
+from src.utils.metrics import timed
+
+@timed('skill_hard_match')
 def calculate_hard_match(resume_data, jd_data):
     """
     Calculate the hard match score based on exact and fuzzy matches of skills.
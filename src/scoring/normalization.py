@@ -0,0 +1,103 @@
+"""
+Normalize a document once and share the result with every scorer.
+
+The semantic backends used to clean the same resume separately (two regex
+passes each), and the keyword, section and embedding scorers each re-derived
+their own view of the text. A ``NormalizedDocument`` wraps the raw text and
+computes each artifact on first access only: the cleaned string used by the
+TF-IDF and spaCy backends, the content hash used in cache keys, and the ``DocumentAnalysis`` holding tokens and section
+spans. Pass the same object to every scorer and a multi-backend evaluation
+normalizes each text exactly once.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Union
+
+from src.scoring.document import DocumentAnalysis
+from src.utils.analysis_cache import content_hash
+
+# Whitespace runs collapse to one space and unsupported symbols become a
+# space; the classes are disjoint, so one pass equals the former two
+_CLEAN_PATTERN = re.compile(r'\s+|[^\w\s\.,!?;:()-]')
+
+
+def clean_text(text: str) -> str:
+    """Clean and preprocess text for TF-IDF comparison."""
+    if not text:
+        return ""
+    return _CLEAN_PATTERN.sub(' ', text.strip()).lower()
+
+
+class NormalizedDocument:
+    """Raw text plus lazily computed, memoized normalization artifacts"""
+
+    __slots__ = ('text', '_cleaned', '_hash', '_analysis')
+
+    def __init__(self, text: Optional[str], analysis: Optional[DocumentAnalysis] = None):
+        """Wrap a document without doing any work yet
+
+        Args:
+            text: Raw resume or job description text
+            analysis: An existing tokenized view of the same text, if any
+        """
+        self.text = text or ''
+        self._cleaned: Optional[str] = None
+        self._hash: Optional[str] = None
+        self._analysis = analysis
+
+    def __bool__(self) -> bool:
+        return bool(self.text.strip())
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    @property
+    def cleaned(self) -> str:
+        """Lowercased text with collapsed whitespace and symbols removed"""
+        if self._cleaned is None:
+            self._cleaned = clean_text(self.text)
+        return self._cleaned
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 of the raw text, for cache keys"""
+        if self._hash is None:
+            self._hash = content_hash(self.text)
+        return self._hash
+
+    @property
+    def analysis(self) -> DocumentAnalysis:
+        """Tokens, term statistics and section spans (see ``DocumentAnalysis``)"""
+        if self._analysis is None:
+            self._analysis = DocumentAnalysis(self.text)
+        return self._analysis
+
+    @property
+    def tokens(self) -> List[str]:
+        """Lowercased, stopword-filtered tokens in document order"""
+        return self.analysis.terms
+
+    def sections(self, profile: str = "standard") -> Dict[str, List[str]]:
+        """Stripped content lines per section, segmented once per profile"""
+        return self.analysis.sections(profile)
+
+
+DocumentLike = Union[str, Dict[str, Any], DocumentAnalysis, NormalizedDocument, None]
+
+
+def normalize(document: DocumentLike) -> NormalizedDocument:
+    """Return ``document`` as a ``NormalizedDocument``, reusing it if it already is one
+
+    Accepts raw text, a parsed document dict with ``raw_text``, a
+    ``DocumentAnalysis`` (whose tokens are reused) or a ``NormalizedDocument``.
+    """
+    if isinstance(document, NormalizedDocument):
+        return document
+    if isinstance(document, DocumentAnalysis):
+        return NormalizedDocument(document.text, analysis=document)
+    if isinstance(document, dict):
+        return NormalizedDocument(document.get('raw_text', '') or '')
+    return NormalizedDocument('' if document is None else str(document))
+
+
+__all__ = ['NormalizedDocument', 'DocumentLike', 'normalize', 'clean_text']
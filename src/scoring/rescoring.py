@@ -0,0 +1,210 @@
+"""
+Incremental re-scoring of a job's candidates when its description is edited.
+
+Each candidate's score is split into parts that depend on different pieces
+of the JD, so that an edit only recomputes the parts its diff touches:
+
+- the hard match is the share of the JD's keywords found in the resume
+  (``DocumentAnalysis.keyword_overlap``, as in bulk screening). Each
+  candidate keeps its matched keyword count, so a new version only checks
+  the added and removed keywords against the resume's term set:
+  O(keywords changed) per candidate instead of re-tokenizing every resume;
+- the semantic score is the cosine of pooled chunk embeddings. Resume
+  embeddings are stored with the resume, so an edit embeds the new JD once
+  and takes one dot product per candidate. Without a transformer model it
+  falls back to pairwise TF-IDF of stored resume terms. Edits that leave
+  the whitespace-normalised text unchanged skip it entirely.
+
+``diff_job_descriptions`` compares two ``parse_job_description`` results:
+keywords and parsed skills added or removed, sections added, removed or
+changed, and the experience requirement. Scoring goes through a
+``MatrixScorer`` from ``src.scoring.screening``, so a candidate scored
+incrementally gets the same scores as a full screening run.
+"""
+
+import logging
+from collections import Counter
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.parsing.jd_parser import JDParser
+from src.scoring.document import DocumentAnalysis, ngram_counts
+from src.scoring.screening import MatrixScorer
+from src.scoring.verdict import get_verdict
+from src.utils.analysis_cache import content_hash
+
+logger = logging.getLogger(__name__)
+
+SKILL_LEVELS = ('required', 'preferred')
+SECTION_PROFILE = 'standard'
+
+
+def normalize_whitespace(text: str) -> str:
+    return ' '.join((text or '').split())
+
+
+def parse_job_description(text: str) -> Dict[str, Any]:
+    """Parts of a JD that a diff is computed over, JSON-serialisable"""
+    analysis = DocumentAnalysis(text)
+    parser = JDParser()
+    skills = parser.extract_skills(text)
+    return {
+        'keywords': sorted(analysis.vocabulary),
+        'skills': {level: sorted(set(skills.get(level, []))) for level in SKILL_LEVELS},
+        'sections': {
+            name: content_hash('\n'.join(lines))[:16]
+            for name, lines in analysis.sections(SECTION_PROFILE).items() if lines
+        },
+        'experience_required': parser.extract_experience_requirements(text),
+        'text_hash': content_hash(normalize_whitespace(text)),
+    }
+
+
+def diff_job_descriptions(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """What changed between two parsed versions of a JD"""
+    old_keywords, new_keywords = set(old['keywords']), set(new['keywords'])
+    old_sections, new_sections = old['sections'], new['sections']
+    experience = (old['experience_required'], new['experience_required'])
+    return {
+        'keywords_added': sorted(new_keywords - old_keywords),
+        'keywords_removed': sorted(old_keywords - new_keywords),
+        'skills_added': {
+            level: sorted(set(new['skills'][level]) - set(old['skills'][level])) for level in SKILL_LEVELS
+        },
+        'skills_removed': {
+            level: sorted(set(old['skills'][level]) - set(new['skills'][level])) for level in SKILL_LEVELS
+        },
+        'sections_added': sorted(set(new_sections) - set(old_sections)),
+        'sections_removed': sorted(set(old_sections) - set(new_sections)),
+        'sections_changed': sorted(
+            name for name in set(old_sections) & set(new_sections) if old_sections[name] != new_sections[name]
+        ),
+        'experience_required': {'old': experience[0], 'new': experience[1]} if experience[0] != experience[1] else None,
+        'text_changed': old['text_hash'] != new['text_hash'],
+    }
+
+
+class CandidateProfile:
+    """What re-scoring needs of a resume: its terms and, if any, its pooled embedding"""
+
+    __slots__ = ('terms', 'keywords', 'vector', '_counts')
+
+    def __init__(self, terms: Sequence[str], vector: Optional[np.ndarray] = None):
+        self.terms = list(terms)
+        self.keywords: FrozenSet[str] = frozenset(self.terms)
+        self.vector = vector
+        self._counts: Dict[Tuple[int, int], Counter] = {}
+
+    @classmethod
+    def from_text(cls, text: str) -> "CandidateProfile":
+        return cls(DocumentAnalysis(text).terms)
+
+    def counts(self, ngram_range: Tuple[int, int]) -> Counter:
+        """N-gram counts for the TF-IDF semantic fallback, built on first use"""
+        if ngram_range not in self._counts:
+            self._counts[ngram_range] = ngram_counts(self.terms, ngram_range)
+        return self._counts[ngram_range]
+
+
+def embedding_signature(scorer: MatrixScorer) -> Optional[str]:
+    """Identifies the embedding space of a scorer's vectors, ``None`` for TF-IDF"""
+    embedder = scorer.embedder
+    if embedder is None:
+        return None
+    manager = embedder.manager
+    return f"{manager.backend}:{manager.model_name}:{embedder.max_tokens}:{embedder.overlap_tokens}"
+
+
+def embed_profiles(scorer: MatrixScorer, texts: Dict[Any, str], profiles: Dict[Any, CandidateProfile]) -> None:
+    """Fill in the pooled embedding of profiles that have none, in batches"""
+    missing = {key: texts[key] for key, profile in profiles.items() if profile.vector is None and key in texts}
+    if scorer.embedder is None or not missing:
+        return
+    scorer.prepare({('resume', key): text for key, text in missing.items()})
+    for key in missing:
+        profiles[key].vector = scorer.vectors.pop(('resume', key))
+        scorer.analyses.pop(('resume', key), None)
+
+
+def rescore(scorer: MatrixScorer, jd_text: str, parsed: Dict[str, Any],
+            profiles: Dict[Any, CandidateProfile], matched: Optional[Dict[Any, int]] = None,
+            diff: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Score candidates against a JD version, recomputing only what ``diff`` affects
+
+    Args:
+        scorer: Decides the semantic backend; profiles need vectors for the
+            embeddings backend (see ``embed_profiles``)
+        jd_text: Text of the version being scored
+        parsed: ``parse_job_description`` of that text
+        profiles: Candidates to score, by any key
+        matched: Matched keyword counts against the previous version. With
+            ``diff`` this turns on incremental scoring; without, every
+            part is computed from scratch
+        diff: ``diff_job_descriptions`` from the previous version to this one
+
+    Returns:
+        ``keys`` in scoring order, ``matched`` counts and ``hard`` scores,
+        ``semantic`` scores (``None`` when the text did not change, so the
+        stored ones still hold), and which parts were recomputed
+    """
+    keys = list(profiles)
+    keywords = set(parsed['keywords'])
+    incremental = matched is not None and diff is not None
+
+    if not incremental:
+        counts = np.array([len(keywords & profiles[key].keywords) for key in keys], dtype=np.int64)
+        hard_recomputed = True
+    else:
+        added, removed = set(diff['keywords_added']), set(diff['keywords_removed'])
+        counts = np.array([matched[key] for key in keys], dtype=np.int64)
+        hard_recomputed = bool(added or removed)
+        if hard_recomputed:
+            counts += np.array([
+                len(added & profiles[key].keywords) - len(removed & profiles[key].keywords) for key in keys
+            ], dtype=np.int64)
+    hard = np.minimum(counts / len(keywords) * 100, 100.0) if keywords else np.zeros(len(keys))
+
+    semantic = None
+    if not incremental or diff['text_changed']:
+        semantic = _semantic_scores(scorer, jd_text, [profiles[key] for key in keys])
+
+    return {
+        'keys': keys,
+        'matched': counts,
+        'hard': hard,
+        'semantic': semantic,
+        'hard_recomputed': hard_recomputed,
+        'semantic_recomputed': semantic is not None,
+    }
+
+
+def _semantic_scores(scorer: MatrixScorer, jd_text: str, profiles: List[CandidateProfile]) -> np.ndarray:
+    """One JD against many stored resumes through the scorer's own semantic backend"""
+    jd_key = ('jd', content_hash(jd_text))
+    scorer.prepare({jd_key: jd_text})
+    resume_keys = [('resume', index) for index in range(len(profiles))]
+    ngram_range = tuple(scorer.options.semantic_ngram_range)
+    for key, profile in zip(resume_keys, profiles):
+        if scorer.embedder is None:
+            scorer.counts[key] = profile.counts(ngram_range)
+        else:
+            scorer.vectors[key] = profile.vector if profile.vector is not None else np.zeros(0)
+    try:
+        return scorer.semantic_scores(jd_key, resume_keys)
+    finally:
+        for key in resume_keys:
+            scorer.counts.pop(key, None)
+            scorer.vectors.pop(key, None)
+
+
+def combine(hard: np.ndarray, semantic: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+    """Final scores and verdicts, as in bulk screening"""
+    final = (np.asarray(hard, dtype=float) + np.asarray(semantic, dtype=float)) / 2
+    return final, [get_verdict(float(score)) for score in final]
+
+
+__all__ = [
+    'parse_job_description', 'diff_job_descriptions', 'CandidateProfile', 'embed_profiles',
+    'embedding_signature', 'rescore', 'combine', 'normalize_whitespace'
+]
@@ -0,0 +1,409 @@
+"""
+Offline bulk screening of resume archives against job descriptions.
+
+Re-screening an archive of resumes against dozens of job descriptions used
+to mean going through the UI one pair at a time. ``screen`` scores the
+whole resumes×JDs matrix in one run:
+
+- files are collected from directories (recursively) or glob patterns and
+  their text is extracted by ``src.utils.extraction_service``: in a process
+  pool with a per-file timeout, and from its persistent cache for files
+  parsed by an earlier run;
+- every document is tokenized once into a ``DocumentAnalysis``. The hard
+  match of a pair is the JD's keyword overlap with the resume. The semantic
+  score is the cosine of pooled chunk embeddings, computed in batches of
+  documents and then as one matrix-vector product per JD, or per-pair
+  TF-IDF of the analysis terms when no transformer model is loaded;
+- each finished JD column is appended to a JSONL checkpoint, so an
+  interrupted run resumes where it stopped. Documents are identified by
+  path, size and modification time, so edited files are scored again;
+- ranks within each JD are assigned when the results are written, to CSV
+  or Parquet depending on the output extension.
+
+Run it with ``python -m src.cli screen`` (see ``src/cli.py``).
+"""
+
+import glob
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.scoring.document import DocumentAnalysis, ngram_counts, pairwise_tfidf_cosines
+from src.scoring.engine import ScoringOptions
+from src.scoring.verdict import get_verdict
+from src.utils.analysis_cache import content_hash
+from src.utils.extraction_service import ExtractionService, default_cache_path
+from src.utils.topology import detect_cpus
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+SEMANTIC_BACKENDS = ('auto', 'embeddings', 'tfidf')
+CHECKPOINT_VERSION = 1
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_MISSING_KEYWORDS = 10
+
+RESULT_COLUMNS = [
+    'jd_name', 'rank', 'resume_name', 'final_score', 'hard_match_score', 'semantic_match_score',
+    'verdict', 'missing_keywords', 'jd_path', 'resume_path', 'jd_id', 'resume_id',
+]
+
+
+def collect_files(sources: Iterable[str]) -> List[str]:
+    """Supported files under each directory or matching each glob pattern, sorted"""
+    found: Dict[str, None] = {}
+    for source in sources:
+        if os.path.isdir(source):
+            candidates = (str(path) for path in Path(source).rglob('*'))
+        else:
+            candidates = glob.glob(source, recursive=True)
+        for path in candidates:
+            if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS):
+                found[os.path.abspath(path)] = None
+    return sorted(found)
+
+
+def document_key(path: str) -> str:
+    """Identity of a file version: path, size and modification time"""
+    stat = os.stat(path)
+    return content_hash(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}")[:16]
+
+
+def default_workers() -> int:
+    """``PROCESS_POOL_SIZE`` if set, otherwise every usable CPU (the job owns the box)"""
+    configured = os.getenv('PROCESS_POOL_SIZE')
+    return max(1, int(configured)) if configured else detect_cpus()[0]
+
+
+class Progress:
+    """Counts finished units and logs the throughput every ``interval`` seconds"""
+
+    def __init__(self, label: str, total: int, unit: str, interval: float = 5.0):
+        self.label = label
+        self.total = total
+        self.unit = unit
+        self.interval = interval
+        self.done = 0
+        self.started = time.monotonic()
+        self._last_report = self.started
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def describe(self) -> str:
+        return f"{self.label} {self.done}/{self.total} {self.unit} ({self.rate:.1f} {self.unit}/s)"
+
+    def update(self, count: int = 1):
+        self.done += count
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            logger.info(self.describe())
+
+    def finish(self):
+        logger.info(self.describe())
+
+
+def extract_texts(paths: Sequence[str], service: ExtractionService) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Extract every file through the extraction service, logging the throughput
+
+    Returns:
+        Tuple of (text by path, error message by path)
+    """
+    if not paths:
+        return {}, {}
+    progress = Progress("📄 Extracted", len(paths), "files")
+    texts, errors = service.extract_many(paths, progress=progress.update)
+    progress.finish()
+    return texts, errors
+
+
+class ScreeningCheckpoint:
+    """Append-only JSONL record of finished JD columns
+
+    The first line holds the scoring settings; a checkpoint written with
+    different settings is refused rather than silently mixed. Every further
+    line holds the rows of one JD.
+    """
+
+    def __init__(self, path: str, settings: Dict[str, Any]):
+        self.path = path
+        # Round-trip so tuples compare equal to the lists read back from disk
+        self.settings = json.loads(json.dumps(settings))
+        self.rows: List[Dict[str, Any]] = []
+        self.done: Set[Tuple[str, str]] = set()
+
+    def load(self):
+        """Read finished rows, dropping a line torn by an interrupted write"""
+        content = b''
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                content = f.read()
+        complete = content[:content.rfind(b'\n') + 1]
+        if len(complete) < len(content):
+            logger.warning(f"⚠️ Discarding an incomplete line at the end of {self.path}")
+
+        if not complete:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'version': CHECKPOINT_VERSION, 'settings': self.settings}) + '\n')
+            return
+        if len(complete) < len(content):
+            with open(self.path, 'wb') as f:
+                f.write(complete)
+
+        lines = complete.decode('utf-8').splitlines()
+        header = json.loads(lines[0])
+        if header.get('version') != CHECKPOINT_VERSION or header.get('settings') != self.settings:
+            raise ValueError(
+                f"Checkpoint {self.path} was written with different settings; "
+                f"remove it or pass --fresh to start over"
+            )
+        for line in lines[1:]:
+            self._add(json.loads(line)['rows'])
+
+    def _add(self, rows: List[Dict[str, Any]]):
+        self.rows.extend(rows)
+        self.done.update((row['resume_id'], row['jd_id']) for row in rows)
+
+    def append(self, rows: List[Dict[str, Any]]):
+        """Persist one JD column before counting it as done"""
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'rows': rows}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._add(rows)
+
+
+class MatrixScorer:
+    """Scores resumes against one JD at a time from per-document state"""
+
+    def __init__(self, options: Optional[ScoringOptions] = None, semantic: str = 'auto',
+                 batch_size: int = DEFAULT_BATCH_SIZE, embedder=None):
+        """Choose the semantic backend
+
+        Args:
+            options: Scoring options; the n-gram range, feature limit and
+                missing keyword limit of the profile are used
+            semantic: ``embeddings``, ``tfidf`` or ``auto`` (embeddings when
+                a transformer model is loaded)
+            batch_size: Documents embedded per batch
+            embedder: ``ChunkedEmbedder`` to use, defaults to the global one
+        """
+        if semantic not in SEMANTIC_BACKENDS:
+            raise ValueError(f"Unknown semantic backend '{semantic}', expected one of {SEMANTIC_BACKENDS}")
+        self.options = options or ScoringOptions.standard()
+        self.batch_size = max(1, int(batch_size))
+        self.embedder = None
+        if semantic != 'tfidf':
+            if embedder is None:
+                from src.scoring.chunking import get_chunked_embedder
+                embedder = get_chunked_embedder()
+            if embedder.available:
+                self.embedder = embedder
+            elif semantic == 'embeddings':
+                raise ValueError("No embedding model is available for --semantic embeddings")
+        self.backend = 'embeddings' if self.embedder is not None else 'tfidf'
+        self.analyses: Dict[str, DocumentAnalysis] = {}
+        self.vectors: Dict[str, np.ndarray] = {}
+        self.counts: Dict[str, Any] = {}
+
+    def settings(self) -> Dict[str, Any]:
+        """Everything that changes the scores, for the checkpoint header"""
+        settings = {'options': self.options.to_dict(), 'semantic': self.backend}
+        if self.embedder is not None:
+            settings['model'] = self.embedder.manager.model_name
+        return settings
+
+    def prepare(self, texts: Dict[str, str]):
+        """Tokenize every document once and compute its semantic representation"""
+        for key, text in texts.items():
+            self.analyses[key] = DocumentAnalysis(text)
+
+        if self.embedder is None:
+            ngram_range = tuple(self.options.semantic_ngram_range)
+            for key, analysis in self.analyses.items():
+                self.counts[key] = ngram_counts(analysis.terms, ngram_range)
+            return
+
+        from src.scoring.chunking import pool_embeddings
+        keys = list(texts)
+        progress = Progress("🧠 Embedded", len(keys), "docs")
+        for start in range(0, len(keys), self.batch_size):
+            batch = keys[start:start + self.batch_size]
+            for key, (_, embeddings) in zip(batch, self.embedder.embed_documents([texts[key] for key in batch])):
+                self.vectors[key] = pool_embeddings(embeddings, 'mean')
+            progress.update(len(batch))
+        progress.finish()
+
+    def semantic_scores(self, jd_key: str, resume_keys: Sequence[str]) -> np.ndarray:
+        """0-100 semantic score of each resume against the JD"""
+        if self.embedder is None:
+            cosines = pairwise_tfidf_cosines(
+                [self.counts[key] for key in resume_keys],
+                [self.counts[jd_key]] * len(resume_keys),
+                self.options.semantic_max_features,
+            )
+        else:
+            jd_vector = self.vectors[jd_key]
+            cosines = np.array([
+                float(self.vectors[key] @ jd_vector) if len(self.vectors[key]) == len(jd_vector) else 0.0
+                for key in resume_keys
+            ]) if len(jd_vector) else np.zeros(len(resume_keys))
+        return np.clip(cosines, 0.0, 1.0) * 100
+
+    def score_column(self, jd_key: str, resume_keys: Sequence[str]) -> List[Dict[str, Any]]:
+        """Score rows of every resume against one JD"""
+        jd = self.analyses[jd_key]
+        limit = self.options.missing_keyword_limit or DEFAULT_MISSING_KEYWORDS
+        rows = []
+        for resume_key, semantic in zip(resume_keys, self.semantic_scores(jd_key, resume_keys)):
+            hard, missing = jd.keyword_overlap(self.analyses[resume_key]) if jd else (0.0, [])
+            final = (hard + float(semantic)) / 2
+            rows.append({
+                'resume_id': resume_key,
+                'jd_id': jd_key,
+                'hard_match_score': round(hard, 2),
+                'semantic_match_score': round(float(semantic), 2),
+                'final_score': round(final, 2),
+                'verdict': get_verdict(final),
+                'missing_keywords': '; '.join(missing[:limit]),
+            })
+        return rows
+
+
+def rank_results(rows: List[Dict[str, Any]], top_k: Optional[int] = None) -> pd.DataFrame:
+    """Rank resumes within each JD by final score (1 = best), optionally keeping the top ``k``"""
+    frame = pd.DataFrame(rows, columns=[column for column in RESULT_COLUMNS if column != 'rank'])
+    frame['rank'] = (
+        frame.groupby('jd_id')['final_score'].rank(method='first', ascending=False).astype(int)
+        if len(frame) else pd.Series(dtype=int)
+    )
+    if top_k is not None:
+        frame = frame[frame['rank'] <= top_k]
+    return frame.sort_values(['jd_name', 'jd_path', 'rank'])[RESULT_COLUMNS].reset_index(drop=True)
+
+
+def write_results(frame: pd.DataFrame, output: str):
+    """Write to ``.csv`` or ``.parquet`` according to the extension"""
+    suffix = Path(output).suffix.lower()
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    if suffix == '.csv':
+        frame.to_csv(output, index=False)
+    elif suffix == '.parquet':
+        try:
+            frame.to_parquet(output, index=False)
+        except ImportError as e:
+            raise ValueError(f"Parquet output needs pyarrow or fastparquet: {e}") from e
+    else:
+        raise ValueError(f"Unsupported output format '{suffix}', use .csv or .parquet")
+
+
+def screen(resume_sources: Sequence[str], jd_sources: Sequence[str], output: str,
+           checkpoint_path: Optional[str] = None, workers: Optional[int] = None,
+           options: Optional[ScoringOptions] = None, semantic: str = 'auto',
+           batch_size: int = DEFAULT_BATCH_SIZE, top_k: Optional[int] = None,
+           fresh: bool = False, scorer: Optional[MatrixScorer] = None,
+           extraction: Optional[ExtractionService] = None) -> Dict[str, Any]:
+    """Score every resume against every JD and write the ranked results
+
+    Args:
+        resume_sources: Directories or glob patterns of resumes
+        jd_sources: Directories or glob patterns of job descriptions
+        output: ``.csv`` or ``.parquet`` results file
+        checkpoint_path: JSONL checkpoint, defaults to ``<output>.checkpoint.jsonl``
+        workers: Extraction processes, defaults to ``default_workers()``;
+            ``0`` extracts in this process
+        options: Scoring options, defaults to the standard profile
+        semantic: Semantic backend, see ``MatrixScorer``
+        batch_size: Documents embedded per batch
+        top_k: Keep only the best ``k`` resumes per JD in the output
+        fresh: Discard an existing checkpoint
+        scorer: Preconfigured ``MatrixScorer`` (overrides the three above)
+        extraction: Preconfigured ``ExtractionService`` (overrides ``workers``)
+
+    Returns:
+        Summary of the run
+    """
+    started = time.monotonic()
+    resumes = collect_files(resume_sources)
+    jds = collect_files(jd_sources)
+    if not resumes:
+        raise ValueError(f"No resumes found in {', '.join(resume_sources)}")
+    if not jds:
+        raise ValueError(f"No job descriptions found in {', '.join(jd_sources)}")
+    logger.info(f"🔍 Screening {len(resumes)} resumes against {len(jds)} job descriptions")
+
+    keys = {path: document_key(path) for path in resumes + jds}
+    scorer = scorer or MatrixScorer(options, semantic, batch_size)
+    checkpoint_path = checkpoint_path or f"{output}.checkpoint.jsonl"
+    if fresh and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = ScreeningCheckpoint(checkpoint_path, scorer.settings())
+    checkpoint.load()
+
+    pending = {}
+    for jd in jds:
+        remaining = [resume for resume in resumes if (keys[resume], keys[jd]) not in checkpoint.done]
+        if remaining:
+            pending[jd] = remaining
+    resumed = len(resumes) * len(jds) - sum(len(remaining) for remaining in pending.values())
+    if resumed:
+        logger.info(f"↩️ Resuming: {resumed} pairs already scored in {checkpoint_path}")
+
+    needed = sorted(set(pending) | {resume for remaining in pending.values() for resume in remaining})
+    extraction = extraction or ExtractionService(
+        cache_path=default_cache_path(), workers=default_workers() if workers is None else workers
+    )
+    texts, errors = extract_texts(needed, extraction)
+    scorer.prepare({keys[path]: text for path, text in texts.items()})
+
+    columns = [
+        (jd, [resume for resume in remaining if resume in texts])
+        for jd, remaining in pending.items() if jd in texts
+    ]
+    progress = Progress("🧮 Scored", sum(len(remaining) for _, remaining in columns), "pairs")
+    for jd, remaining in columns:
+        rows = scorer.score_column(keys[jd], [keys[resume] for resume in remaining])
+        for row, resume in zip(rows, remaining):
+            row.update(jd_path=jd, jd_name=Path(jd).name, resume_path=resume, resume_name=Path(resume).name)
+        checkpoint.append(rows)
+        progress.update(len(rows))
+    progress.finish()
+
+    current = {(keys[resume], keys[jd]) for resume in resumes for jd in jds}
+    frame = rank_results(
+        [row for row in checkpoint.rows if (row['resume_id'], row['jd_id']) in current], top_k
+    )
+    write_results(frame, output)
+
+    elapsed = time.monotonic() - started
+    logger.info(f"✅ Wrote {len(frame)} ranked rows to {output} in {elapsed:.1f}s")
+    return {
+        'resumes': len(resumes),
+        'job_descriptions': len(jds),
+        'scored_pairs': progress.done,
+        'resumed_pairs': resumed,
+        'pairs_per_second': progress.rate,
+        'failed_files': errors,
+        'semantic_backend': scorer.backend,
+        'rows_written': len(frame),
+        'output': output,
+        'checkpoint': checkpoint_path,
+        'elapsed_seconds': elapsed,
+    }
+
+
+__all__ = [
+    'screen', 'MatrixScorer', 'ScreeningCheckpoint', 'collect_files', 'extract_texts',
+    'rank_results', 'write_results', 'document_key', 'default_workers', 'SUPPORTED_EXTENSIONS',
+    'SEMANTIC_BACKENDS'
+]
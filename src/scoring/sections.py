@@ -0,0 +1,165 @@
+"""
+Linear-time section segmentation for resumes and job descriptions.
+
+Each profile compiles its header vocabulary into one regular expression with
+a named group per section. A line is only treated as a header when it also
+looks like one (short, starts with a capital, no bullet, no sentence
+punctuation), so body text such as "Work with the data science team" no
+longer switches sections. Segmentation is a single pass over the text and
+returns character offsets instead of copied line lists.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Pattern, Tuple
+
+Span = Tuple[int, int]
+
+# Header vocabulary per profile, as regex fragments. The professional analyzer
+# tracks six sections with a few extra headers; the other front ends track four.
+SECTION_PROFILES: Dict[str, Dict[str, List[str]]] = {
+    "standard": {
+        'experience': [r'experience', r'employment(?:\s+history)?', r'work\s+history', r'career\s+history', r'responsibilities'],
+        'skills': [r'skills', r'technologies', r'tools', r'competencies', r'tech(?:nical)?\s+stack'],
+        'education': [r'education', r'academics?', r'academic\s+background'],
+        'projects': [r'projects', r'portfolio', r'work\s+samples'],
+    },
+    "professional": {
+        'experience': [r'experience', r'employment(?:\s+history)?', r'work\s+history', r'career\s+history', r'responsibilities'],
+        'skills': [r'skills', r'technologies', r'tools', r'competencies', r'expertise', r'tech(?:nical)?\s+stack'],
+        'education': [r'education', r'academics?', r'academic\s+background', r'qualifications?'],
+        'projects': [r'projects', r'portfolio', r'work\s+samples', r'achievements'],
+        'certifications': [r'certifications', r'certificates', r'credentials', r'licenses'],
+        'summary': [r'summary', r'objective', r'profile', r'about(?:\s+(?:me|us|the\s+role))?', r'overview'],
+    },
+}
+
+# Up to two qualifier words around the header keyword ("Technical Skills",
+# "Work Experience", "Skills & Tools") keep the regex anchored and linear
+_QUALIFIER = r"[A-Za-z&][\w&/+.'-]*"
+_BULLETS = "•●▪‣◦·*-–>"
+MAX_HEADER_LENGTH = 60
+
+
+def _compile_profile(profile: Dict[str, List[str]]) -> Pattern:
+    """Compile one anchored header regex with a named group per section"""
+    alternatives = '|'.join(
+        f"(?P<{name}>{'|'.join(keywords)})" for name, keywords in profile.items()
+    )
+    return re.compile(
+        rf"^[#=\s]*(?:{_QUALIFIER}\s+){{0,2}}(?:{alternatives})(?:\s+{_QUALIFIER}){{0,2}}"
+        rf"\s*(?:[:|]\s*(?P<rest>.*?))?[\s:#=]*$",
+        re.IGNORECASE
+    )
+
+
+class SectionClassifier:
+    """Classifies header lines and segments documents into section spans"""
+
+    def __init__(self, profile: str = "standard"):
+        """Compile the header classifier for a section profile
+
+        Args:
+            profile: Key of ``SECTION_PROFILES``
+        """
+        self.profile = profile
+        self.section_names = tuple(SECTION_PROFILES[profile])
+        self._pattern = _compile_profile(SECTION_PROFILES[profile])
+
+    def classify(self, line: str) -> Optional[Tuple[str, int]]:
+        """Return (section, offset of inline content) if ``line`` is a header
+
+        The offset points into ``line`` at the start of any content following
+        the header on the same line ("Skills: Python, SQL"), or at the end of
+        the line when there is none.
+        """
+        stripped = line.strip()
+        if not stripped or stripped[0] in _BULLETS:
+            return None
+
+        first_alpha = next((char for char in stripped if char.isalpha()), '')
+        if not first_alpha or not first_alpha.isupper():
+            return None
+
+        match = self._pattern.match(line)
+        if match is None:
+            return None
+
+        rest_start = match.start('rest') if match.group('rest') else len(line)
+        header = line[:rest_start].strip()
+        if len(header) > MAX_HEADER_LENGTH or header.endswith(('.', ',', ';')):
+            return None
+
+        for name in self.section_names:
+            if match.group(name) is not None:
+                return name, rest_start
+        return None
+
+    def segment(self, text: str) -> Dict[str, List[Span]]:
+        """Split text into section spans in one pass
+
+        Returns:
+            Mapping of section name to ``(start, end)`` character offsets.
+            Each span covers the content between one header and the next,
+            trimmed of surrounding whitespace.
+        """
+        spans: Dict[str, List[Span]] = {name: [] for name in self.section_names}
+        current: Optional[str] = None
+        span_start = span_end = -1
+
+        def close_span():
+            if current is not None and span_start >= 0:
+                spans[current].append((span_start, span_end))
+
+        offset = 0
+        for line in (text or '').split('\n'):
+            line_start = offset
+            offset += len(line) + 1
+
+            header = self.classify(line)
+            if header is not None:
+                close_span()
+                current, content_offset = header
+                span_start = span_end = -1
+                line = line[content_offset:]
+                line_start += content_offset
+
+            if current is None:
+                continue
+
+            content = line.strip()
+            if not content:
+                continue
+
+            content_start = line_start + (len(line) - len(line.lstrip()))
+            if span_start < 0:
+                span_start = content_start
+            span_end = content_start + len(content)
+
+        close_span()
+        return spans
+
+
+@lru_cache(maxsize=None)
+def get_section_classifier(profile: str = "standard") -> SectionClassifier:
+    """Compiled classifier for a profile, built once per process"""
+    return SectionClassifier(profile)
+
+
+def segment_sections(text: str, profile: str = "standard") -> Dict[str, List[Span]]:
+    """Section spans of ``text`` as character offsets"""
+    return get_section_classifier(profile).segment(text)
+
+
+def span_lines(text: str, spans: List[Span]) -> List[str]:
+    """Non-empty stripped lines covered by the given spans"""
+    lines: List[str] = []
+    for start, end in spans:
+        lines.extend(line.strip() for line in text[start:end].split('\n') if line.strip())
+    return lines
+
+
+__all__ = [
+    'SECTION_PROFILES', 'SectionClassifier', 'get_section_classifier',
+    'segment_sections', 'span_lines'
+]
@@ -3,7 +3,16 @@ import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from typing import Dict, Any, List, Optional, Tuple
+import os
 import re
+import time
+
+from src.scoring.alignment import get_requirement_aligner, summarize_alignment
+from src.inference.client import InferenceError, RemoteGenerator, get_inference_client
+from src.scoring.chunking import get_chunked_embedder
+from src.scoring.normalization import DocumentLike, normalize
+from src.scoring.spacy_backend import SPACY_AVAILABLE, get_spacy_backend
+from src.utils.metrics import record_fallback, record_model_load, timed, timed_backend
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,15 +37,6 @@ except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
     logger.warning("❌ Sentence Transformers not available")
 
-try:
-    import spacy
-    SPACY_AVAILABLE = True
-    logger.info("✅ spaCy backend available")
-except ImportError:
-    spacy = None
-    SPACY_AVAILABLE = False
-    logger.warning("❌ spaCy not available")
-
 # LangChain imports
 try:
     from langchain_huggingface import HuggingFacePipeline
@@ -58,19 +58,74 @@ except ImportError:
         LANGCHAIN_HF_AVAILABLE = False
         logger.warning("❌ LangChain with Hugging Face not available")
 
+# Pooling of chunk embeddings into a document vector: mean, max or attention
+CHUNK_POOLING = os.getenv('CHUNK_POOLING', 'mean')
+# Characters of each document that fit in the LLM prompt
+LLM_EXCERPT_CHARS = 500
+
 # Global model cache - NO Ollama references
-_sentence_model = None
-_spacy_model = None
 _hf_pipeline = None
 
+# Seconds a sidecar ping result (models or unreachable) is trusted before asking again
+SIDECAR_PING_TTL = float(os.getenv('SIDECAR_PING_TTL', '30'))
+
+# (checked_at, models or None) of the last ping
+_sidecar_status = None
+
+def _get_sidecar_models() -> Optional[Dict[str, Any]]:
+    """Models served by the inference sidecar, or None if none is configured or reachable.
+
+    Both answers are cached for ``SIDECAR_PING_TTL`` seconds: a sidecar that
+    is down is not reconnected to on every call, and one restarted with
+    different models is noticed.
+    """
+    global _sidecar_status
+    client = get_inference_client()
+    if client is None:
+        return None
+    now = time.monotonic()
+    if _sidecar_status is None or now - _sidecar_status[0] >= SIDECAR_PING_TTL:
+        was_reachable = _sidecar_status is None or _sidecar_status[1] is not None
+        try:
+            models = client.ping()
+        except InferenceError as e:
+            models = None
+            if was_reachable:
+                logger.error(f"❌ Inference sidecar unavailable: {e}")
+        _sidecar_status = (now, models)
+    return _sidecar_status[1]
+
+def _backend_enabled(sidecar_model: str, available_locally: bool) -> bool:
+    """With a reachable sidecar only the models it serves count, otherwise local imports."""
+    models = _get_sidecar_models()
+    if models is not None:
+        return models.get(sidecar_model) is not None
+    return available_locally
+
+def backend_availability() -> Dict[str, bool]:
+    """Which semantic backends can run in this process (locally or through the sidecar)."""
+    return {
+        'huggingface_llm': _backend_enabled('generator', HUGGINGFACE_LLM_AVAILABLE),
+        'sentence_transformers': _backend_enabled('embeddings', SENTENCE_TRANSFORMERS_AVAILABLE),
+        'spacy': _backend_enabled('spacy', SPACY_AVAILABLE),
+    }
+
 def _get_huggingface_pipeline():
     """Get or initialize optimized Hugging Face pipeline for resume analysis."""
     global _hf_pipeline
     
+    models = _get_sidecar_models()
+    if _hf_pipeline is None and models is not None:
+        # Thin client: generate through the sidecar, never load a local copy
+        if models.get('generator') is not None:
+            _hf_pipeline = RemoteGenerator(get_inference_client())
+        return _hf_pipeline
+    
     if _hf_pipeline is None and HUGGINGFACE_LLM_AVAILABLE and pipeline is not None:
         try:
             # Use DistilGPT-2 for fast, efficient text generation
             model_name = "distilgpt2"
+            start = time.perf_counter()
             _hf_pipeline = pipeline(
                 "text-generation",
                 model=model_name,
@@ -79,6 +134,7 @@ def _get_huggingface_pipeline():
                 temperature=0.3,
                 pad_token_id=50256
             )
+            record_model_load(model_name, time.perf_counter() - start)
             logger.info(f"✅ Hugging Face pipeline loaded: {model_name}")
                 
         except Exception as e:
@@ -87,56 +143,28 @@ def _get_huggingface_pipeline():
             
     return _hf_pipeline
 
-def _get_sentence_transformer_model():
-    """Get or initialize Sentence Transformer model."""
-    global _sentence_model
-    if _sentence_model is None and SENTENCE_TRANSFORMERS_AVAILABLE and SentenceTransformer is not None:
-        try:
-            # Use a lightweight, fast model for production
-            _sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("✅ Sentence Transformer model loaded successfully")
-        except Exception as e:
-            logger.error(f"❌ Failed to load Sentence Transformer model: {e}")
-            _sentence_model = None
-    return _sentence_model
-
-def _get_spacy_model():
-    """Get or initialize spaCy model."""
-    global _spacy_model
-    if _spacy_model is None and SPACY_AVAILABLE and spacy is not None:
-        try:
-            _spacy_model = spacy.load("en_core_web_sm")
-            logger.info("✅ spaCy model loaded successfully")
-        except Exception as e:
-            logger.error(f"❌ Failed to load spaCy model: {e}")
-            _spacy_model = None
-    return _spacy_model
-
-def _clean_text(text: str) -> str:
-    """Clean and preprocess text."""
-    if not text:
-        return ""
-    
-    # Remove extra whitespace and normalize
-    text = re.sub(r'\s+', ' ', text.strip())
-    
-    # Remove special characters but keep important punctuation
-    text = re.sub(r'[^\w\s\.,!?;:()-]', ' ', text)
-    
-    return text.lower()
-
-def _calculate_huggingface_similarity(resume_text: str, jd_text: str) -> float:
+@timed_backend('huggingface_llm')
+def _calculate_huggingface_similarity(resume_text: DocumentLike, jd_text: DocumentLike) -> float:
     """Calculate similarity using Hugging Face models."""
     try:
         pipeline_model = _get_huggingface_pipeline()
         if pipeline_model is None:
             logger.warning("Hugging Face LLM not available, falling back to Sentence Transformers")
+            record_fallback('huggingface_llm', 'sentence_transformers')
             return _calculate_transformer_similarity(resume_text, jd_text)
         
-        # Create a focused prompt for resume-job matching
+        # Create a focused prompt for resume-job matching from the passages
+        # of each document that best match the other one
+        resume, jd = normalize(resume_text).text, normalize(jd_text).text
+        embedder = get_chunked_embedder()
+        if embedder.available:
+            resume_excerpt = embedder.relevant_excerpt(resume, jd, LLM_EXCERPT_CHARS)
+            jd_excerpt = embedder.relevant_excerpt(jd, resume, LLM_EXCERPT_CHARS)
+        else:
+            resume_excerpt, jd_excerpt = resume[:LLM_EXCERPT_CHARS], jd[:LLM_EXCERPT_CHARS]
         prompt = f"""Rate resume-job match 0.0-1.0:
-Resume: {resume_text[:500]}...
-Job: {jd_text[:500]}...
+Resume: {resume_excerpt}...
+Job: {jd_excerpt}...
 Score:"""
         
         # Generate response
@@ -158,58 +186,64 @@ Score:"""
             return min(max(score, 0.0), 1.0)
         else:
             logger.warning(f"Could not parse Hugging Face score: {score_text}")
+            record_fallback('huggingface_llm', 'sentence_transformers')
             return _calculate_transformer_similarity(resume_text, jd_text)
             
     except Exception as e:
         logger.error(f"Hugging Face similarity calculation failed: {e}")
+        record_fallback('huggingface_llm', 'sentence_transformers')
         return _calculate_transformer_similarity(resume_text, jd_text)
 
-def _calculate_transformer_similarity(resume_text: str, jd_text: str) -> float:
-    """Calculate similarity using Sentence Transformers."""
+@timed_backend('sentence_transformers')
+def _calculate_transformer_similarity(resume_text: DocumentLike, jd_text: DocumentLike) -> float:
+    """Calculate similarity using Sentence Transformers.
+    
+    Both documents are embedded chunk by chunk, so text beyond the model's
+    256-token window still counts, and the chunks are pooled per document.
+    """
     try:
-        model = _get_sentence_transformer_model()
-        if model is None:
+        embedder = get_chunked_embedder()
+        if not embedder.available:
+            record_fallback('sentence_transformers', 'tfidf')
             return _calculate_tfidf_similarity(resume_text, jd_text)
         
-        # Encode texts
-        resume_embedding = model.encode([_clean_text(resume_text)])
-        jd_embedding = model.encode([_clean_text(jd_text)])
-        
-        # Calculate cosine similarity
-        similarity = cosine_similarity(resume_embedding, jd_embedding)[0][0]
+        similarity = embedder.similarity(normalize(resume_text).text, normalize(jd_text).text,
+                                         pooling=CHUNK_POOLING)
         
         return max(0.0, min(1.0, float(similarity)))
         
     except Exception as e:
         logger.error(f"Transformer similarity calculation failed: {e}")
+        record_fallback('sentence_transformers', 'tfidf')
         return _calculate_tfidf_similarity(resume_text, jd_text)
 
-def _calculate_spacy_similarity(resume_text: str, jd_text: str) -> float:
+@timed_backend('spacy')
+def _calculate_spacy_similarity(resume_text: DocumentLike, jd_text: DocumentLike) -> float:
     """Calculate similarity using spaCy."""
     try:
-        nlp = _get_spacy_model()
-        if nlp is None:
+        backend = get_spacy_backend()
+        if not backend.available:
+            record_fallback('spacy', 'tfidf')
             return _calculate_tfidf_similarity(resume_text, jd_text)
         
-        # Process texts
-        resume_doc = nlp(_clean_text(resume_text))
-        jd_doc = nlp(_clean_text(jd_text))
-        
-        # Calculate similarity
-        similarity = resume_doc.similarity(jd_doc)
+        # Both documents go through one trimmed pipe call, or come from the
+        # cache when they were already processed for another comparison
+        similarity = backend.similarity(resume_text, jd_text)
         
         return max(0.0, min(1.0, float(similarity)))
         
     except Exception as e:
         logger.error(f"spaCy similarity calculation failed: {e}")
+        record_fallback('spacy', 'tfidf')
         return _calculate_tfidf_similarity(resume_text, jd_text)
 
-def _calculate_tfidf_similarity(resume_text: str, jd_text: str) -> float:
+@timed_backend('tfidf')
+def _calculate_tfidf_similarity(resume_text: DocumentLike, jd_text: DocumentLike) -> float:
     """Calculate similarity using TF-IDF (fallback method)."""
     try:
         # Clean texts
-        resume_clean = _clean_text(resume_text)
-        jd_clean = _clean_text(jd_text)
+        resume_clean = normalize(resume_text).cleaned
+        jd_clean = normalize(jd_text).cleaned
         
         if not resume_clean or not jd_clean:
             return 0.0
@@ -233,28 +267,31 @@ def _calculate_tfidf_similarity(resume_text: str, jd_text: str) -> float:
         logger.error(f"TF-IDF similarity calculation failed: {e}")
         return 0.0
 
-def calculate_semantic_match(resume_data: Dict[str, Any], jd_data: Dict[str, Any], use_huggingface: bool = True) -> float:
+@timed('semantic_match')
+def calculate_semantic_match(resume_data: DocumentLike, jd_data: DocumentLike, use_huggingface: bool = True) -> float:
     """Calculate semantic similarity between resume and job description using Hugging Face."""
     try:
-        resume_text = resume_data.get('raw_text', '')
-        jd_text = jd_data.get('raw_text', '')
+        # Normalized once and shared by whichever backends (and fallbacks) run
+        resume_text = normalize(resume_data)
+        jd_text = normalize(jd_data)
         
-        if not resume_text or not jd_text:
+        if not resume_text.text or not jd_text.text:
             logger.warning("Empty text provided for semantic matching")
             return 0.0
         
         # Try different backends in order of preference (Hugging Face first)
-        if use_huggingface and HUGGINGFACE_LLM_AVAILABLE:
+        available = backend_availability()
+        if use_huggingface and available['huggingface_llm']:
             score = _calculate_huggingface_similarity(resume_text, jd_text)
             logger.info(f"🤖 Hugging Face semantic similarity: {score:.3f}")
             return score * 100
         
-        if SENTENCE_TRANSFORMERS_AVAILABLE:
+        if available['sentence_transformers']:
             score = _calculate_transformer_similarity(resume_text, jd_text)
             logger.info(f"🧠 Sentence Transformer semantic similarity: {score:.3f}")
             return score * 100
         
-        if SPACY_AVAILABLE:
+        if available['spacy']:
             score = _calculate_spacy_similarity(resume_text, jd_text)
             logger.info(f"📝 spaCy semantic similarity: {score:.3f}")
             return score * 100
@@ -268,29 +305,38 @@ def calculate_semantic_match(resume_data: Dict[str, Any], jd_data: Dict[str, Any
         logger.error(f"❌ Semantic matching failed: {e}")
         return 0.0
 
-def calculate_detailed_semantic_match(resume_data: Dict[str, Any], jd_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Calculate detailed semantic analysis using multiple backends."""
+@timed('detailed_semantic_match')
+def calculate_detailed_semantic_match(resume_data: DocumentLike, jd_data: DocumentLike) -> Dict[str, Any]:
+    """Calculate detailed semantic analysis using multiple backends.
+    
+    Besides the per-backend scores, ``requirement_alignment`` maps each JD
+    requirement to its best resume evidence (see ``src.scoring.alignment``);
+    the ``detailed_analysis`` text is rendered from these structured results.
+    Both documents are normalized once and shared by all backends.
+    """
     try:
-        resume_text = resume_data.get('raw_text', '')
-        jd_text = jd_data.get('raw_text', '')
+        resume_text = normalize(resume_data)
+        jd_text = normalize(jd_data)
         
-        if not resume_text or not jd_text:
+        if not resume_text.text or not jd_text.text:
             return {
                 'weighted_score': 0.0,
                 'detailed_analysis': 'No text provided for analysis',
-                'backend_scores': {}
+                'backend_scores': {},
+                'requirement_alignment': {}
             }
         
         backend_scores = {}
         
         # Try all available backends (prioritize Hugging Face)
-        if HUGGINGFACE_LLM_AVAILABLE:
+        available = backend_availability()
+        if available['huggingface_llm']:
             backend_scores['huggingface_llm'] = _calculate_huggingface_similarity(resume_text, jd_text)
         
-        if SENTENCE_TRANSFORMERS_AVAILABLE:
+        if available['sentence_transformers']:
             backend_scores['sentence_transformers'] = _calculate_transformer_similarity(resume_text, jd_text)
         
-        if SPACY_AVAILABLE:
+        if available['spacy']:
             backend_scores['spacy'] = _calculate_spacy_similarity(resume_text, jd_text)
         
         # Always include TF-IDF as baseline
@@ -325,12 +371,17 @@ def calculate_detailed_semantic_match(resume_data: Dict[str, Any], jd_data: Dict
             analysis_parts.append(f"📝 NLP Analysis: {backend_scores['spacy']:.1%}")
         analysis_parts.append(f"📊 Statistical Analysis: {backend_scores['tfidf']:.1%}")
         
+        # Requirement-level evidence
+        alignment = get_requirement_aligner().align(resume_text.text, jd_text.text)
+        analysis_parts.extend(summarize_alignment(alignment))
+        
         detailed_analysis = "\n".join(analysis_parts)
         
         return {
             'weighted_score': max(0.0, min(100.0, weighted_score * 100)),  # Convert to percentage
             'detailed_analysis': detailed_analysis,
-            'backend_scores': {k: v * 100 for k, v in backend_scores.items()}  # Convert to percentages
+            'backend_scores': {k: v * 100 for k, v in backend_scores.items()},  # Convert to percentages
+            'requirement_alignment': alignment
         }
         
     except Exception as e:
@@ -338,5 +389,6 @@ def calculate_detailed_semantic_match(resume_data: Dict[str, Any], jd_data: Dict
         return {
             'weighted_score': 0.0,
             'detailed_analysis': f'Analysis failed: {str(e)}',
-            'backend_scores': {}
+            'backend_scores': {},
+            'requirement_alignment': {}
         }
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""
+spaCy backend that processes each document once.
+
+The similarity backend used to run the full ``en_core_web_sm`` pipeline
+(tok2vec, tagger, parser, attribute ruler, lemmatizer, NER) on both texts of
+every comparison just to call ``Doc.similarity``. The small model ships no
+static word vectors, so that similarity is the cosine of the mean tok2vec
+tensor rows; the tagger, parser and lemmatizer never contribute to it.
+
+``SpacyBackend`` loads the model with those components excluded, keeping
+``tok2vec`` (which writes ``Doc.tensor``) and ``ner``. Documents are
+processed in bulk with ``nlp.pipe`` and reduced to compact ``SpacyArtifacts``
+(normalised document vector, entities, lowercased tokens) cached by content
+hash, so a resume compared against many job descriptions, or parsed and
+later scored, goes through the pipeline once. Similarity, entity and skill
+extraction all read the same cached artifacts.
+
+With ``INFERENCE_SOCKET`` set, cache misses are processed by the inference
+sidecar (``src.inference``) instead of a model loaded in this process.
+"""
+
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.inference.client import InferenceError, get_inference_client
+from src.scoring.normalization import DocumentLike, normalize
+from src.utils.analysis_cache import AnalysisCache, make_cache_key
+from src.utils.metrics import record_model_load, timed
+
+logger = logging.getLogger(__name__)
+
+try:
+    import spacy
+    SPACY_AVAILABLE = True
+    logger.info("✅ spaCy backend available")
+except ImportError:
+    spacy = None
+    SPACY_AVAILABLE = False
+    logger.warning("❌ spaCy not available")
+
+DEFAULT_MODEL = "en_core_web_sm"
+# Components that neither the document vector nor the entities depend on
+EXCLUDED_COMPONENTS = ("tagger", "parser", "attribute_ruler", "lemmatizer", "senter")
+DEFAULT_BATCH_SIZE = 32
+# Entity labels that name tools, languages and products rather than people or places
+SKILL_ENTITY_LABELS = ("PRODUCT", "LANGUAGE")
+
+
+class SpacyArtifacts(NamedTuple):
+    """What the scorers need from one processed ``Doc``"""
+    vector: np.ndarray
+    entities: Tuple[Tuple[str, str], ...]
+    tokens: Tuple[str, ...]
+
+
+def _unit(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+
+def _artifacts(doc) -> SpacyArtifacts:
+    """Reduce a ``Doc`` to its unit-length vector, entities and tokens"""
+    return SpacyArtifacts(
+        vector=_unit(doc.vector),
+        entities=tuple((ent.text, ent.label_) for ent in doc.ents),
+        tokens=tuple(token.lower_ for token in doc if not token.is_space),
+    )
+
+
+class SpacyBackend:
+    """Trimmed spaCy pipeline with a per-document artifact cache"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, nlp=None, n_process: int = 1,
+                 batch_size: int = DEFAULT_BATCH_SIZE, cache_size: int = 1024, client=None):
+        """Configure the backend; the model itself is loaded on first use
+
+        Args:
+            model_name: spaCy package to load
+            nlp: An already loaded ``Language`` to use instead of ``model_name``
+            n_process: Worker processes for ``nlp.pipe``; only worth raising
+                for large bulk loads, since each worker loads its own model
+            batch_size: Documents per ``nlp.pipe`` batch
+            cache_size: Number of document artifacts kept
+            client: ``InferenceClient`` of a sidecar that runs the pipeline
+                instead of this process
+        """
+        self.model_name = model_name
+        self.n_process = max(1, int(n_process))
+        self.batch_size = max(1, int(batch_size))
+        self.cache = AnalysisCache(cache_size, name="spacy_docs")
+        self._nlp = nlp
+        self.client = client
+        self._remote_ok = False
+        self._load_failed = False
+        self._phrase_tokens: Dict[str, Tuple[str, ...]] = {}
+
+    @property
+    def nlp(self):
+        """The trimmed pipeline, or ``None`` if spaCy or the model is missing"""
+        if self._nlp is None and self.client is None and not self._load_failed and SPACY_AVAILABLE:
+            try:
+                start = time.perf_counter()
+                self._nlp = spacy.load(self.model_name, exclude=list(EXCLUDED_COMPONENTS))
+                record_model_load(self.model_name, time.perf_counter() - start)
+                logger.info(f"✅ spaCy model loaded: {self.model_name} ({', '.join(self._nlp.pipe_names)})")
+            except Exception as e:
+                logger.error(f"❌ Failed to load spaCy model: {e}")
+                self._load_failed = True
+        return self._nlp
+
+    @property
+    def available(self) -> bool:
+        if self.client is not None:
+            if not self._remote_ok:
+                try:
+                    self._remote_ok = self.client.ping().get('spacy') is not None
+                except InferenceError as e:
+                    logger.error(f"❌ spaCy sidecar unavailable: {e}")
+            return self._remote_ok
+        return self.nlp is not None
+
+    def _run_pipeline(self, texts: List[str]) -> List[SpacyArtifacts]:
+        if self.client is not None:
+            return [
+                SpacyArtifacts(_unit(vector), tuple(entities), tuple(tokens))
+                for vector, entities, tokens in self.client.spacy(texts)
+            ]
+        nlp = self.nlp
+        if nlp is None:
+            raise RuntimeError(f"spaCy model {self.model_name} is not available")
+        docs = nlp.pipe(texts, batch_size=self.batch_size, n_process=self.n_process)
+        return [_artifacts(doc) for doc in docs]
+
+    def _key(self, content_hash: str) -> str:
+        return make_cache_key("spacy", content_hash, model=self.model_name)
+
+    @timed('spacy_process')
+    def process(self, documents: Sequence[DocumentLike]) -> List[SpacyArtifacts]:
+        """Artifacts of each document, running all cache misses through one ``nlp.pipe``"""
+        normalized = [normalize(document) for document in documents]
+        keys = [self._key(document.content_hash) for document in normalized]
+        results: List[Optional[SpacyArtifacts]] = []
+        missing: Dict[str, List[int]] = {}
+        for index, (document, key) in enumerate(zip(normalized, keys)):
+            cached, hit = self.cache.lookup(key)
+            results.append(cached if hit else None)
+            if not hit:
+                missing.setdefault(document.text, []).append(index)
+
+        if missing:
+            texts = list(missing)
+            for text, artifacts in zip(texts, self._run_pipeline(texts)):
+                for index in missing[text]:
+                    results[index] = artifacts
+                self.cache.store(keys[missing[text][0]], artifacts)
+
+        return results
+
+    def similarity(self, first: DocumentLike, second: DocumentLike) -> float:
+        """Cosine of the two document vectors, as ``Doc.similarity`` computes it"""
+        first_artifacts, second_artifacts = self.process([first, second])
+        return float(np.dot(first_artifacts.vector, second_artifacts.vector))
+
+    def entities(self, document: DocumentLike,
+                 labels: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
+        """Named entities as ``(text, label)``, optionally restricted to ``labels``"""
+        entities = self.process([document])[0].entities
+        if labels is None:
+            return list(entities)
+        wanted = set(labels)
+        return [entity for entity in entities if entity[1] in wanted]
+
+    def tokenize_phrases(self, phrases: Sequence[str]) -> List[Tuple[str, ...]]:
+        """Lowercased tokens of short phrases, tokenized once per phrase"""
+        missing = [phrase for phrase in dict.fromkeys(phrases) if phrase not in self._phrase_tokens]
+        if missing:
+            if self.client is not None:
+                tokenized = self.client.tokenize(missing)
+            else:
+                tokenized = [
+                    [token.lower_ for token in doc if not token.is_space]
+                    for doc in self.nlp.tokenizer.pipe(missing)
+                ]
+            for phrase, tokens in zip(missing, tokenized):
+                self._phrase_tokens[phrase] = tuple(tokens)
+        return [self._phrase_tokens[phrase] for phrase in phrases]
+
+    def skills(self, document: DocumentLike, vocabulary: Sequence[str] = (),
+               include_entities: bool = False) -> List[str]:
+        """Skills from ``vocabulary`` found as whole-token phrases in the document
+
+        Matching on spaCy tokens instead of substrings keeps "java" from
+        matching "javascript". With ``include_entities`` the document's
+        product and language entities are appended as extra candidates.
+        """
+        artifacts = self.process([document])[0]
+        phrases = dict(zip(vocabulary, self.tokenize_phrases(vocabulary)))
+        lengths = {len(tokens) for tokens in phrases.values() if tokens}
+        ngrams = {
+            artifacts.tokens[start:start + length]
+            for length in lengths
+            for start in range(len(artifacts.tokens) - length + 1)
+        }
+        found = [phrase for phrase, tokens in phrases.items() if tokens and tokens in ngrams]
+
+        if include_entities:
+            seen = {phrase.lower() for phrase in found}
+            for text, label in artifacts.entities:
+                if label in SKILL_ENTITY_LABELS and text.lower() not in seen:
+                    seen.add(text.lower())
+                    found.append(text)
+        return found
+
+
+# Global spaCy backend instance
+_spacy_backend = None
+
+
+def get_spacy_backend() -> SpacyBackend:
+    """Get or create the global spaCy backend"""
+    global _spacy_backend
+    if _spacy_backend is None:
+        _spacy_backend = SpacyBackend(
+            model_name=os.getenv('SPACY_MODEL', DEFAULT_MODEL),
+            n_process=int(os.getenv('SPACY_N_PROCESS', 1)),
+            batch_size=int(os.getenv('SPACY_BATCH_SIZE', DEFAULT_BATCH_SIZE)),
+            client=get_inference_client(),
+        )
+    return _spacy_backend
+
+
+__all__ = [
+    'SpacyArtifacts', 'SpacyBackend', 'get_spacy_backend', 'SPACY_AVAILABLE',
+    'EXCLUDED_COMPONENTS', 'SKILL_ENTITY_LABELS'
+]
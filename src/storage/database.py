@@ -6,12 +6,17 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean
+from sqlalchemy import (
+    create_engine, Column, Integer, Float, String, Text, Date, DateTime, Boolean, LargeBinary, Index, UniqueConstraint
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 import bcrypt
 
+from src.storage.rollups import record_evaluation
+from src.utils.metrics import stage_timer, timed
+
 DATABASE_URL = "sqlite:///./evaluations.db"  # Update with your database URL
 
 # Handle database migration - remove old database if schema has changed
@@ -34,6 +39,102 @@ class Evaluation(Base):
     user_id = Column(Integer, index=True)  # Link evaluation to user
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class EvaluationRollup(Base):
+    """Per user/job/day score aggregates, maintained on insert (src/storage/rollups.py)"""
+    __tablename__ = "evaluation_rollups"
+    __table_args__ = (UniqueConstraint("user_id", "job_id", "day", name="uq_evaluation_rollups_key"),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    job_id = Column(String, nullable=False)
+    day = Column(Date, nullable=False, index=True)
+    count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0)
+    score_min = Column(Float)
+    score_max = Column(Float)
+
+class EvaluationScoreBucket(Base):
+    """Score histogram per user/job/day, one row per non-empty bucket"""
+    __tablename__ = "evaluation_score_buckets"
+    __table_args__ = (UniqueConstraint("user_id", "job_id", "day", "bucket", name="uq_evaluation_score_buckets_key"),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    job_id = Column(String, nullable=False)
+    day = Column(Date, nullable=False, index=True)
+    bucket = Column(Integer, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+class EvaluationVerdictCount(Base):
+    """Verdict counts per user/job/day"""
+    __tablename__ = "evaluation_verdict_counts"
+    __table_args__ = (UniqueConstraint("user_id", "job_id", "day", "verdict", name="uq_evaluation_verdict_counts_key"),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    job_id = Column(String, nullable=False)
+    day = Column(Date, nullable=False, index=True)
+    verdict = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+class Job(Base):
+    """A job description whose edits are kept as numbered versions"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, index=True)
+    title = Column(String)
+    current_version = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class JobVersion(Base):
+    """JD text of one version, its parsed form and its diff against the previous version"""
+    __tablename__ = "job_versions"
+    __table_args__ = (UniqueConstraint("job_id", "version", name="uq_job_versions_key"),)
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, nullable=False, index=True)
+    version = Column(Integer, nullable=False)
+    raw_text = Column(Text, nullable=False)
+    parsed = Column(Text, nullable=False)  # JSON, see src/scoring/rescoring.py
+    diff = Column(Text)  # JSON, None for the first version
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class ResumeDocument(Base):
+    """Resume text with its keyword terms and pooled embedding, stored once per user and content"""
+    __tablename__ = "resume_documents"
+    __table_args__ = (UniqueConstraint("user_id", "content_hash", name="uq_resume_documents_key"),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, index=True)
+    content_hash = Column(String, nullable=False)
+    name = Column(String)
+    raw_text = Column(Text, nullable=False)
+    terms = Column(Text, nullable=False)  # JSON list of stopword-filtered terms
+    embedding = Column(LargeBinary)  # float32 pooled chunk embedding
+    embedding_model = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class JobCandidate(Base):
+    """Current scores of one resume against the latest version of a job"""
+    __tablename__ = "job_candidates"
+    __table_args__ = (
+        UniqueConstraint("job_id", "resume_document_id", name="uq_job_candidates_key"),
+        Index("ix_job_candidates_ranking", "job_id", "final_score"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, nullable=False)
+    resume_document_id = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False)
+    matched_keywords = Column(Integer, nullable=False, default=0)
+    hard_match_score = Column(Float, nullable=False, default=0)
+    semantic_match_score = Column(Float, nullable=False, default=0)
+    final_score = Column(Float, nullable=False, default=0)
+    verdict = Column(String)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
 class User(Base):
     __tablename__ = "users"
     
@@ -68,6 +169,7 @@ def get_db():
     finally:
         db.close()
 
+@timed('db_add_evaluation')
 def add_evaluation(db, resume_id, job_id, relevance_score, missing_elements, verdict, user_id=None):
     db_evaluation = Evaluation(
         resume_id=resume_id,
@@ -78,10 +180,13 @@ def add_evaluation(db, resume_id, job_id, relevance_score, missing_elements, ver
         user_id=user_id
     )
     db.add(db_evaluation)
+    db.flush()
+    record_evaluation(db, db_evaluation)
     db.commit()
     db.refresh(db_evaluation)
     return db_evaluation
 
+@timed('db_get_evaluations')
 def get_evaluations(db, skip=0, limit=10, user_id=None):
     query = db.query(Evaluation)
     if user_id:
@@ -91,6 +196,7 @@ def get_evaluations(db, skip=0, limit=10, user_id=None):
 def get_evaluation_by_id(db, evaluation_id):
     return db.query(Evaluation).filter(Evaluation.id == evaluation_id).first()
 
+@timed('db_store_evaluation')
 def store_evaluation_results(evaluation_result, user_id=None):
     """
     Store evaluation results in the database.
@@ -113,7 +219,11 @@ def store_evaluation_results(evaluation_result, user_id=None):
             user_id=user_id
         )
         db.add(db_evaluation)
-        db.commit()
+        db.flush()
+        # Same transaction, so the rollups never disagree with the evaluations table
+        record_evaluation(db, db_evaluation)
+        with stage_timer("db_commit"):
+            db.commit()
         db.refresh(db_evaluation)
         return db_evaluation
     except Exception as e:
@@ -123,6 +233,7 @@ def store_evaluation_results(evaluation_result, user_id=None):
     finally:
         db.close()
 
+@timed('db_create_user')
 def create_user(db, username: str, email: str, password: str):
     """Create a new user with bcrypt password hashing"""
     try:
@@ -136,6 +247,7 @@ def create_user(db, username: str, email: str, password: str):
         db.rollback()
         raise e
 
+@timed('db_get_user')
 def get_user_by_username(db, username: str):
     """Get user by username"""
     return db.query(User).filter(User.username == username).first()
@@ -0,0 +1,224 @@
+"""
+Streaming export of evaluation history as CSV, NDJSON or Parquet.
+
+Exports used to load the whole history into a DataFrame, render it to one
+CSV string and base64-encode that into a data URI, holding three copies of
+the data at once. Here rows are read through a server-side cursor
+(``stream_results`` with ``yield_per``: a named cursor on PostgreSQL,
+incremental fetches on SQLite) in batches of ``batch_size``. Each batch is
+serialised and handed to the response before the next one is fetched, so
+memory stays constant regardless of the size of the history. CSV and
+NDJSON batches are text; Parquet is written one row group per batch through
+pyarrow into a sink that is drained after every batch.
+
+``export_records`` applies the same serialisers to in-memory session
+results, for the Streamlit front ends that have no database behind them.
+"""
+
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PYARROW_AVAILABLE = False
+
+# Format -> (media type, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+EXPORT_COLUMNS = [
+    'id', 'resume_id', 'job_id', 'relevance_score', 'missing_elements', 'verdict', 'user_id', 'created_at'
+]
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10000
+
+
+def _evaluation_schema():
+    return pa.schema([
+        ('id', pa.int64()),
+        ('resume_id', pa.string()),
+        ('job_id', pa.string()),
+        ('relevance_score', pa.int64()),
+        ('missing_elements', pa.string()),
+        ('verdict', pa.string()),
+        ('user_id', pa.int64()),
+        ('created_at', pa.timestamp('us')),
+    ])
+
+
+def iter_evaluation_batches(db, user_id: Optional[int] = None, job_id: Optional[str] = None,
+                            since: Optional[datetime] = None, until: Optional[datetime] = None,
+                            batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Evaluation rows in id order, ``batch_size`` at a time, from a server-side cursor"""
+    from sqlalchemy import select
+    from src.storage.database import Evaluation
+
+    query = select(*[getattr(Evaluation, column) for column in EXPORT_COLUMNS]).order_by(Evaluation.id)
+    if user_id is not None:
+        query = query.where(Evaluation.user_id == user_id)
+    if job_id is not None:
+        query = query.where(Evaluation.job_id == job_id)
+    if since is not None:
+        query = query.where(Evaluation.created_at >= since)
+    if until is not None:
+        query = query.where(Evaluation.created_at < until)
+
+    result = db.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+    for partition in result.partitions():
+        yield [dict(row._mapping) for row in partition]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _scalar(value: Any) -> Any:
+    """Nested values become JSON text so every column has a flat type"""
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, default=_json_default)
+    return value
+
+
+def _csv_chunks(batches: Iterable[List[Dict[str, Any]]], columns: Sequence[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(columns), extrasaction='ignore')
+    writer.writeheader()
+    for batch in batches:
+        writer.writerows({key: _scalar(value) for key, value in row.items()} for row in batch)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')  # Header of an empty export
+
+
+def _ndjson_chunks(batches: Iterable[List[Dict[str, Any]]], columns: Sequence[str]) -> Iterator[bytes]:
+    for batch in batches:
+        yield ''.join(
+            json.dumps({column: row.get(column) for column in columns}, default=_json_default) + '\n'
+            for row in batch
+        ).encode('utf-8')
+
+
+class _DrainableSink:
+    """Write-only file object whose contents are taken out after every row group"""
+
+    def __init__(self):
+        self.closed = False
+        self._buffer = bytearray()
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _parquet_chunks(batches: Iterable[List[Dict[str, Any]]], columns: Sequence[str],
+                    schema=None) -> Iterator[bytes]:
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("Parquet export requires pyarrow")
+    sink = _DrainableSink()
+    writer = None
+    for batch in batches:
+        rows = [{column: _scalar(row.get(column)) for column in columns} for row in batch]
+        table = pa.Table.from_pylist(rows, schema=schema)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is None:
+        writer = pq.ParquetWriter(sink, schema or pa.schema([(column, pa.string()) for column in columns]))
+    writer.close()
+    yield sink.drain()
+
+
+def stream_export(batches: Iterable[List[Dict[str, Any]]], format: str, columns: Sequence[str],
+                  schema=None) -> Iterator[bytes]:
+    """Serialise row batches as byte chunks of a CSV, NDJSON or Parquet file
+
+    Args:
+        batches: Lists of row dicts
+        format: One of ``EXPORT_FORMATS``
+        columns: Columns in output order
+        schema: pyarrow schema for Parquet, inferred from the first batch if omitted
+    """
+    if format == 'csv':
+        return _csv_chunks(batches, columns)
+    if format == 'ndjson':
+        return _ndjson_chunks(batches, columns)
+    if format == 'parquet':
+        return _parquet_chunks(batches, columns, schema)
+    raise ValueError(f"Unknown export format '{format}', expected one of {sorted(EXPORT_FORMATS)}")
+
+
+def stream_evaluations(format: str, user_id: Optional[int] = None, job_id: Optional[str] = None,
+                       since: Optional[datetime] = None, until: Optional[datetime] = None,
+                       batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[bytes]:
+    """Export chunks of the evaluation history, holding one session for the whole stream"""
+    from src.storage.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        batches = iter_evaluation_batches(db, user_id, job_id, since, until, batch_size)
+        schema = _evaluation_schema() if format == 'parquet' else None
+        yield from stream_export(batches, format, EXPORT_COLUMNS, schema)
+    except Exception as e:
+        logger.error(f"Evaluation export failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+def export_records(records: Sequence[Dict[str, Any]], format: str,
+                   batch_size: int = DEFAULT_BATCH_SIZE) -> bytes:
+    """Serialise in-memory result dicts, e.g. a Streamlit session's analyses"""
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    schema = None
+    if format == 'parquet' and PYARROW_AVAILABLE and records:
+        # Infer from every record so a column that starts out empty keeps its type
+        schema = pa.Table.from_pylist(
+            [{column: _scalar(record.get(column)) for column in columns} for record in records]
+        ).schema
+    batches = (list(records[start:start + batch_size]) for start in range(0, len(records), batch_size))
+    return b''.join(stream_export(batches, format, columns, schema))
+
+
+def export_filename(prefix: str, format: str) -> str:
+    """Timestamped download file name with the format's extension"""
+    return f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{EXPORT_FORMATS[format][1]}"
+
+
+__all__ = [
+    'stream_evaluations', 'stream_export', 'export_records', 'iter_evaluation_batches', 'export_filename',
+    'EXPORT_FORMATS', 'EXPORT_COLUMNS', 'DEFAULT_BATCH_SIZE', 'MAX_BATCH_SIZE', 'PYARROW_AVAILABLE'
+]
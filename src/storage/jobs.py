@@ -0,0 +1,314 @@
+"""
+Versioned job descriptions and their stored candidates.
+
+A job keeps every edit of its description as a numbered ``JobVersion``
+with the parsed form and the diff from the version before. Resumes are
+stored once per user as ``ResumeDocument`` rows, with their terms and
+pooled embedding. ``JobCandidate`` holds each resume's current scores
+against the job's latest version, including the matched keyword count
+that incremental re-scoring starts from (``src.scoring.rescoring``).
+
+Editing a JD therefore costs one parse and one embedding of the new text,
+a keyword delta and a dot product per candidate, and one bulk update. Term
+sets and vectors of recently used resumes are kept in an in-process LRU
+cache, so repeated edits of the same job do not decode them again.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.scoring.document import DocumentAnalysis
+from src.scoring.rescoring import (
+    CandidateProfile, combine, diff_job_descriptions, embed_profiles, embedding_signature,
+    parse_job_description, rescore
+)
+from src.scoring.screening import DEFAULT_MISSING_KEYWORDS, MatrixScorer
+from src.storage.database import Job, JobCandidate, JobVersion, ResumeDocument
+from src.utils.analysis_cache import AnalysisCache, content_hash, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_CACHE_SIZE = 10000
+DEFAULT_RANKING_LIMIT = 50
+# Keeps IN (...) lists under SQLite's bound parameter limit
+QUERY_CHUNK = 500
+
+
+def _new_scorer() -> MatrixScorer:
+    # A fresh scorer per operation: it accumulates per-document state
+    return MatrixScorer()
+
+
+def get_job(db, job_id: int, user_id: Optional[int]) -> Optional[Job]:
+    """The job if it exists and belongs to ``user_id``"""
+    return db.query(Job).filter(Job.id == job_id, Job.user_id == user_id).first()
+
+
+def list_jobs(db, user_id: Optional[int]) -> List[Dict[str, Any]]:
+    jobs = db.query(Job).filter(Job.user_id == user_id).order_by(Job.id).all()
+    return [_job_dict(job) for job in jobs]
+
+
+def _job_dict(job: Job) -> Dict[str, Any]:
+    return {
+        'job_id': job.id,
+        'title': job.title,
+        'version': job.current_version,
+        'created_at': job.created_at.isoformat() if job.created_at is not None else None,
+        'updated_at': job.updated_at.isoformat() if job.updated_at is not None else None,
+    }
+
+
+def _current_version(db, job: Job) -> JobVersion:
+    return db.query(JobVersion).filter(
+        JobVersion.job_id == job.id, JobVersion.version == job.current_version
+    ).one()
+
+
+def create_job(db, user_id: Optional[int], jd_text: str, title: Optional[str] = None) -> Dict[str, Any]:
+    """Store a job and the first version of its description"""
+    from src.parsing.jd_parser import JDParser
+
+    parsed = parse_job_description(jd_text)
+    job = Job(user_id=user_id, title=title or JDParser().extract_role_title(jd_text), current_version=1)
+    db.add(job)
+    db.flush()
+    db.add(JobVersion(job_id=job.id, version=1, raw_text=jd_text, parsed=json.dumps(parsed)))
+    db.commit()
+    logger.info(f"✅ Created job {job.id} with {len(parsed['keywords'])} keywords")
+    return {**_job_dict(job), 'keywords': len(parsed['keywords']), 'skills': parsed['skills']}
+
+
+def list_versions(db, job: Job) -> List[Dict[str, Any]]:
+    versions = db.query(JobVersion).filter(JobVersion.job_id == job.id).order_by(JobVersion.version).all()
+    return [
+        {
+            'version': version.version,
+            'created_at': version.created_at.isoformat() if version.created_at is not None else None,
+            'diff': json.loads(version.diff) if version.diff else None,
+        }
+        for version in versions
+    ]
+
+
+# Global profile cache
+_profile_cache = None
+
+def get_profile_cache() -> AnalysisCache:
+    """Get or create the global cache of candidate profiles"""
+    global _profile_cache
+    if _profile_cache is None:
+        _profile_cache = AnalysisCache(
+            int(os.getenv('CANDIDATE_PROFILE_CACHE_SIZE', DEFAULT_PROFILE_CACHE_SIZE)), name="candidate_profiles"
+        )
+    return _profile_cache
+
+
+def _load_profiles(db, scorer: MatrixScorer, document_ids: Sequence[int]) -> Dict[int, CandidateProfile]:
+    """Profiles of stored resumes by document id, embedding any that lack a vector for this model"""
+    signature = embedding_signature(scorer)
+    cache = get_profile_cache()
+    profiles: Dict[int, CandidateProfile] = {}
+    documents: Dict[int, ResumeDocument] = {}
+
+    ids = list(document_ids)
+    for start in range(0, len(ids), QUERY_CHUNK):
+        chunk = ids[start:start + QUERY_CHUNK]
+        for document in db.query(ResumeDocument).filter(ResumeDocument.id.in_(chunk)):
+            key = make_cache_key("candidate_profile", document.content_hash, embedding=signature)
+            profile, hit = cache.lookup(key)
+            if not hit:
+                vector = None
+                if signature is not None and document.embedding is not None and document.embedding_model == signature:
+                    vector = np.frombuffer(document.embedding, dtype=np.float32)
+                profile = CandidateProfile(json.loads(document.terms), vector)
+                documents[document.id] = document
+            profiles[document.id] = profile
+
+    if signature is not None:
+        missing = [document_id for document_id, profile in profiles.items() if profile.vector is None]
+        if missing:
+            texts = {document_id: db.get(ResumeDocument, document_id).raw_text for document_id in missing}
+            embed_profiles(scorer, texts, {document_id: profiles[document_id] for document_id in missing})
+            for document_id in missing:
+                document = db.get(ResumeDocument, document_id)
+                document.embedding = np.asarray(profiles[document_id].vector, dtype=np.float32).tobytes()
+                document.embedding_model = signature
+                documents[document_id] = document
+
+    for document_id, document in documents.items():
+        key = make_cache_key("candidate_profile", document.content_hash, embedding=signature)
+        cache.store(key, profiles[document_id])
+    return profiles
+
+
+def add_candidates(db, job: Job, resumes: Sequence[Dict[str, Any]],
+                   scorer: Optional[MatrixScorer] = None) -> Dict[str, Any]:
+    """Store resumes and score them against the job's current version
+
+    Args:
+        db: Session
+        job: Job the candidates apply to
+        resumes: Dicts with ``resume_text`` and optionally ``name``
+        scorer: Scorer deciding the semantic backend, a fresh ``MatrixScorer`` by default
+
+    Returns:
+        Counts of added and already present candidates
+    """
+    scorer = scorer or _new_scorer()
+    document_ids = []
+    for resume in resumes:
+        text = resume['resume_text']
+        digest = content_hash(text)
+        document = db.query(ResumeDocument).filter(
+            ResumeDocument.user_id == job.user_id, ResumeDocument.content_hash == digest
+        ).first()
+        if document is None:
+            document = ResumeDocument(
+                user_id=job.user_id, content_hash=digest, name=resume.get('name'), raw_text=text,
+                terms=json.dumps(DocumentAnalysis(text).terms)
+            )
+            db.add(document)
+            db.flush()
+        document_ids.append(document.id)
+
+    existing = {
+        document_id for (document_id,) in db.query(JobCandidate.resume_document_id).filter(JobCandidate.job_id == job.id)
+    }
+    new_ids = list(dict.fromkeys(document_id for document_id in document_ids if document_id not in existing))
+    if new_ids:
+        version = _current_version(db, job)
+        profiles = _load_profiles(db, scorer, new_ids)
+        result = rescore(scorer, version.raw_text, json.loads(version.parsed), profiles)
+        final, verdicts = combine(result['hard'], result['semantic'])
+        now = datetime.utcnow()
+        db.bulk_insert_mappings(JobCandidate, [
+            {
+                'job_id': job.id, 'resume_document_id': document_id, 'version': version.version,
+                'matched_keywords': int(result['matched'][i]), 'hard_match_score': float(result['hard'][i]),
+                'semantic_match_score': float(result['semantic'][i]), 'final_score': float(final[i]),
+                'verdict': verdicts[i], 'updated_at': now,
+            }
+            for i, document_id in enumerate(result['keys'])
+        ])
+    db.commit()
+    return {
+        'job_id': job.id,
+        'version': job.current_version,
+        'added': len(new_ids),
+        'already_present': len(set(document_ids)) - len(new_ids),
+        'semantic_backend': scorer.backend,
+    }
+
+
+def update_job_description(db, job: Job, jd_text: str, scorer: Optional[MatrixScorer] = None,
+                           top_k: int = 10) -> Dict[str, Any]:
+    """Store a new version of the JD and re-score every candidate incrementally
+
+    Returns:
+        The new version, its diff, which score parts were recomputed, the
+        elapsed time and the new top ``top_k``
+    """
+    started = time.monotonic()
+    current = _current_version(db, job)
+    if jd_text == current.raw_text:
+        return {'job_id': job.id, 'version': job.current_version, 'changed': False, 'diff': None,
+                'candidates': 0, 'hard_recomputed': False, 'semantic_recomputed': False,
+                'elapsed_seconds': time.monotonic() - started, 'top': job_ranking(db, job, top_k)}
+
+    scorer = scorer or _new_scorer()
+    parsed = parse_job_description(jd_text)
+    diff = diff_job_descriptions(json.loads(current.parsed), parsed)
+    version = job.current_version + 1
+
+    columns = (JobCandidate.id, JobCandidate.resume_document_id, JobCandidate.matched_keywords,
+               JobCandidate.hard_match_score, JobCandidate.semantic_match_score)
+    candidates = db.query(*columns).filter(JobCandidate.job_id == job.id).all()
+    hard_recomputed = semantic_recomputed = False
+
+    if candidates and (diff['text_changed'] or diff['keywords_added'] or diff['keywords_removed']):
+        by_document = {row.resume_document_id: row for row in candidates}
+        profiles = _load_profiles(db, scorer, list(by_document))
+        result = rescore(
+            scorer, jd_text, parsed, profiles,
+            matched={document_id: row.matched_keywords for document_id, row in by_document.items()}, diff=diff
+        )
+        semantic = result['semantic']
+        if semantic is None:
+            semantic = np.array([by_document[key].semantic_match_score for key in result['keys']])
+        final, verdicts = combine(result['hard'], semantic)
+        now = datetime.utcnow()
+        db.bulk_update_mappings(JobCandidate, [
+            {
+                'id': by_document[key].id, 'version': version, 'matched_keywords': int(result['matched'][i]),
+                'hard_match_score': float(result['hard'][i]), 'semantic_match_score': float(semantic[i]),
+                'final_score': float(final[i]), 'verdict': verdicts[i], 'updated_at': now,
+            }
+            for i, key in enumerate(result['keys'])
+        ])
+        hard_recomputed, semantic_recomputed = result['hard_recomputed'], result['semantic_recomputed']
+    else:
+        db.query(JobCandidate).filter(JobCandidate.job_id == job.id).update({'version': version})
+
+    db.add(JobVersion(job_id=job.id, version=version, raw_text=jd_text, parsed=json.dumps(parsed),
+                      diff=json.dumps(diff)))
+    job.current_version = version
+    job.updated_at = datetime.utcnow()
+    db.commit()
+
+    elapsed = time.monotonic() - started
+    logger.info(f"✅ Job {job.id} v{version}: re-scored {len(candidates)} candidates in {elapsed:.2f}s")
+    return {
+        'job_id': job.id,
+        'version': version,
+        'changed': True,
+        'diff': diff,
+        'candidates': len(candidates),
+        'hard_recomputed': hard_recomputed,
+        'semantic_recomputed': semantic_recomputed,
+        'semantic_backend': scorer.backend,
+        'elapsed_seconds': elapsed,
+        'top': job_ranking(db, job, top_k),
+    }
+
+
+def job_ranking(db, job: Job, limit: int = DEFAULT_RANKING_LIMIT, offset: int = 0) -> List[Dict[str, Any]]:
+    """Candidates by final score, best first, with the JD keywords each one misses"""
+    rows = (
+        db.query(JobCandidate, ResumeDocument.name, ResumeDocument.terms)
+        .join(ResumeDocument, ResumeDocument.id == JobCandidate.resume_document_id)
+        .filter(JobCandidate.job_id == job.id)
+        .order_by(JobCandidate.final_score.desc(), JobCandidate.id)
+        .offset(offset).limit(limit).all()
+    )
+    if not rows:
+        return []
+
+    jd = DocumentAnalysis(_current_version(db, job).raw_text)
+    ranking = []
+    for rank, (candidate, name, terms) in enumerate(rows, start=offset + 1):
+        missing = jd.rank_keywords(set(jd.vocabulary) - set(json.loads(terms)))
+        ranking.append({
+            'rank': rank,
+            'resume_id': candidate.resume_document_id,
+            'name': name,
+            'final_score': round(candidate.final_score, 2),
+            'hard_match_score': round(candidate.hard_match_score, 2),
+            'semantic_match_score': round(candidate.semantic_match_score, 2),
+            'verdict': candidate.verdict,
+            'version': candidate.version,
+            'missing_keywords': missing[:DEFAULT_MISSING_KEYWORDS],
+        })
+    return ranking
+
+
+__all__ = [
+    'create_job', 'get_job', 'list_jobs', 'list_versions', 'add_candidates', 'update_job_description',
+    'job_ranking', 'get_profile_cache', 'DEFAULT_RANKING_LIMIT'
+]
@@ -0,0 +1,469 @@
+"""
+Pre-aggregated evaluation analytics.
+
+The analytics pages used to download evaluations and recompute mean, min,
+max and histograms in pandas on every rerun, which is O(evaluations) per
+page view. Instead every insert also updates small tables keyed by user,
+job and UTC day (``EvaluationRollup``, ``EvaluationScoreBucket`` and
+``EvaluationVerdictCount`` in ``src.storage.database``). The update is an upsert in the same
+transaction as the evaluation, so the rollups never drift from the rows
+they summarise. ``summarize`` and the narrower queries below it
+(distribution, verdict breakdown, trend, per-job comparison) answer from
+the rollups alone, in O(days + jobs + buckets) however many evaluations
+there are. Percentiles are interpolated within histogram buckets with
+NumPy, so they are approximate to within a bucket.
+
+A database with evaluations from before the rollups existed gets them
+built by ``backfill_rollups`` once at API startup (the FastAPI lifespan),
+under a database lock so concurrent workers do not rebuild in parallel;
+``python -m src.cli rebuild-rollups`` does the same on demand.
+
+Scores are bucketed into ``HISTOGRAM_BUCKETS`` buckets of ``BUCKET_WIDTH``
+points; 100 falls into the last bucket. ``ScoreRollup`` is the same
+aggregate in memory, for the Streamlit front ends that keep results in the
+session rather than a database.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, text
+
+logger = logging.getLogger(__name__)
+
+BUCKET_WIDTH = 10
+HISTOGRAM_BUCKETS = 10
+# Rollup keys are NOT NULL so upserts can match them
+ANONYMOUS_USER_ID = 0
+UNKNOWN_JOB_ID = ''
+UNKNOWN_VERDICT = 'Unknown'
+PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+TREND_INTERVALS = ('day', 'week', 'month')
+
+
+def score_bucket(score: float) -> int:
+    """Histogram bucket of a 0-100 score"""
+    return min(max(int(score // BUCKET_WIDTH), 0), HISTOGRAM_BUCKETS - 1)
+
+
+def bucket_labels() -> List[str]:
+    return [f"{i * BUCKET_WIDTH}-{(i + 1) * BUCKET_WIDTH}" for i in range(HISTOGRAM_BUCKETS)]
+
+
+def _rollup_key(user_id: Optional[int], job_id: Optional[str], created_at: Optional[datetime]) -> Dict[str, Any]:
+    return {
+        'user_id': ANONYMOUS_USER_ID if user_id is None else user_id,
+        'job_id': UNKNOWN_JOB_ID if job_id is None else job_id,
+        'day': (created_at or datetime.utcnow()).date(),
+    }
+
+
+def _upsert_dialect(db) -> Optional[Tuple[Any, Any, Any]]:
+    """(insert, least, greatest) for dialects with INSERT ... ON CONFLICT, else None"""
+    name = db.get_bind().dialect.name
+    if name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert, func.min, func.max
+    if name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert, func.least, func.greatest
+    return None
+
+
+def _verdict(verdict: Optional[str]) -> str:
+    return verdict or UNKNOWN_VERDICT
+
+
+def record_evaluation(db, evaluation) -> None:
+    """Add a flushed, uncommitted evaluation to its rollups in the caller's transaction"""
+    from src.storage.database import EvaluationRollup, EvaluationScoreBucket, EvaluationVerdictCount
+
+    key = _rollup_key(evaluation.user_id, evaluation.job_id, evaluation.created_at)
+    score = float(evaluation.relevance_score or 0)
+    counters = (
+        (EvaluationScoreBucket, {'bucket': score_bucket(score)}),
+        (EvaluationVerdictCount, {'verdict': _verdict(evaluation.verdict)}),
+    )
+
+    dialect = _upsert_dialect(db)
+    if dialect is None:
+        _record_without_upsert(db, key, score, counters)
+        return
+
+    insert, least, greatest = dialect
+    rollups = EvaluationRollup.__table__
+    statement = insert(rollups).values(**key, count=1, score_sum=score, score_min=score, score_max=score)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=['user_id', 'job_id', 'day'],
+        set_={
+            'count': rollups.c.count + 1,
+            'score_sum': rollups.c.score_sum + statement.excluded.score_sum,
+            'score_min': least(rollups.c.score_min, statement.excluded.score_min),
+            'score_max': greatest(rollups.c.score_max, statement.excluded.score_max),
+        }
+    ))
+
+    for model, extra_key in counters:
+        table = model.__table__
+        statement = insert(table).values(**key, **extra_key, count=1)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[*key, *extra_key],
+            set_={'count': table.c.count + 1}
+        ))
+
+
+def _record_without_upsert(db, key: Dict[str, Any], score: float, counters) -> None:
+    from src.storage.database import EvaluationRollup
+
+    rollup = db.query(EvaluationRollup).filter_by(**key).with_for_update().first()
+    if rollup is None:
+        db.add(EvaluationRollup(**key, count=1, score_sum=score, score_min=score, score_max=score))
+    else:
+        rollup.count += 1
+        rollup.score_sum += score
+        rollup.score_min = min(rollup.score_min, score)
+        rollup.score_max = max(rollup.score_max, score)
+
+    for model, extra_key in counters:
+        row = db.query(model).filter_by(**key, **extra_key).with_for_update().first()
+        if row is None:
+            db.add(model(**key, **extra_key, count=1))
+        else:
+            row.count += 1
+
+
+def rebuild_rollups(db, batch_size: int = 5000) -> Dict[str, int]:
+    """Recompute every rollup from the evaluations table and commit
+
+    Only needed once for a database that predates the rollups, or after
+    evaluations were changed outside ``src.storage.database``.
+    """
+    from src.storage.database import Evaluation, EvaluationRollup, EvaluationScoreBucket, EvaluationVerdictCount
+
+    totals = {}
+    histogram = defaultdict(int)
+    verdicts = defaultdict(int)
+    columns = (Evaluation.user_id, Evaluation.job_id, Evaluation.created_at, Evaluation.relevance_score,
+               Evaluation.verdict)
+    result = db.execute(
+        db.query(*columns).statement.execution_options(stream_results=True, yield_per=batch_size)
+    )
+    evaluations = 0
+    for user_id, job_id, created_at, relevance_score, verdict in result:
+        key = _rollup_key(user_id, job_id, created_at)
+        score = float(relevance_score or 0)
+        group = tuple(key.values())
+        if group in totals:
+            rollup = totals[group]
+            rollup['count'] += 1
+            rollup['score_sum'] += score
+            rollup['score_min'] = min(rollup['score_min'], score)
+            rollup['score_max'] = max(rollup['score_max'], score)
+        else:
+            totals[group] = {**key, 'count': 1, 'score_sum': score, 'score_min': score, 'score_max': score}
+        histogram[group + (score_bucket(score),)] += 1
+        verdicts[group + (_verdict(verdict),)] += 1
+        evaluations += 1
+
+    for model in (EvaluationVerdictCount, EvaluationScoreBucket, EvaluationRollup):
+        db.query(model).delete()
+    db.bulk_insert_mappings(EvaluationRollup, list(totals.values()))
+    db.bulk_insert_mappings(EvaluationScoreBucket, [
+        {'user_id': user_id, 'job_id': job_id, 'day': day, 'bucket': bucket, 'count': count}
+        for (user_id, job_id, day, bucket), count in histogram.items()
+    ])
+    db.bulk_insert_mappings(EvaluationVerdictCount, [
+        {'user_id': user_id, 'job_id': job_id, 'day': day, 'verdict': verdict, 'count': count}
+        for (user_id, job_id, day, verdict), count in verdicts.items()
+    ])
+    db.commit()
+    logger.info(f"✅ Rebuilt {len(totals)} rollups from {evaluations} evaluations")
+    return {'evaluations': evaluations, 'rollups': len(totals), 'buckets': len(histogram), 'verdicts': len(verdicts)}
+
+
+# PostgreSQL advisory lock key serialising backfills across processes
+BACKFILL_LOCK_KEY = 0x726F6C6C
+
+
+def _rollups_missing(db) -> bool:
+    from src.storage.database import Evaluation, EvaluationRollup, EvaluationVerdictCount
+
+    if db.query(Evaluation.id).first() is None:
+        return False
+    return any(db.query(model.id).first() is None for model in (EvaluationRollup, EvaluationVerdictCount))
+
+
+def _lock_for_backfill(db):
+    """Take the database-wide write lock until the transaction ends"""
+    dialect = db.get_bind().dialect.name
+    if dialect == 'postgresql':
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': BACKFILL_LOCK_KEY})
+    elif dialect == 'sqlite':
+        db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def backfill_rollups(db) -> Optional[Dict[str, int]]:
+    """Build the rollups of a database whose evaluations predate them
+
+    Checks without a lock first, so the common case costs two indexed
+    lookups. Otherwise it takes the database lock and checks again: a
+    process that waited for another one's backfill finds nothing to do.
+
+    Returns:
+        Counts from ``rebuild_rollups``, or ``None`` if nothing was missing
+    """
+    if not _rollups_missing(db):
+        return None
+    _lock_for_backfill(db)
+    if not _rollups_missing(db):
+        db.rollback()
+        return None
+    return rebuild_rollups(db)
+
+
+def _filtered(query, model, user_id, job_id, since, until):
+    if user_id is not None:
+        query = query.filter(model.user_id == user_id)
+    if job_id is not None:
+        query = query.filter(model.job_id == job_id)
+    if since is not None:
+        query = query.filter(model.day >= since)
+    if until is not None:
+        query = query.filter(model.day <= until)
+    return query
+
+
+def _stats(count, total, minimum, maximum) -> Dict[str, Any]:
+    count = int(count or 0)
+    return {
+        'count': count,
+        'mean': round(total / count, 2) if count else None,
+        'min': minimum,
+        'max': maximum,
+    }
+
+
+def summarize(db, user_id: Optional[int] = None, job_id: Optional[str] = None,
+              since: Optional[date] = None, until: Optional[date] = None) -> Dict[str, Any]:
+    """Score statistics, histogram, daily series and per-job breakdown from the rollups
+
+    Args:
+        db: Session
+        user_id: Restrict to one user, or ``None`` for everyone
+        job_id: Restrict to one job
+        since: First UTC day to include
+        until: Last UTC day to include
+    """
+    from src.storage.database import EvaluationRollup as R, EvaluationScoreBucket as B
+
+    aggregates = (func.sum(R.count), func.sum(R.score_sum), func.min(R.score_min), func.max(R.score_max))
+    overall = _filtered(db.query(*aggregates), R, user_id, job_id, since, until).one()
+    daily = _filtered(db.query(R.day, *aggregates), R, user_id, job_id, since, until).group_by(R.day).order_by(R.day)
+    jobs = _filtered(db.query(R.job_id, *aggregates), R, user_id, job_id, since, until).group_by(R.job_id).order_by(R.job_id)
+    buckets = dict(_filtered(db.query(B.bucket, func.sum(B.count)), B, user_id, job_id, since, until).group_by(B.bucket))
+
+    return {
+        **_stats(*overall),
+        'histogram': [
+            {'bucket': label, 'lower': i * BUCKET_WIDTH, 'count': int(buckets.get(i, 0))}
+            for i, label in enumerate(bucket_labels())
+        ],
+        'daily': [{'day': day.isoformat(), **_stats(*row)} for day, *row in daily],
+        'jobs': [{'job_id': job, **_stats(*row)} for job, *row in jobs],
+    }
+
+
+def histogram_percentiles(counts, quantiles: Sequence[float], minimums=None, maximums=None) -> np.ndarray:
+    """Approximate quantiles of each row of a histogram matrix
+
+    Interpolates linearly within the bucket holding each quantile, for all
+    rows at once. Rows without counts give NaN. ``minimums``/``maximums``
+    (one per row) clamp the estimates to the observed range.
+    """
+    counts = np.atleast_2d(np.asarray(counts, dtype=float))
+    quantiles = np.asarray(quantiles, dtype=float)
+    cumulative = counts.cumsum(axis=1)
+    targets = cumulative[:, -1:] * quantiles[None, :]
+    # Index of the first bucket whose cumulative count reaches each target
+    index = (cumulative[:, None, :] < targets[:, :, None]).sum(axis=2).clip(max=counts.shape[1] - 1)
+    below = np.take_along_axis(cumulative - counts, index, axis=1)
+    within = np.take_along_axis(counts, index, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fraction = np.where(within > 0, (targets - below) / within, 0.0)
+    values = (index + fraction) * BUCKET_WIDTH
+    if minimums is not None:
+        values = np.maximum(values, np.asarray(minimums, dtype=float)[:, None])
+    if maximums is not None:
+        values = np.minimum(values, np.asarray(maximums, dtype=float)[:, None])
+    values[cumulative[:, -1] == 0] = np.nan
+    return values
+
+
+def _percentile_fields(values: np.ndarray) -> Dict[str, Optional[float]]:
+    return {
+        f"p{round(q * 100)}": None if np.isnan(value) else round(float(value), 2)
+        for q, value in zip(PERCENTILES, values)
+    }
+
+
+def score_distribution(db, user_id: Optional[int] = None, job_id: Optional[str] = None,
+                       since: Optional[date] = None, until: Optional[date] = None) -> Dict[str, Any]:
+    """Score statistics, approximate percentiles and histogram"""
+    from src.storage.database import EvaluationRollup as R, EvaluationScoreBucket as B
+
+    aggregates = (func.sum(R.count), func.sum(R.score_sum), func.min(R.score_min), func.max(R.score_max))
+    stats = _stats(*_filtered(db.query(*aggregates), R, user_id, job_id, since, until).one())
+    counts = np.zeros(HISTOGRAM_BUCKETS)
+    for bucket, count in _filtered(db.query(B.bucket, func.sum(B.count)), B, user_id, job_id, since, until).group_by(B.bucket):
+        counts[bucket] = count
+
+    percentiles = histogram_percentiles(counts, PERCENTILES, [stats['min'] or 0], [stats['max'] or 100])[0]
+    return {
+        **stats,
+        **_percentile_fields(percentiles),
+        'histogram': [
+            {'bucket': label, 'lower': i * BUCKET_WIDTH, 'count': int(counts[i])}
+            for i, label in enumerate(bucket_labels())
+        ],
+    }
+
+
+def verdict_breakdown(db, user_id: Optional[int] = None, job_id: Optional[str] = None,
+                      since: Optional[date] = None, until: Optional[date] = None) -> Dict[str, Any]:
+    """Count and share of each verdict, most frequent first"""
+    from src.storage.database import EvaluationVerdictCount as V
+
+    rows = _filtered(db.query(V.verdict, func.sum(V.count)), V, user_id, job_id, since, until).group_by(V.verdict).all()
+    total = sum(count for _, count in rows)
+    return {
+        'count': int(total),
+        'verdicts': [
+            {'verdict': verdict, 'count': int(count), 'share': round(count / total, 4)}
+            for verdict, count in sorted(rows, key=lambda row: (-row[1], row[0]))
+        ],
+    }
+
+
+def _period_start(day: date, interval: str) -> date:
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def score_trend(db, user_id: Optional[int] = None, job_id: Optional[str] = None,
+                since: Optional[date] = None, until: Optional[date] = None,
+                interval: str = 'day') -> Dict[str, Any]:
+    """Count, mean, min and max per day, ISO week (starting Monday) or month"""
+    from src.storage.database import EvaluationRollup as R
+
+    if interval not in TREND_INTERVALS:
+        raise ValueError(f"Unknown interval '{interval}', expected one of {TREND_INTERVALS}")
+    aggregates = (func.sum(R.count), func.sum(R.score_sum), func.min(R.score_min), func.max(R.score_max))
+    daily = _filtered(db.query(R.day, *aggregates), R, user_id, job_id, since, until).group_by(R.day).order_by(R.day)
+
+    periods = {}
+    for day, count, total, minimum, maximum in daily:
+        start = _period_start(day, interval)
+        if start in periods:
+            period = periods[start]
+            period[0] += count
+            period[1] += total
+            period[2] = min(period[2], minimum)
+            period[3] = max(period[3], maximum)
+        else:
+            periods[start] = [count, total, minimum, maximum]
+    return {
+        'interval': interval,
+        'points': [{'period': start.isoformat(), **_stats(*period)} for start, period in periods.items()],
+    }
+
+
+def job_comparison(db, user_id: Optional[int] = None, since: Optional[date] = None,
+                   until: Optional[date] = None, success_threshold: int = 70) -> Dict[str, Any]:
+    """Per-job statistics, median, success rate and verdict mix, best mean first"""
+    from src.storage.database import EvaluationRollup as R, EvaluationScoreBucket as B, EvaluationVerdictCount as V
+
+    aggregates = (func.sum(R.count), func.sum(R.score_sum), func.min(R.score_min), func.max(R.score_max))
+    rows = _filtered(db.query(R.job_id, *aggregates), R, user_id, None, since, until).group_by(R.job_id).all()
+    if not rows:
+        return {'success_threshold': success_threshold, 'jobs': []}
+    index = {row[0]: i for i, row in enumerate(rows)}
+
+    counts = np.zeros((len(rows), HISTOGRAM_BUCKETS))
+    buckets = _filtered(db.query(B.job_id, B.bucket, func.sum(B.count)), B, user_id, None, since, until)
+    for job, bucket, count in buckets.group_by(B.job_id, B.bucket):
+        counts[index[job], bucket] = count
+    verdicts = defaultdict(dict)
+    verdict_rows = _filtered(db.query(V.job_id, V.verdict, func.sum(V.count)), V, user_id, None, since, until)
+    for job, verdict, count in verdict_rows.group_by(V.job_id, V.verdict):
+        verdicts[job][verdict] = int(count)
+
+    minimums = np.array([row[3] for row in rows], dtype=float)
+    maximums = np.array([row[4] for row in rows], dtype=float)
+    medians = histogram_percentiles(counts, [0.5], minimums, maximums)[:, 0]
+    success = counts[:, success_threshold // BUCKET_WIDTH:].sum(axis=1) / counts.sum(axis=1)
+
+    jobs = [
+        {
+            'job_id': job,
+            **_stats(*aggregate),
+            'p50': round(float(medians[i]), 2),
+            'success_rate': round(float(success[i]), 4),
+            'verdicts': verdicts.get(job, {}),
+        }
+        for i, (job, *aggregate) in enumerate(rows)
+    ]
+    jobs.sort(key=lambda job: (-job['mean'], job['job_id']))
+    return {'success_threshold': success_threshold, 'jobs': jobs}
+
+
+class ScoreRollup:
+    """Count, sum, min, max and histogram of a score, updated one value at a time"""
+
+    __slots__ = ('count', 'total', 'minimum', 'maximum', 'buckets')
+
+    def __init__(self, scores: Iterable[float] = ()):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+        for score in scores:
+            self.add(score)
+
+    def add(self, score: float) -> None:
+        score = float(score)
+        self.count += 1
+        self.total += score
+        self.minimum = score if self.minimum is None else min(self.minimum, score)
+        self.maximum = score if self.maximum is None else max(self.maximum, score)
+        self.buckets[score_bucket(score)] += 1
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def share_at_least(self, threshold: int) -> float:
+        """Fraction of scores >= ``threshold``, a multiple of ``BUCKET_WIDTH``"""
+        if not self.count:
+            return 0.0
+        return sum(self.buckets[threshold // BUCKET_WIDTH:]) / self.count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **_stats(self.count, self.total, self.minimum, self.maximum),
+            'histogram': dict(zip(bucket_labels(), self.buckets)),
+        }
+
+
+__all__ = [
+    'record_evaluation', 'rebuild_rollups', 'backfill_rollups', 'summarize', 'score_distribution', 'verdict_breakdown', 'score_trend',
+    'job_comparison', 'histogram_percentiles', 'ScoreRollup', 'score_bucket', 'bucket_labels',
+    'BUCKET_WIDTH', 'HISTOGRAM_BUCKETS', 'PERCENTILES', 'TREND_INTERVALS', 'ANONYMOUS_USER_ID', 'UNKNOWN_JOB_ID',
+    'UNKNOWN_VERDICT'
+]
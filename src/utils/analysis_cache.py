@@ -0,0 +1,135 @@
+"""
+Bounded in-process cache for document extraction and scoring results.
+
+The Streamlit front ends rerun the whole script on every widget interaction,
+so PDF parsing and TF-IDF fitting would otherwise be repeated for documents
+that have not changed. Entries are keyed by a content hash of the inputs plus
+the analysis options, and the cache reports whether a value was served from
+cache so the UI can show it.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple, Union
+
+from src.utils.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 128
+
+
+def content_hash(data: Union[bytes, str, None]) -> str:
+    """Return a stable SHA-256 hex digest for file bytes or extracted text."""
+    if data is None:
+        data = b""
+    if isinstance(data, str):
+        data = data.encode("utf-8", errors="surrogatepass")
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_cache_key(namespace: str, *parts: Any, **options: Any) -> str:
+    """Build a cache key from a namespace, content hashes and analysis options.
+
+    Options are serialised with sorted keys so that the same settings always
+    produce the same key regardless of argument order.
+    """
+    payload = json.dumps(
+        {"parts": [str(part) for part in parts], "options": options},
+        sort_keys=True,
+        default=str,
+    )
+    return f"{namespace}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class AnalysisCache:
+    """Thread-safe LRU cache with hit/miss accounting"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, name: str = "analysis"):
+        """Initialize the cache
+
+        Args:
+            max_entries: Maximum number of entries kept before the least
+                recently used one is evicted
+            name: Cache label used in the hit/miss metrics
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.name = name
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return the cached value for ``key`` or compute and store it
+
+        Args:
+            key: Cache key, usually built with ``make_cache_key``
+            compute: Zero-argument callable producing the value on a miss
+
+        Returns:
+            Tuple of (value, served_from_cache). ``None`` results are not
+            cached so that failed extractions are retried on the next rerun.
+        """
+        value, hit = self.lookup(key)
+        if hit:
+            return value, True
+
+        # Compute outside the lock so slow parsing does not block other sessions
+        value = compute()
+        self.store(key, value)
+        return value, False
+
+    def lookup(self, key: str) -> Tuple[Any, bool]:
+        """Return ``(value, True)`` for a cached key, else ``(None, False)``
+
+        Lets callers check several keys first and compute the misses together.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                record_cache_lookup(self.name, True, self.hits, self.misses)
+                return self._entries[key], True
+            self.misses += 1
+            record_cache_lookup(self.name, False, self.hits, self.misses)
+            return None, False
+
+    def store(self, key: str, value: Any):
+        """Cache a computed value, evicting the least recently used entries"""
+        if value is None:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                logger.debug(f"Evicted {self.name} cache entry: {evicted_key}")
+
+    def clear(self):
+        """Drop all cached entries and reset statistics"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit ratio for display"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / total) if total else 0.0,
+            }
+
+
+__all__ = ['AnalysisCache', 'content_hash', 'make_cache_key', 'DEFAULT_MAX_ENTRIES']
@@ -0,0 +1,218 @@
+"""
+Length-bucketed batching and request coalescing for embedding inference.
+
+Transformer encoders pad every sequence in a batch to the longest one, so a
+batch mixing one-line skills with ten-page resumes spends most of its compute
+on padding. ``plan_buckets`` sorts inputs by estimated token length and packs
+them into buckets whose padded size (``batch size x longest sequence``) stays
+under a token budget, and ``run_bucketed`` encodes each bucket and restores
+the caller's order.
+
+``MicroBatcher`` coalesces single-item requests made concurrently from
+different threads (API workers, thread pools) into one batch, waiting at most
+``max_wait_ms`` after the first item before running it. Threads do not
+survive ``fork``, so batchers created in a pre-forking master start a fresh
+worker thread and queue in each child.
+"""
+
+import logging
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from queue import Empty, Queue
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+
+from src.utils.metrics import QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 8192  # 32 sequences at MiniLM's 256-token limit
+DEFAULT_MAX_BATCH_SIZE = 64
+CHARS_PER_TOKEN = 4  # English wordpiece average, close enough for ordering
+
+
+def estimate_token_count(text: str, max_seq_length: Optional[int] = None) -> int:
+    """Cheap wordpiece estimate including the [CLS]/[SEP] tokens
+
+    Only used to order and pack inputs, so it avoids tokenizing twice.
+    """
+    tokens = len(text) // CHARS_PER_TOKEN + 2
+    return min(tokens, max_seq_length) if max_seq_length else tokens
+
+
+def plan_buckets(lengths: Sequence[int], token_budget: int = DEFAULT_TOKEN_BUDGET,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE) -> List[List[int]]:
+    """Group input indices into batches of similar length
+
+    Args:
+        lengths: Token length of each input
+        token_budget: Maximum padded tokens (batch size x longest input) per batch
+        max_batch_size: Maximum inputs per batch
+
+    Returns:
+        Lists of input indices, shortest inputs first; every index appears once
+    """
+    order = sorted(range(len(lengths)), key=lambda index: lengths[index])
+    buckets: List[List[int]] = []
+    current: List[int] = []
+    for index in order:
+        # Inputs arrive in ascending length, so this one sets the padded width
+        width = max(lengths[index], 1)
+        if current and (len(current) >= max_batch_size or (len(current) + 1) * width > token_budget):
+            buckets.append(current)
+            current = []
+        current.append(index)
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+def run_bucketed(encode: Callable[[List[str]], Any], texts: Sequence[str],
+                 token_budget: int = DEFAULT_TOKEN_BUDGET,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_seq_length: Optional[int] = None) -> np.ndarray:
+    """Encode texts bucket by bucket and return rows in the input order
+
+    Args:
+        encode: Function embedding a list of texts into an ``(n, dim)`` array
+        texts: Texts to embed
+        token_budget: Maximum padded tokens per call to ``encode``
+        max_batch_size: Maximum texts per call to ``encode``
+        max_seq_length: Model truncation length, caps the length estimates
+
+    Returns:
+        Array of shape ``(len(texts), dim)``
+    """
+    texts = list(texts)
+    if not texts:
+        return np.asarray(encode([]))
+
+    lengths = [estimate_token_count(text, max_seq_length) for text in texts]
+    result = None
+    for bucket in plan_buckets(lengths, token_budget, max_batch_size):
+        embeddings = np.asarray(encode([texts[index] for index in bucket]))
+        if result is None:
+            result = np.empty((len(texts), embeddings.shape[1]), dtype=embeddings.dtype)
+        result[bucket] = embeddings
+    return result
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-item calls into batched calls
+
+    ``encode_batch`` receives a list of items and must return one result per
+    item in the same order. A worker thread takes the first queued item, then
+    keeps collecting until ``max_batch_size`` items are queued or
+    ``max_wait_ms`` has passed, and runs them as one batch.
+    """
+
+    def __init__(self, encode_batch: Callable[[List[Any]], Sequence[Any]],
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait_ms: float = 2.0,
+                 name: str = "embeddings"):
+        self.encode_batch = encode_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._queue: Queue = Queue()
+        self._depth = QUEUE_DEPTH.labels(f"microbatch_{name}")
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        _batchers.add(self)
+
+    def _after_fork(self):
+        """Drop the parent's worker thread, queue and lock in a forked child"""
+        self._queue = Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def submit(self, item: Any) -> Future:
+        """Queue one item and return a future for its result"""
+        if self._closed:
+            raise RuntimeError(f"MicroBatcher '{self.name}' is closed")
+        self._ensure_worker()
+        future: Future = Future()
+        self._depth.inc()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Submit an item and block until its batch has run"""
+        return self.submit(item).result(timeout)
+
+    def close(self):
+        """Stop the worker after the queued items have run"""
+        self._closed = True
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name=f"microbatch-{self.name}", daemon=True
+                    )
+                    self._worker.start()
+
+    def _collect(self, first) -> List:
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except Empty:
+                break
+            if entry is None:
+                # Close requested: finish this batch, then let the loop exit
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            items = [item for item, _ in batch]
+            try:
+                results = self.encode_batch(items)
+                if len(results) != len(items):
+                    raise ValueError(f"encode_batch returned {len(results)} results for {len(items)} items")
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"Micro-batch of {len(items)} items failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                self._depth.dec(len(batch))
+
+
+# Live batchers, reset in forked children (see MicroBatcher._after_fork)
+_batchers: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def _reset_batchers_after_fork():
+    for batcher in list(_batchers):
+        batcher._after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_batchers_after_fork)
+
+
+__all__ = [
+    'estimate_token_count', 'plan_buckets', 'run_bucketed', 'MicroBatcher',
+    'DEFAULT_TOKEN_BUDGET', 'DEFAULT_MAX_BATCH_SIZE'
+]
@@ -1,8 +1,13 @@
 import numpy as np
 from typing import List, Union, Optional
 import logging
+import os
+import time
 from functools import lru_cache
 
+from src.utils.batching import DEFAULT_MAX_BATCH_SIZE, DEFAULT_TOKEN_BUDGET, MicroBatcher, run_bucketed
+from src.utils.metrics import record_cache_lookup, record_fallback, record_model_load, timed
+
 try:
     from sentence_transformers import SentenceTransformer
     from sklearn.metrics.pairwise import cosine_similarity
@@ -11,24 +16,83 @@ except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
     logging.warning("sentence-transformers not available. Using fallback embeddings.")
 
+# "torch" runs the SentenceTransformer in fp32; "onnx" runs the same model
+# exported to ONNX with int8 weights (see src/utils/onnx_embeddings.py);
+# "remote" asks the inference sidecar at INFERENCE_SOCKET (src/inference)
+EMBEDDING_BACKENDS = ('torch', 'onnx', 'remote')
+DEFAULT_EMBEDDING_BACKEND = 'torch'
+MAX_SEQ_LENGTH = 256  # MiniLM truncation length
+
 class EmbeddingManager:
     """Advanced embedding manager using Sentence Transformers for better semantic understanding"""
     
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', backend: Optional[str] = None):
         """Initialize the embedding manager with a pre-trained model
         
         Args:
             model_name: Name of the sentence transformer model to use
+            backend: "torch", "onnx" or "remote"; defaults to the
+                EMBEDDING_BACKEND environment variable, then "remote" when
+                INFERENCE_SOCKET is set, then "torch"
         """
         self.model_name = model_name
+        default_backend = 'remote' if os.getenv('INFERENCE_SOCKET') else DEFAULT_EMBEDDING_BACKEND
+        self.backend = (backend or os.getenv('EMBEDDING_BACKEND', default_backend)).lower()
+        if self.backend not in EMBEDDING_BACKENDS:
+            logging.warning(f"Unknown embedding backend '{self.backend}', using {DEFAULT_EMBEDDING_BACKEND}")
+            self.backend = DEFAULT_EMBEDDING_BACKEND
+        # Padded tokens per forward pass, and how long a single-text request
+        # waits for concurrent ones to share its batch (0 disables coalescing)
+        self.token_budget = int(os.getenv('EMBEDDING_TOKEN_BUDGET', DEFAULT_TOKEN_BUDGET))
+        self.max_batch_size = int(os.getenv('EMBEDDING_MAX_BATCH_SIZE', DEFAULT_MAX_BATCH_SIZE))
+        self.max_wait_ms = float(os.getenv('EMBEDDING_MAX_WAIT_MS', '2'))
         self._model = None
+        self._batcher = None
         self._load_model()
+        if self._model is not None and self.max_wait_ms > 0:
+            self._batcher = MicroBatcher(self._encode_batch, self.max_batch_size, self.max_wait_ms)
     
     def _load_model(self):
         """Load the sentence transformer model"""
+        if self.backend == 'remote':
+            from src.inference.client import InferenceError, RemoteEmbeddingModel, get_inference_client
+            client = get_inference_client()
+            try:
+                if client is None:
+                    raise InferenceError("INFERENCE_SOCKET is not set")
+                models = client.ping()
+                if models.get('embeddings') is None:
+                    raise InferenceError("the sidecar has no embedding model")
+                self.model_name = models['embeddings']
+                self._model = RemoteEmbeddingModel(client)
+                logging.info(f"Using embedding model {self.model_name} from the inference sidecar")
+                return
+            except InferenceError as e:
+                logging.error(f"Inference sidecar unavailable, loading the model locally: {e}")
+                record_fallback('remote', 'torch')
+                self.backend = 'torch'
+        
+        if self.backend == 'onnx':
+            try:
+                from src.utils.onnx_embeddings import OnnxEmbeddingModel
+                self._model = OnnxEmbeddingModel(self.model_name)
+                logging.info(f"Loaded int8 ONNX embedding model: {self.model_name}")
+                return
+            except Exception as e:
+                logging.error(f"Failed to load ONNX model {self.model_name}, falling back to torch: {e}")
+                record_fallback('onnx', 'torch')
+                self.backend = 'torch'
+        
         if SENTENCE_TRANSFORMERS_AVAILABLE:
             try:
+                start = time.perf_counter()
+                threads = os.getenv('TORCH_NUM_THREADS')
+                if threads:
+                    # Intra-op threads chosen by the launcher's topology plan
+                    import torch
+                    torch.set_num_threads(int(threads))
                 self._model = SentenceTransformer(self.model_name)
+                record_model_load(self.model_name, time.perf_counter() - start)
                 logging.info(f"Loaded sentence transformer model: {self.model_name}")
             except Exception as e:
                 logging.error(f"Failed to load model {self.model_name}: {e}")
@@ -36,7 +100,6 @@ class EmbeddingManager:
         else:
             logging.warning("Sentence transformers not available, using TF-IDF fallback")
     
-    @lru_cache(maxsize=128)
     def create_embeddings(self, text: str) -> np.ndarray:
         """Create embeddings from input text
         
@@ -46,14 +109,25 @@ class EmbeddingManager:
         Returns:
             numpy array containing the embeddings
         """
+        hits_before = self._cached_embeddings.cache_info().hits
+        embeddings = self._cached_embeddings(text)
+        info = self._cached_embeddings.cache_info()
+        record_cache_lookup('embeddings', info.hits > hits_before, info.hits, info.misses)
+        return embeddings
+    
+    @lru_cache(maxsize=128)
+    def _cached_embeddings(self, text: str) -> np.ndarray:
+        """Memoized embedding of one text"""
         if not text or not text.strip():
             return np.zeros(384)  # Default embedding size for MiniLM
         
         if self._model is not None:
             try:
-                # Use sentence transformers for high-quality embeddings
-                embeddings = self._model.encode(text.strip(), normalize_embeddings=True)
-                return embeddings
+                # Use sentence transformers for high-quality embeddings; texts
+                # requested concurrently from other threads share one batch
+                if self._batcher is not None:
+                    return self._batcher(text.strip())
+                return self._encode_batch([text.strip()])[0]
             except Exception as e:
                 logging.error(f"Error creating embeddings: {e}")
                 return self._fallback_embeddings(text)
@@ -73,19 +147,39 @@ class EmbeddingManager:
             # Ultimate fallback - zeros
             return np.zeros(384)
     
-    def create_batch_embeddings(self, texts: List[str]) -> np.ndarray:
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in length-sorted buckets, returning rows in input order"""
+        max_seq_length = getattr(self._model, 'max_seq_length', None) or MAX_SEQ_LENGTH
+        return run_bucketed(
+            lambda bucket: self._model.encode(bucket, batch_size=len(bucket) or 1, normalize_embeddings=True),
+            texts, self.token_budget, self.max_batch_size, max_seq_length
+        )
+    
+    @timed('batch_embeddings')
+    def create_batch_embeddings(self, texts: List[str], coalesce: bool = True) -> np.ndarray:
         """Create embeddings for multiple texts efficiently
         
+        Texts are sorted by length and packed into batches under the token
+        budget, so short texts are not padded to the longest document. Up
+        to ``max_batch_size`` texts (one document's chunks or requirements)
+        go through the micro-batcher, so documents scored concurrently in
+        other threads share a forward pass; longer lists are bulk work and
+        are encoded directly.
+        
         Args:
             texts: List of texts to create embeddings for
+            coalesce: Allow sharing batches with other threads; callers that
+                batch themselves (the inference sidecar) turn it off
             
         Returns:
             numpy array with shape (n_texts, embedding_dim)
         """
         if self._model is not None:
             try:
-                embeddings = self._model.encode(texts, normalize_embeddings=True)
-                return embeddings
+                if coalesce and self._batcher is not None and 0 < len(texts) <= self.max_batch_size:
+                    futures = [self._batcher.submit(text) for text in texts]
+                    return np.vstack([future.result() for future in futures])
+                return self._encode_batch(texts)
             except Exception as e:
                 logging.error(f"Error creating batch embeddings: {e}")
                 return np.array([self._fallback_embeddings(text) for text in texts])
@@ -174,6 +268,6 @@ def normalize_embeddings(embeddings: np.ndarray) -> np.ndarray:
 
 # Export all functions
 __all__ = [
-    'EmbeddingManager', 'get_embedding_manager', 
+    'EmbeddingManager', 'get_embedding_manager', 'EMBEDDING_BACKENDS',
     'create_embeddings', 'compare_embeddings', 'normalize_embeddings'
 ]
\ No newline at end of file
@@ -0,0 +1,440 @@
+"""
+Text extraction service with a process pool and a persistent cache.
+
+PyPDF2 parsing is the CPU hog of the bulk flows, and the same archive files
+were parsed again on every run. ``ExtractionService``:
+
+- hashes each file and looks the SHA-256 up in a SQLite table keyed by
+  ``(file hash, PARSER_VERSION)``, so a second pass over an archive costs
+  one read per file. ``PARSER_VERSION`` combines ``EXTRACTOR_REVISION`` with
+  the installed PyPDF2 and python-docx versions: upgrading a parser, or
+  bumping the revision after changing ``src.utils.text_extraction``, makes
+  the old entries miss, and ``prune`` deletes them;
+- parses the misses of bulk runs in a process pool of ``PROCESS_POOL_SIZE``
+  workers. Workers are started with ``spawn`` rather than forked from a
+  process that may hold model threads. Each file gets ``timeout`` seconds,
+  enforced by a timer signal inside the worker, so a pathological PDF fails
+  on its own instead of occupying a worker indefinitely. Single files
+  (uploads to the API and dashboards) go through ``get_extraction_service``,
+  which parses in the calling process: one pool per API worker or front end
+  would exceed the topology's CPU budget of ``PROCESS_POOL_SIZE``
+  extraction processes, and one file does not repay spawn and IPC costs.
+  Off the main thread (API threadpool, Streamlit script threads) the timer
+  signal is unavailable, so the parse runs on a small thread pool and the
+  caller stops waiting at the deadline; the abandoned parse finishes in the
+  background and its result is dropped;
+- records parse failures too, so files known to be broken are not parsed
+  again on every pass unless ``retry_failed`` is set. Timeouts and crashed
+  workers are not recorded, since they may not recur. Plain-text files are
+  read directly and never cached.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.utils.analysis_cache import content_hash
+from src.utils.metrics import record_cache_lookup
+from src.utils.text_extraction import extract_text
+
+logger = logging.getLogger(__name__)
+
+# Bump when the extraction code changes its output
+EXTRACTOR_REVISION = 1
+DEFAULT_CACHE_PATH = ".cache/extraction.sqlite3"
+DEFAULT_TIMEOUT = 60.0
+TEXT_EXTENSIONS = ('.txt',)
+# Cache writes are batched so an interrupted bulk run keeps most of its work
+FLUSH_EVERY = 100
+# Host parameters per SQLite statement stay below the historical limit of 999
+QUERY_CHUNK = 500
+# Threads running in-process parses that need a deadline off the main thread
+DEFAULT_DEADLINE_THREADS = 4
+
+
+def _package_version(module_name: str) -> str:
+    try:
+        from importlib.metadata import version
+        return version(module_name)
+    except Exception:
+        return "unknown"
+
+
+PARSER_VERSION = (
+    f"r{EXTRACTOR_REVISION}-pypdf2-{_package_version('PyPDF2')}-docx-{_package_version('python-docx')}"
+)
+
+
+class ExtractionError(ValueError):
+    """A file could not be turned into text"""
+
+
+class _ExtractionTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise _ExtractionTimeout()
+
+
+def _timer_available() -> bool:
+    """SIGALRM timers can only be handled in the main thread, on platforms with ``setitimer``"""
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+
+def _timeout_error(timeout: float) -> Tuple[None, str, bool]:
+    return None, f"Timed out after {timeout:g}s", False
+
+
+def _extract_file(path: str, timeout: Optional[float]) -> Tuple[Optional[str], Optional[str], bool]:
+    """Pool task returning ``(text, error, cacheable)`` for one file; never raises
+
+    Timeouts depend on the load of the machine, so they are not cacheable.
+
+    The timer is a SIGALRM interval timer, so it only applies where
+    ``_timer_available``: always the case in pool workers. Other callers
+    enforce the deadline themselves (``ExtractionService._extract_here``).
+    """
+    use_timer = bool(timeout) and _timer_available()
+    if use_timer:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return extract_text(path), None, True
+    except _ExtractionTimeout:
+        return _timeout_error(timeout)
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}", True
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file's bytes"""
+    with open(path, 'rb') as f:
+        return content_hash(f.read())
+
+
+class ExtractionCache:
+    """SQLite table of extracted text keyed by file hash and parser version"""
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        # WAL lets several processes read while one writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            " file_hash TEXT NOT NULL, parser_version TEXT NOT NULL,"
+            " text BLOB, error TEXT, created_at REAL NOT NULL,"
+            " PRIMARY KEY (file_hash, parser_version))"
+        )
+        self._conn.commit()
+
+    def get_many(self, hashes: Iterable[str], parser_version: str) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """``(text, error)`` for every hash cached under ``parser_version``"""
+        hashes = list(hashes)
+        found: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        with self._lock:
+            for start in range(0, len(hashes), QUERY_CHUNK):
+                chunk = hashes[start:start + QUERY_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT file_hash, text, error FROM extractions WHERE parser_version = ?"
+                    f" AND file_hash IN ({','.join('?' * len(chunk))})",
+                    [parser_version, *chunk],
+                )
+                for digest, text, error in rows:
+                    found[digest] = (zlib.decompress(text).decode('utf-8') if text is not None else None, error)
+        return found
+
+    def put_many(self, entries: Sequence[Tuple[str, Optional[str], Optional[str]]], parser_version: str):
+        """Store ``(hash, text, error)`` entries"""
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?, ?)",
+                [
+                    (digest, parser_version,
+                     zlib.compress(text.encode('utf-8')) if text is not None else None, error, now)
+                    for digest, text, error in entries
+                ],
+            )
+            self._conn.commit()
+
+    def prune(self, parser_version: str) -> int:
+        """Delete entries written by any other parser version"""
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM extractions WHERE parser_version != ?", (parser_version,)
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def default_cache_path() -> Optional[str]:
+    """``EXTRACTION_CACHE_PATH``, or ``None`` when it is set to an empty string"""
+    return os.getenv('EXTRACTION_CACHE_PATH', DEFAULT_CACHE_PATH) or None
+
+
+def default_pool_size() -> int:
+    """Extraction processes from the hardware topology (``PROCESS_POOL_SIZE``)"""
+    from src.utils.topology import plan_topology
+    return plan_topology().process_pool_size
+
+
+class ExtractionService:
+    """Cached, pooled PDF/DOCX text extraction"""
+
+    def __init__(self, cache_path: Optional[str] = DEFAULT_CACHE_PATH, workers: Optional[int] = None,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT, parser_version: str = PARSER_VERSION):
+        """Configure the service; the pool is started on first use
+
+        Args:
+            cache_path: SQLite file of the persistent cache, ``None`` to disable it
+            workers: Pool processes, ``0`` to parse in this process; defaults
+                to ``default_pool_size()``
+            timeout: Seconds allowed per file, ``None`` for no limit
+            parser_version: Cache namespace, defaults to ``PARSER_VERSION``
+        """
+        self.cache = ExtractionCache(cache_path) if cache_path else None
+        self.workers = default_pool_size() if workers is None else max(0, int(workers))
+        self.timeout = timeout
+        self.parser_version = parser_version
+        self.hits = 0
+        self.misses = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._deadline_pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+
+    def _reset_pool(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _deadline_executor(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._deadline_pool is None:
+                self._deadline_pool = ThreadPoolExecutor(
+                    max_workers=DEFAULT_DEADLINE_THREADS, thread_name_prefix="extraction"
+                )
+            return self._deadline_pool
+
+    def _extract_here(self, path: str) -> Tuple[Optional[str], Optional[str], bool]:
+        """Parse in this process, with the timeout enforced from any thread
+
+        A Python thread cannot be interrupted, so off the main thread the
+        caller waits on a future for at most ``timeout`` seconds (queueing
+        included). A parse that overruns keeps its thread until it returns.
+        """
+        if not self.timeout or _timer_available():
+            return _extract_file(path, self.timeout)
+        future = self._deadline_executor().submit(_extract_file, path, None)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            return _timeout_error(self.timeout)
+
+    def _parse(self, jobs: Dict[str, str]) -> Iterator[Tuple[str, Optional[str], Optional[str], bool]]:
+        """Yield ``(hash, text, error, cacheable)`` for each ``hash -> path`` job as it finishes"""
+        if self.workers == 0:
+            for digest, path in jobs.items():
+                yield (digest, *self._extract_here(path))
+            return
+
+        pool = self._executor()
+        futures = {pool.submit(_extract_file, path, self.timeout): digest for digest, path in jobs.items()}
+        for future in as_completed(futures):
+            try:
+                yield (futures[future], *future.result())
+            except BrokenProcessPool as e:
+                # A worker died (e.g. out of memory); the next call starts a new pool
+                self._reset_pool()
+                yield futures[future], None, f"Extraction worker crashed: {e}", False
+
+    def _count(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        record_cache_lookup("extraction", hit, self.hits, self.misses)
+
+    def extract_many(self, paths: Sequence[str], retry_failed: bool = False,
+                     progress: Optional[Callable[[int], None]] = None) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Extract every file, serving unchanged files from the cache
+
+        Args:
+            paths: Files to extract
+            retry_failed: Parse files whose cached extraction failed again
+            progress: Called with the number of files finished, as they finish
+
+        Returns:
+            Tuple of (text by path, error message by path)
+        """
+        texts: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        advance = progress or (lambda count: None)
+
+        def settle(path: str, text: Optional[str], error: Optional[str]):
+            if error is None:
+                texts[path] = text
+            else:
+                errors[path] = error
+            advance(1)
+
+        hashes: Dict[str, str] = {}
+        for path in paths:
+            try:
+                if path.lower().endswith(TEXT_EXTENSIONS):
+                    with open(path, encoding='utf-8', errors='replace') as f:
+                        settle(path, f.read(), None)
+                else:
+                    hashes[path] = file_hash(path)
+            except OSError as e:
+                settle(path, None, f"{type(e).__name__}: {e}")
+
+        cached = self.cache.get_many(set(hashes.values()), self.parser_version) if self.cache is not None else {}
+        pending: Dict[str, List[str]] = {}
+        for path, digest in hashes.items():
+            entry = cached.get(digest)
+            if entry is not None and (entry[1] is None or not retry_failed):
+                self._count(True)
+                settle(path, *entry)
+            else:
+                self._count(False)
+                pending.setdefault(digest, []).append(path)
+
+        fresh: List[Tuple[str, Optional[str], Optional[str]]] = []
+        for digest, text, error, cacheable in self._parse({digest: group[0] for digest, group in pending.items()}):
+            for path in pending[digest]:
+                settle(path, text, error)
+            if cacheable:
+                fresh.append((digest, text, error))
+            if self.cache is not None and len(fresh) >= FLUSH_EVERY:
+                self.cache.put_many(fresh, self.parser_version)
+                fresh = []
+        if self.cache is not None:
+            self.cache.put_many(fresh, self.parser_version)
+
+        for path, error in errors.items():
+            logger.warning(f"⚠️ Could not extract {path}: {error}")
+        return texts, errors
+
+    def extract(self, path: str) -> str:
+        """Text of one file
+
+        Raises:
+            ExtractionError: The file could not be read or parsed
+        """
+        texts, errors = self.extract_many([path])
+        if path in errors:
+            raise ExtractionError(errors[path])
+        return texts[path]
+
+    def extract_bytes(self, data: bytes, filename: str) -> str:
+        """Text of uploaded file content; ``filename`` supplies the format
+
+        Raises:
+            ExtractionError: The content could not be parsed
+        """
+        suffix = os.path.splitext(filename or '')[1].lower() or '.tmp'
+        if suffix in TEXT_EXTENSIONS:
+            return data.decode('utf-8', errors='replace')
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+            tmp_file.write(data)
+        try:
+            return self.extract(tmp_file.name)
+        finally:
+            os.unlink(tmp_file.name)
+
+    def prune(self) -> int:
+        """Drop cache entries of other parser versions"""
+        if self.cache is None:
+            return 0
+        deleted = self.cache.prune(self.parser_version)
+        if deleted:
+            logger.info(f"🧹 Pruned {deleted} extraction cache entries from older parser versions")
+        return deleted
+
+    def stats(self) -> Dict[str, object]:
+        total = self.hits + self.misses
+        return {
+            'parser_version': self.parser_version,
+            'cached_files': len(self.cache) if self.cache is not None else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': (self.hits / total) if total else 0.0,
+            'workers': self.workers,
+        }
+
+    def close(self):
+        """Stop the pools and close the cache"""
+        self._reset_pool()
+        with self._pool_lock:
+            if self._deadline_pool is not None:
+                self._deadline_pool.shutdown(wait=False, cancel_futures=True)
+                self._deadline_pool = None
+        if self.cache is not None:
+            self.cache.close()
+
+
+# Global extraction service instance
+_extraction_service = None
+
+
+def get_extraction_service() -> ExtractionService:
+    """Get or create the global extraction service for single files
+
+    Files are parsed in-process (still through the persistent cache); bulk
+    runs build their own pooled ``ExtractionService``. Configured by
+    ``EXTRACTION_CACHE_PATH`` and ``EXTRACTION_TIMEOUT`` (seconds, ``0`` for
+    no limit).
+    """
+    global _extraction_service
+    if _extraction_service is None:
+        _extraction_service = ExtractionService(
+            cache_path=default_cache_path(), workers=0,
+            timeout=float(os.getenv('EXTRACTION_TIMEOUT', DEFAULT_TIMEOUT)) or None,
+        )
+        _extraction_service.prune()
+    return _extraction_service
+
+
+__all__ = [
+    'ExtractionService', 'ExtractionCache', 'ExtractionError', 'get_extraction_service',
+    'file_hash', 'default_cache_path', 'default_pool_size', 'PARSER_VERSION', 'EXTRACTOR_REVISION'
+]
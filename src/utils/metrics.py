@@ -0,0 +1,226 @@
+"""
+Prometheus metrics for the scoring pipeline.
+
+Stage and backend latencies are recorded with the ``timed`` and
+``timed_backend`` decorators, which resolve their labelled histogram child
+once at decoration time so the per-call cost is two ``perf_counter`` calls
+and one observation. Backend fallbacks, cache lookups, model load times and
+queue depths have small helper functions so call sites stay one line.
+
+While a request trace is active (see ``src.utils.tracing``) the same
+decorators and ``stage_timer`` also open child spans, and fallbacks and
+cache lookups are attached to the current span as events.
+
+When ``prometheus_client`` is not installed every metric is a no-op and
+``render_metrics`` returns an explanatory comment. With several worker
+processes, set ``PROMETHEUS_MULTIPROC_DIR`` and ``/metrics`` aggregates the
+samples of all workers.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.utils.tracing import add_event, is_tracing, span, start_span
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+    )
+    from prometheus_client import multiprocess
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+    logger.warning("prometheus-client not available. Metrics are disabled.")
+
+# Scoring stages range from microseconds (verdict) to seconds (LLM backends)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _NoopMetric:
+    """Stand-in used when prometheus_client is missing"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+
+if PROMETHEUS_AVAILABLE:
+    STAGE_LATENCY = Histogram(
+        'resume_stage_duration_seconds', 'Latency of pipeline stages',
+        ['stage'], buckets=LATENCY_BUCKETS
+    )
+    BACKEND_LATENCY = Histogram(
+        'resume_semantic_backend_duration_seconds', 'Latency of each semantic similarity backend',
+        ['backend'], buckets=LATENCY_BUCKETS
+    )
+    BACKEND_FALLBACKS = Counter(
+        'resume_semantic_backend_fallbacks_total', 'Semantic backend calls that fell back to another backend',
+        ['from_backend', 'to_backend']
+    )
+    CACHE_REQUESTS = Counter(
+        'resume_cache_requests_total', 'Cache lookups by result', ['cache', 'result']
+    )
+    CACHE_HIT_RATIO = Gauge(
+        'resume_cache_hit_ratio', 'Hit ratio of a cache since process start', ['cache'],
+        multiprocess_mode='max'
+    )
+    MODEL_LOAD_SECONDS = Gauge(
+        'resume_model_load_seconds', 'Time taken to load a model', ['model'],
+        multiprocess_mode='max'
+    )
+    QUEUE_DEPTH = Gauge(
+        'resume_queue_depth', 'Work items currently queued or in flight', ['queue'],
+        multiprocess_mode='livesum'
+    )
+else:
+    STAGE_LATENCY = BACKEND_LATENCY = BACKEND_FALLBACKS = _NoopMetric()
+    CACHE_REQUESTS = CACHE_HIT_RATIO = MODEL_LOAD_SECONDS = QUEUE_DEPTH = _NoopMetric()
+
+
+def _text_length(arg: Any) -> Optional[int]:
+    if isinstance(arg, str):
+        return len(arg)
+    if isinstance(arg, dict) and 'raw_text' in arg:
+        return len(arg.get('raw_text') or '')
+    text = getattr(arg, 'text', None)  # NormalizedDocument / DocumentAnalysis
+    return len(text) if isinstance(text, str) else None
+
+
+def _input_lengths(args: tuple) -> Dict[str, Any]:
+    """Span attribute with the length of each text argument"""
+    lengths = [length for length in map(_text_length, args) if length is not None]
+    return {'input_lengths': lengths} if lengths else {}
+
+
+def _timed(metric, name: str) -> Callable:
+    """Decorator observing the wall time of sync or async calls into ``metric``"""
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                traced = start_span(name, _input_lengths(args)) if is_tracing() else None
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    metric.observe(time.perf_counter() - start)
+                    if traced is not None:
+                        traced.end()
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            traced = start_span(name, _input_lengths(args)) if is_tracing() else None
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metric.observe(time.perf_counter() - start)
+                if traced is not None:
+                    traced.end()
+        return wrapper
+    return decorator
+
+
+def timed(stage: str) -> Callable:
+    """Record the latency of a pipeline stage (parsing, scoring, storage)"""
+    return _timed(STAGE_LATENCY.labels(stage), stage)
+
+
+def timed_backend(backend: str) -> Callable:
+    """Record the latency of one semantic similarity backend"""
+    return _timed(BACKEND_LATENCY.labels(backend), f"backend.{backend}")
+
+
+@contextmanager
+def stage_timer(stage: str, **attributes):
+    """Context manager form of ``timed`` for blocks inside a function
+
+    Yields the trace span (or ``None``) so the block can add attributes.
+    """
+    with span(stage, **attributes) as active:
+        start = time.perf_counter()
+        try:
+            yield active
+        finally:
+            STAGE_LATENCY.labels(stage).observe(time.perf_counter() - start)
+
+
+def observe_stage(stage: str, seconds: float):
+    """Record a stage latency that was measured elsewhere"""
+    STAGE_LATENCY.labels(stage).observe(seconds)
+
+
+def record_fallback(from_backend: str, to_backend: str):
+    """Count a semantic backend handing a request to its fallback"""
+    BACKEND_FALLBACKS.labels(from_backend, to_backend).inc()
+    add_event('backend_fallback', from_backend=from_backend, to_backend=to_backend)
+
+
+def record_cache_lookup(cache: str, hit: bool, hits: Optional[int] = None, misses: Optional[int] = None):
+    """Count a cache lookup and, given running totals, update the hit ratio"""
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+    add_event('cache_lookup', cache=cache, hit=hit)
+    if hits is not None and misses is not None and hits + misses:
+        CACHE_HIT_RATIO.labels(cache).set(hits / (hits + misses))
+
+
+def record_model_load(model: str, seconds: float):
+    """Record how long a model took to load"""
+    MODEL_LOAD_SECONDS.labels(model).set(seconds)
+    logger.info(f"Loaded {model} in {seconds:.2f}s")
+
+
+@contextmanager
+def track_queue(queue: str):
+    """Count a work item as queued or in flight for the duration of the block"""
+    gauge = QUEUE_DEPTH.labels(queue)
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Serialize all metrics in the Prometheus text format
+
+    Returns:
+        Tuple of (payload, content type) for the ``/metrics`` response
+    """
+    if not PROMETHEUS_AVAILABLE:
+        return b"# prometheus-client is not installed\n", CONTENT_TYPE_LATEST
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+__all__ = [
+    'PROMETHEUS_AVAILABLE', 'STAGE_LATENCY', 'BACKEND_LATENCY', 'BACKEND_FALLBACKS',
+    'CACHE_REQUESTS', 'CACHE_HIT_RATIO', 'MODEL_LOAD_SECONDS', 'QUEUE_DEPTH',
+    'timed', 'timed_backend', 'stage_timer', 'observe_stage', 'record_fallback',
+    'record_cache_lookup', 'record_model_load', 'track_queue', 'render_metrics'
+]
@@ -0,0 +1,255 @@
+"""
+ONNX Runtime backend for sentence embeddings with dynamic int8 quantization.
+
+The MiniLM sentence-transformer is exported once to ONNX, its weights are
+quantized to int8 with ``onnxruntime.quantization.quantize_dynamic`` and the
+result is cached under ``ONNX_MODEL_DIR``. At runtime only ``onnxruntime``
+and the fast tokenizer are needed, so workers do not have to import torch.
+``OnnxEmbeddingModel.encode`` reproduces the sentence-transformers pipeline
+(truncate to 256 wordpieces, mean pooling over the attention mask, optional
+l2 normalisation) and keeps the 384-dimensional output.
+
+Exporting needs torch and is a build step, run ahead of deployment with:
+    python -m src.utils.onnx_embeddings export --model all-MiniLM-L6-v2
+Workers only load the result and never export on their own, so a pre-fork
+master does no inference work. The export is written to a staging directory
+and moved into place in one rename under a file lock, so concurrent exports
+do not collide and a reader never sees a half-written model.
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ort = None
+    ONNXRUNTIME_AVAILABLE = False
+    logging.warning("onnxruntime not available. ONNX embedding backend disabled.")
+
+try:
+    from transformers import AutoTokenizer
+    TOKENIZER_AVAILABLE = True
+except ImportError:
+    AutoTokenizer = None
+    TOKENIZER_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:  # Windows: exports are not serialised, but still land atomically
+    fcntl = None
+
+from src.utils.metrics import record_model_load
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_MODEL_DIR = PROJECT_ROOT / "models" / "onnx"
+MAX_SEQ_LENGTH = 256  # all-MiniLM-L6-v2 max_seq_length in sentence-transformers
+EMBEDDING_DIM = 384
+QUANTIZED_FILENAME = "model-int8.onnx"
+ONNX_INPUT_NAMES = ["input_ids", "attention_mask", "token_type_ids"]
+
+
+def _hub_id(model_name: str) -> str:
+    """sentence-transformers resolves bare names under the sentence-transformers org"""
+    return model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+
+
+def model_directory(model_name: str, root: Optional[Union[str, Path]] = None) -> Path:
+    """Directory holding the exported model and tokenizer files"""
+    root = Path(root or os.getenv('ONNX_MODEL_DIR', DEFAULT_MODEL_DIR))
+    return root / model_name.replace('/', '__')
+
+
+@contextmanager
+def _export_lock(target_dir: Path):
+    """Exclusive lock serialising exports of one model across processes"""
+    target_dir.parent.mkdir(parents=True, exist_ok=True)
+    with open(target_dir.parent / f".{target_dir.name}.lock", 'a') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def export_quantized_model(model_name: str = 'all-MiniLM-L6-v2',
+                           root: Optional[Union[str, Path]] = None, force: bool = False) -> Path:
+    """Export the transformer to ONNX and quantize it to int8
+
+    Needs torch, transformers and onnx; this is a one-off build step, the
+    runtime only loads the quantized file.
+
+    Returns:
+        Path of the quantized model
+    """
+    target_dir = model_directory(model_name, root)
+    quantized_path = target_dir / QUANTIZED_FILENAME
+    if quantized_path.exists() and not force:
+        return quantized_path
+    if not ONNXRUNTIME_AVAILABLE:
+        raise RuntimeError("onnxruntime is required to quantize the embedding model")
+
+    with _export_lock(target_dir):
+        # Another process may have finished the export while we waited
+        if quantized_path.exists() and not force:
+            return quantized_path
+        staging_dir = Path(tempfile.mkdtemp(prefix=f".{target_dir.name}-", dir=target_dir.parent))
+        try:
+            _export_to(model_name, staging_dir)
+            if target_dir.exists():
+                stale_dir = Path(tempfile.mkdtemp(prefix=f".{target_dir.name}-old-", dir=target_dir.parent))
+                os.replace(target_dir, stale_dir / target_dir.name)
+                shutil.rmtree(stale_dir, ignore_errors=True)
+            os.replace(staging_dir, target_dir)
+        except BaseException:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+    logging.info(f"Exported int8 ONNX model for {model_name} to {quantized_path}")
+    return quantized_path
+
+
+def _export_to(model_name: str, directory: Path):
+    """Write the tokenizer, fp32 ONNX graph and int8 model into ``directory``"""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel
+
+    hub_id = _hub_id(model_name)
+    tokenizer = AutoTokenizer.from_pretrained(hub_id)
+    model = AutoModel.from_pretrained(hub_id)
+    model.eval()
+    tokenizer.save_pretrained(directory)
+
+    sample = tokenizer(["export sample"], return_tensors="pt", padding=True)
+    float_path = directory / "model.onnx"
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in ONNX_INPUT_NAMES}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in ONNX_INPUT_NAMES),
+            str(float_path),
+            input_names=ONNX_INPUT_NAMES,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,  # first opset with a native LayerNormalization
+        )
+
+    quantize_dynamic(str(float_path), str(directory / QUANTIZED_FILENAME), weight_type=QuantType.QInt8)
+
+
+class OnnxEmbeddingModel:
+    """Drop-in replacement for ``SentenceTransformer.encode`` on ONNX Runtime"""
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', root: Optional[Union[str, Path]] = None,
+                 intra_op_threads: Optional[int] = None, export_if_missing: bool = False):
+        """Load the quantized model
+
+        Args:
+            model_name: Sentence-transformer model name
+            root: Directory of exported models, defaults to ``ONNX_MODEL_DIR``
+            intra_op_threads: ONNX Runtime threads per session, defaults to
+                ``ORT_INTRA_OP_THREADS`` or the runtime's own choice
+            export_if_missing: Export the model first if it has not been
+                built; servers leave this off and rely on the export step
+
+        Raises:
+            FileNotFoundError: The model has not been exported
+        """
+        if not ONNXRUNTIME_AVAILABLE or not TOKENIZER_AVAILABLE:
+            raise RuntimeError("onnxruntime and transformers are required for the ONNX backend")
+
+        start = time.perf_counter()
+        if export_if_missing:
+            model_path = export_quantized_model(model_name, root)
+        else:
+            model_path = model_directory(model_name, root) / QUANTIZED_FILENAME
+            if not model_path.exists():
+                raise FileNotFoundError(
+                    f"No quantized ONNX model at {model_path}; build it with "
+                    f"`python -m src.utils.onnx_embeddings export --model {model_name}`"
+                )
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path.parent)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = intra_op_threads or int(os.getenv('ORT_INTRA_OP_THREADS', '0'))
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self._input_names = {item.name for item in self.session.get_inputs()}
+        record_model_load(f"{model_name}-onnx-int8", time.perf_counter() - start)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return EMBEDDING_DIM
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32,
+               normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        """Embed one text or a list of texts
+
+        Returns:
+            A ``(384,)`` vector for a single string, otherwise ``(n, 384)``
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+
+        batches = []
+        for offset in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[offset:offset + batch_size], padding=True, truncation=True,
+                max_length=MAX_SEQ_LENGTH, return_tensors="np"
+            )
+            feeds = {name: encoded[name].astype(np.int64) for name in ONNX_INPUT_NAMES
+                     if name in self._input_names and name in encoded}
+            if 'token_type_ids' in self._input_names and 'token_type_ids' not in feeds:
+                feeds['token_type_ids'] = np.zeros_like(feeds['input_ids'])
+            hidden = self.session.run(None, feeds)[0]
+
+            # Mean pooling over real tokens, as in the sentence-transformers config
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled)
+
+        embeddings = np.vstack(batches).astype(np.float32)
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+
+__all__ = [
+    'OnnxEmbeddingModel', 'export_quantized_model', 'model_directory',
+    'ONNXRUNTIME_AVAILABLE', 'EMBEDDING_DIM', 'MAX_SEQ_LENGTH'
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage ONNX embedding models")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    export = subcommands.add_parser("export", help="export and int8-quantize a sentence-transformer")
+    export.add_argument("--model", default="all-MiniLM-L6-v2")
+    export.add_argument("--output-dir", default=None, help="defaults to ONNX_MODEL_DIR or models/onnx")
+    export.add_argument("--force", action="store_true", help="re-export even if a quantized model exists")
+    args = parser.parse_args()
+
+    path = export_quantized_model(args.model, args.output_dir, force=args.force)
+    print(f"Quantized model: {path} ({path.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,131 @@
+"""
+Time-boxed sampling profiler for live API workers.
+
+A sampler walks ``sys._current_frames()`` at a fixed rate and counts each
+thread's stack in the collapsed format used by flamegraph.pl, speedscope and
+py-spy (``outer;inner;leaf count``). Only one profile may run per process at
+a time, and both duration and rate are capped so the overhead stays bounded
+even if the endpoint is misused.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent.parent) + os.sep
+MAX_PROFILE_SECONDS = float(os.environ.get('PROFILER_MAX_SECONDS', '60'))
+MAX_SAMPLE_RATE_HZ = int(os.environ.get('PROFILER_MAX_RATE_HZ', '250'))
+DEFAULT_SAMPLE_RATE_HZ = 100
+MAX_STACK_DEPTH = 128
+
+_active = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running"""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = filename[len(PROJECT_ROOT):]
+    elif 'site-packages' in filename:
+        filename = filename.split('site-packages' + os.sep, 1)[-1]
+    return f"{code.co_name} ({filename})"
+
+
+def _collapse(frame) -> str:
+    """Root-first ``;``-joined stack of a thread's current frame"""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ';'.join(labels)
+
+
+def sample_stacks(seconds: float, rate_hz: int = DEFAULT_SAMPLE_RATE_HZ,
+                  include: Optional[str] = None) -> Dict[str, Any]:
+    """Sample every thread's stack for ``seconds`` at ``rate_hz``
+
+    Args:
+        seconds: Profile duration, capped at ``MAX_PROFILE_SECONDS``
+        rate_hz: Samples per second, capped at ``MAX_SAMPLE_RATE_HZ``
+        include: Keep only stacks with a frame whose label contains this
+            substring, e.g. ``"src/scoring"``
+
+    Returns:
+        Dictionary with ``stacks`` (collapsed stack to sample count),
+        ``samples``, ``duration_s``, ``rate_hz`` and ``threads``
+
+    Raises:
+        ProfilerBusyError: If another profile is already running
+    """
+    if not _active.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running in this worker")
+
+    try:
+        seconds = min(max(seconds, 0.0), MAX_PROFILE_SECONDS)
+        rate_hz = min(max(int(rate_hz), 1), MAX_SAMPLE_RATE_HZ)
+        interval = 1.0 / rate_hz
+        own_thread = threading.get_ident()
+        stacks: Counter = Counter()
+        threads = set()
+        samples = 0
+
+        start = time.perf_counter()
+        deadline = start + seconds
+        next_tick = start
+        while True:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                stack = _collapse(frame)
+                if include is None or include in stack:
+                    stacks[stack] += 1
+                    threads.add(thread_id)
+            samples += 1
+
+            next_tick += interval
+            now = time.perf_counter()
+            if next_tick >= deadline:
+                break
+            if next_tick > now:
+                time.sleep(next_tick - now)
+
+        duration = time.perf_counter() - start
+        logger.info(f"Profiled {samples} samples over {duration:.2f}s at {rate_hz}Hz")
+        return {
+            'stacks': dict(stacks),
+            'samples': samples,
+            'duration_s': duration,
+            'rate_hz': rate_hz,
+            'threads': len(threads),
+        }
+    finally:
+        _active.release()
+
+
+def format_collapsed(stacks: Dict[str, int]) -> str:
+    """Render stacks as collapsed lines, most frequent first"""
+    ordered = sorted(stacks.items(), key=lambda item: (-item[1], item[0]))
+    return ''.join(f"{stack} {count}\n" for stack, count in ordered)
+
+
+def is_profiling() -> bool:
+    """Whether a profile is currently running in this process"""
+    return _active.locked()
+
+
+__all__ = [
+    'ProfilerBusyError', 'sample_stacks', 'format_collapsed', 'is_profiling',
+    'MAX_PROFILE_SECONDS', 'MAX_SAMPLE_RATE_HZ', 'DEFAULT_SAMPLE_RATE_HZ'
+]
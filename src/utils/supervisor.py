@@ -0,0 +1,281 @@
+"""
+Process supervisor for running the API and dashboard side by side.
+
+The launchers used to start uvicorn and Streamlit with ``stdout=PIPE`` and
+never read the pipe. Once the OS pipe buffer (64 KiB on Linux) filled up,
+every log write in the child blocked and the server stalled under load.
+They also probed readiness with a bare TCP connect, which succeeds before
+the app has finished importing, and gave up as soon as a child died.
+
+``ServiceSupervisor`` owns each child process:
+
+- a drain thread per child reads its combined stdout/stderr line by line
+  into a size-rotated log file, so the pipe never fills;
+- readiness is an HTTP GET of the service's health URL returning 2xx, or a
+  custom ``ready_check`` for services without HTTP;
+- a crashed service is restarted with exponential backoff, and the backoff
+  resets once the service has stayed up for ``stable_after`` seconds. After
+  ``max_restarts`` crashes without a stable run the supervisor gives up;
+- on SIGTERM/SIGINT the children are sent SIGTERM in reverse start order so
+  they can finish in-flight requests, and are killed only after
+  ``grace_period`` seconds.
+"""
+
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_LOG_BACKUPS = 5
+
+
+@dataclass
+class ServiceSpec:
+    """How to run and probe one child service"""
+    name: str
+    command: List[str]
+    health_url: Optional[str] = None
+    # Readiness probe for services without an HTTP endpoint
+    ready_check: Optional[Callable[[], bool]] = None
+    cwd: Optional[str] = None
+    env: Dict[str, str] = field(default_factory=dict)
+    ready_timeout: float = 60.0
+    grace_period: float = 10.0
+
+
+def check_http_ready(url: str, timeout: float = 2.0) -> bool:
+    """True if ``url`` answers with a 2xx status"""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return 200 <= response.status < 300
+    except (urllib.error.URLError, OSError, ValueError):
+        return False
+
+
+def backoff_delay(failures: int, base: float = 1.0, maximum: float = 30.0) -> float:
+    """Delay before restart number ``failures`` (1-based): base, 2x base, 4x base ... capped"""
+    return min(maximum, base * (2 ** max(0, failures - 1)))
+
+
+def _service_log(name: str, log_dir: Path, max_bytes: int, backups: int) -> logging.Logger:
+    """Dedicated, non-propagating logger writing a child's output to a rotating file"""
+    log_dir.mkdir(parents=True, exist_ok=True)
+    service_logger = logging.getLogger(f"service.{name}")
+    service_logger.setLevel(logging.INFO)
+    service_logger.propagate = False
+    path = str(log_dir / f"{name}.log")
+    if not any(getattr(handler, 'baseFilename', None) == os.path.abspath(path)
+               for handler in service_logger.handlers):
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        service_logger.addHandler(handler)
+    return service_logger
+
+
+class SupervisedService:
+    """One child process with its log drain"""
+
+    def __init__(self, spec: ServiceSpec, log: logging.Logger):
+        self.spec = spec
+        self.log = log
+        self.process: Optional[subprocess.Popen] = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.restarts = 0
+        self._drain: Optional[threading.Thread] = None
+
+    def start(self):
+        env = os.environ.copy()
+        env.update({'PYTHONUNBUFFERED': '1', 'PYTHONIOENCODING': 'utf-8'})
+        env.update(self.spec.env)
+        self.process = subprocess.Popen(
+            self.spec.command,
+            cwd=self.spec.cwd,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+        )
+        self.started_at = time.monotonic()
+        self._drain = threading.Thread(
+            target=self._drain_output, args=(self.process,), name=f"drain-{self.spec.name}", daemon=True
+        )
+        self._drain.start()
+        logger.info(f"▶️ {self.spec.name} started (pid {self.process.pid})")
+
+    def _drain_output(self, process: subprocess.Popen):
+        """Copy the child's output into its log file until the pipe closes"""
+        try:
+            for line in process.stdout:
+                self.log.info(line.rstrip('\n'))
+        except (ValueError, OSError):
+            pass  # Pipe closed while stopping
+        finally:
+            process.stdout.close()
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def wait_ready(self, stop: threading.Event, interval: float = 0.5) -> bool:
+        """Poll the health URL (or ``ready_check``) until it answers, the child exits or the timeout passes"""
+        if self.spec.health_url:
+            probe = lambda: check_http_ready(self.spec.health_url)
+        elif self.spec.ready_check is not None:
+            probe = self.spec.ready_check
+        else:
+            return self.alive
+        deadline = time.monotonic() + self.spec.ready_timeout
+        while time.monotonic() < deadline and not stop.is_set():
+            if not self.alive:
+                return False
+            if probe():
+                logger.info(f"✅ {self.spec.name} ready ({time.monotonic() - self.started_at:.1f}s)")
+                return True
+            stop.wait(interval)
+        return False
+
+    def stop(self):
+        """SIGTERM, wait ``grace_period`` for in-flight work, then SIGKILL"""
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            logger.info(f"🛑 Stopping {self.spec.name}...")
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=self.spec.grace_period)
+            except subprocess.TimeoutExpired:
+                logger.warning(f"⚠️ {self.spec.name} did not exit within {self.spec.grace_period}s, killing")
+                self.process.kill()
+                self.process.wait()
+        if self._drain is not None:
+            self._drain.join(timeout=2)
+
+
+class ServiceSupervisor:
+    """Starts services in order, restarts crashed ones and stops them gracefully"""
+
+    def __init__(self, specs: List[ServiceSpec], log_dir: str = "logs", max_restarts: int = 5,
+                 backoff_base: float = 1.0, backoff_max: float = 30.0, stable_after: float = 60.0,
+                 poll_interval: float = 1.0, log_max_bytes: int = DEFAULT_LOG_MAX_BYTES,
+                 log_backups: int = DEFAULT_LOG_BACKUPS):
+        """Configure the supervisor
+
+        Args:
+            specs: Services in start order; they are stopped in reverse
+            log_dir: Directory for the rotating ``<name>.log`` files
+            max_restarts: Consecutive crashes tolerated before giving up
+            backoff_base: Delay before the first restart, doubled per crash
+            backoff_max: Upper bound of the restart delay
+            stable_after: Seconds of uptime after which the crash count resets
+            poll_interval: Seconds between liveness checks
+            log_max_bytes: Size at which a service log is rotated
+            log_backups: Rotated log files kept per service
+        """
+        self.services = [
+            SupervisedService(spec, _service_log(spec.name, Path(log_dir), log_max_bytes, log_backups))
+            for spec in specs
+        ]
+        self.max_restarts = max_restarts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stable_after = stable_after
+        self.poll_interval = poll_interval
+        self.stopping = threading.Event()
+
+    def start(self) -> bool:
+        """Start every service and wait for each to become ready before the next"""
+        for service in self.services:
+            service.start()
+            if not service.wait_ready(self.stopping):
+                logger.error(f"❌ {service.spec.name} did not become ready")
+                return False
+        return True
+
+    def install_signal_handlers(self):
+        """Stop gracefully on SIGTERM and SIGINT (main thread only)"""
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self._handle_signal)
+
+    def _handle_signal(self, signum, frame):
+        logger.info(f"🛑 Received signal {signum}, draining services...")
+        self.stopping.set()
+
+    def _restart(self, service: SupervisedService) -> bool:
+        """Restart a crashed service after its backoff delay; False when giving up"""
+        code = service.process.returncode
+        if time.monotonic() - service.started_at >= self.stable_after:
+            service.failures = 0
+        service.failures += 1
+        if service.failures > self.max_restarts:
+            logger.error(f"❌ {service.spec.name} crashed {service.failures} times in a row, giving up")
+            return False
+
+        delay = backoff_delay(service.failures, self.backoff_base, self.backoff_max)
+        logger.warning(f"⚠️ {service.spec.name} exited with code {code}, restarting in {delay:.1f}s")
+        if self.stopping.wait(delay):
+            return True
+        service.start()
+        service.restarts += 1
+        if not service.wait_ready(self.stopping):
+            logger.warning(f"⚠️ {service.spec.name} restarted but is not ready yet")
+        return True
+
+    def run(self) -> bool:
+        """Supervise until stopped; False if a service had to be given up"""
+        healthy = True
+        try:
+            while not self.stopping.is_set():
+                for service in self.services:
+                    if self.stopping.is_set():
+                        break
+                    if not service.alive and not self._restart(service):
+                        healthy = False
+                        self.stopping.set()
+                        break
+                self.stopping.wait(self.poll_interval)
+        finally:
+            self.stop()
+        return healthy
+
+    def stop(self):
+        """Stop all services, last started first"""
+        self.stopping.set()
+        for service in reversed(self.services):
+            try:
+                service.stop()
+            except Exception as e:
+                logger.error(f"Error stopping {service.spec.name}: {e}")
+        logger.info("🎯 All services stopped")
+
+    def status(self) -> List[Dict[str, object]]:
+        """Liveness, pid and restart count per service"""
+        return [
+            {
+                'name': service.spec.name,
+                'alive': service.alive,
+                'pid': service.process.pid if service.process else None,
+                'restarts': service.restarts,
+            }
+            for service in self.services
+        ]
+
+
+__all__ = [
+    'ServiceSpec', 'ServiceSupervisor', 'SupervisedService', 'check_http_ready', 'backoff_delay'
+]
@@ -1,6 +1,9 @@
 from PyPDF2 import PdfReader
 import docx
 
+from src.utils.metrics import timed
+
+@timed('pdf_extraction')
 def extract_text_from_pdf(pdf_path):
     text = ""
     with open(pdf_path, "rb") as file:
@@ -9,15 +12,17 @@ def extract_text_from_pdf(pdf_path):
             text += page.extract_text() + "\n"
     return text.strip()
 
+@timed('docx_extraction')
 def extract_text_from_docx(docx_path):
     doc = docx.Document(docx_path)
     text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
     return text.strip()
 
 def extract_text(file_path):
-    if file_path.endswith('.pdf'):
+    extension = file_path.lower()
+    if extension.endswith('.pdf'):
         return extract_text_from_pdf(file_path)
-    elif file_path.endswith('.docx'):
+    elif extension.endswith('.docx'):
         return extract_text_from_docx(file_path)
     else:
         raise ValueError("Unsupported file format. Please upload a PDF or DOCX file.")
\ No newline at end of file
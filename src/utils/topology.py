@@ -0,0 +1,190 @@
+"""
+Worker and thread topology derived from the hardware actually available.
+
+The launchers used to pin ``OMP_NUM_THREADS=2`` and one uvicorn worker on
+every machine, leaving most of a 32-core node idle while oversubscribing a
+2-core container. ``plan_topology`` reads the usable CPUs (scheduler
+affinity capped by the cgroup v2 ``cpu.max`` or v1 ``cpu.cfs_quota_us``
+quota, since containers see the host's core count) and the available memory
+(host memory capped by the cgroup memory limit). It then chooses:
+
+- ``process_pool_size``: a quarter of the CPUs for document extraction
+  processes, at least one;
+- ``api_workers``: half of the remaining CPUs, so each worker gets at least
+  two intra-op threads, bounded by how many model-loaded workers fit in
+  memory and by ``MAX_API_WORKERS``;
+- ``torch_threads``: the remaining CPUs divided evenly between the workers.
+
+so that ``api_workers * torch_threads + process_pool_size`` does not exceed
+the CPUs. ``API_WORKERS``, ``TORCH_NUM_THREADS`` and ``PROCESS_POOL_SIZE``
+in the environment override the corresponding choice.
+"""
+
+import logging
+import math
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, MutableMapping, Optional, Tuple
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+MAX_API_WORKERS = 8
+# Resident memory of one API worker with MiniLM, DistilGPT-2 and spaCy loaded
+WORKER_MEMORY_MB = int(os.getenv('WORKER_MEMORY_MB', '1200'))
+POOL_PROCESS_MEMORY_MB = 150
+
+# Thread-count variables read by the numeric libraries in each worker
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                   'TORCH_NUM_THREADS', 'ORT_INTRA_OP_THREADS')
+
+
+@dataclass(frozen=True)
+class TopologyPlan:
+    """Chosen process and thread layout plus the inputs it was based on"""
+    cpus: int
+    cpu_source: str
+    memory_available_mb: int
+    api_workers: int
+    torch_threads: int
+    process_pool_size: int
+
+    @property
+    def total_threads(self) -> int:
+        return self.api_workers * self.torch_threads + self.process_pool_size
+
+    def environment(self) -> Dict[str, str]:
+        """Variables that make child processes follow this plan"""
+        env = {name: str(self.torch_threads) for name in THREAD_ENV_VARS}
+        env['API_WORKERS'] = str(self.api_workers)
+        env['PROCESS_POOL_SIZE'] = str(self.process_pool_size)
+        return env
+
+    def apply(self, environ: Optional[MutableMapping[str, str]] = None):
+        """Export the plan into ``environ`` (``os.environ`` by default)"""
+        (os.environ if environ is None else environ).update(self.environment())
+
+    def describe(self) -> str:
+        return (f"{self.cpus} CPUs ({self.cpu_source}), {self.memory_available_mb} MB available -> "
+                f"{self.api_workers} API workers x {self.torch_threads} threads "
+                f"+ {self.process_pool_size} pool processes")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except (OSError, ValueError):
+        return None
+
+
+def cgroup_cpu_limit(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """CPUs granted by the cgroup quota, or ``None`` when unlimited"""
+    cpu_max = _read(root / "cpu.max")  # cgroup v2: "<quota> <period>" or "max <period>"
+    if cpu_max:
+        quota, _, period = cpu_max.partition(' ')
+        if quota != 'max' and period:
+            return int(quota) / int(period)
+        return None
+
+    quota = _read(root / "cpu" / "cpu.cfs_quota_us") or _read(root / "cpu,cpuacct" / "cpu.cfs_quota_us")
+    period = _read(root / "cpu" / "cpu.cfs_period_us") or _read(root / "cpu,cpuacct" / "cpu.cfs_period_us")
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    return None
+
+
+def cgroup_memory_available(root: Path = CGROUP_ROOT) -> Optional[int]:
+    """Bytes left under the cgroup memory limit, or ``None`` when unlimited"""
+    limit = _read(root / "memory.max")
+    usage = _read(root / "memory.current")
+    if limit is None:
+        limit = _read(root / "memory" / "memory.limit_in_bytes")
+        usage = _read(root / "memory" / "memory.usage_in_bytes")
+    if not limit or limit == 'max' or not usage:
+        return None
+    limit_bytes = int(limit)
+    if limit_bytes >= 1 << 60:  # cgroup v1 reports "unlimited" as a huge number
+        return None
+    return max(0, limit_bytes - int(usage))
+
+
+def detect_cpus(root: Path = CGROUP_ROOT) -> Tuple[int, str]:
+    """Usable CPUs and where the number came from"""
+    if hasattr(os, 'sched_getaffinity'):
+        cpus, source = len(os.sched_getaffinity(0)), 'affinity'
+    else:
+        cpus, source = psutil.cpu_count(logical=True) or 1, 'cpu_count'
+    quota = cgroup_cpu_limit(root)
+    if quota is not None and math.ceil(quota) < cpus:
+        cpus, source = max(1, math.ceil(quota)), 'cgroup quota'
+    return cpus, source
+
+
+def detect_memory_mb(root: Path = CGROUP_ROOT) -> int:
+    """Available memory in MB, the smaller of host and cgroup headroom"""
+    available = psutil.virtual_memory().available
+    cgroup_available = cgroup_memory_available(root)
+    if cgroup_available is not None:
+        available = min(available, cgroup_available)
+    return int(available // (1024 * 1024))
+
+
+def _override(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return max(1, int(value)) if value else None
+
+
+def plan_topology(cpus: Optional[int] = None, memory_available_mb: Optional[int] = None,
+                  worker_memory_mb: int = WORKER_MEMORY_MB,
+                  max_workers: int = MAX_API_WORKERS) -> TopologyPlan:
+    """Choose API workers, intra-op threads and pool size for this machine
+
+    Args:
+        cpus: Usable CPUs, detected when omitted
+        memory_available_mb: Available memory, detected when omitted
+        worker_memory_mb: Expected resident size of one API worker
+        max_workers: Upper bound on API workers
+
+    Returns:
+        The plan; environment overrides win over the computed values
+    """
+    source = 'given'
+    if cpus is None:
+        cpus, source = detect_cpus()
+    if memory_available_mb is None:
+        memory_available_mb = detect_memory_mb()
+
+    pool_size = _override('PROCESS_POOL_SIZE') or max(1, cpus // 4)
+    budget = max(1, cpus - pool_size)
+
+    memory_cap = (memory_available_mb - pool_size * POOL_PROCESS_MEMORY_MB) // max(1, worker_memory_mb)
+    workers = _override('API_WORKERS') or max(1, min(budget // 2, memory_cap, max_workers))
+    threads = _override('TORCH_NUM_THREADS') or max(1, budget // workers)
+
+    return TopologyPlan(
+        cpus=cpus,
+        cpu_source=source,
+        memory_available_mb=int(memory_available_mb),
+        api_workers=workers,
+        torch_threads=threads,
+        process_pool_size=pool_size,
+    )
+
+
+def log_topology(plan: TopologyPlan):
+    """Record the chosen plan at startup"""
+    logger.info(f"🧮 Topology: {plan.describe()}")
+    if plan.total_threads > plan.cpus:
+        logger.warning(f"⚠️ Topology uses {plan.total_threads} threads on {plan.cpus} CPUs")
+
+
+__all__ = [
+    'TopologyPlan', 'plan_topology', 'log_topology', 'detect_cpus', 'detect_memory_mb',
+    'cgroup_cpu_limit', 'cgroup_memory_available', 'THREAD_ENV_VARS'
+]
@@ -0,0 +1,220 @@
+"""
+Opt-in request tracing with an OpenTelemetry-compatible file exporter.
+
+A trace is started per request (``/evaluate/?trace=1``) and stored in a
+context variable, so the ``timed`` decorators and ``stage_timer`` blocks in
+``src.utils.metrics`` open child spans automatically while it is active.
+Outside a trace, the only cost is a context-variable lookup.
+
+Finished traces can be returned as a nested span tree and appended to a
+JSON-lines file in the OTLP/JSON layout (``resourceSpans`` → ``scopeSpans``
+→ ``spans``), the same format the OpenTelemetry collector's file exporter
+writes, so they can be replayed into any OTLP-compatible backend.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_PATH = "traces/evaluate_traces.jsonl"
+SERVICE_NAME = "resume-relevance-check"
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_export_lock = threading.Lock()
+
+
+class Span:
+    """One timed unit of work inside a trace"""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent', 'start_ns', 'end_ns',
+                 'attributes', 'events', 'children', '_token')
+
+    def __init__(self, name: str, trace_id: str, parent: Optional["Span"] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent = parent
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.children: List["Span"] = []
+        self._token = None
+        if parent is not None:
+            parent.children.append(self)
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes):
+        self.events.append({'name': name, 'time_ns': time.time_ns(), 'attributes': attributes})
+
+    def end(self):
+        """Close the span and restore its parent as the current span"""
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Nested span tree for API responses"""
+        return {
+            'name': self.name,
+            'duration_ms': round(self.duration_ms, 3),
+            'attributes': self.attributes,
+            'events': [
+                {'name': event['name'], 'offset_ms': round((event['time_ns'] - self.start_ns) / 1e6, 3),
+                 **event['attributes']}
+                for event in self.events
+            ],
+            'children': [child.to_dict() for child in self.children],
+        }
+
+    def walk(self):
+        """This span and all of its descendants, parents first"""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+def is_tracing() -> bool:
+    """Whether a trace is active in the current context"""
+    return _current_span.get() is not None
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Optional[Span]:
+    """Open a child of the current span and make it current
+
+    Returns ``None`` when no trace is active. Callers must ``end()`` the span.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    child = Span(name, parent.trace_id, parent, attributes)
+    child._token = _current_span.set(child)
+    return child
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Context manager form of ``start_span``"""
+    child = start_span(name, attributes)
+    try:
+        yield child
+    finally:
+        if child is not None:
+            child.end()
+
+
+def add_event(name: str, **attributes):
+    """Attach an event (cache hit, fallback) to the current span, if any"""
+    active = _current_span.get()
+    if active is not None:
+        active.add_event(name, **attributes)
+
+
+@contextmanager
+def start_trace(name: str, enabled: bool = True, **attributes):
+    """Run a block as the root span of a new trace
+
+    Yields the root ``Span``, or ``None`` when ``enabled`` is false so callers
+    can pass a request flag straight through.
+    """
+    if not enabled:
+        yield None
+        return
+
+    root = Span(name, os.urandom(16).hex(), None, attributes)
+    root._token = _current_span.set(root)
+    try:
+        yield root
+    finally:
+        root.end()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, (list, tuple)):
+        return {'arrayValue': {'values': [_otlp_value(item) for item in value]}}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp(root: Span) -> Dict[str, Any]:
+    """Convert a finished trace to an OTLP/JSON ``ExportTraceServiceRequest``"""
+    spans = []
+    for item in root.walk():
+        spans.append({
+            'traceId': item.trace_id,
+            'spanId': item.span_id,
+            'parentSpanId': item.parent.span_id if item.parent is not None else '',
+            'name': item.name,
+            'kind': 2 if item.parent is None else 1,  # SERVER for the request, INTERNAL below
+            'startTimeUnixNano': str(item.start_ns),
+            'endTimeUnixNano': str(item.end_ns or item.start_ns),
+            'attributes': _otlp_attributes(item.attributes),
+            'events': [
+                {'timeUnixNano': str(event['time_ns']), 'name': event['name'],
+                 'attributes': _otlp_attributes(event['attributes'])}
+                for event in item.events
+            ],
+        })
+
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': _otlp_attributes({'service.name': SERVICE_NAME})},
+            'scopeSpans': [{'scope': {'name': __name__}, 'spans': spans}],
+        }]
+    }
+
+
+def export_trace(root: Span, path: Optional[str] = None) -> Optional[Path]:
+    """Append a finished trace as one OTLP/JSON line to the export file
+
+    The path defaults to ``TRACE_EXPORT_PATH`` or ``traces/evaluate_traces.jsonl``.
+    Export failures are logged and never fail the request.
+    """
+    target = Path(path or os.getenv('TRACE_EXPORT_PATH', DEFAULT_EXPORT_PATH))
+    try:
+        line = json.dumps(to_otlp(root), separators=(',', ':'))
+        with _export_lock:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with target.open('a', encoding='utf-8') as handle:
+                handle.write(line + '\n')
+        return target
+    except Exception as e:
+        logger.error(f"Trace export failed: {e}")
+        return None
+
+
+__all__ = [
+    'Span', 'is_tracing', 'current_span', 'start_span', 'span', 'add_event',
+    'start_trace', 'to_otlp', 'export_trace'
+]
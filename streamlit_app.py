@@ -15,6 +15,8 @@ import glob
 import random
 import logging
 
+from src.scoring.engine import ScoringOptions, get_scoring_engine
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -108,82 +110,6 @@ def extract_text_from_file(uploaded_file):
         st.error(f"Error extracting text: {e}")
         return None
 
-def calculate_hard_match(resume_data, jd_data):
-    """Calculate hard match score based on keyword matching"""
-    try:
-        resume_text = resume_data.get('raw_text', '').lower()
-        jd_text = jd_data.get('raw_text', '').lower()
-        
-        if not resume_text or not jd_text:
-            return 0.0, []
-        
-        # Simple keyword matching approach
-        jd_words = set(jd_text.split())
-        resume_words = set(resume_text.split())
-        
-        # Calculate overlap
-        common_words = jd_words.intersection(resume_words)
-        missing_words = jd_words - resume_words
-        total_jd_words = len(jd_words)
-        
-        if total_jd_words == 0:
-            return 0.0, []
-            
-        score = (len(common_words) / total_jd_words) * 100
-        return min(score, 100.0), list(missing_words)
-        
-    except Exception as e:
-        logger.error(f"Hard match calculation failed: {e}")
-        return 0.0, []
-
-def calculate_semantic_match(resume_data, jd_data):
-    """Calculate semantic similarity using TF-IDF"""
-    try:
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.metrics.pairwise import cosine_similarity
-        
-        resume_text = resume_data.get('raw_text', '')
-        jd_text = jd_data.get('raw_text', '')
-        
-        if not resume_text or not jd_text:
-            return 0.0
-        
-        # Clean texts
-        def _clean_text(text):
-            import re
-            if not text:
-                return ""
-            # Remove extra whitespace and normalize
-            text = re.sub(r'\s+', ' ', text.strip())
-            # Remove special characters but keep important punctuation
-            text = re.sub(r'[^\w\s\.,!?;:()-]', ' ', text)
-            return text.lower()
-        
-        resume_clean = _clean_text(resume_text)
-        jd_clean = _clean_text(jd_text)
-        
-        if not resume_clean or not jd_clean:
-            return 0.0
-        
-        # Create TF-IDF vectors
-        vectorizer = TfidfVectorizer(
-            stop_words='english',
-            ngram_range=(1, 2),
-            max_features=1000,
-            min_df=1
-        )
-        
-        tfidf_matrix = vectorizer.fit_transform([resume_clean, jd_clean])
-        
-        # Calculate cosine similarity
-        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-        
-        return max(0.0, min(100.0, float(similarity) * 100))
-        
-    except Exception as e:
-        logger.error(f"Semantic matching failed: {e}")
-        return 0.0
-
 def get_detailed_verdict(hard_match_score, semantic_match_score, missing_keywords=None):
     """Generate detailed verdict based on scores"""
     combined_score = (hard_match_score + semantic_match_score) / 2
@@ -332,15 +258,16 @@ def perform_analysis(analysis_depth):
         status_text.text('📊 Preparing data...')
         progress_bar.progress(40)
         
-        resume_data = {"raw_text": st.session_state.resume_text}
-        jd_data = {"raw_text": st.session_state.jd_text}
-        
         # Calculate scores
         status_text.text('🧮 Calculating scores...')
         progress_bar.progress(60)
         
-        hard_match_score, missing_keywords = calculate_hard_match(resume_data, jd_data)
-        semantic_match_score = calculate_semantic_match(resume_data, jd_data)
+        scores = get_scoring_engine().score(
+            st.session_state.resume_text, st.session_state.jd_text,
+            ScoringOptions.standard(include_sections=False)
+        )
+        hard_match_score, missing_keywords = scores['hard_match_score'], scores['missing_keywords']
+        semantic_match_score = scores['semantic_match_score']
         
         progress_bar.progress(80)
         status_text.text('🏆 Generating verdict...')
@@ -0,0 +1,76 @@
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add project root to Python path so tests can import the src package
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.embeddings import EmbeddingManager
+
+FAKE_EMBEDDING_DIM = 64
+
+
+class BagOfWordsManager(EmbeddingManager):
+    """Deterministic EmbeddingManager stand-in: hashed, normalised word counts
+
+    Records every batch it embeds in ``batches``; ``delay`` seconds per
+    batch give concurrent requests time to queue up.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.model_name = "bag-of-words"
+        self.backend = "test"
+        self._model = object()
+        self._batcher = None
+        self.delay = delay
+        self.batches = []
+
+    def create_batch_embeddings(self, texts, coalesce=True):
+        self.batches.append(list(texts))
+        if self.delay:
+            time.sleep(self.delay)
+        vectors = np.zeros((len(texts), FAKE_EMBEDDING_DIM))
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                vectors[row, sum(map(ord, word)) % FAKE_EMBEDDING_DIM] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+@pytest.fixture
+def fake_embedding_manager():
+    """Factory of ``BagOfWordsManager`` instances, e.g. ``fake_embedding_manager(delay=0.01)``"""
+    return BagOfWordsManager
+
+
+@pytest.fixture(scope="session")
+def api_client(tmp_path_factory):
+    """TestClient for the API with authentication bypassed
+
+    src/storage/database.py opens ./evaluations.db relative to the working
+    directory, so the session runs from a scratch directory to keep test
+    evaluations out of the project database.
+    """
+    from fastapi.testclient import TestClient
+
+    previous_cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("api"))
+    try:
+        from src.api.auth import get_current_active_user
+        from src.api.main import app
+        from src.api.models import User
+
+        app.dependency_overrides[get_current_active_user] = lambda: User(
+            id=1, username="tester", email="tester@example.com"
+        )
+        with TestClient(app) as client:
+            yield client
+        app.dependency_overrides.clear()
+    finally:
+        os.chdir(previous_cwd)
@@ -0,0 +1,87 @@
+"""
+Tests for requirement-to-evidence alignment.
+"""
+
+from src.scoring.alignment import RequirementAligner, split_requirements, summarize_alignment
+
+JD = """Senior Data Engineer
+Acme Corp, Remote
+
+REQUIREMENTS
+• Build streaming pipelines with Kafka and Spark
+• Orchestrate batch jobs with Airflow. Model data with dbt.
+• 5+ years of Python and SQL experience
+• Experience designing iOS mobile applications
+
+WHAT WE OFFER
+• Generous stock option package
+"""
+
+RESUME = """Jane Doe
+
+EXPERIENCE
+Built Kafka and Spark streaming pipelines processing billions of events.
+Maintained Airflow DAGs and dbt models for the analytics team.
+
+SKILLS
+Python, SQL, Kafka, Spark, Airflow, dbt
+"""
+
+
+def test_requirements_are_bullets_and_sentences_without_benefits():
+    requirements = [item.text for item in split_requirements(JD)]
+
+    assert requirements == [
+        "Build streaming pipelines with Kafka and Spark",
+        "Orchestrate batch jobs with Airflow.",
+        "Model data with dbt.",
+        "5+ years of Python and SQL experience",
+        "Experience designing iOS mobile applications",
+    ]
+    first = split_requirements(JD)[0]
+    assert JD[first.start:].startswith(first.text)
+
+
+def test_headerless_jd_uses_all_lines():
+    requirements = split_requirements("Looking for a Go developer\nMust know gRPC and Kubernetes well")
+    assert len(requirements) == 2
+
+
+def test_tfidf_alignment_finds_evidence_and_gaps(fake_embedding_manager):
+    aligner = RequirementAligner(fake_embedding_manager())
+    aligner.manager._model = None  # no transformer model: TF-IDF space
+
+    alignment = aligner.align(RESUME, JD)
+
+    assert alignment['method'] == 'tfidf'
+    by_requirement = {item['requirement']: item for item in alignment['requirements']}
+    kafka = by_requirement["Build streaming pipelines with Kafka and Spark"]
+    assert kafka['status'] != 'missing' and "Kafka" in kafka['evidence']
+    assert by_requirement["Experience designing iOS mobile applications"]['status'] == 'missing'
+    assert alignment['counts']['missing'] >= 1
+    assert 0 < alignment['coverage'] < 100
+
+
+def test_embedding_alignment_batches_once_and_reuses_requirement_vectors(fake_embedding_manager):
+    manager = fake_embedding_manager()
+    aligner = RequirementAligner(manager)
+
+    first = aligner.align(RESUME, JD)
+    assert first['method'] == 'embeddings'
+    assert len(manager.batches) == 1
+
+    aligner.align(RESUME + "\nAlso shipped Flink jobs to production.", JD)
+    # Requirements and unchanged evidence come from the cache
+    assert len(manager.batches) == 2
+    assert len(manager.batches[1]) < len(manager.batches[0])
+
+
+def test_summary_lists_gaps(fake_embedding_manager):
+    aligner = RequirementAligner(fake_embedding_manager())
+    aligner.manager._model = None
+    alignment = aligner.align(RESUME, JD)
+    lines = summarize_alignment(alignment, limit=10)
+
+    assert lines[0].startswith("🎯 Requirements covered:")
+    assert len(lines) == 1 + alignment['counts']['missing']
+    assert any("iOS" in line for line in lines[1:])
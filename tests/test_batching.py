@@ -0,0 +1,136 @@
+"""
+Tests for length-bucketed batching and micro-batch coalescing.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from src.utils.batching import MicroBatcher, estimate_token_count, plan_buckets, run_bucketed
+from src.utils.embeddings import EmbeddingManager
+
+
+def length_encoder(calls):
+    """Embeds each text as (length, batch size) and records the batches"""
+    def encode(texts):
+        calls.append(list(texts))
+        return np.array([[len(text), len(texts)] for text in texts], dtype=np.float32)
+    return encode
+
+
+def test_plan_buckets_respects_budget_and_covers_every_input():
+    lengths = [300, 5, 12, 256, 8, 40, 7, 120, 6, 256]
+    buckets = plan_buckets(lengths, token_budget=512, max_batch_size=4)
+
+    assert sorted(index for bucket in buckets for index in bucket) == list(range(len(lengths)))
+    for bucket in buckets:
+        assert len(bucket) <= 4
+        assert len(bucket) * max(lengths[index] for index in bucket) <= 512 or len(bucket) == 1
+    # Similar lengths end up together: the short inputs share the first bucket
+    assert set(buckets[0]) == {1, 4, 6, 8}
+
+
+def test_run_bucketed_restores_input_order():
+    texts = ["x" * 2000, "short", "y" * 40, "", "z" * 900, "mid length text"]
+    calls = []
+
+    embeddings = run_bucketed(length_encoder(calls), texts, token_budget=300, max_batch_size=3,
+                              max_seq_length=256)
+
+    assert embeddings[:, 0].tolist() == [len(text) for text in texts]
+    assert len(calls) > 1
+    assert all(len(batch) <= 3 for batch in calls)
+
+
+def test_estimate_token_count_is_capped_by_model_length():
+    assert estimate_token_count("word " * 1000, max_seq_length=256) == 256
+    assert estimate_token_count("") == 2
+
+
+def test_micro_batcher_coalesces_concurrent_calls():
+    calls = []
+    batcher = MicroBatcher(length_encoder(calls), max_batch_size=16, max_wait_ms=200, name="test")
+    start = threading.Barrier(8)
+    results = {}
+
+    def request(index):
+        start.wait()
+        results[index] = batcher("t" * index)
+
+    threads = [threading.Thread(target=request, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    assert {index: int(row[0]) for index, row in results.items()} == {index: index for index in range(8)}
+    assert len(calls) < 8
+    assert sum(len(batch) for batch in calls) == 8
+
+
+def test_micro_batcher_propagates_errors():
+    def failing(items):
+        raise RuntimeError("model unavailable")
+
+    batcher = MicroBatcher(failing, max_wait_ms=0, name="test_errors")
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        batcher("text", timeout=5)
+    batcher.close()
+
+
+def test_manager_batches_by_length(monkeypatch):
+    class RecordingModel:
+        max_seq_length = 256
+
+        def __init__(self):
+            self.batches = []
+
+        def encode(self, texts, batch_size=32, normalize_embeddings=False):
+            self.batches.append(list(texts))
+            return np.array([[len(text), 0.0] for text in texts])
+
+    monkeypatch.setenv("EMBEDDING_TOKEN_BUDGET", "512")
+    manager = EmbeddingManager()
+    manager._model = RecordingModel()
+    texts = ["resume " * 400, "python", "sql", "job description " * 300, "aws"]
+
+    embeddings = manager.create_batch_embeddings(texts)
+
+    assert embeddings[:, 0].tolist() == [len(text) for text in texts]
+    assert manager._model.batches[0] == ["sql", "aws", "python"]
+
+
+def test_manager_coalesces_documents_embedded_concurrently():
+    class RecordingModel:
+        max_seq_length = 256
+
+        def __init__(self):
+            self.batches = []
+
+        def encode(self, texts, batch_size=32, normalize_embeddings=False):
+            self.batches.append(list(texts))
+            return np.array([[len(text), 0.0] for text in texts])
+
+    manager = EmbeddingManager()
+    manager._model = RecordingModel()
+    manager._batcher = MicroBatcher(manager._encode_batch, max_batch_size=16, max_wait_ms=200, name="test_manager")
+    documents = [["python", "sql", "aws"], ["kafka", "spark streaming", "docker"]]
+    start = threading.Barrier(len(documents))
+    results = {}
+
+    def score(index):
+        start.wait()
+        results[index] = manager.create_batch_embeddings(documents[index])
+
+    threads = [threading.Thread(target=score, args=(index,)) for index in range(len(documents))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    manager._batcher.close()
+
+    for index, texts in enumerate(documents):
+        assert results[index][:, 0].tolist() == [len(text) for text in texts]
+    assert len(manager._model.batches) == 1 and len(manager._model.batches[0]) == 6
@@ -0,0 +1,28 @@
+"""
+The synthetic benchmark corpus must be reproducible across runs and commits.
+"""
+
+from benchmarks.corpus import SyntheticCorpus
+from src.scoring.document import DocumentAnalysis
+
+
+def test_corpus_is_deterministic_per_index():
+    first, second = SyntheticCorpus(seed=7), SyntheticCorpus(seed=7)
+
+    assert first.resume(42) == second.resume(42)
+    assert first.jd(3) == second.jd(3)
+    assert first.resume(42) != SyntheticCorpus(seed=8).resume(42)
+
+
+def test_pairs_cycle_over_jd_pool():
+    pairs = list(SyntheticCorpus().pairs(5, jd_pool=2))
+
+    assert len(pairs) == 5
+    assert len({resume for resume, _ in pairs}) == 5
+    assert len({jd for _, jd in pairs}) == 2
+
+
+def test_generated_resumes_have_detectable_sections():
+    doc = DocumentAnalysis(SyntheticCorpus().resume(0))
+
+    assert any(doc.has_section(name, "professional") for name in ("experience", "skills", "education"))
@@ -0,0 +1,95 @@
+"""
+Tests for section-aware chunking and chunked document embeddings.
+"""
+
+import re
+
+import numpy as np
+import pytest
+
+from benchmarks.corpus import SyntheticCorpus
+from src.scoring.chunking import ChunkedEmbedder, pool_embeddings, split_into_chunks
+
+RESUME = """Jane Doe
+Data Engineer
+
+SUMMARY
+Data engineer building streaming pipelines.
+
+EXPERIENCE
+Built Kafka and Spark pipelines processing billions of events.
+Maintained Airflow DAGs and dbt models.
+
+SKILLS
+Python, SQL, Kafka, Spark, Airflow
+"""
+
+
+def test_chunks_follow_section_boundaries():
+    chunks = split_into_chunks(RESUME)
+
+    assert [chunk.section for chunk in chunks] == [None, 'summary', 'experience', 'skills']
+    assert chunks[2].text.startswith("EXPERIENCE Built Kafka")
+    for chunk in chunks:
+        assert RESUME[chunk.start:chunk.end].split() == chunk.text.split()
+
+
+def test_long_documents_are_fully_covered_within_budget():
+    text = "\n".join(SyntheticCorpus().resume(index) for index in range(6))
+    chunks = split_into_chunks(text, max_tokens=120, overlap_tokens=20)
+
+    assert all(len(chunk.text) / 4 <= 120 for chunk in chunks)
+    covered = set()
+    for chunk in chunks:
+        covered.update(range(chunk.start, chunk.end))
+    words = [match.start() for match in re.finditer(r"\S+", text)]
+    assert all(position in covered for position in words)
+
+
+def test_overlong_lines_are_split_into_overlapping_windows():
+    text = " ".join(f"word{index}" for index in range(600))
+    chunks = split_into_chunks(text, max_tokens=100, overlap_tokens=20)
+
+    assert len(chunks) > 1
+    for first, second in zip(chunks, chunks[1:]):
+        assert second.start < first.end  # consecutive windows overlap
+    assert chunks[-1].text.endswith("word599")
+
+
+def test_pooling_methods():
+    embeddings = np.array([[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]])
+
+    assert np.allclose(pool_embeddings(embeddings, 'max'), np.array([1.0, 1.0]) / np.sqrt(2))
+    mean = pool_embeddings(embeddings, 'mean')
+    assert np.isclose(np.linalg.norm(mean), 1.0)
+    # Attention towards the first axis weights the first chunk most
+    attended = pool_embeddings(embeddings, 'attention', query=np.array([1.0, 0.0]))
+    assert attended[0] > mean[0]
+    with pytest.raises(ValueError):
+        pool_embeddings(embeddings, 'median')
+
+
+def test_embedder_batches_and_caches_chunks(fake_embedding_manager):
+    manager = fake_embedding_manager()
+    embedder = ChunkedEmbedder(manager)
+    jd = "Requirements\nKafka and Spark streaming experience\nPython and SQL"
+
+    score = embedder.similarity(RESUME, jd)
+    assert 0.0 < score <= 1.0
+    assert len(manager.batches) == 1  # all chunks of both documents in one batch
+
+    for pooling in ('max', 'attention'):
+        assert 0.0 < embedder.similarity(RESUME, jd, pooling=pooling) <= 1.0
+    assert len(manager.batches) == 1  # served from the chunk cache
+
+
+def test_max_sim_matrix_and_excerpt_point_at_matching_passages(fake_embedding_manager):
+    embedder = ChunkedEmbedder(fake_embedding_manager())
+    jd = "We need Kafka, Spark and Airflow pipelines"
+
+    resume_chunks, jd_chunks, matrix = embedder.max_sim_matrix(RESUME, jd)
+
+    assert matrix.shape == (len(resume_chunks), len(jd_chunks))
+    assert resume_chunks[int(matrix[:, 0].argmax())].section in ('experience', 'skills')
+    excerpt = embedder.relevant_excerpt(RESUME, jd, max_chars=80)
+    assert len(excerpt) <= 80 and "Kafka" in excerpt
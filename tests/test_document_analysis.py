@@ -0,0 +1,71 @@
+import pytest
+
+from src.scoring.document import DocumentAnalysis, ngram_counts, pairwise_tfidf_cosines, tfidf_cosine, tokenize
+from src.scoring.engine import ScoringEngine, ScoringOptions
+
+
+def test_tokenization_drops_stop_words():
+    doc = DocumentAnalysis("We are looking for a Python developer with the AWS skills")
+
+    assert set(doc.vocabulary) == {"looking", "python", "developer", "aws", "skills"}
+
+
+def test_keyword_overlap_ignores_stop_words():
+    jd = DocumentAnalysis("The candidate must know Python and Docker and AWS")
+    resume = DocumentAnalysis("Python and Docker engineer")
+
+    score, missing = jd.keyword_overlap(resume)
+
+    # Keywords: candidate, know, python, docker, aws -> two of five matched
+    assert score == 40.0
+    assert set(missing) == {"candidate", "know", "aws"}
+
+
+def test_missing_keywords_are_ranked_by_weight():
+    jd = DocumentAnalysis("Kubernetes\nKubernetes clusters\nKubernetes operators\nGraphQL\nteam")
+    resume = DocumentAnalysis("Python developer")
+
+    _, missing = jd.keyword_overlap(resume)
+
+    assert missing[0] == "kubernetes"
+    assert missing.index("graphql") < missing.index("team")
+
+
+def test_tfidf_cosine_matches_vectorizer_semantics():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    first, second = "python docker aws python", "python kubernetes aws"
+    matrix = TfidfVectorizer(stop_words="english", ngram_range=(1, 2)).fit_transform([first, second])
+    expected = cosine_similarity(matrix[0:1], matrix[1:2])[0][0]
+
+    actual = tfidf_cosine(ngram_counts(first.split(), (1, 2)), ngram_counts(second.split(), (1, 2)))
+
+    assert abs(actual - expected) < 1e-12
+
+
+def test_engine_limits_missing_keywords_per_profile():
+    engine = ScoringEngine()
+    jd = engine.analyze(" ".join(f"skill{i}" for i in range(40)))
+    resume = engine.analyze("skill0 skill1")
+
+    _, professional_missing = engine.hard_match(resume, jd, ScoringOptions.professional())
+    _, standard_missing = engine.hard_match(resume, jd, ScoringOptions.standard())
+
+    assert len(professional_missing) == 20
+    assert len(standard_missing) == 38
+
+
+def test_pairwise_cosines_match_single_pair_cosine():
+    pairs = [
+        ("python docker aws python", "python aws kubernetes"),
+        ("alpha beta gamma delta", "delta epsilon alpha zeta"),
+        ("unrelated words only", "nothing shared here"),
+        ("", "python"),
+    ]
+    first = [ngram_counts(tokenize(a), (1, 2)) for a, _ in pairs]
+    second = [ngram_counts(tokenize(b), (1, 2)) for _, b in pairs]
+
+    for max_features in (None, 3):
+        expected = [tfidf_cosine(a, b, max_features) for a, b in zip(first, second)]
+        assert list(pairwise_tfidf_cosines(first, second, max_features)) == pytest.approx(expected)
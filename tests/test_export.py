@@ -0,0 +1,89 @@
+"""
+Tests for the streaming evaluation export.
+"""
+
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from src.storage.export import export_records, iter_evaluation_batches
+
+JOB_ID = "export-job"
+
+
+@pytest.fixture(scope="module")
+def stored(api_client):
+    from src.storage.database import store_evaluation_results
+
+    for i in range(5):
+        store_evaluation_results({
+            'resume_id': f"resume-{i}", 'job_id': JOB_ID, 'final_score': 50 + i,
+            'missing_elements': ['docker', 'kafka'], 'verdict': 'Medium',
+        }, user_id=1)
+    store_evaluation_results({'resume_id': "other", 'job_id': JOB_ID, 'final_score': 90}, user_id=2)
+    return api_client
+
+
+@pytest.mark.parametrize("format", ["csv", "ndjson", "parquet"])
+def test_export_endpoint_streams_the_users_history(stored, format):
+    if format == "parquet":
+        pytest.importorskip("pyarrow")
+    response = stored.get("/api/v1/evaluations/export",
+                          params={"format": format, "job_id": JOB_ID, "batch_size": 2})
+    assert response.status_code == 200
+    assert f'.{format}"' in response.headers["content-disposition"]
+
+    if format == "csv":
+        frame = pd.read_csv(io.BytesIO(response.content))
+    elif format == "ndjson":
+        frame = pd.DataFrame([json.loads(line) for line in response.text.splitlines()])
+    else:
+        frame = pd.read_parquet(io.BytesIO(response.content))
+    assert frame['resume_id'].tolist() == [f"resume-{i}" for i in range(5)]
+    assert frame['relevance_score'].tolist() == [50, 51, 52, 53, 54]
+    assert set(frame['user_id']) == {1}
+
+
+def test_export_endpoint_filters_and_validates(stored):
+    response = stored.get("/api/v1/evaluations/export", params={"job_id": "no-such-job"})
+    assert response.status_code == 200
+    assert response.text.strip().split(",")[0] == "id"
+
+    assert stored.get("/api/v1/evaluations/export", params={"format": "xlsx"}).status_code == 422
+    assert stored.get("/api/v1/evaluations/export", params={"batch_size": 0}).status_code == 422
+
+
+def test_batches_come_from_partitions(stored):
+    from src.storage.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        sizes = [len(batch) for batch in iter_evaluation_batches(db, user_id=1, job_id=JOB_ID, batch_size=2)]
+    finally:
+        db.close()
+    assert sizes == [2, 2, 1]
+
+
+def test_export_records_round_trips_session_results():
+    records = [
+        {'final_score': 81.5, 'verdict': 'High', 'missing_skills': ['aws'], 'note': None},
+        {'final_score': 40.0, 'verdict': 'Low', 'missing_skills': [], 'note': "retry"},
+    ]
+    csv = pd.read_csv(io.BytesIO(export_records(records, 'csv', batch_size=1)))
+    assert csv['verdict'].tolist() == ['High', 'Low']
+    assert json.loads(csv['missing_skills'][0]) == ['aws']
+
+    lines = export_records(records, 'ndjson').decode().splitlines()
+    assert json.loads(lines[1])['note'] == "retry"
+
+    with pytest.raises(ValueError, match="Unknown export format"):
+        export_records(records, 'xml')
+
+    pq = pytest.importorskip("pyarrow.parquet")
+    parquet = pq.ParquetFile(io.BytesIO(export_records(records, 'parquet', batch_size=1)))
+    assert parquet.num_row_groups == 2
+    table = parquet.read()
+    assert table.column('note').to_pylist() == [None, "retry"]
+    assert table.column('final_score').to_pylist() == [81.5, 40.0]
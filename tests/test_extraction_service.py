@@ -0,0 +1,129 @@
+"""
+Tests for the pooled, persistently cached text extraction service.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+docx = pytest.importorskip("docx")
+
+from src.utils import extraction_service
+from src.utils.extraction_service import ExtractionError, ExtractionService
+
+
+def write_docx(path, text):
+    document = docx.Document()
+    document.add_paragraph(text)
+    document.save(str(path))
+    return str(path)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    (tmp_path / "files").mkdir()
+    resume = write_docx(tmp_path / "files" / "resume.docx", "Python developer with Kafka")
+    copy = write_docx(tmp_path / "files" / "copy.DOCX", "Python developer with Kafka")
+    broken = tmp_path / "files" / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    return tmp_path, [resume, copy, str(broken)]
+
+
+def counting_extractor(monkeypatch):
+    calls = []
+    original = extraction_service.extract_text
+
+    def extract(path):
+        calls.append(path)
+        return original(path)
+
+    monkeypatch.setattr(extraction_service, "extract_text", extract)
+    return calls
+
+
+def test_second_pass_is_served_from_the_cache(archive, monkeypatch):
+    tmp_path, paths = archive
+    calls = counting_extractor(monkeypatch)
+    service = ExtractionService(str(tmp_path / "cache.sqlite3"), workers=0)
+
+    texts, errors = service.extract_many(paths)
+    assert texts[paths[0]] == texts[paths[1]] == "Python developer with Kafka"
+    assert list(errors) == [paths[2]]
+    assert len(calls) == 2  # identical content is parsed once
+
+    calls.clear()
+    again = ExtractionService(str(tmp_path / "cache.sqlite3"), workers=0)
+    assert again.extract_many(paths) == (texts, errors)
+    assert calls == [] and again.stats()['hits'] == 3
+
+    again.extract_many(paths, retry_failed=True)
+    assert calls == [paths[2]]
+
+
+def test_parser_upgrade_invalidates_and_prunes(archive, monkeypatch):
+    tmp_path, paths = archive
+    calls = counting_extractor(monkeypatch)
+    ExtractionService(str(tmp_path / "cache.sqlite3"), workers=0, parser_version="old").extract(paths[0])
+
+    upgraded = ExtractionService(str(tmp_path / "cache.sqlite3"), workers=0, parser_version="new")
+    upgraded.extract(paths[0])
+    assert len(calls) == 2
+    assert upgraded.prune() == 1 and upgraded.stats()['cached_files'] == 1
+
+
+def test_slow_files_time_out(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction_service, "extract_text", lambda path: time.sleep(5))
+    service = ExtractionService(str(tmp_path / "cache.sqlite3"), workers=0, timeout=0.2)
+    path = write_docx(tmp_path / "slow.docx", "text")
+
+    started = time.monotonic()
+    with pytest.raises(ExtractionError, match="Timed out after 0.2s"):
+        service.extract(path)
+    assert time.monotonic() - started < 2
+    assert len(service.cache) == 0  # timeouts are retried on the next pass
+
+
+def test_uploads_time_out_off_the_main_thread(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction_service, "extract_text", lambda path: time.sleep(5))
+    service = ExtractionService(str(tmp_path / "cache.sqlite3"), workers=0, timeout=0.2)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(1) as request_thread:  # like the API threadpool or a Streamlit script thread
+        future = request_thread.submit(service.extract_bytes, b"%PDF-1.4", "upload.pdf")
+        with pytest.raises(ExtractionError, match="Timed out after 0.2s"):
+            future.result()
+    assert time.monotonic() - started < 2
+    assert len(service.cache) == 0
+    service.close()
+
+
+def test_process_pool_and_uploaded_bytes(archive):
+    tmp_path, paths = archive
+    service = ExtractionService(str(tmp_path / "cache.sqlite3"), workers=2)
+    try:
+        texts, errors = service.extract_many(paths)
+        assert texts[paths[1]] == "Python developer with Kafka"
+        assert "broken.pdf" in next(iter(errors))
+
+        with open(paths[0], "rb") as f:
+            assert service.extract_bytes(f.read(), "upload.docx") == "Python developer with Kafka"
+        assert service.extract_bytes(b"plain text", "notes.txt") == "plain text"
+        with pytest.raises(ExtractionError, match="Unsupported file format"):
+            service.extract_bytes(b"data", "sheet.xlsx")
+    finally:
+        service.close()
+
+
+def test_global_service_extracts_in_process(archive, monkeypatch):
+    tmp_path, paths = archive
+    monkeypatch.setenv("EXTRACTION_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(extraction_service, "_extraction_service", None)
+    service = extraction_service.get_extraction_service()
+    try:
+        with open(paths[0], "rb") as f:
+            assert service.extract_bytes(f.read(), "upload.docx") == "Python developer with Kafka"
+        assert service.workers == 0 and service._pool is None
+        assert service.stats()['cached_files'] == 1
+    finally:
+        service.close()
@@ -0,0 +1,210 @@
+"""
+Tests for the Unix-socket inference sidecar and its clients.
+"""
+
+import os
+import shutil
+import socket
+import stat
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+pytest.importorskip("msgpack")
+
+from src.inference.client import InferenceClient, InferenceError, RemoteGenerator
+from src.inference.protocol import pack_array, recv_frame, send_frame, unpack_array
+from src.inference.server import InferenceServer
+from src.scoring import semantic_match
+from src.scoring.spacy_backend import SpacyBackend
+from src.utils.embeddings import EmbeddingManager
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="Unix sockets only")
+
+
+@contextmanager
+def running_sidecar(manager, spacy_backend=None):
+    """Sidecar with the stand-in embedder and an echoing generator, on a short socket path"""
+    directory = tempfile.mkdtemp(prefix="sidecar", dir="/tmp")
+    path = f"{directory}/inference.sock"
+    server = InferenceServer(
+        path, max_wait_ms=50, include_llm=False, include_spacy=False, embedding_manager=manager,
+        spacy_backend=spacy_backend,
+        generator=lambda prompt, **kwargs: [{'generated_text': f"{prompt} {kwargs['max_new_tokens']}"}],
+    )
+    server.load()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = InferenceClient(path, timeout=10)
+    for _ in range(100):
+        if client.is_available():
+            break
+        time.sleep(0.02)
+    try:
+        yield server, client, manager
+    finally:
+        server.shutdown()
+        thread.join(timeout=5)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def sidecar(fake_embedding_manager):
+    # The delay is long enough for concurrent requests to queue up
+    with running_sidecar(fake_embedding_manager(delay=0.01)) as running:
+        yield running
+
+
+def test_arrays_travel_as_float16_frames():
+    vectors = np.random.default_rng(0).normal(size=(3, 384)).astype(np.float32)
+    payload = pack_array(vectors)
+    assert payload['dtype'] == '<f2' and len(payload['data']) == 3 * 384 * 2
+
+    first, second = socket.socketpair()
+    with first, second:
+        send_frame(first, {'op': 'embed', 'vectors': payload})
+        received = unpack_array(recv_frame(second)['vectors'])
+    assert received.dtype == np.float32
+    assert np.allclose(received, vectors, atol=1e-2)
+
+
+def test_embeddings_match_the_local_model(sidecar):
+    _, client, manager = sidecar
+    texts = ["Kafka and Spark pipelines", "Python developer"]
+
+    remote = client.embed(texts)
+    local = manager.create_batch_embeddings(texts)
+    assert remote.shape == (2, 64)
+    assert np.allclose(remote, local, atol=1e-3)
+    assert client.ping() == {'embeddings': 'bag-of-words', 'spacy': None, 'generator': 'huggingface_llm'}
+
+
+def test_concurrent_requests_are_coalesced(sidecar):
+    _, client, manager = sidecar
+    manager.batches.clear()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: client.embed([f"request number {i}"]), range(8)))
+
+    assert all(result.shape == (1, 64) for result in results)
+    assert sum(len(batch) for batch in manager.batches) == 8
+    assert len(manager.batches) < 8
+
+
+def test_errors_and_generation(sidecar):
+    _, client, _ = sidecar
+
+    with pytest.raises(InferenceError, match="No spaCy model"):
+        client.spacy(["text"])
+    with pytest.raises(InferenceError, match="Unknown op"):
+        client.call('train')
+    assert RemoteGenerator(client)("Score:", max_new_tokens=5) == [{'generated_text': "Score: 5"}]
+
+
+def test_socket_is_private_and_hung_up_clients_are_dropped(sidecar):
+    server, client, _ = sidecar
+    assert stat.S_IMODE(os.stat(server.socket_path).st_mode) == 0o600
+
+    errors = []
+    server._server.handle_error = lambda request, address: errors.append(sys.exc_info()[1])
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as hung_up:
+        hung_up.connect(server.socket_path)
+        send_frame(hung_up, {'op': 'embed', 'texts': ["gone before the reply"] * 64})
+    time.sleep(0.3)
+
+    assert not errors
+    assert client.ping()['embeddings'] == 'bag-of-words'
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="fork is POSIX only")
+def test_forked_child_opens_its_own_connection(sidecar):
+    _, client, _ = sidecar
+    client.ping()  # main-thread connection now open in the parent
+    inherited = client._local.sock
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            client.ping()
+            code = 0 if client._local.sock is not inherited else 1
+        except Exception:
+            code = 2
+        os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert client._local.sock is inherited
+    assert client.embed(["Python developer"]).shape == (1, 64)
+
+
+def test_embedding_manager_and_semantic_match_become_thin_clients(sidecar, monkeypatch):
+    server, _, _ = sidecar
+    monkeypatch.setenv("INFERENCE_SOCKET", server.socket_path)
+    monkeypatch.delenv("EMBEDDING_BACKEND", raising=False)
+    monkeypatch.setattr(semantic_match, "_sidecar_status", None)
+    monkeypatch.setattr(semantic_match, "_hf_pipeline", None)
+
+    manager = EmbeddingManager()
+    assert manager.backend == 'remote' and manager.model_name == 'bag-of-words'
+    assert manager.create_batch_embeddings(["Python developer"]).shape == (1, 64)
+
+    available = semantic_match.backend_availability()
+    assert available == {'huggingface_llm': True, 'sentence_transformers': True, 'spacy': False}
+    assert isinstance(semantic_match._get_huggingface_pipeline(), RemoteGenerator)
+
+
+def test_sidecar_ping_results_expire(monkeypatch):
+    class FlakyClient:
+        pings = 0
+        models = None
+
+        def ping(self):
+            self.pings += 1
+            if self.models is None:
+                raise InferenceError("down")
+            return self.models
+
+    client = FlakyClient()
+    monkeypatch.setattr(semantic_match, "get_inference_client", lambda: client)
+    monkeypatch.setattr(semantic_match, "_sidecar_status", None)
+
+    assert semantic_match._get_sidecar_models() is None
+    assert semantic_match._get_sidecar_models() is None
+    assert client.pings == 1  # the failure is cached too
+
+    client.models = {'embeddings': "restarted"}
+    monkeypatch.setattr(semantic_match, "SIDECAR_PING_TTL", 0.0)
+    assert semantic_match._get_sidecar_models() == {'embeddings': "restarted"}
+    assert client.pings == 2
+
+
+def test_unreachable_sidecar_falls_back_to_local(monkeypatch):
+    monkeypatch.setenv("INFERENCE_SOCKET", "/tmp/no-such-inference.sock")
+    monkeypatch.delenv("EMBEDDING_BACKEND", raising=False)
+
+    manager = EmbeddingManager()
+    assert manager.backend == 'torch'
+    with pytest.raises(InferenceError):
+        InferenceClient("/tmp/no-such-inference.sock").ping()
+
+
+def test_spacy_artifacts_come_from_the_sidecar(fake_embedding_manager):
+    spacy = pytest.importorskip("spacy")
+    from spacy.training import Example
+
+    nlp = spacy.blank("en")
+    nlp.add_pipe("tok2vec")
+    nlp.initialize(lambda: [Example.from_dict(nlp.make_doc("Python and Kafka"), {})])
+    local = SpacyBackend(nlp=nlp)
+    resume, jd = "Built Kafka pipelines in Python", "Java engineer with Kafka experience"
+
+    with running_sidecar(fake_embedding_manager(), spacy_backend=SpacyBackend(nlp=nlp)) as (_, client, _):
+        remote = SpacyBackend(client=client)
+        assert remote.available
+        assert remote.similarity(resume, jd) == pytest.approx(local.similarity(resume, jd), abs=1e-2)
+        assert remote.skills(resume, ["python", "java", "kafka"]) == ["python", "kafka"]
@@ -0,0 +1,67 @@
+"""
+Tests for the Prometheus instrumentation.
+"""
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from prometheus_client import REGISTRY
+
+from src.scoring.semantic_match import calculate_detailed_semantic_match
+from src.utils.analysis_cache import AnalysisCache
+from src.utils.metrics import record_fallback, timed
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_timed_decorator_observes_sync_and_async_calls():
+    @timed("test_sync_stage")
+    def work():
+        return 1
+
+    @timed("test_async_stage")
+    async def async_work():
+        return 2
+
+    import asyncio
+
+    before = sample("resume_stage_duration_seconds_count", stage="test_sync_stage")
+    assert work() == 1
+    assert asyncio.run(async_work()) == 2
+
+    assert sample("resume_stage_duration_seconds_count", stage="test_sync_stage") == before + 1
+    assert sample("resume_stage_duration_seconds_count", stage="test_async_stage") >= 1
+
+
+def test_semantic_backends_are_timed():
+    before = sample("resume_semantic_backend_duration_seconds_count", backend="tfidf")
+    calculate_detailed_semantic_match({"raw_text": "python developer"}, {"raw_text": "python engineer"})
+
+    assert sample("resume_semantic_backend_duration_seconds_count", backend="tfidf") == before + 1
+
+
+def test_fallbacks_and_cache_lookups_are_counted():
+    before = sample("resume_semantic_backend_fallbacks_total", from_backend="spacy", to_backend="tfidf")
+    record_fallback("spacy", "tfidf")
+    assert sample("resume_semantic_backend_fallbacks_total", from_backend="spacy", to_backend="tfidf") == before + 1
+
+    cache = AnalysisCache(name="test_cache")
+    cache.get_or_compute("key", lambda: "value")
+    cache.get_or_compute("key", lambda: "value")
+    assert sample("resume_cache_requests_total", cache="test_cache", result="hit") == 1
+    assert sample("resume_cache_requests_total", cache="test_cache", result="miss") == 1
+    assert sample("resume_cache_hit_ratio", cache="test_cache") == 0.5
+
+
+def test_metrics_endpoint_exposes_request_and_stage_metrics(api_client):
+    api_client.post("/api/v1/evaluate/", data={"resume_text": "Python developer", "jd_text": "Python engineer"})
+    response = api_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'resume_stage_duration_seconds_count{stage="http_request"}' in response.text
+    assert 'resume_stage_duration_seconds_count{stage="db_store_evaluation"}' in response.text
+    assert 'resume_queue_depth{queue="http_requests"} 0.0' in response.text
@@ -0,0 +1,82 @@
+"""
+Tests for the shared document normalization.
+"""
+
+import re
+
+from src.scoring import normalization
+from src.scoring.document import DocumentAnalysis
+from src.scoring.engine import ScoringEngine, ScoringOptions
+from src.scoring.normalization import NormalizedDocument, clean_text, normalize
+from src.scoring.semantic_match import calculate_detailed_semantic_match
+
+RESUME = """JANE DOE
+Data Engineer | jane@example.com
+
+EXPERIENCE
+• Built Kafka → Spark pipelines.  Cut latency by 40%!
+• Maintained Airflow DAGs (dbt, SQL)
+
+SKILLS
+Python, SQL, Kafka
+"""
+
+
+def two_pass_clean(text):
+    """The cleaning previously duplicated across the backends"""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text.strip())
+    text = re.sub(r'[^\w\s\.,!?;:()-]', ' ', text)
+    return text.lower()
+
+
+def test_single_pass_cleaning_matches_previous_output():
+    samples = [RESUME, "", "  tabs\tand\n\nnewlines  ", "C++ & C# — résumé™ (2020–2024)", "a  #  b"]
+    for sample in samples:
+        assert clean_text(sample) == two_pass_clean(sample)
+
+
+def test_artifacts_are_computed_once(monkeypatch):
+    calls = []
+    original = normalization.clean_text
+    monkeypatch.setattr(normalization, "clean_text", lambda text: calls.append(text) or original(text))
+    document = NormalizedDocument(RESUME)
+
+    assert document.cleaned is document.cleaned
+    assert document.analysis is document.analysis
+    assert document.tokens is document.analysis.terms
+    assert len(calls) == 1
+    assert not hasattr(document, "__dict__")
+
+
+def test_normalize_reuses_existing_objects():
+    document = NormalizedDocument(RESUME)
+    analysis = DocumentAnalysis(RESUME)
+
+    assert normalize(document) is document
+    assert normalize(analysis).analysis is analysis
+    assert normalize({"raw_text": RESUME}).text == RESUME
+    assert normalize(None).text == ""
+
+
+def test_engine_accepts_normalized_documents():
+    engine = ScoringEngine()
+    options = ScoringOptions.standard()
+    jd = "Requirements\nKafka, Spark and Airflow experience"
+
+    from_text = engine.score(RESUME, jd, options)
+    from_documents = engine.score(NormalizedDocument(RESUME), NormalizedDocument(jd), options)
+
+    for key in ('hard_match_score', 'semantic_match_score', 'section_scores'):
+        assert from_text[key] == from_documents[key]
+
+
+def test_detailed_match_normalizes_each_text_once(monkeypatch):
+    calls = []
+    original = normalization.clean_text
+    monkeypatch.setattr(normalization, "clean_text", lambda text: calls.append(text) or original(text))
+
+    calculate_detailed_semantic_match({"raw_text": RESUME}, {"raw_text": "Kafka and Spark engineer"})
+
+    assert len(calls) == 2
@@ -0,0 +1,129 @@
+"""
+Tests for the int8 ONNX embedding backend.
+"""
+
+import numpy as np
+import pytest
+
+from src.utils import onnx_embeddings
+from src.utils.embeddings import EmbeddingManager
+
+TEXTS = [
+    "python developer",
+    "senior machine learning engineer with years of experience",
+    "sql aws docker",
+    "team lead",
+]
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    """A small randomly initialised BERT saved locally, so no download is needed"""
+    pytest.importorskip("onnxruntime")
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+
+    model_dir = tmp_path_factory.mktemp("tiny-bert")
+    words = sorted({word for text in TEXTS for word in text.split()})
+    specials = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    (model_dir / "vocab.txt").write_text("\n".join(specials + words) + "\n")
+    tokenizer = transformers.BertTokenizerFast(str(model_dir / "vocab.txt"))
+    tokenizer.save_pretrained(model_dir)
+
+    torch.manual_seed(0)
+    config = transformers.BertConfig(
+        vocab_size=tokenizer.vocab_size, hidden_size=384, num_hidden_layers=2,
+        num_attention_heads=6, intermediate_size=512
+    )
+    model = transformers.BertModel(config).eval()
+    model.save_pretrained(model_dir)
+    return str(model_dir), tokenizer, model
+
+
+def test_onnx_embeddings_match_torch_mean_pooling(tiny_model, tmp_path):
+    """Checks export, quantization and pooling against torch on the tiny random BERT
+
+    This only proves the ONNX pipeline reproduces mean pooling for that model;
+    parity with the real MiniLM backend is covered by the test below, which
+    runs when sentence-transformers and the model weights are available.
+    """
+    import torch
+
+    model_dir, tokenizer, model = tiny_model
+    onnx_model = onnx_embeddings.OnnxEmbeddingModel(model_dir, root=tmp_path, export_if_missing=True)
+
+    encoded = tokenizer(TEXTS, padding=True, return_tensors="pt")
+    with torch.no_grad():
+        hidden = model(**encoded).last_hidden_state
+    mask = encoded["attention_mask"][..., None].float()
+    expected = ((hidden * mask).sum(1) / mask.sum(1)).numpy()
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+
+    # Batches of two force padding to differ from the single reference batch
+    actual = onnx_model.encode(TEXTS, batch_size=2, normalize_embeddings=True)
+
+    assert actual.shape == (len(TEXTS), onnx_embeddings.EMBEDDING_DIM)
+    assert np.min(np.sum(actual * expected, axis=1)) > 0.98
+    assert np.max(np.abs(actual @ actual.T - expected @ expected.T)) < 0.05
+    assert onnx_model.encode(TEXTS[0]).shape == (onnx_embeddings.EMBEDDING_DIM,)
+
+
+def test_onnx_embeddings_match_sentence_transformers(tmp_path):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("torch")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    try:
+        reference = sentence_transformers.SentenceTransformer("all-MiniLM-L6-v2")
+    except Exception as e:
+        pytest.skip(f"all-MiniLM-L6-v2 is not available: {e}")
+
+    onnx_model = onnx_embeddings.OnnxEmbeddingModel("all-MiniLM-L6-v2", root=tmp_path, export_if_missing=True)
+    expected = reference.encode(TEXTS, normalize_embeddings=True)
+    actual = onnx_model.encode(TEXTS, normalize_embeddings=True)
+
+    assert actual.shape == expected.shape
+    assert np.min(np.sum(actual * expected, axis=1)) > 0.97
+    assert np.max(np.abs(actual @ actual.T - expected @ expected.T)) < 0.05
+
+
+def test_quantized_model_is_reused(tiny_model, tmp_path):
+    model_dir, _, _ = tiny_model
+    first = onnx_embeddings.export_quantized_model(model_dir, root=tmp_path)
+    mtime = first.stat().st_mtime_ns
+
+    assert onnx_embeddings.export_quantized_model(model_dir, root=tmp_path) == first
+    assert first.stat().st_mtime_ns == mtime
+
+
+def test_loading_never_exports(tiny_model, tmp_path):
+    model_dir, _, _ = tiny_model
+    with pytest.raises(FileNotFoundError, match="onnx_embeddings export"):
+        onnx_embeddings.OnnxEmbeddingModel(model_dir, root=tmp_path)
+
+    onnx_embeddings.export_quantized_model(model_dir, root=tmp_path)
+    assert onnx_embeddings.OnnxEmbeddingModel(model_dir, root=tmp_path).encode("team lead").shape == (384,)
+    # Only the finished model directory and its lock are left behind, no staging directories
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        [onnx_embeddings.model_directory(model_dir, tmp_path).name,
+         f".{onnx_embeddings.model_directory(model_dir, tmp_path).name}.lock"]
+    )
+
+
+def test_onnx_backend_falls_back_to_torch_when_unavailable(monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise RuntimeError("onnxruntime and transformers are required for the ONNX backend")
+
+    monkeypatch.setattr(onnx_embeddings, "OnnxEmbeddingModel", unavailable)
+    manager = EmbeddingManager(backend="onnx")
+
+    assert manager.backend == "torch"
+
+
+def test_embedding_backend_is_read_from_environment(monkeypatch):
+    monkeypatch.setattr(onnx_embeddings, "OnnxEmbeddingModel", lambda *args, **kwargs: "onnx-model")
+    monkeypatch.setenv("EMBEDDING_BACKEND", "onnx")
+
+    manager = EmbeddingManager()
+
+    assert manager.backend == "onnx"
+    assert manager._model == "onnx-model"
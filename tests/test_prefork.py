@@ -0,0 +1,76 @@
+"""
+Tests for pre-fork preloading: fork safety and the memory report.
+"""
+
+import gc
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.api import prefork
+from src.api.prefork import format_memory_report, memory_report
+from src.utils.batching import MicroBatcher
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason="fork is POSIX only")
+
+
+def test_micro_batcher_works_in_forked_child():
+    batcher = MicroBatcher(lambda items: [item * 2 for item in items], max_wait_ms=1.0)
+    assert batcher(1, timeout=5) == 2  # worker thread now running in the parent
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            code = 0 if batcher(21, timeout=5) == 42 else 1
+        except Exception:
+            code = 2
+        os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    batcher.close()
+
+
+def test_memory_report_counts_pages_shared_with_workers():
+    weights = np.ones((64, 1024, 1024 // 8))  # 64 MB of "model weights"
+    workers = []
+    for _ in range(2):
+        pid = os.fork()
+        if pid == 0:
+            float(weights.sum())  # read-only use keeps the pages shared
+            time.sleep(30)
+            os._exit(0)
+        workers.append(pid)
+
+    try:
+        time.sleep(0.5)
+        report = memory_report(os.getpid())
+        assert report['workers'] >= 2
+        children = [entry for entry in report['processes'] if entry['pid'] in workers]
+        assert all(entry['shared_mb'] > 50 for entry in children)
+        assert report['shared_savings_mb'] > 50
+        assert "workers:" in format_memory_report(report)
+    finally:
+        for pid in workers:
+            os.kill(pid, 9)
+            os.waitpid(pid, 0)
+
+
+def test_freeze_heap_moves_objects_to_permanent_generation():
+    if not hasattr(gc, 'freeze'):
+        pytest.skip("gc.freeze needs Python 3.7+")
+    try:
+        prefork.freeze_heap()
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+
+def test_gunicorn_config_preloads():
+    pytest.importorskip("gunicorn")
+    from src.api import gunicorn_conf
+
+    assert gunicorn_conf.preload_app is True
+    assert gunicorn_conf.worker_class == 'uvicorn.workers.UvicornWorker'
+    assert callable(gunicorn_conf.on_starting)
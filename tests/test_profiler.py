@@ -0,0 +1,61 @@
+"""
+Tests for the sampling profiler and its admin endpoint.
+"""
+
+import threading
+
+import pytest
+
+from src.utils import profiler
+from src.utils.profiler import ProfilerBusyError, format_collapsed, sample_stacks
+
+
+def busy_scoring_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_samples_other_threads_in_collapsed_format():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_scoring_loop, args=(stop,))
+    worker.start()
+    try:
+        result = sample_stacks(0.2, rate_hz=200, include="busy_scoring_loop")
+    finally:
+        stop.set()
+        worker.join()
+
+    assert result["samples"] > 5
+    assert result["threads"] == 1
+    # Most samples land in the loop body; a few may catch it inside stop.is_set()
+    lines = format_collapsed(result["stacks"]).splitlines()
+    assert len(lines) == len(result["stacks"])
+    top_stack, top_count = lines[0].rsplit(" ", 1)
+    assert top_stack.split(";")[-1].startswith("busy_scoring_loop (tests/test_profiler.py)")
+    assert all("busy_scoring_loop (tests/test_profiler.py)" in stack for stack in result["stacks"])
+    assert int(top_count) == max(result["stacks"].values())
+
+
+def test_refuses_concurrent_profiles():
+    with profiler._active:
+        with pytest.raises(ProfilerBusyError):
+            sample_stacks(0.01)
+
+
+def test_profile_endpoint_requires_admin(api_client, monkeypatch):
+    monkeypatch.setattr("src.api.auth.ADMIN_USERNAMES", set())
+    assert api_client.post("/api/v1/admin/profile?seconds=0.05").status_code == 403
+
+    monkeypatch.setattr("src.api.auth.ADMIN_USERNAMES", {"tester"})
+    response = api_client.post("/api/v1/admin/profile?seconds=0.05&rate=100")
+    assert response.status_code == 200
+    assert int(response.headers["X-Profile-Samples"]) >= 1
+
+    payload = api_client.post("/api/v1/admin/profile?seconds=0.05&format=json").json()
+    assert set(payload) >= {"stacks", "samples", "duration_s", "rate_hz"}
+
+
+def test_profile_endpoint_reports_busy(api_client, monkeypatch):
+    monkeypatch.setattr("src.api.auth.ADMIN_USERNAMES", {"tester"})
+    with profiler._active:
+        assert api_client.post("/api/v1/admin/profile?seconds=0.05").status_code == 409
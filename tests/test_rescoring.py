@@ -0,0 +1,125 @@
+"""
+Tests for JD versioning and incremental re-scoring of stored candidates.
+"""
+
+import numpy as np
+
+from benchmarks.corpus import SyntheticCorpus
+from src.scoring.chunking import ChunkedEmbedder
+from src.scoring.rescoring import (
+    CandidateProfile, combine, diff_job_descriptions, embed_profiles, parse_job_description, rescore
+)
+from src.scoring.screening import MatrixScorer
+
+JD = """Senior Data Engineer
+
+REQUIREMENTS
+3+ years of experience with Python and SQL.
+Build Kafka and Spark pipelines.
+
+NICE TO HAVE
+Airflow, dbt
+"""
+
+EDITED_JD = """Senior Data Engineer
+
+REQUIREMENTS
+5+ years of experience with Python and SQL.
+Build Kafka and Flink pipelines on Kubernetes.
+
+NICE TO HAVE
+Airflow, dbt
+"""
+
+
+def _full_scores(scorer, jd_text, profiles):
+    result = rescore(scorer, jd_text, parse_job_description(jd_text), profiles)
+    return result['hard'], result['semantic']
+
+
+def test_diff_reports_keywords_sections_and_experience():
+    diff = diff_job_descriptions(parse_job_description(JD), parse_job_description(EDITED_JD))
+
+    assert {'flink', 'kubernetes'} <= set(diff['keywords_added'])
+    assert 'spark' in diff['keywords_removed'] and 'python' not in diff['keywords_removed']
+    assert diff['experience_required'] is not None
+    assert diff['text_changed']
+
+    same = diff_job_descriptions(parse_job_description(JD), parse_job_description(JD.replace("\n", "\n\n")))
+    assert not same['keywords_added'] and not same['keywords_removed'] and not same['text_changed']
+
+
+def test_incremental_rescoring_matches_full_recompute():
+    corpus = SyntheticCorpus()
+    old_jd, new_jd = corpus.jd(0), corpus.jd(0) + "\nKubernetes, Terraform and Go experience.\n"
+    new_jd = new_jd.replace(new_jd.split()[3], "", 1)
+    profiles = {index: CandidateProfile.from_text(text) for index, text in enumerate(corpus.resumes(20))}
+    scorer = MatrixScorer(semantic='tfidf')
+
+    old_parsed, new_parsed = parse_job_description(old_jd), parse_job_description(new_jd)
+    first = rescore(scorer, old_jd, old_parsed, profiles)
+    diff = diff_job_descriptions(old_parsed, new_parsed)
+    assert diff['keywords_added']
+    incremental = rescore(scorer, new_jd, new_parsed, profiles,
+                          matched=dict(zip(first['keys'], first['matched'])), diff=diff)
+
+    hard, semantic = _full_scores(scorer, new_jd, profiles)
+    assert incremental['hard_recomputed'] and incremental['semantic_recomputed']
+    np.testing.assert_allclose(incremental['hard'], hard)
+    np.testing.assert_allclose(incremental['semantic'], semantic)
+    final, verdicts = combine(incremental['hard'], incremental['semantic'])
+    assert len(verdicts) == 20 and np.all((final >= 0) & (final <= 100))
+
+
+def test_edits_embed_only_the_new_jd(fake_embedding_manager):
+    manager = fake_embedding_manager()
+    scorer = MatrixScorer(semantic='embeddings', embedder=ChunkedEmbedder(manager=manager, cache_size=0))
+    texts = dict(enumerate(SyntheticCorpus().resumes(5)))
+    profiles = {key: CandidateProfile.from_text(text) for key, text in texts.items()}
+    embed_profiles(scorer, texts, profiles)
+    assert all(profile.vector is not None for profile in profiles.values())
+
+    old_parsed, new_parsed = parse_job_description(JD), parse_job_description(EDITED_JD)
+    first = rescore(scorer, JD, old_parsed, profiles)
+    manager.batches.clear()
+    incremental = rescore(scorer, EDITED_JD, new_parsed, profiles, matched=dict(zip(first['keys'], first['matched'])),
+                          diff=diff_job_descriptions(old_parsed, new_parsed))
+
+    embedded = [text for call in manager.batches for text in call]
+    assert embedded and all(text.split()[0] in EDITED_JD for text in embedded)
+    assert not any(text in resume for text in embedded for resume in texts.values())
+    np.testing.assert_allclose(incremental['semantic'], _full_scores(scorer, EDITED_JD, profiles)[1])
+
+
+def test_job_endpoints_version_and_rerank(api_client):
+    created = api_client.post("/api/v1/jobs/", json={"jd_text": JD, "title": "Data Engineer"})
+    assert created.status_code == 201
+    job_id = created.json()['job_id']
+
+    resumes = [
+        {"name": "spark", "resume_text": "Python SQL Kafka Spark pipelines engineer"},
+        {"name": "flink", "resume_text": "Python SQL Kafka Flink Kubernetes pipelines engineer"},
+        {"name": "none", "resume_text": "Pastry chef and baker"},
+    ]
+    added = api_client.post(f"/api/v1/jobs/{job_id}/candidates", json={"resumes": resumes}).json()
+    assert added['added'] == 3
+    again = api_client.post(f"/api/v1/jobs/{job_id}/candidates", json={"resumes": resumes[:1]}).json()
+    assert (again['added'], again['already_present']) == (0, 1)
+
+    ranking = api_client.get(f"/api/v1/jobs/{job_id}/ranking").json()
+    assert [row['name'] for row in ranking][0] == "spark" and ranking[-1]['name'] == "none"
+
+    updated = api_client.put(f"/api/v1/jobs/{job_id}", json={"jd_text": EDITED_JD}).json()
+    assert updated['version'] == 2 and updated['candidates'] == 3 and updated['hard_recomputed']
+    assert updated['top'][0]['name'] == "flink" and updated['top'][0]['version'] == 2
+    assert 'kubernetes' not in updated['top'][0]['missing_keywords']
+
+    unchanged = api_client.put(f"/api/v1/jobs/{job_id}", json={"jd_text": EDITED_JD}).json()
+    assert not unchanged['changed'] and unchanged['version'] == 2
+
+    versions = api_client.get(f"/api/v1/jobs/{job_id}/versions").json()
+    assert [version['version'] for version in versions] == [1, 2]
+    assert versions[0]['diff'] is None and 'flink' in versions[1]['diff']['keywords_added']
+
+    assert api_client.get("/api/v1/jobs/9999/ranking").status_code == 404
+    assert any(job['job_id'] == job_id for job in api_client.get("/api/v1/jobs/").json())
@@ -0,0 +1,130 @@
+"""
+Tests for the pre-aggregated analytics rollups.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.storage.rollups import ScoreRollup, histogram_percentiles, score_bucket
+
+JOB_ID = "rollup-job"
+SCORES = [35, 62, 68, 71, 100]
+
+
+@pytest.fixture(scope="module")
+def stored(api_client):
+    from src.storage.database import store_evaluation_results
+
+    for score, verdict in zip(SCORES, ['Low', 'Medium', 'Medium', 'High', 'High']):
+        store_evaluation_results({'job_id': JOB_ID, 'final_score': score, 'verdict': verdict}, user_id=1)
+    store_evaluation_results({'job_id': JOB_ID, 'final_score': 10}, user_id=2)
+    store_evaluation_results({'job_id': "rollup-other", 'final_score': 90}, user_id=1)
+    return api_client
+
+
+def test_summary_endpoint_serves_rollups(stored):
+    response = stored.get("/api/v1/analytics/summary", params={"job_id": JOB_ID})
+    assert response.status_code == 200
+    summary = response.json()
+
+    assert summary['count'] == 5
+    assert summary['mean'] == pytest.approx(sum(SCORES) / 5)
+    assert (summary['min'], summary['max']) == (35, 100)
+    histogram = {bucket['bucket']: bucket['count'] for bucket in summary['histogram']}
+    assert len(histogram) == 10
+    assert (histogram['30-40'], histogram['60-70'], histogram['70-80'], histogram['90-100']) == (1, 2, 1, 1)
+    today = datetime.utcnow().date().isoformat()
+    assert summary['daily'] == [{'day': today, 'count': 5, 'mean': summary['mean'], 'min': 35, 'max': 100}]
+    assert [job['job_id'] for job in summary['jobs']] == [JOB_ID]
+
+    everything = stored.get("/api/v1/analytics/summary").json()
+    assert {job['job_id'] for job in everything['jobs']} >= {JOB_ID, "rollup-other"}
+    future = stored.get("/api/v1/analytics/summary", params={"since": "2999-01-01"}).json()
+    assert future['count'] == 0 and future['mean'] is None and future['daily'] == []
+
+
+def test_aggregate_endpoints(stored):
+    params = {"job_id": JOB_ID}
+    distribution = stored.get("/api/v1/analytics/distribution", params=params).json()
+    assert distribution['count'] == 5 and 60 <= distribution['p50'] <= 70
+    assert distribution['p25'] <= distribution['p50'] <= distribution['p75'] <= distribution['p90'] <= 100
+
+    verdicts = stored.get("/api/v1/analytics/verdicts", params=params).json()
+    assert [(row['verdict'], row['count']) for row in verdicts['verdicts']] == [('High', 2), ('Medium', 2), ('Low', 1)]
+
+    for interval in ("week", "month"):
+        trend = stored.get("/api/v1/analytics/trends", params={**params, "interval": interval}).json()
+        assert len(trend['points']) == 1 and trend['points'][0]['count'] == 5
+    assert stored.get("/api/v1/analytics/trends", params={"interval": "hour"}).status_code == 422
+
+    jobs = {job['job_id']: job for job in stored.get("/api/v1/analytics/jobs").json()['jobs']}
+    assert jobs[JOB_ID]['success_rate'] == pytest.approx(0.4)
+    assert jobs[JOB_ID]['verdicts'] == {'High': 2, 'Medium': 2, 'Low': 1}
+    assert jobs["rollup-other"]['p50'] == 90
+
+
+def test_analytics_responses_revalidate_by_etag(stored):
+    first = stored.get("/api/v1/analytics/verdicts", params={"job_id": JOB_ID})
+    etag = first.headers["etag"]
+    assert "no-cache" in first.headers["cache-control"]
+
+    cached = stored.get("/api/v1/analytics/verdicts", params={"job_id": JOB_ID}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+
+    from src.storage.database import store_evaluation_results
+    store_evaluation_results({'job_id': "rollup-etag", 'final_score': 55, 'verdict': 'Medium'}, user_id=1)
+    changed = stored.get("/api/v1/analytics/verdicts", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+
+def test_rebuild_matches_incremental_rollups(stored):
+    from src.storage.database import SessionLocal
+    from src.storage.rollups import rebuild_rollups, summarize, verdict_breakdown
+
+    db = SessionLocal()
+    try:
+        before = summarize(db), verdict_breakdown(db)
+        counts = rebuild_rollups(db)
+        assert (summarize(db), verdict_breakdown(db)) == before
+        assert counts['evaluations'] == before[0]['count']
+    finally:
+        db.close()
+
+
+def test_backfill_only_rebuilds_missing_rollups(stored):
+    from src.api.main import backfill_analytics
+    from src.storage.database import EvaluationRollup, EvaluationScoreBucket, EvaluationVerdictCount, SessionLocal
+    from src.storage.rollups import backfill_rollups, summarize
+
+    db = SessionLocal()
+    try:
+        before = summarize(db)
+        assert backfill_rollups(db) is None
+
+        for model in (EvaluationVerdictCount, EvaluationScoreBucket, EvaluationRollup):
+            db.query(model).delete()
+        db.commit()
+        backfill_analytics()  # what the API runs at startup
+        assert summarize(db) == before
+        assert backfill_rollups(db) is None
+    finally:
+        db.close()
+
+
+def test_score_rollup():
+    rollup = ScoreRollup([35, 62.5, 69.9, 70])
+    rollup.add(100)
+    assert rollup.count == 5 and rollup.mean == pytest.approx(67.48)
+    assert (rollup.minimum, rollup.maximum) == (35, 100)
+    assert rollup.share_at_least(70) == pytest.approx(0.4)
+    assert rollup.to_dict()['histogram']['60-70'] == 2
+    assert ScoreRollup().mean is None and ScoreRollup().share_at_least(70) == 0.0
+    assert [score_bucket(s) for s in (0, 9.99, 10, 99.5, 100, 120)] == [0, 0, 1, 9, 9, 9]
+
+
+def test_histogram_percentiles_are_vectorised_over_rows():
+    counts = [[0, 0, 0, 1, 0, 0, 2, 1, 0, 1], [0] * 10]
+    values = histogram_percentiles(counts, [0.5, 0.9], minimums=[35, 0], maximums=[100, 0])
+    assert values[0, 0] == pytest.approx(67.5) and values[0, 1] == pytest.approx(95)
+    assert all(value != value for value in values[1])  # NaN for an empty row
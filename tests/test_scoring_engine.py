@@ -0,0 +1,54 @@
+"""
+Parity tests for the unified scoring engine.
+
+The expected values in fixtures/scoring_parity.json were recorded from the
+per-UI implementations that the engine replaced, so each profile must keep
+producing the same semantic scores. Keyword hard match was deliberately
+changed to ignore stop words (test_document_analysis.py), and the section
+values were re-recorded when header detection moved to the compiled
+classifier (test_sections.py).
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.scoring.engine import ScoringEngine, ScoringOptions
+
+FIXTURE = json.loads((Path(__file__).parent / "fixtures" / "scoring_parity.json").read_text())
+CASES = FIXTURE["cases"]
+PROFILES = {
+    "standard": ScoringOptions.standard(),
+    "professional": ScoringOptions.professional(),
+}
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return ScoringEngine()
+
+
+@pytest.mark.parametrize("profile", sorted(PROFILES))
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_scores_match_recorded_outputs(engine, profile, case):
+    expected = FIXTURE["expected"][profile][case]
+    result = engine.score(CASES[case]["resume"], CASES[case]["jd"], PROFILES[profile])
+
+    assert result["semantic_match_score"] == pytest.approx(expected["semantic_match_score"])
+    assert result["resume_sections"] == expected["resume_sections"]
+    assert result["jd_sections"] == expected["jd_sections"]
+    assert result["section_scores"] == pytest.approx(expected["section_scores"])
+
+
+def test_score_accepts_parsed_documents_and_reports_timings(engine):
+    case = CASES["short"]
+    result = engine.score({"raw_text": case["resume"]}, {"raw_text": case["jd"]})
+
+    assert result["hard_match_score"] > 0
+    assert set(result["timings"]) >= {"hard_match", "semantic_match", "section_extraction", "section_scoring", "total"}
+
+
+def test_options_are_hashable_for_cache_keys():
+    assert hash(ScoringOptions.professional()) == hash(ScoringOptions.professional())
+    assert ScoringOptions.professional() != ScoringOptions.standard()
@@ -0,0 +1,120 @@
+"""
+Tests for the offline bulk screening command.
+"""
+
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from src.cli import main
+from src.scoring.screening import MatrixScorer, ScreeningCheckpoint, collect_files, screen
+
+RESUMES = {
+    "python.txt": "Python developer\nBuilt Kafka and Spark pipelines\nSQL, Docker, AWS",
+    "java.txt": "Java engineer\nSpring Boot microservices\nKubernetes",
+    "designer.txt": "Graphic designer\nPhotoshop and Illustrator",
+}
+JDS = {
+    "data_engineer.txt": "Data engineer\nPython, Kafka, Spark and SQL required\nAWS preferred",
+    "backend.txt": "Backend engineer\nJava and Spring Boot\nKubernetes experience",
+}
+
+
+@pytest.fixture(autouse=True)
+def extraction_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("EXTRACTION_CACHE_PATH", str(tmp_path / "extraction.sqlite3"))
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    for folder, files in (("resumes", RESUMES), ("jds", JDS)):
+        (tmp_path / folder).mkdir()
+        for name, text in files.items():
+            (tmp_path / folder / name).write_text(text)
+    (tmp_path / "resumes" / "notes.md").write_text("not a resume")
+    return tmp_path
+
+
+class CountingScorer(MatrixScorer):
+    def __init__(self):
+        super().__init__(semantic='tfidf')
+        self.scored = []
+
+    def score_column(self, jd_key, resume_keys):
+        self.scored.extend(resume_keys)
+        return super().score_column(jd_key, resume_keys)
+
+
+def run(corpus, scorer=None, workers=0, **kwargs):
+    return screen([str(corpus / "resumes")], [str(corpus / "jds" / "*.txt")], str(corpus / "out.csv"),
+                  workers=workers, scorer=scorer or CountingScorer(), **kwargs)
+
+
+def test_matrix_is_scored_and_ranked(corpus):
+    summary = run(corpus)
+    results = pd.read_csv(corpus / "out.csv")
+
+    assert summary['scored_pairs'] == 6 and summary['semantic_backend'] == 'tfidf'
+    assert len(results) == 6 and sorted(results['rank'].unique()) == [1, 2, 3]
+    best = results[results['rank'] == 1].set_index('jd_name')['resume_name']
+    assert best.to_dict() == {'backend.txt': 'java.txt', 'data_engineer.txt': 'python.txt'}
+    combined = (results['hard_match_score'] + results['semantic_match_score']) / 2
+    assert (results['final_score'] - combined).abs().max() <= 0.01
+
+
+def test_rerun_resumes_from_checkpoint_and_rescores_changed_files(corpus):
+    run(corpus)
+
+    scorer = CountingScorer()
+    summary = run(corpus, scorer=scorer)
+    assert scorer.scored == [] and summary['resumed_pairs'] == 6
+
+    changed = corpus / "resumes" / "designer.txt"
+    changed.write_text("Python and Kafka designer")
+    os.utime(changed, ns=(1, 1))
+    scorer = CountingScorer()
+    summary = run(corpus, scorer=scorer, top_k=1)
+    assert len(scorer.scored) == 2 and summary['resumed_pairs'] == 4
+    assert len(pd.read_csv(corpus / "out.csv")) == 2
+
+
+def test_checkpoint_recovers_from_torn_write_and_rejects_other_settings(corpus):
+    settings = CountingScorer().settings()
+    checkpoint = ScreeningCheckpoint(str(corpus / "ckpt.jsonl"), settings)
+    checkpoint.load()
+    checkpoint.append([{'resume_id': 'r', 'jd_id': 'j'}])
+    with open(corpus / "ckpt.jsonl", "a") as f:
+        f.write('{"rows": [{"resume_id"')
+
+    reloaded = ScreeningCheckpoint(str(corpus / "ckpt.jsonl"), settings)
+    reloaded.load()
+    assert reloaded.done == {('r', 'j')}
+    assert (corpus / "ckpt.jsonl").read_text().endswith("\n")
+
+    with pytest.raises(ValueError, match="different settings"):
+        ScreeningCheckpoint(str(corpus / "ckpt.jsonl"), {**settings, 'semantic': 'embeddings'}).load()
+
+
+def test_process_pool_and_failed_files(corpus):
+    (corpus / "resumes" / "broken.pdf").write_bytes(b"not a pdf")
+    assert len(collect_files([str(corpus / "resumes")])) == 4
+
+    summary = run(corpus, workers=2)
+    assert list(summary['failed_files']) == [str(corpus / "resumes" / "broken.pdf")]
+    assert summary['scored_pairs'] == 6
+
+
+def test_cli_writes_parquet_and_reports_errors(corpus, tmp_path):
+    pytest.importorskip("pyarrow")
+    output = tmp_path / "out.parquet"
+    code = main(["screen", "--resumes", str(corpus / "resumes"), "--jds", str(corpus / "jds"),
+                 "--output", str(output), "--workers", "0", "--semantic", "tfidf", "--top-k", "2"])
+    assert code == 0
+    assert len(pd.read_parquet(output)) == 4
+    header = json.loads((tmp_path / "out.parquet.checkpoint.jsonl").read_text().splitlines()[0])
+    assert header['settings']['semantic'] == 'tfidf'
+
+    assert main(["screen", "--resumes", str(tmp_path / "missing"), "--jds", str(corpus / "jds"),
+                 "--output", str(output)]) == 2
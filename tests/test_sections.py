@@ -0,0 +1,63 @@
+"""
+Tests for the compiled section header classifier.
+"""
+
+import pytest
+
+from src.scoring.document import DocumentAnalysis
+from src.scoring.sections import SectionClassifier, segment_sections
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return SectionClassifier("professional")
+
+
+@pytest.mark.parametrize("line, section", [
+    ("WORK EXPERIENCE", "experience"),
+    ("Professional Experience:", "experience"),
+    ("## Technical Skills", "skills"),
+    ("Skills & Tools", "skills"),
+    ("EDUCATION", "education"),
+    ("Certifications", "certifications"),
+    ("PROFESSIONAL SUMMARY", "summary"),
+])
+def test_header_lines_are_classified(classifier, line, section):
+    assert classifier.classify(line)[0] == section
+
+
+@pytest.mark.parametrize("line", [
+    "• Work with the data science team on experience design",
+    "Worked on internal tools for the platform team.",
+    "5+ years of experience in software engineering",
+    "experience",
+    "University of Technology, 2018",
+    "",
+])
+def test_body_lines_are_not_headers(classifier, line):
+    assert classifier.classify(line) is None
+
+
+def test_inline_header_content_is_kept():
+    text = "Skills: Python, SQL\nEducation\nB.S. Computer Science"
+    spans = segment_sections(text)
+
+    assert [text[start:end] for start, end in spans["skills"]] == ["Python, SQL"]
+    assert [text[start:end] for start, end in spans["education"]] == ["B.S. Computer Science"]
+
+
+def test_keyword_in_body_does_not_switch_section():
+    text = "Projects\n• Resume checker\n• Work with recruiters on tooling\nEducation\nB.S."
+    doc = DocumentAnalysis(text)
+
+    assert doc.sections()["projects"] == ["• Resume checker", "• Work with recruiters on tooling"]
+    assert doc.section_terms("projects") == ["resume", "checker", "work", "recruiters", "tooling"]
+    assert doc.has_section("education")
+    assert not doc.has_section("skills")
+
+
+def test_repeated_headers_produce_one_span_each():
+    text = "Experience\nA\n\nB\nSkills\nC\nExperience\nD"
+    spans = segment_sections(text)
+
+    assert [text[start:end] for start, end in spans["experience"]] == ["A\n\nB", "D"]
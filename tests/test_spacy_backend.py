@@ -0,0 +1,100 @@
+"""
+Tests for the cached, trimmed spaCy backend.
+"""
+
+import numpy as np
+import pytest
+
+from src.parsing import resume_parser
+from src.parsing.resume_parser import ResumeParser
+from src.scoring import semantic_match, spacy_backend
+from src.scoring.normalization import NormalizedDocument
+from src.scoring.spacy_backend import SpacyBackend
+
+RESUME = """Jane Doe
+Built Kafka pipelines in Python and JavaScript.
+Machine learning models with scikit-learn.
+"""
+JD = "Looking for a Java engineer with Kafka experience"
+
+
+@pytest.fixture
+def pipeline():
+    """Blank English pipeline with a tok2vec (for Doc.tensor) and an entity ruler"""
+    spacy = pytest.importorskip("spacy")
+    from spacy.training import Example
+
+    nlp = spacy.blank("en")
+    nlp.add_pipe("tok2vec")
+    ruler = nlp.add_pipe("entity_ruler")
+    nlp.initialize(lambda: [Example.from_dict(nlp.make_doc(RESUME), {})])
+    ruler.add_patterns([{"label": "PRODUCT", "pattern": "Kafka"}, {"label": "PERSON", "pattern": "Jane Doe"}])
+    return nlp
+
+
+class CountingPipe:
+    """Wraps ``nlp.pipe`` to record which texts reach the pipeline"""
+
+    def __init__(self, nlp):
+        self.nlp = nlp
+        self.texts = []
+
+    def __getattr__(self, name):
+        return getattr(self.nlp, name)
+
+    def pipe(self, texts, **kwargs):
+        texts = list(texts)
+        self.texts.extend(texts)
+        return self.nlp.pipe(texts, **kwargs)
+
+
+def test_documents_are_processed_once_across_comparisons(pipeline):
+    counting = CountingPipe(pipeline)
+    backend = SpacyBackend(nlp=counting)
+
+    backend.similarity(RESUME, JD)
+    backend.similarity(NormalizedDocument(RESUME), JD + " and Spark")
+    backend.skills(RESUME, ["kafka"])
+    backend.entities(RESUME)
+
+    assert counting.texts == [RESUME, JD, JD + " and Spark"]
+
+
+def test_similarity_matches_doc_similarity(pipeline):
+    backend = SpacyBackend(nlp=pipeline)
+    first, second = pipeline(RESUME), pipeline(JD)
+    expected = np.dot(first.vector, second.vector) / (np.linalg.norm(first.vector) * np.linalg.norm(second.vector))
+
+    assert backend.similarity(RESUME, JD) == pytest.approx(float(expected), abs=1e-5)
+
+
+def test_skills_and_entities_share_the_cached_tokens(pipeline):
+    backend = SpacyBackend(nlp=pipeline)
+    vocabulary = ["java", "javascript", "python", "machine learning", "scikit-learn", "docker"]
+
+    assert backend.skills(RESUME, vocabulary) == ["javascript", "python", "machine learning", "scikit-learn"]
+    assert backend.entities(RESUME, labels=["PRODUCT"]) == [("Kafka", "PRODUCT")]
+    assert backend.skills(RESUME, ["python"], include_entities=True) == ["python", "Kafka"]
+
+
+def test_missing_model_falls_back(monkeypatch):
+    backend = SpacyBackend(model_name="no_such_spacy_model")
+    monkeypatch.setattr(semantic_match, "get_spacy_backend", lambda: backend)
+    monkeypatch.setattr(resume_parser, "get_spacy_backend", lambda: backend)
+
+    assert not backend.available
+    score = semantic_match._calculate_spacy_similarity(RESUME, JD)
+    assert score == semantic_match._calculate_tfidf_similarity(RESUME, JD)
+
+    parser = ResumeParser()
+    assert "javascript" in parser.extract_skills(RESUME)
+    assert parser.extract_entities(RESUME) == []
+
+
+def test_global_backend_reads_environment(monkeypatch):
+    monkeypatch.setattr(spacy_backend, "_spacy_backend", None)
+    monkeypatch.setenv("SPACY_N_PROCESS", "2")
+    monkeypatch.setenv("SPACY_BATCH_SIZE", "8")
+
+    backend = spacy_backend.get_spacy_backend()
+    assert (backend.n_process, backend.batch_size) == (2, 8)
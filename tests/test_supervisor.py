@@ -0,0 +1,104 @@
+"""
+Tests for the child process supervisor.
+"""
+
+import socket
+import sys
+import textwrap
+import time
+
+import pytest
+
+from src.utils.supervisor import ServiceSpec, ServiceSupervisor, backoff_delay, check_http_ready
+
+# Floods stdout well past the pipe buffer before serving /health, then keeps
+# logging; exits with code 3 right away when CRASH is set
+CHILD = textwrap.dedent("""
+    import os, sys, threading, time
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    if os.environ.get("CRASH"):
+        print("crashing", flush=True)
+        sys.exit(3)
+
+    for i in range(5000):
+        print(f"startup line {i} " + "x" * 40)
+
+    class Health(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200 if self.path == "/health" else 404)
+            self.end_headers()
+
+        def log_message(self, *args):
+            print("request", self.path, flush=True)
+
+    server = HTTPServer(("127.0.0.1", int(sys.argv[1])), Health)
+    server.serve_forever()
+""")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def child_spec(tmp_path, port, **kwargs):
+    script = tmp_path / "child.py"
+    script.write_text(CHILD)
+    return ServiceSpec(
+        name="child",
+        command=[sys.executable, str(script), str(port)],
+        health_url=f"http://127.0.0.1:{port}/health",
+        ready_timeout=15,
+        grace_period=5,
+        **kwargs
+    )
+
+
+def test_backoff_doubles_up_to_the_cap():
+    assert [backoff_delay(n, 1.0, 5.0) for n in range(1, 6)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+
+def test_ready_over_http_with_output_drained_to_file(tmp_path):
+    port = free_port()
+    supervisor = ServiceSupervisor([child_spec(tmp_path, port)], log_dir=str(tmp_path / "logs"))
+    try:
+        # 5000 lines (~250 KiB) would block a child whose pipe is never read
+        assert supervisor.start()
+        assert check_http_ready(f"http://127.0.0.1:{port}/health")
+        assert not check_http_ready(f"http://127.0.0.1:{port}/missing")
+    finally:
+        supervisor.stop()
+
+    log = (tmp_path / "logs" / "child.log").read_text()
+    assert "startup line 4999" in log
+    assert "request /health" in log
+    assert supervisor.status()[0]['alive'] is False
+
+
+def test_crashing_service_is_restarted_then_given_up(tmp_path):
+    spec = child_spec(tmp_path, free_port(), env={"CRASH": "1"})
+    spec.health_url = None
+    supervisor = ServiceSupervisor(
+        [spec], log_dir=str(tmp_path / "logs"), max_restarts=2,
+        backoff_base=0.05, backoff_max=0.1, poll_interval=0.05
+    )
+    supervisor.start()
+
+    start = time.monotonic()
+    assert supervisor.run() is False
+    assert time.monotonic() - start < 10
+    assert supervisor.services[0].restarts == 2
+    assert (tmp_path / "logs" / "child.log").read_text().count("crashing") == 3
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX signals")
+def test_stop_terminates_gracefully(tmp_path):
+    supervisor = ServiceSupervisor([child_spec(tmp_path, free_port())], log_dir=str(tmp_path / "logs"))
+    assert supervisor.start()
+    process = supervisor.services[0].process
+
+    supervisor.stopping.set()  # what the SIGTERM handler does
+    assert supervisor.run() is True
+    assert process.returncode == -15  # exited on SIGTERM, not SIGKILL
@@ -0,0 +1,74 @@
+"""
+Tests for the hardware-derived worker/thread topology.
+"""
+
+import pytest
+
+from src.utils import topology
+from src.utils.topology import cgroup_cpu_limit, cgroup_memory_available, plan_topology
+
+
+@pytest.fixture(autouse=True)
+def no_overrides(monkeypatch):
+    for name in ('API_WORKERS', 'TORCH_NUM_THREADS', 'PROCESS_POOL_SIZE'):
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.mark.parametrize("cpus", [1, 2, 3, 4, 8, 16, 32, 64])
+def test_plan_never_oversubscribes(cpus):
+    plan = plan_topology(cpus=cpus, memory_available_mb=256_000)
+    assert plan.api_workers >= 1 and plan.torch_threads >= 1 and plan.process_pool_size >= 1
+    assert plan.total_threads <= max(cpus, 2)
+
+
+def test_large_and_small_nodes():
+    large = plan_topology(cpus=32, memory_available_mb=64_000)
+    assert (large.api_workers, large.torch_threads, large.process_pool_size) == (8, 3, 8)
+
+    small = plan_topology(cpus=2, memory_available_mb=4_000)
+    assert (small.api_workers, small.torch_threads, small.process_pool_size) == (1, 1, 1)
+
+
+def test_memory_limits_workers():
+    plan = plan_topology(cpus=32, memory_available_mb=3_200, worker_memory_mb=1_000)
+    assert plan.api_workers == 2
+    assert plan.torch_threads == 12  # freed CPUs go to intra-op threads
+
+
+def test_environment_overrides_and_export(monkeypatch):
+    monkeypatch.setenv('API_WORKERS', '3')
+    plan = plan_topology(cpus=16, memory_available_mb=64_000)
+    assert plan.api_workers == 3 and plan.torch_threads == 4
+
+    environ = {}
+    plan.apply(environ)
+    assert environ['OMP_NUM_THREADS'] == environ['TORCH_NUM_THREADS'] == '4'
+    assert environ['API_WORKERS'] == '3'
+    assert environ['PROCESS_POOL_SIZE'] == '4'
+
+
+def test_cgroup_v2_limits(tmp_path):
+    (tmp_path / "cpu.max").write_text("250000 100000\n")
+    (tmp_path / "memory.max").write_text(str(4 * 1024 ** 3))
+    (tmp_path / "memory.current").write_text(str(1 * 1024 ** 3))
+
+    assert cgroup_cpu_limit(tmp_path) == 2.5
+    assert cgroup_memory_available(tmp_path) == 3 * 1024 ** 3
+
+    cpus, source = topology.detect_cpus(tmp_path)
+    assert source in ('cgroup quota', 'affinity', 'cpu_count') and cpus <= 3
+
+
+def test_cgroup_v1_and_unlimited(tmp_path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000")
+    assert cgroup_cpu_limit(tmp_path) is None
+
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("400000")
+    assert cgroup_cpu_limit(tmp_path) == 4.0
+
+    (tmp_path / "memory").mkdir()
+    (tmp_path / "memory" / "memory.limit_in_bytes").write_text(str(1 << 62))
+    (tmp_path / "memory" / "memory.usage_in_bytes").write_text("1000")
+    assert cgroup_memory_available(tmp_path) is None
@@ -0,0 +1,65 @@
+"""
+Tests for opt-in request tracing.
+"""
+
+import json
+
+from src.utils.metrics import record_cache_lookup, stage_timer, timed
+from src.utils.tracing import is_tracing, start_trace, to_otlp
+
+
+@timed("test_traced_stage")
+def traced_work(text):
+    with stage_timer("test_inner_stage"):
+        record_cache_lookup("test_trace_cache", True)
+    return len(text)
+
+
+def test_spans_nest_and_carry_input_lengths_and_events():
+    with start_trace("request") as root:
+        traced_work("abcd")
+
+    assert not is_tracing()
+    (stage,) = root.children
+    assert stage.name == "test_traced_stage"
+    assert stage.attributes == {"input_lengths": [4]}
+    (inner,) = stage.children
+    assert inner.events[0]["name"] == "cache_lookup"
+    assert inner.events[0]["attributes"] == {"cache": "test_trace_cache", "hit": True}
+
+
+def test_untraced_calls_create_no_spans():
+    with start_trace("request", enabled=False) as root:
+        traced_work("abcd")
+
+    assert root is None
+    assert not is_tracing()
+
+
+def test_otlp_export_links_parents():
+    with start_trace("request") as root:
+        traced_work("abcd")
+
+    spans = to_otlp(root)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_name = {item["name"]: item for item in spans}
+
+    assert by_name["request"]["parentSpanId"] == ""
+    assert by_name["test_traced_stage"]["parentSpanId"] == by_name["request"]["spanId"]
+    assert by_name["test_inner_stage"]["parentSpanId"] == by_name["test_traced_stage"]["spanId"]
+    assert len({item["traceId"] for item in spans}) == 1
+
+
+def test_evaluate_returns_and_exports_trace(api_client, tmp_path, monkeypatch):
+    export_path = tmp_path / "traces.jsonl"
+    monkeypatch.setenv("TRACE_EXPORT_PATH", str(export_path))
+    form = {"resume_text": "Python developer", "jd_text": "Python engineer"}
+
+    traced = api_client.post("/api/v1/evaluate/?trace=1", data=form).json()
+    plain = api_client.post("/api/v1/evaluate/", data=form).json()
+
+    assert "trace" not in plain
+    stages = [child["name"] for child in traced["trace"]["children"]]
+    assert stages[0] == "evaluate_parse"
+    assert "scoring_semantic_match" in stages and "db_store_evaluation" in stages
+    exported = json.loads(export_path.read_text().splitlines()[0])
+    assert exported["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["traceId"] == traced["trace"]["trace_id"]
@@ -27,6 +27,10 @@ from datetime import datetime
 import time
 from pathlib import Path
 import glob
+import re
+
+# Whitespace runs and unsupported symbols each become one space, in one pass
+_CLEAN_PATTERN = re.compile(r'\\s+|[^\\w\\s\\.,!?;:()-]')
 
 # Page configuration
 st.set_page_config(
@@ -150,14 +154,9 @@ def calculate_semantic_match(resume_data, jd_data):
         
         # Clean texts
         def _clean_text(text):
-            import re
             if not text:
                 return ""
-            # Remove extra whitespace and normalize
-            text = re.sub(r'\\s+', ' ', text.strip())
-            # Remove special characters but keep important punctuation
-            text = re.sub(r'[^\\w\\s\\.,!?;:()-]', ' ', text)
-            return text.lower()
+            return _CLEAN_PATTERN.sub(' ', text.strip()).lower()
         
         resume_clean = _clean_text(resume_text)
         jd_clean = _clean_text(jd_text)